@@ -0,0 +1 @@
+"""Performance benchmarks for the pack value toolkit (not part of the test suite)."""
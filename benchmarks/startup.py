@@ -0,0 +1,144 @@
+"""CLI startup benchmark based on ``python -X importtime``.
+
+Invokes every subcommand in a fresh interpreter with arguments that make it
+fail fast (missing inputs under a temporary directory) right after its lazy
+imports, records wall-clock startup and the import tree cost, and flags
+lightweight commands that exceed the startup budget. Commands without a
+side-effect-free probe are measured via ``--help``.
+
+Usage: ``python -m benchmarks.startup [--repeat 5] [--output startup.json]``
+"""
+
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import typer
+
+from wos_pack_value.utils import save_json
+
+# Commands that only read JSON exports and must stay cheap to start.
+LIGHT_COMMANDS = ("plan", "goal", "announce", "history-diff")
+DEFAULT_BUDGET_MS = 150.0
+
+# Fast-failing invocations; ``{tmp}`` is an empty scratch directory and
+# ``{file}`` an existing regular file (unusable as a raw/site directory).
+COMMAND_PROBES: Dict[str, List[str]] = {
+    "run": ["--raw-dir", "{file}", "--site-dir", "{tmp}/site", "--summary-only"],
+    "ingest": ["--raw-dir", "{file}"],
+    "value": ["--processed", "{tmp}/missing.json"],
+    "export": ["--processed", "{tmp}/missing.json", "--site-dir", "{tmp}/site"],
+    "analyze": ["--site-dir", "{tmp}"],
+    "plan": ["--site-dir", "{tmp}", "--budget", "10"],
+    "goal": ["--site-dir", "{tmp}", "--target", "shard", "--amount", "1"],
+    "announce": ["--site-dir", "{tmp}"],
+    "history-diff": ["--previous", "{tmp}/prev.json", "--current", "{tmp}/curr.json"],
+    "build-knowledge": ["--site-dir", "{tmp}/site", "--no-github", "--no-web"],
+}
+
+
+def _list_commands() -> List[str]:
+    from wos_pack_value.cli import app
+
+    names = []
+    for cmd in app.registered_commands:
+        name = cmd.name or cmd.callback.__name__.replace("_", "-")
+        names.append(name)
+    return names
+
+
+def _parse_importtime(stderr: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """Return total import time (ms) and top-level modules with their cumulative cost."""
+    total_us = 0
+    top_level: List[Tuple[str, float]] = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:") :].split("|", 2)
+        except ValueError:
+            continue
+        if name.startswith(" ") and not name.startswith("  "):
+            cum_us = int(cumulative.strip())
+            total_us += cum_us
+            top_level.append((name.strip(), cum_us / 1000.0))
+    top_level.sort(key=lambda t: t[1], reverse=True)
+    return total_us / 1000.0, top_level
+
+
+def _probe_args(command: str, scratch: Path) -> List[str]:
+    probe = COMMAND_PROBES.get(command)
+    if probe is None:
+        return [command, "--help"]
+    marker = scratch / "not_a_dir.txt"
+    marker.write_text("", encoding="utf-8")
+    return [command] + [arg.format(tmp=scratch, file=marker) for arg in probe]
+
+
+def measure_command(command: str, repeat: int = 5) -> Dict:
+    """Measure the startup of a single subcommand (best of ``repeat`` runs)."""
+    best_wall = float("inf")
+    best_imports = float("inf")
+    heaviest: List[Tuple[str, float]] = []
+    # Plain tracebacks/help keep rich rendering out of the measurement.
+    env = {**os.environ, "TYPER_USE_RICH": "0"}
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as tmp:
+            args = _probe_args(command, Path(tmp))
+            start = time.perf_counter()
+            proc = subprocess.run(
+                [sys.executable, "-X", "importtime", "-m", "wos_pack_value.cli", *args],
+                capture_output=True,
+                text=True,
+                env=env,
+            )
+            wall_ms = (time.perf_counter() - start) * 1000.0
+        import_ms, top_level = _parse_importtime(proc.stderr)
+        best_wall = min(best_wall, wall_ms)
+        if import_ms < best_imports:
+            best_imports = import_ms
+            heaviest = top_level[:5]
+    return {
+        "command": command,
+        "probe": "help" if command not in COMMAND_PROBES else "invoke",
+        "wall_ms": round(best_wall, 1),
+        "import_ms": round(best_imports, 1),
+        "heaviest_imports": [{"module": name, "ms": round(ms, 1)} for name, ms in heaviest],
+    }
+
+
+def main(
+    commands: Optional[List[str]] = typer.Argument(None, help="Subcommands to measure (default: all)"),
+    repeat: int = typer.Option(5, help="Runs per command; the best run is reported"),
+    budget_ms: float = typer.Option(DEFAULT_BUDGET_MS, help="Startup budget for lightweight commands"),
+    output: Optional[Path] = typer.Option(None, help="Optional JSON output path"),
+):
+    """Measure startup time of every CLI subcommand."""
+    results = [measure_command(cmd, repeat=repeat) for cmd in (commands or _list_commands())]
+    over_budget = []
+    typer.echo(f"{'command':<18} {'wall ms':>9} {'import ms':>10}  heaviest import")
+    for res in results:
+        top = res["heaviest_imports"][0] if res["heaviest_imports"] else {"module": "-", "ms": 0.0}
+        flag = ""
+        if res["command"] in LIGHT_COMMANDS and res["wall_ms"] > budget_ms:
+            flag = "  OVER BUDGET"
+            over_budget.append(res["command"])
+        typer.echo(
+            f"{res['command']:<18} {res['wall_ms']:>9.1f} {res['import_ms']:>10.1f}  {top['module']} ({top['ms']:.1f} ms){flag}"
+        )
+    if output:
+        save_json(output, {"budget_ms": budget_ms, "light_commands": list(LIGHT_COMMANDS), "results": results})
+        typer.echo(f"Results written to {output}")
+    if over_budget:
+        typer.echo(f"Lightweight commands over {budget_ms:.0f} ms: {', '.join(over_budget)}")
+        raise typer.Exit(code=1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
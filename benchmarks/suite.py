@@ -0,0 +1,209 @@
+"""Scaling benchmarks for the main pipeline entry points.
+
+Generates synthetic catalogs at several scales (see `benchmarks.synthetic`),
+times ingestion, valuation, export, analysis, planners, validation,
+knowledge linking and history diffs, and records the results to JSON. `compare` flags benchmarks
+that got slower than a stored baseline.
+
+Usage:
+    python -m benchmarks.suite run --scales 1,10,100 --output benchmarks/baseline.json
+    python -m benchmarks.suite compare benchmarks/baseline.json benchmarks/results/latest.json
+"""
+
+from __future__ import annotations
+
+import copy
+import platform
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import typer
+
+from wos_pack_value.analysis.budget_planner import load_site_data, plan_budget
+from wos_pack_value.analysis.goal_planner import plan_for_goal
+from wos_pack_value.analysis.ranking import analyze_from_site_data, analyze_packs, load_analysis_config
+from wos_pack_value.export.json_export import export_site_json
+from wos_pack_value.history.diff import diff_packs
+from wos_pack_value.ingestion.ocr import ingest_ocr_text_blocks
+from wos_pack_value.ingestion.tabular import parse_file
+from wos_pack_value.knowledge.linking import build_item_to_knowledge_links
+from wos_pack_value.utils import load_json, save_json, timestamp
+from wos_pack_value.validation.validator import validate_packs_and_items
+from wos_pack_value.valuation.config import load_valuation_config
+from wos_pack_value.valuation.engine import value_packs
+
+from .synthetic import CatalogSize, generate_csv, generate_knowledge_entities, generate_ocr_blocks, generate_workbook
+
+DEFAULT_RESULTS = Path(__file__).parent / "results" / "latest.json"
+
+app = typer.Typer(add_completion=False, help="Scaling benchmarks for wos_pack_value")
+
+
+def _best_of(fn: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _perturbed_snapshot(packs_path: Path, out_path: Path, seed: int) -> Path:
+    """Write an older-looking packs.json: ~10% removed, ~10% repriced, some items changed."""
+    rng = random.Random(seed)
+    data = copy.deepcopy(load_json(packs_path))
+    packs = []
+    for pack in data.get("packs", []):
+        roll = rng.random()
+        if roll < 0.1:
+            continue
+        if roll < 0.2:
+            pack["value_per_dollar"] = float(pack.get("value_per_dollar") or 0) * 0.9
+            pack["value"] = float(pack.get("value") or 0) * 0.9
+        elif roll < 0.3 and pack.get("items"):
+            pack["items"][0]["quantity"] = float(pack["items"][0].get("quantity") or 0) + 1
+        packs.append(pack)
+    data["packs"] = packs
+    save_json(out_path, data)
+    return out_path
+
+
+def run_scale(factor: int, repeat: int, workdir: Path) -> List[Dict[str, Any]]:
+    size = CatalogSize().scaled(factor)
+    raw_dir = workdir / "raw"
+    images_dir = workdir / "images"
+    site_dir = workdir / "site"
+    xlsx_path = generate_workbook(raw_dir / "synthetic.xlsx", size, seed=factor)
+    csv_path = generate_csv(raw_dir / "synthetic.csv", size, seed=factor)
+    ocr_blocks = generate_ocr_blocks(size, seed=factor)
+
+    results: List[Dict[str, Any]] = []
+
+    def record(name: str, fn: Callable[[], Any], n: int) -> None:
+        seconds = _best_of(fn, repeat)
+        results.append({"scale": f"{factor}x", "name": name, "seconds": round(seconds, 6), "n": n})
+        typer.echo(f"  {factor:>4}x {name:<26} {seconds * 1000:>10.2f} ms  (n={n})")
+
+    packs = parse_file(xlsx_path, images_dir=images_dir) + parse_file(csv_path, images_dir=images_dir)
+    record("parse_file[xlsx]", lambda: parse_file(xlsx_path, images_dir=images_dir), size.workbook_packs)
+    record("parse_file[csv]", lambda: parse_file(csv_path, images_dir=images_dir), size.csv_packs)
+    record("parse_ocr_text", lambda: ingest_ocr_text_blocks(ocr_blocks), len(ocr_blocks))
+
+    valuation_config = load_valuation_config()
+    valued = value_packs(packs, config=valuation_config)
+    record("value_packs", lambda: value_packs(packs, config=valuation_config), len(packs))
+    record("export_site_json", lambda: export_site_json(valued, site_dir=site_dir), len(valued))
+
+    packs_path = site_dir / "packs.json"
+    site_packs = load_json(packs_path)["packs"]
+    analysis_config = load_analysis_config()
+    record("analyze_packs", lambda: analyze_packs(site_packs, analysis_config), len(site_packs))
+
+    analyze_from_site_data(site_dir, output_dir=site_dir)
+    planned = load_site_data(site_dir)
+    record("plan_budget", lambda: plan_budget(planned, budget=100.0), len(planned))
+    record(
+        "plan_for_goal",
+        lambda: plan_for_goal(site_dir=site_dir, target_name="Shard", target_amount=500),
+        len(site_packs),
+    )
+
+    items = [item.dict() for vp in valued for item in vp.pack.items]
+    pack_dicts = [vp.pack.dict() for vp in valued]
+    record("validate_packs_and_items", lambda: validate_packs_and_items(pack_dicts, items), len(pack_dicts))
+
+    site_items = load_json(site_dir / "items.json")["items"]
+    entities = generate_knowledge_entities(size, seed=factor)
+    record(
+        "link_knowledge",
+        lambda: build_item_to_knowledge_links(site_items, entities),
+        len(site_items),
+    )
+
+    prev_path = _perturbed_snapshot(packs_path, workdir / "prev_packs.json", seed=factor)
+    record("diff_packs", lambda: diff_packs(prev_path, packs_path), len(site_packs))
+    return results
+
+
+def _parse_scales(scales: str) -> List[int]:
+    return [int(s.strip().rstrip("xX")) for s in scales.split(",") if s.strip()]
+
+
+@app.command()
+def run(
+    scales: str = typer.Option("1,10,100", help="Comma-separated scale factors"),
+    repeat: int = typer.Option(3, help="Runs per benchmark; the best run is recorded"),
+    output: Path = typer.Option(DEFAULT_RESULTS, help="Where to write the results JSON"),
+):
+    """Run the benchmark suite and record results."""
+    all_results: List[Dict[str, Any]] = []
+    for factor in _parse_scales(scales):
+        with tempfile.TemporaryDirectory() as tmp:
+            all_results.extend(run_scale(factor, repeat, Path(tmp)))
+    save_json(
+        output,
+        {
+            "generated_at": timestamp(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": repeat,
+            "results": all_results,
+        },
+    )
+    typer.echo(f"Results written to {output}")
+
+
+def compare_results(
+    baseline: Dict[str, Any],
+    current: Dict[str, Any],
+    threshold: float = 0.25,
+    min_delta_s: float = 0.002,
+) -> List[Dict[str, Any]]:
+    """Return one row per benchmark present in both files, flagging regressions."""
+    base_map = {(r["scale"], r["name"]): r for r in baseline.get("results", [])}
+    rows = []
+    for res in current.get("results", []):
+        base = base_map.get((res["scale"], res["name"]))
+        if not base:
+            continue
+        before, after = float(base["seconds"]), float(res["seconds"])
+        ratio = after / before if before else float("inf")
+        rows.append(
+            {
+                "scale": res["scale"],
+                "name": res["name"],
+                "baseline_s": before,
+                "current_s": after,
+                "ratio": round(ratio, 3),
+                "regression": ratio > 1 + threshold and (after - before) > min_delta_s,
+            }
+        )
+    return rows
+
+
+@app.command()
+def compare(
+    baseline: Path = typer.Argument(..., help="Baseline results JSON"),
+    current: Path = typer.Argument(DEFAULT_RESULTS, help="Current results JSON"),
+    threshold: float = typer.Option(0.25, help="Allowed slowdown ratio before flagging (0.25 = 25%)"),
+    min_delta_ms: float = typer.Option(2.0, help="Ignore slowdowns smaller than this many milliseconds"),
+):
+    """Compare results against a baseline; exits 1 when regressions are found."""
+    rows = compare_results(load_json(baseline), load_json(current), threshold, min_delta_ms / 1000.0)
+    regressions = [r for r in rows if r["regression"]]
+    for r in rows:
+        flag = "  REGRESSION" if r["regression"] else ""
+        typer.echo(
+            f"{r['scale']:>5} {r['name']:<26} {r['baseline_s'] * 1000:>10.2f} -> {r['current_s'] * 1000:>10.2f} ms  x{r['ratio']:.2f}{flag}"
+        )
+    if regressions:
+        typer.echo(f"{len(regressions)} regression(s) above {threshold:.0%}")
+        raise typer.Exit(code=1)
+    typer.echo("No regressions.")
+
+
+if __name__ == "__main__":
+    app()
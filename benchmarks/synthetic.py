@@ -0,0 +1,199 @@
+"""Synthetic catalog generator for benchmarks.
+
+Produces workbooks laid out like the community sheets the tabular parser
+expects (title row, header row, item rows, "Gem Total" summary row), CSVs in
+the flat `pack_name,price,...` layout, and OCR text blocks. Output is seeded
+and deterministic so benchmark runs are comparable.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import math
+import random
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import List, Tuple
+
+from openpyxl import Workbook
+
+from wos_pack_value.knowledge.schemas import KnowledgeEntity
+
+ITEM_NAMES: Tuple[Tuple[str, str, float], ...] = (
+    ("Fire Crystal", "premium_currency", 1.0),
+    ("VIP Point", "vip", 0.02),
+    ("Speedup 60m", "speedup", 0.4),
+    ("Speedup 3h", "speedup", 1.0),
+    ("Universal Shard", "shard", 0.35),
+    ("Epic Hero Shard", "shard", 0.55),
+    ("Legendary Hero Shard", "shard", 0.75),
+    ("Food", "resource", 0.00005),
+    ("Wood", "resource", 0.00005),
+    ("Iron", "resource", 0.0001),
+    ("Stone", "resource", 0.0001),
+)
+PRICE_TIERS = (0.99, 2.99, 4.99, 9.99, 14.99, 19.99, 24.99, 49.99, 74.99, 99.99)
+
+
+@dataclass(frozen=True)
+class CatalogSize:
+    """Knobs for one synthetic catalog; `scaled()` multiplies the volume knobs."""
+
+    sheets: int = 2
+    tables_per_sheet: int = 5
+    items_per_pack: int = 8
+    distinct_items: int = 40
+    merged_cells_per_sheet: int = 5
+    images_per_sheet: int = 2
+    csv_packs: int = 10
+    ocr_blocks: int = 10
+    knowledge_entities: int = 200
+
+    def scaled(self, factor: int) -> "CatalogSize":
+        # Grow sheets and tables-per-sheet together (~sqrt each) so both loops are exercised.
+        sheet_mult = max(1, int(round(math.sqrt(factor))))
+        return replace(
+            self,
+            sheets=self.sheets * sheet_mult,
+            tables_per_sheet=math.ceil(self.tables_per_sheet * factor / sheet_mult),
+            distinct_items=self.distinct_items * factor,
+            merged_cells_per_sheet=self.merged_cells_per_sheet * factor,
+            images_per_sheet=self.images_per_sheet * factor,
+            csv_packs=self.csv_packs * factor,
+            ocr_blocks=self.ocr_blocks * factor,
+            knowledge_entities=self.knowledge_entities * factor,
+        )
+
+    @property
+    def workbook_packs(self) -> int:
+        return self.sheets * self.tables_per_sheet
+
+
+def _item_pool(size: CatalogSize, rng: random.Random) -> List[Tuple[str, str, float]]:
+    pool = list(ITEM_NAMES)
+    idx = 1
+    while len(pool) < size.distinct_items:
+        base_name, category, value = ITEM_NAMES[idx % len(ITEM_NAMES)]
+        pool.append((f"{base_name} {idx}", category, value * rng.uniform(0.5, 1.5)))
+        idx += 1
+    return pool
+
+
+def _pack_items(pool: List[Tuple[str, str, float]], count: int, rng: random.Random) -> List[Tuple[str, str, float, int]]:
+    chosen = rng.sample(pool, k=min(count, len(pool)))
+    return [(name, cat, value, rng.choice((1, 2, 5, 10, 50, 100, 300, 1000))) for name, cat, value in chosen]
+
+
+def _png_bytes() -> bytes:
+    from PIL import Image as PILImage
+
+    buf = io.BytesIO()
+    PILImage.new("RGB", (8, 8), (200, 30, 30)).save(buf, format="PNG")
+    return buf.getvalue()
+
+
+def generate_workbook(path: Path, size: CatalogSize = CatalogSize(), seed: int = 0) -> Path:
+    """Write a multi-sheet, multi-table workbook and return its path."""
+    from openpyxl.drawing.image import Image as XLImage
+
+    rng = random.Random(seed)
+    pool = _item_pool(size, rng)
+    png = _png_bytes() if size.images_per_sheet else b""
+    wb = Workbook()
+    wb.remove(wb.active)
+    for sheet_idx in range(size.sheets):
+        ws = wb.create_sheet(f"Packs {sheet_idx + 1}")
+        row = 1
+        title_rows: List[int] = []
+        for table_idx in range(size.tables_per_sheet):
+            ws.cell(row=row, column=1, value=f"Pack S{sheet_idx + 1} T{table_idx + 1}")
+            title_rows.append(row)
+            row += 1
+            for col, header in enumerate(("Item", "Quantity", "Gem per unit", "Total", "Note"), start=1):
+                ws.cell(row=row, column=col, value=header)
+            row += 1
+            first_item_row = row
+            gem_total = 0.0
+            for name, _, value, qty in _pack_items(pool, size.items_per_pack, rng):
+                gems = round(value * 100, 4)
+                total = gems * qty
+                gem_total += total
+                for col, cell_value in enumerate((name, qty, gems, total), start=1):
+                    ws.cell(row=row, column=col, value=cell_value)
+                row += 1
+            # Community sheets often merge a note cell down the item rows.
+            if table_idx < size.merged_cells_per_sheet and row - first_item_row > 1:
+                ws.cell(row=first_item_row, column=5, value="limited offer")
+                ws.merge_cells(start_row=first_item_row, start_column=5, end_row=row - 1, end_column=5)
+            ws.cell(row=row, column=1, value="Gem Total")
+            ws.cell(row=row, column=4, value=gem_total)
+            row += 3  # two blank rows close the table
+        for img_idx in range(size.images_per_sheet):
+            image = XLImage(io.BytesIO(png))
+            anchor_row = title_rows[img_idx % len(title_rows)] + 2 if title_rows else 1
+            ws.add_image(image, f"G{anchor_row}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(path)
+    return path
+
+
+def generate_csv(path: Path, size: CatalogSize = CatalogSize(), seed: int = 0) -> Path:
+    """Write a flat pack CSV (`pack_name,price,currency,item_name,quantity,category`)."""
+    rng = random.Random(seed)
+    pool = _item_pool(size, rng)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["pack_name", "price", "currency", "item_name", "quantity", "category"])
+        for pack_idx in range(size.csv_packs):
+            price = rng.choice(PRICE_TIERS)
+            for name, category, _, qty in _pack_items(pool, size.items_per_pack, rng):
+                writer.writerow([f"CSV Pack {pack_idx + 1}", price, "USD", name, qty, category])
+    return path
+
+
+def generate_ocr_blocks(size: CatalogSize = CatalogSize(), seed: int = 0) -> List[Tuple[str, str]]:
+    """Return `(filename, text)` OCR blocks in the layout `parse_ocr_text_to_pack` expects."""
+    rng = random.Random(seed)
+    pool = _item_pool(size, rng)
+    blocks = []
+    for idx in range(size.ocr_blocks):
+        lines = [f"OCR Pack {idx + 1}", f"${rng.choice(PRICE_TIERS)}"]
+        for name, _, _, qty in _pack_items(pool, size.items_per_pack, rng):
+            lines.append(f"{name} x{qty}" if rng.random() < 0.5 else f"{qty} {name}")
+        blocks.append((f"ocr_{idx + 1:04}.png", "\n".join(lines)))
+    return blocks
+
+
+def generate_knowledge_entities(size: CatalogSize = CatalogSize(), seed: int = 0) -> List[KnowledgeEntity]:
+    """Scraped-looking entities: heroes (some named like item-name fragments) and exact-name resources."""
+    rng = random.Random(seed)
+    pool = _item_pool(size, rng)
+    syllables = ("ka", "ron", "mi", "sar", "ge", "na", "tor", "li", "ve", "zu")
+    entities = []
+    for idx in range(size.knowledge_entities):
+        roll = rng.random()
+        if roll < 0.1:
+            entity_type, name = "resource", rng.choice(pool)[0]
+        elif roll < 0.2:
+            entity_type, name = "hero", rng.choice(pool)[0].split()[-1]
+        elif roll < 0.6:
+            entity_type = "hero"
+            name = "".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))).title()
+        else:
+            entity_type, name = rng.choice(("building", "tech", "page")), f"Entity {idx}"
+        entities.append(
+            KnowledgeEntity(
+                id=f"{entity_type}-{idx}",
+                game="whiteout_survival",
+                entity_type=entity_type,
+                name=name,
+                source="synthetic",
+                source_detail="",
+            )
+        )
+    return entities
+
+
+__all__ = ["CatalogSize", "generate_workbook", "generate_csv", "generate_knowledge_entities", "generate_ocr_blocks"]
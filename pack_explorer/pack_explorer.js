@@ -26,7 +26,7 @@
       const merged = { ...p };
       const o = overallMap[p.id] || {};
       merged.rank_overall = o.rank_overall ?? null;
-      merged.value_per_dollar = o.value_per_dollar ?? p.value_per_dollar ?? p.value || 0;
+      merged.value_per_dollar = (o.value_per_dollar ?? p.value_per_dollar ?? p.value) || 0;
       merged.category_scores = {};
       Object.entries(categoryRanks).forEach(([cat, list]) => {
         const found = (list || []).find((entry) => entry.id === p.id);
@@ -52,25 +52,41 @@
     }
     const sortField = filters.sortField || "rank_overall";
     const dir = filters.sortDir === "asc" ? 1 : -1;
-    result.sort((a, b) => {
-      const av =
-        sortField === "rank_overall"
-          ? a.rank_overall ?? Number.POSITIVE_INFINITY
-          : sortField === "value_per_dollar"
-            ? a.value_per_dollar ?? 0
-            : a.price?.amount ?? a.price ?? 0;
-      const bv =
-        sortField === "rank_overall"
-          ? b.rank_overall ?? Number.POSITIVE_INFINITY
-          : sortField === "value_per_dollar"
-            ? b.value_per_dollar ?? 0
-            : b.price?.amount ?? b.price ?? 0;
+    const sortValue = (p) =>
+      sortField === "rank_overall"
+        ? p.rank_overall ?? Number.POSITIVE_INFINITY
+        : sortField === "value_per_dollar"
+          ? p.value_per_dollar ?? 0
+          : p.price?.amount ?? p.price ?? 0;
+    const compare = (a, b) => {
+      const av = sortValue(a);
+      const bv = sortValue(b);
       return av > bv ? dir : av < bv ? -dir : 0;
-    });
+    };
     if (filters.topN && filters.topToggle) {
-      result = result.slice(0, filters.topN);
+      return topN(result, filters.topN, compare);
+    }
+    return result.sort(compare);
+  }
+
+  // First n of a stable sort by `compare`, without sorting everything: a
+  // bounded sorted buffer where equal items keep their input order.
+  function topN(items, n, compare) {
+    const best = [];
+    if (n <= 0) return best;
+    for (const item of items) {
+      if (best.length === n && compare(item, best[n - 1]) >= 0) continue;
+      let lo = 0;
+      let hi = best.length;
+      while (lo < hi) {
+        const mid = (lo + hi) >> 1;
+        if (compare(item, best[mid]) < 0) hi = mid;
+        else lo = mid + 1;
+      }
+      best.splice(lo, 0, item);
+      if (best.length > n) best.pop();
     }
-    return result;
+    return best;
   }
 
   function updateSelectionWithLimit(current, id, shouldSelect, maxCount = 3) {
@@ -462,7 +478,7 @@
   document.addEventListener("DOMContentLoaded", init);
 
   // Export pure functions for testing
-  window.PackExplorer = { mergePacksWithRankings, applyFiltersAndSort, updateSelectionWithLimit };
+  window.PackExplorer = { mergePacksWithRankings, applyFiltersAndSort, topN, updateSelectionWithLimit };
 
   // Manual planner test tips:
   // - Budget: set budget to 50, click "Plan budget"; reduce to 10 to see fewer packs; toggle "Include reference" to see refs included.
@@ -1,5 +1,6 @@
 from pathlib import Path
 
+from wos_pack_value import logging_utils
 from wos_pack_value.analysis.announcements import generate_announcement
 
 
@@ -30,3 +31,80 @@ def test_generate_announcement_includes_title_and_summary():
     md = generate_announcement(packs, title="Custom Title", top_n=1)
     assert "Custom Title" in md
     assert "Summary" in md
+
+
+def test_generate_announcement_appends_change_log():
+    packs = [
+        {"id": "a", "name": "Pack A", "price": {"amount": 10, "currency": "USD"}, "value_per_dollar": 5, "summary": "Line."},
+    ]
+    change_log = {
+        "steps": [
+            {
+                "from": "s1",
+                "to": "s2",
+                "new_packs": [],
+                "removed_packs": [],
+                "changed_packs": [
+                    {
+                        "pack_name": "Pack A",
+                        "before": {"value_per_dollar": 4.0},
+                        "after": {"value_per_dollar": 5.0},
+                        "items": {"added": [], "removed": [], "quantity_changes": []},
+                    }
+                ],
+            }
+        ]
+    }
+    md = generate_announcement(packs, top_n=1, change_log=change_log)
+    assert md.index("Pack A") < md.index("What changed")
+    assert "4.00 → 5.00" in md
+
+
+def test_batch_announcements_match_single_calls(tmp_path: Path, monkeypatch):
+    from typer.testing import CliRunner
+
+    from wos_pack_value.analysis.announcements import load_and_generate_announcement, load_and_generate_announcements
+    from wos_pack_value.cli import app
+    from wos_pack_value.utils import save_json
+
+    monkeypatch.setattr(logging_utils, "LOG_DIR", tmp_path / "logs")
+    packs = [
+        {
+            "id": f"p{i}",
+            "name": f"Pack {i}",
+            "price": {"amount": 4.99, "currency": "USD"},
+            "value": 10.0 * (i % 4 + 1),
+            "value_per_dollar": 10.0 * (i % 4 + 1) / 4.99,
+            "category_values": {"shards": 5.0 * i},
+            "summary": "Stored summary.",
+            "is_reference": i == 3,
+        }
+        for i in range(8)
+    ]
+    save_json(tmp_path / "packs.json", {"packs": packs})
+    save_json(
+        tmp_path / "pack_ranking_profile_f2p.json",
+        {"packs": [{"id": f"p{i}", "profile_score": float(i), "profile_rank": 8 - i} for i in range(8)]},
+    )
+
+    variants = load_and_generate_announcements(tmp_path, profiles=[None, "f2p", "whale"], top_ns=[2, 5])
+    assert list(variants) == [(None, 2), (None, 5), ("f2p", 2), ("f2p", 5), ("whale", 2), ("whale", 5)]
+    assert variants[(None, 5)] == load_and_generate_announcement(tmp_path, top_n=5)
+    single = load_and_generate_announcement(tmp_path, profile_name="f2p", top_n=2)
+    assert variants[("f2p", 2)].split("Summary")[0] == single.split("Summary")[0]  # same packs, order and ranks
+    assert "Pack 7" in variants[("f2p", 2)] and "Pack 3" not in variants[("f2p", 5)]
+    assert "Good fit for F2P players" in variants[("f2p", 2)]
+    assert "Appeals to whales" in variants[("whale", 5)]
+    assert "Stored summary." in variants[(None, 2)]
+
+    out_dir = tmp_path / "posts"
+    result = CliRunner().invoke(
+        app, ["announce", "--site-dir", str(tmp_path), "--profiles", "overall,f2p", "--top-ns", "3,5", "--output-dir", str(out_dir)]
+    )
+    assert result.exit_code == 0, result.output
+    assert sorted(p.name for p in out_dir.iterdir()) == [
+        "announcement_f2p_top3.md",
+        "announcement_f2p_top5.md",
+        "announcement_overall_top3.md",
+        "announcement_overall_top5.md",
+    ]
@@ -1,71 +1,159 @@
+import shutil
+import subprocess
 from pathlib import Path
 
+import pytest
+
 from wos_pack_value.automation import auto_update
+from wos_pack_value.history.store import SnapshotStore
+from wos_pack_value.export.changes import ChangeSet, describe_change, write_export
+from wos_pack_value.pipeline import run_pipeline
+
+
+REAL_GIT_ADD = auto_update._git_add
+REAL_GIT_COMMIT = auto_update._git_commit
+REAL_GIT_PENDING = auto_update._git_pending
 
 
 class DummyGit:
     def __init__(self):
-        self.add_called = False
-        self.commit_called = False
-        self.status_lines = []
-        self.run_code = 0
+        self.add_paths = None
         self.commit_message = None
+        self.pending = []
 
-    def run_pipeline(self, **kwargs):
-        return self.run_code
-
-    def status(self):
-        return self.status_lines
+    def status(self, paths):
+        return list(self.pending)
 
     def add(self, paths):
-        self.add_called = True
         self.add_paths = list(paths)
         return 0
 
     def commit(self, msg):
-        self.commit_called = True
         self.commit_message = msg
         return 0
 
 
-def test_auto_update_no_changes(monkeypatch, tmp_path: Path):
-    dummy = DummyGit()
-    monkeypatch.setattr(auto_update, "_run_pipeline_cmd", lambda **kwargs: dummy.run_pipeline(**kwargs))
-    monkeypatch.setattr(auto_update, "_git_status", lambda: dummy.status())
-    monkeypatch.setattr(auto_update, "_git_add", lambda paths: dummy.add(paths))
-    monkeypatch.setattr(auto_update, "_git_commit", lambda msg: dummy.commit(msg))
-
-    code = auto_update.auto_update_and_commit(raw_dir=tmp_path, site_dir=tmp_path / "site")
-    assert code == 0
-    assert not dummy.add_called
-    assert not dummy.commit_called
-
-
-def test_auto_update_with_changes_dry_run(monkeypatch, tmp_path: Path):
-    dummy = DummyGit()
-    dummy.status_lines = [" M site_data/packs.json"]
-    monkeypatch.setattr(auto_update, "_run_pipeline_cmd", lambda **kwargs: dummy.run_pipeline(**kwargs))
-    monkeypatch.setattr(auto_update, "_git_status", lambda: dummy.status())
-    monkeypatch.setattr(auto_update, "_git_add", lambda paths: dummy.add(paths))
-    monkeypatch.setattr(auto_update, "_git_commit", lambda msg: dummy.commit(msg))
-
-    code = auto_update.auto_update_and_commit(raw_dir=tmp_path, site_dir=tmp_path / "site", dry_run=True)
-    assert code == 0
-    assert not dummy.add_called
-    assert not dummy.commit_called
-
-
-def test_auto_update_with_changes_commit(monkeypatch, tmp_path: Path):
+@pytest.fixture
+def env(monkeypatch, tmp_path: Path):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    shutil.copy(Path(__file__).parent / "data" / "sample_packs.csv", raw_dir / "sample_packs.csv")
     dummy = DummyGit()
-    dummy.status_lines = [" M site_data/packs.json"]
-    monkeypatch.setattr(auto_update, "_run_pipeline_cmd", lambda **kwargs: dummy.run_pipeline(**kwargs))
-    monkeypatch.setattr(auto_update, "_git_status", lambda: dummy.status())
-    monkeypatch.setattr(auto_update, "_git_add", lambda paths: dummy.add(paths))
-    monkeypatch.setattr(auto_update, "_git_commit", lambda msg: dummy.commit(msg))
 
-    code = auto_update.auto_update_and_commit(raw_dir=tmp_path, site_dir=Path("site_data"))
+    def fake_run_pipeline(**kwargs):
+        return run_pipeline(
+            processed_dir=tmp_path / "processed",
+            images_dir=tmp_path / "images",
+            log_file=tmp_path / "run.log",
+            **kwargs,
+        )
+
+    monkeypatch.setattr(auto_update, "run_pipeline", fake_run_pipeline)
+    monkeypatch.setattr(auto_update, "_git_add", dummy.add)
+    monkeypatch.setattr(auto_update, "_git_commit", dummy.commit)
+    monkeypatch.setattr(auto_update, "_git_pending", dummy.status)
+    return raw_dir, tmp_path / "site", dummy
+
+
+def test_auto_update_commits_changed_exports_then_nothing(env):
+    raw_dir, site_dir, dummy = env
+    changes = ChangeSet()
+    code = auto_update.auto_update_and_commit(raw_dir=raw_dir, site_dir=site_dir, changes=changes)
     assert code == 0
-    assert dummy.add_called
-    assert dummy.commit_called
+    assert site_dir / "packs.json" in dummy.add_paths
+    assert site_dir / "pack_ranking_overall.json" in dummy.add_paths
+    assert site_dir / "run_metrics.json" not in dummy.add_paths
     assert dummy.commit_message.startswith("Update pack data")
-
+    assert "packs.json: created" in dummy.commit_message
+
+    # Same inputs: exports are not rewritten and git is never invoked.
+    dummy.add_paths = dummy.commit_message = None
+    assert auto_update.auto_update_and_commit(raw_dir=raw_dir, site_dir=site_dir) == 0
+    assert dummy.add_paths is None and dummy.commit_message is None
+
+    with (raw_dir / "sample_packs.csv").open("a", encoding="utf-8") as f:
+        f.write("New Pack,1.99,USD,Fire Crystal,50,premium_currency\n")
+    changes = ChangeSet()
+    auto_update.auto_update_and_commit(raw_dir=raw_dir, site_dir=site_dir, dry_run=True, changes=changes)
+    reasons = {c.path.name: c.reason for c in changes.changes}
+    assert reasons["packs.json"] == "packs: 1 added, 0 removed, 0 changed"
+    assert dummy.add_paths is None
+
+
+def test_auto_update_snapshots_only_when_changed(env, tmp_path: Path):
+    raw_dir, site_dir, dummy = env
+    history = tmp_path / "history"
+    auto_update.auto_update_and_commit(raw_dir=raw_dir, site_dir=site_dir, history_root=history)
+    store = SnapshotStore(history)
+    snapshots = store.list_snapshots()
+    assert len(snapshots) == 1 and snapshots[0].path in dummy.add_paths
+    assert "pack_ranking_overall.json" in snapshots[0].files
+    assert all(p in dummy.add_paths for p in history.glob("store/objects/*/*.gz"))
+
+    auto_update.auto_update_and_commit(raw_dir=raw_dir, site_dir=site_dir, history_root=history)
+    assert len(store.list_snapshots()) == 1
+
+
+def test_real_run_after_dry_run_commits_pending_exports(env, monkeypatch, tmp_path: Path):
+    raw_dir, site_dir, _ = env
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(auto_update, "_git_add", REAL_GIT_ADD)
+    monkeypatch.setattr(auto_update, "_git_commit", REAL_GIT_COMMIT)
+    monkeypatch.setattr(auto_update, "_git_pending", REAL_GIT_PENDING)
+    for cmd in (["init", "-q"], ["config", "user.email", "t@example.com"], ["config", "user.name", "t"]):
+        subprocess.run(["git", *cmd], check=True)
+    history = tmp_path / "history"
+
+    code = auto_update.auto_update_and_commit(raw_dir=raw_dir, site_dir=site_dir, history_root=history, dry_run=True)
+    assert code == 0
+    assert not subprocess.run(["git", "log"], capture_output=True).stdout
+
+    # Exports are already on disk with identical bytes, but still uncommitted.
+    changes = ChangeSet()
+    code = auto_update.auto_update_and_commit(raw_dir=raw_dir, site_dir=site_dir, history_root=history, changes=changes)
+    assert code == 0 and not changes
+    committed = subprocess.run(["git", "ls-files"], capture_output=True, text=True).stdout.split()
+    assert "site/packs.json" in committed
+    assert any(name.startswith("history/store/objects/") for name in committed)
+    status = subprocess.run(["git", "status", "--porcelain", "site", "history"], capture_output=True, text=True)
+    assert status.stdout == "?? site/run_metrics.json\n"
+
+    assert auto_update.auto_update_and_commit(raw_dir=raw_dir, site_dir=site_dir, history_root=history) == 0
+    log = subprocess.run(["git", "log", "--oneline"], capture_output=True, text=True).stdout
+    assert len(log.splitlines()) == 1
+
+
+def test_extra_run_args_map_to_pipeline_kwargs():
+    kwargs = auto_update._run_kwargs_from_args(["--use-ocr-screenshots", "--ocr-lang", "deu", "--no-validation"])
+    assert kwargs["use_ocr"] is True
+    assert kwargs["ocr_lang"] == "deu"
+    assert kwargs["enable_validation"] is False
+    assert kwargs["use_ocr_cache"] is True
+    assert auto_update._run_kwargs_from_args(["--log-file", "x.log", "--with-analysis"])["log_file"] == "x.log"
+
+
+def test_unsupported_extra_run_args_are_rejected(env):
+    raw_dir, site_dir, dummy = env
+    with pytest.raises(ValueError, match="--raw-dir, --summary-only"):
+        auto_update._run_kwargs_from_args(["--summary-only", "--raw-dir", "elsewhere"])
+    with pytest.raises(ValueError, match="--timings"):
+        auto_update.auto_update_and_commit(raw_dir=raw_dir, site_dir=site_dir, extra_run_args=["--timings"])
+    assert not (site_dir / "packs.json").exists()
+
+
+def test_pipeline_failure_aborts(monkeypatch, tmp_path: Path):
+    def boom(**kwargs):
+        raise RuntimeError("broken workbook")
+
+    monkeypatch.setattr(auto_update, "run_pipeline", boom)
+    assert auto_update.auto_update_and_commit(raw_dir=tmp_path, site_dir=tmp_path / "site") == 1
+
+
+def test_write_export_ignores_generated_at(tmp_path: Path):
+    path = tmp_path / "packs.json"
+    changes = ChangeSet()
+    assert write_export(path, {"generated_at": "a", "packs": [{"id": "x", "v": 1}]}, changes)
+    assert not write_export(path, {"generated_at": "b", "packs": [{"id": "x", "v": 1}]}, changes)
+    assert write_export(path, {"generated_at": "c", "packs": [{"id": "x", "v": 2}, {"id": "y"}]}, changes)
+    assert [c.reason for c in changes.changes] == ["created", "packs: 1 added, 0 removed, 1 changed"]
+    assert describe_change({"a": 1}, {"a": 2}) == "content changed"
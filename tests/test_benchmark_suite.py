@@ -0,0 +1,38 @@
+from pathlib import Path
+
+from benchmarks.suite import compare_results
+from benchmarks.synthetic import CatalogSize, generate_csv, generate_ocr_blocks, generate_workbook
+from wos_pack_value.ingestion.ocr import ingest_ocr_text_blocks
+from wos_pack_value.ingestion.tabular import parse_file
+
+
+def test_synthetic_catalog_round_trips_through_parsers(tmp_path: Path):
+    size = CatalogSize(sheets=2, tables_per_sheet=3, items_per_pack=4, csv_packs=5, ocr_blocks=3)
+    xlsx = generate_workbook(tmp_path / "raw" / "synthetic.xlsx", size)
+    csv_path = generate_csv(tmp_path / "raw" / "synthetic.csv", size)
+
+    workbook_packs = parse_file(xlsx, images_dir=tmp_path / "images")
+    assert len(workbook_packs) == size.workbook_packs
+    assert all(len(p.items) == size.items_per_pack for p in workbook_packs)
+    assert all(p.meta.get("gem_total") for p in workbook_packs)
+    assert any(item.icon for p in workbook_packs for item in p.items)
+
+    assert len(parse_file(csv_path, images_dir=tmp_path / "images")) == size.csv_packs
+    ocr_packs = ingest_ocr_text_blocks(generate_ocr_blocks(size))
+    assert len(ocr_packs) == size.ocr_blocks
+    assert all(p.price > 0 and len(p.items) == size.items_per_pack for p in ocr_packs)
+
+
+def test_catalog_size_scaling():
+    base = CatalogSize()
+    scaled = base.scaled(100)
+    assert scaled.workbook_packs >= base.workbook_packs * 100
+    assert scaled.csv_packs == base.csv_packs * 100
+
+
+def test_compare_results_flags_regressions():
+    baseline = {"results": [{"scale": "1x", "name": "a", "seconds": 0.1}, {"scale": "1x", "name": "b", "seconds": 0.1}]}
+    current = {"results": [{"scale": "1x", "name": "a", "seconds": 0.2}, {"scale": "1x", "name": "b", "seconds": 0.105}]}
+    rows = {r["name"]: r for r in compare_results(baseline, current, threshold=0.25)}
+    assert rows["a"]["regression"]
+    assert not rows["b"]["regression"]
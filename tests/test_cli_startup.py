@@ -0,0 +1,12 @@
+import subprocess
+import sys
+
+
+def test_cli_import_defers_heavy_dependencies():
+    code = (
+        "import sys, wos_pack_value.cli; "
+        "print(','.join(m for m in ('pandas', 'openpyxl', 'pydantic', 'requests', 'bs4', 'numpy') if m in sys.modules))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert proc.stdout.strip() == ""
+
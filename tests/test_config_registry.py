@@ -0,0 +1,72 @@
+from pathlib import Path
+from types import MappingProxyType
+
+import pytest
+
+from wos_pack_value.analysis.item_categories import load_item_category_config
+from wos_pack_value.analysis.planner_presets import load_planner_presets
+from wos_pack_value.analysis.game_profiles import GameProfile
+from wos_pack_value.config_registry import ConfigRegistry, freeze, registry, thaw
+from wos_pack_value.valuation.config import DEFAULT_CONFIG, load_valuation_config
+
+
+def test_registry_parses_once_and_invalidates_on_change(tmp_path: Path):
+    path = tmp_path / "cfg.yaml"
+    path.write_text("a: 1\nlist: [x, y]\n", encoding="utf-8")
+    reg = ConfigRegistry()
+    builds = []
+
+    def build(data):
+        builds.append(data)
+        return {"doubled": data["a"] * 2}
+
+    first = reg.load(path, build)
+    assert reg.load(path, build) is first
+    assert first == {"doubled": 2}
+    assert isinstance(builds[0], MappingProxyType) and builds[0]["list"] == ("x", "y")
+    with pytest.raises(TypeError):
+        builds[0]["a"] = 3
+    assert reg.stats.to_dict() == {"parses": 1, "builds": 1, "hits": 1, "invalidations": 0}
+
+    path.write_text("a: 21\n", encoding="utf-8")
+    assert reg.load(path, build) == {"doubled": 42}
+    assert reg.stats.parses == 2 and reg.stats.invalidations == 1
+
+    with pytest.raises(FileNotFoundError):
+        reg.parsed(tmp_path / "missing.yaml")
+
+
+def test_freeze_thaw_round_trip():
+    data = {"a": [1, {"b": [2]}], "c": "d"}
+    frozen = freeze(data)
+    assert thaw(frozen) == data
+    assert type(thaw(frozen)["a"][1]) is dict
+
+
+def test_loaders_share_cached_builds_but_return_independent_dicts(tmp_path: Path):
+    values = tmp_path / "item_values.yaml"
+    values.write_text("items:\n  Gem:\n    base_value: 1\n", encoding="utf-8")
+    config = load_valuation_config(values)
+    config["items"]["Gem"]["base_value"] = 99
+    config["valuation"]["ratio_scale"]["max_ratio"] = 1.0
+    again = load_valuation_config(values)
+    assert again["items"]["Gem"]["base_value"] == 1
+    assert again["valuation"]["ratio_scale"]["max_ratio"] == 10.0
+    assert DEFAULT_CONFIG["items"] == {}
+
+    cats = tmp_path / "item_categories.yaml"
+    cats.write_text("categories:\n  speedups:\n    match:\n      name_contains: [SPEEDUP]\n", encoding="utf-8")
+    assert load_item_category_config(cats) is load_item_category_config(cats)
+    assert load_item_category_config(cats).categories["speedups"].name_contains == ["speedup"]
+
+    presets = tmp_path / "planner_presets.yaml"
+    presets.write_text(
+        "games:\n  g1:\n    presets:\n      - {key: a, label: A}\n  g2:\n    presets:\n      - {key: b, label: B}\n",
+        encoding="utf-8",
+    )
+    g1, g2 = (GameProfile(key=k, label=k, description="", config_dir=None) for k in ("g1", "g2"))
+    assert [p.key for p in load_planner_presets(tmp_path, game=g1)] == ["a"]
+    assert [p.key for p in load_planner_presets(tmp_path, game=g2)] == ["b"]
+    hits = registry.stats.hits
+    load_planner_presets(tmp_path, game=g1)
+    assert registry.stats.hits == hits + 1
@@ -0,0 +1,110 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from wos_pack_value import logging_utils
+from wos_pack_value.analysis.announcements import generate_announcement
+from wos_pack_value.cli import app
+from wos_pack_value.history.diff import SnapshotCache, diff_items, diff_packs, diff_snapshot_range
+from wos_pack_value.history.snapshot import snapshot_site_data
+from wos_pack_value.history.store import SnapshotStore
+from wos_pack_value.utils import ensure_dir, load_json, save_json
+
+
+def _pack(pack_id: str, vpd: float, items: dict) -> dict:
+    return {
+        "id": pack_id,
+        "name": pack_id.title(),
+        "price": {"amount": 5.0, "currency": "USD"},
+        "value_per_dollar": vpd,
+        "items": [{"id": item_id, "quantity": qty} for item_id, qty in items.items()],
+    }
+
+
+def test_diff_items_merge_join():
+    diff = diff_items([("gems", 100.0), ("speedup", 5.0)], [("shards", 2.0), ("speedup", 7.0)])
+    assert diff["added"] == [{"item_id": "shards", "quantity": 2.0}]
+    assert diff["removed"] == [{"item_id": "gems", "quantity": 100.0}]
+    assert diff["quantity_changes"] == [{"item_id": "speedup", "before": 5.0, "after": 7.0, "delta": 2.0}]
+
+
+def test_diff_packs_reports_item_only_changes(tmp_path: Path):
+    prev, curr = tmp_path / "prev.json", tmp_path / "curr.json"
+    # Duplicate item rows are summed before comparing.
+    doubled = _pack("a", 10, {})
+    doubled["items"] = [{"id": "gems", "quantity": 25}, {"id": "gems", "quantity": 25}]
+    save_json(prev, {"packs": [doubled]})
+    save_json(curr, {"packs": [_pack("a", 10, {"gems": 60})]})
+    cache = SnapshotCache()
+    diff = diff_packs(prev, curr, cache=cache)
+    assert diff["summary"]["num_changed_packs"] == 1
+    assert diff["changed_packs"][0]["items"]["quantity_changes"][0]["delta"] == 10.0
+    diff_packs(prev, curr, cache=cache)
+    assert cache.stats() == {"entries": 2, "hits": 2, "misses": 2}
+
+
+def _history(tmp_path: Path) -> Path:
+    site_dir = tmp_path / "site_data"
+    ensure_dir(site_dir)
+    history_root = tmp_path / "exports"
+    t0 = datetime(2024, 3, 1, 8, 0, 0)
+    versions = [
+        [_pack("a", 10, {"gems": 100})],
+        [_pack("a", 12, {"gems": 100, "speedup": 3}), _pack("b", 4, {"shards": 1})],
+        [_pack("a", 12, {"gems": 120, "speedup": 3})],
+    ]
+    for day, packs in enumerate(versions):
+        save_json(site_dir / "packs.json", {"packs": packs})
+        snapshot_site_data(site_dir=site_dir, history_root=history_root, timestamp=t0 + timedelta(days=day))
+    return history_root
+
+
+def test_range_consecutive_and_endpoints(tmp_path: Path):
+    store = SnapshotStore(_history(tmp_path))
+    cache = SnapshotCache(maxsize=2)
+    log = diff_snapshot_range(store, mode="consecutive", cache=cache)
+    assert len(log["steps"]) == 2
+    assert cache.misses == 3  # the middle snapshot is parsed once for both pairs
+    first, second = log["steps"]
+    assert [p["pack_id"] for p in first["new_packs"]] == ["b"]
+    assert first["changed_packs"][0]["items"]["added"] == [{"item_id": "speedup", "quantity": 3.0}]
+    assert [p["pack_id"] for p in second["removed_packs"]] == ["b"]
+    assert log["summary"]["num_new_packs"] == 1 and log["summary"]["num_removed_packs"] == 1
+
+    ends = diff_snapshot_range(store, mode="endpoints", since="2024-03-02")
+    assert ends["snapshots"] == [m.snapshot_id for m in store.list_snapshots()[1:]]
+    assert ends["steps"][0]["changed_packs"][0]["items"]["quantity_changes"][0]["after"] == 120.0
+
+    text = generate_announcement([], change_log=log)
+    assert "What changed" in text and "New packs (1)" in text and "speedup" in text
+
+
+def test_history_diff_range_cli(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(logging_utils, "LOG_DIR", tmp_path / "logs")
+    history_root = _history(tmp_path)
+    out = tmp_path / "changelog.json"
+    result = CliRunner().invoke(
+        app,
+        ["history-diff", "--history-root", str(history_root), "--mode", "endpoints", "--output-file", str(out)],
+    )
+    assert result.exit_code == 0, result.output
+    assert load_json(out)["mode"] == "endpoints"
+
+
+def test_history_diff_against_latest_reads_store_without_materializing(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(logging_utils, "LOG_DIR", tmp_path / "logs")
+    history_root = _history(tmp_path)
+    current = tmp_path / "current.json"
+    save_json(current, {"packs": [_pack("a", 2.0, {"gems": 100})]})
+    out = tmp_path / "diff.json"
+    result = CliRunner().invoke(
+        app,
+        ["history-diff", "--history-root", str(history_root), "--current", str(current), "--output-file", str(out)],
+    )
+    assert result.exit_code == 0, result.output
+    diff = load_json(out)
+    assert diff["summary"]["num_changed_packs"] == 1
+    assert diff["previous_snapshot"] == f"{SnapshotStore(history_root).list_snapshots()[-1].snapshot_id}/packs.json"
+    assert sorted(p.name for p in history_root.iterdir()) == ["store"]
+    assert not (history_root / "store" / "cache").exists()
@@ -0,0 +1,105 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from wos_pack_value import logging_utils
+from wos_pack_value.cli import app
+from wos_pack_value.history.index import HistoryIndex, open_history_index
+from wos_pack_value.history.snapshot import snapshot_site_data
+from wos_pack_value.history.store import RetentionPolicy, SnapshotStore
+from wos_pack_value.utils import ensure_dir, load_json, save_json
+
+
+def _pack(pack_id: str, price: float, vpd: float) -> dict:
+    return {
+        "id": pack_id,
+        "name": pack_id.title(),
+        "price": {"amount": price, "currency": "USD"},
+        "value": price * vpd,
+        "value_per_dollar": vpd,
+    }
+
+
+def _history(tmp_path: Path, series: list[list[dict]]) -> Path:
+    site_dir = tmp_path / "site_data"
+    ensure_dir(site_dir)
+    history_root = tmp_path / "exports"
+    t0 = datetime(2024, 1, 1, 9, 0, 0)
+    for day, packs in enumerate(series):
+        save_json(site_dir / "packs.json", {"packs": packs})
+        snapshot_site_data(site_dir=site_dir, history_root=history_root, timestamp=t0 + timedelta(days=day))
+    return history_root
+
+
+def test_series_top_movers_and_seen(tmp_path: Path):
+    history_root = _history(
+        tmp_path,
+        [
+            [_pack("alpha", 5, 10.0), _pack("beta", 10, 4.0)],
+            [_pack("alpha", 5, 12.0), _pack("beta", 10, 4.0)],
+            [_pack("alpha", 5, 12.0), _pack("beta", 10, 2.0), _pack("gamma", 1, 50.0)],
+        ],
+    )
+    with open_history_index(history_root) as index:
+        assert len(index.snapshots()) == 3
+        alpha = index.series("alpha")
+        assert [p["value_per_dollar"] for p in alpha] == [10.0, 12.0, 12.0]
+        assert [p["rank"] for p in alpha] == [1, 1, 2]
+        assert [p["price"] for p in index.series("alpha", start="2024-01-02", end="2024-01-02")] == [5.0]
+
+        movers = index.top_movers("value_per_dollar", limit=5)
+        assert [(m["pack_key"], m["delta"]) for m in movers] == [("alpha", 2.0), ("beta", -2.0)]
+        assert [m["pack_key"] for m in index.top_movers("value_per_dollar", direction="down")] == ["beta"]
+        assert index.top_movers("value_per_dollar", start="2024-01-03") == []
+
+        seen = {row["pack_key"]: row for row in index.seen()}
+        assert seen["gamma"]["first_seen"] == "2024-01-03T09:00:00"
+        assert seen["alpha"]["num_snapshots"] == 3
+        assert index.resolve_pack("gam") == ["gamma"]
+
+
+def test_top_movers_with_snapshots_in_the_same_second(tmp_path: Path):
+    site_dir = tmp_path / "site_data"
+    history_root = tmp_path / "exports"
+    ts = datetime(2024, 1, 1, 9, 0, 0)
+    for vpd in (10.0, 11.0, 13.0):
+        save_json(site_dir / "packs.json", {"packs": [_pack("alpha", 5, vpd)]})
+        snapshot_site_data(site_dir=site_dir, history_root=history_root, timestamp=ts)
+    with open_history_index(history_root) as index:
+        assert len(index.snapshots()) == 3
+        assert [p["value_per_dollar"] for p in index.series("alpha")] == [10.0, 11.0, 13.0]
+        movers = index.top_movers("value_per_dollar")
+        assert [(m["pack_key"], m["before"], m["after"]) for m in movers] == [("alpha", 10.0, 13.0)]
+
+
+def test_sync_is_incremental_and_follows_retention(tmp_path: Path):
+    history_root = _history(tmp_path, [[_pack("alpha", 5, 10.0)]] * 3)
+    index = HistoryIndex.for_history_root(history_root)
+    store = SnapshotStore(history_root)
+    # Identical packs.json across snapshots is parsed once and copied for the rest.
+    assert index.sync(store) == {"added": 1, "reused": 2, "removed": 0}
+    assert index.sync(store) == {"added": 0, "reused": 0, "removed": 0}
+
+    store.apply_retention(RetentionPolicy(daily_days=0, weekly_weeks=None, keep_last=1), now=datetime(2024, 1, 3, 10))
+    assert index.sync(store)["removed"] == 2
+    assert len(index.series("alpha")) == 1
+    index.close()
+
+
+def test_history_query_cli(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(logging_utils, "LOG_DIR", tmp_path / "logs")
+    history_root = _history(tmp_path, [[_pack("alpha", 5, 10.0)], [_pack("alpha", 5, 11.0)]])
+    out = tmp_path / "query.json"
+    runner = CliRunner()
+    result = runner.invoke(
+        app,
+        ["history-query", "--history-root", str(history_root), "--pack", "alpha", "--top-movers", "3", "--output-file", str(out)],
+    )
+    assert result.exit_code == 0, result.output
+    data = load_json(out)
+    assert len(data["series"]["alpha"]) == 2
+    assert data["top_movers"][0]["after"] == 11.0
+
+    missing = runner.invoke(app, ["history-query", "--history-root", str(history_root), "--pack", "nope"])
+    assert missing.exit_code == 1
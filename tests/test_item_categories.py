@@ -43,3 +43,43 @@ def test_aggregate_category_values_with_breakdown():
     totals = aggregate_category_values(items, breakdown, cfg)
     assert totals["shards"] == 100.0
     assert totals["speedups"] == 50.0
+
+
+def _naive_classify(item, config):
+    name = str(item.get("name", "")).lower()
+    item_id = str(item.get("item_id", "")).lower()
+    matched = []
+    for cat, rule in config.categories.items():
+        if any(token in name for token in rule.name_contains):
+            matched.append(cat)
+        elif any(name == exact or item_id == exact for exact in rule.name_exact):
+            matched.append(cat)
+    return matched
+
+
+def test_compiled_classifier_matches_naive_rules_and_caches():
+    cfg = ItemCategoryConfig(
+        categories={
+            "shards": CategoryRule(name_contains=["shard", "hero shard"]),
+            "speedups": CategoryRule(name_contains=["speedup", "speed"], name_exact=["gems"]),
+            "gems": CategoryRule(name_exact=["gems", "gem-pack"]),
+            "any": CategoryRule(name_contains=[""]),
+            "resources": CategoryRule(name_contains=["meat", "wood", "eat"]),
+        }
+    )
+    items = [
+        {"name": name, "item_id": item_id}
+        for name in ["Hero Shard", "Speedup 5m", "Gems", "Meat", "Sweet Wood", "Nothing", ""]
+        for item_id in ["gem-pack", "x"]
+    ]
+    for item in items:
+        assert classify_item(item, cfg) == _naive_classify(item, cfg)
+
+    classifier = cfg.classifier()
+    assert classifier is cfg.classifier()
+    before = classifier.cache_info()
+    totals = aggregate_category_values([{"item_id": "x", "name": "Hero Shard", "category": "misc"}] * 50, {"x": 1.0}, cfg)
+    assert totals == {"shards": 50.0, "any": 50.0, "misc": 50.0}
+    after = classifier.cache_info()
+    assert after.hits - before.hits == 50 and after.misses == before.misses
+    assert ItemCategoryConfig().classifier().classify("anything") == ()
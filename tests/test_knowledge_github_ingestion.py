@@ -2,6 +2,7 @@ from pathlib import Path
 
 import pandas as pd
 
+from wos_pack_value.knowledge import github_ingestion
 from wos_pack_value.knowledge.github_ingestion import extract_knowledge_from_github_root
 
 
@@ -23,3 +24,49 @@ def test_extract_knowledge_from_local_tables(tmp_path: Path):
     assert "Hero A" in names
     assert "Hero B" in names
     assert any("Hall" in n for n in names)
+
+
+def _write_repo(root: Path) -> None:
+    repo = root / "repo1"
+    repo.mkdir(parents=True, exist_ok=True)
+    pd.DataFrame([{"Name": "Hero A", "Rarity": "Epic"}, {"Name": "Hero B", "Rarity": None}]).to_csv(
+        repo / "heroes.csv", index=False
+    )
+    pd.DataFrame([{"Tech": "Tool Enhancement", "Research Time": 60}]).to_csv(repo / "tech.csv", index=False)
+
+
+def test_ids_are_stable_and_nulls_dropped_from_attributes(tmp_path: Path):
+    _write_repo(tmp_path)
+    first = extract_knowledge_from_github_root("whiteout_survival", tmp_path, ["**/*.csv"])
+    second = extract_knowledge_from_github_root("whiteout_survival", tmp_path, ["**/*.csv"], workers=2)
+    assert [e.id for e in first] == [e.id for e in second]
+    assert len({e.id for e in first}) == 3
+    hero_b = next(e for e in first if e.name == "Hero B")
+    assert hero_b.id.startswith("heroes-0-")
+    assert hero_b.attributes == {"Name": "Hero B"}
+    assert hero_b.entity_type == "table"
+    assert next(e for e in first if e.name == "Unknown").entity_type == "tech"
+
+
+def test_unchanged_files_are_not_reread(tmp_path: Path, monkeypatch):
+    root = tmp_path / "clones"
+    _write_repo(root)
+    cache_path = tmp_path / "cache.json"
+    first = extract_knowledge_from_github_root("whiteout_survival", root, ["**/*.csv"], cache_path=cache_path)
+
+    read = []
+    real_iter_tables = github_ingestion._iter_tables
+
+    def counting_iter_tables(file_path):
+        read.append(file_path.name)
+        return real_iter_tables(file_path)
+
+    monkeypatch.setattr(github_ingestion, "_iter_tables", counting_iter_tables)
+    again = extract_knowledge_from_github_root("whiteout_survival", root, ["**/*.csv"], cache_path=cache_path)
+    assert read == []
+    assert [(e.id, e.name, e.attributes) for e in again] == [(e.id, e.name, e.attributes) for e in first]
+
+    pd.DataFrame([{"Name": "Hero C"}]).to_csv(root / "repo1" / "heroes.csv", index=False)
+    updated = extract_knowledge_from_github_root("whiteout_survival", root, ["**/*.csv"], cache_path=cache_path)
+    assert read == ["heroes.csv"]
+    assert sorted(e.name for e in updated) == ["Hero C", "Unknown"]
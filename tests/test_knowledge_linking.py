@@ -1,5 +1,8 @@
+import random
+
+from benchmarks.synthetic import CatalogSize, generate_knowledge_entities
 from wos_pack_value.knowledge.schemas import KnowledgeEntity
-from wos_pack_value.knowledge.linking import build_item_to_knowledge_links
+from wos_pack_value.knowledge.linking import AhoCorasick, build_item_to_knowledge_links
 
 
 def test_build_item_to_knowledge_links_hero_match():
@@ -17,3 +20,43 @@ def test_build_item_to_knowledge_links_hero_match():
     links = build_item_to_knowledge_links(items, entities)
     assert "sarge-shard" in links
     assert "hero-sarge" in links["sarge-shard"]
+
+
+def _naive_links(items, entities):
+    links = {}
+    for item in items:
+        name = str(item.get("name", "")).lower()
+        item_id = item.get("id") or item.get("item_id") or item.get("name")
+        matched = [
+            ent.id
+            for ent in entities
+            if (ent.entity_type == "hero" and name and ent.name.lower() in name)
+            or (ent.entity_type != "hero" and name == ent.name.lower())
+        ]
+        if matched and item_id:
+            links[item_id] = matched
+    return links
+
+
+def test_aho_corasick_finds_overlapping_patterns():
+    matcher = AhoCorasick()
+    for pos, pattern in enumerate(["he", "she", "his", "hers", "x"]):
+        matcher.add(pattern, pos)
+    assert matcher.search("ushers") == {0, 1, 3}
+    assert matcher.search("") == set()
+
+
+def test_index_links_match_naive_scan():
+    size = CatalogSize(knowledge_entities=400)
+    entities = generate_knowledge_entities(size, seed=3)
+    entities.append(KnowledgeEntity("hero-blank", "whiteout_survival", "hero", "", "test", ""))
+    entities.append(KnowledgeEntity("res-dup", "whiteout_survival", "resource", "Food", "test", ""))
+    rng = random.Random(3)
+    names = [e.name for e in entities] + ["Epic Hero Shard 7", "Food", "", "Nothing Here"]
+    items = [{"id": f"item-{i}", "name": f"{rng.choice(names)} {rng.choice(['', 'Shard'])}".strip()} for i in range(300)]
+    items.append({"name": "Food"})
+    items.append({"id": "blank", "name": ""})
+
+    links = build_item_to_knowledge_links(items, entities)
+    assert links == _naive_links(items, entities)
+    assert "hero-blank" in links["Food"]
@@ -1,7 +1,14 @@
 from pathlib import Path
 
-from wos_pack_value.knowledge.loader import save_knowledge_entities, load_knowledge_entities
+from wos_pack_value.knowledge.loader import (
+    load_knowledge_entities,
+    load_knowledge_index,
+    load_knowledge_shards,
+    save_knowledge_entities,
+    save_knowledge_shards,
+)
 from wos_pack_value.knowledge.schemas import KnowledgeEntity
+from wos_pack_value.knowledge.store import open_knowledge_store
 
 
 def test_save_and_load_round_trip(tmp_path: Path):
@@ -23,3 +30,45 @@ def test_save_and_load_round_trip(tmp_path: Path):
     loaded = load_knowledge_entities(path)
     assert len(loaded) == 1
     assert loaded[0].name == "Hero One"
+
+
+def _entities():
+    return [
+        KnowledgeEntity("hero-1", "whiteout_survival", "hero", "Gina", "test", "f", attributes={"r": "E"}, raw={"r": "E"}),
+        KnowledgeEntity("bld-1", "whiteout_survival", "building", "Furnace", "test", "f", raw={"Level": 1}),
+        KnowledgeEntity("hero-2", "whiteout_survival", "hero", "Sarge", "test", "f"),
+    ]
+
+
+def test_shards_are_per_type_hash_named_and_slim(tmp_path: Path):
+    index = save_knowledge_shards(tmp_path, _entities())
+    assert set(index["shards"]) == {"hero", "building"}
+    assert index["shards"]["hero"]["count"] == 2
+    assert index["entities"][0] == {"id": "hero-1", "type": "hero", "name": "Gina"}
+    hero_file = index["shards"]["hero"]["file"]
+    assert hero_file.startswith("shards/hero.") and (tmp_path / hero_file).exists()
+
+    heroes = load_knowledge_shards(tmp_path, ["hero"])
+    assert [e.id for e in heroes] == ["hero-1", "hero-2"]
+    assert heroes[0].attributes == {"r": "E"} and heroes[0].raw == {}
+    assert load_knowledge_index(tmp_path) == index
+
+    # Unchanged types keep their file name; changed ones get a new one and the old file is removed.
+    entities = _entities()
+    entities[1].name = "Furnace II"
+    again = save_knowledge_shards(tmp_path, entities)
+    assert again["shards"]["hero"]["file"] == hero_file
+    assert again["shards"]["building"]["file"] != index["shards"]["building"]["file"]
+    assert sorted(p.name for p in (tmp_path / "shards").iterdir()) == sorted(
+        Path(s["file"]).name for s in again["shards"].values()
+    )
+
+    with_raw = save_knowledge_shards(tmp_path, _entities(), include_raw=True)
+    assert load_knowledge_shards(tmp_path, ["building"])[0].raw == {"Level": 1}
+    assert with_raw["shards"]["building"]["file"] != index["shards"]["building"]["file"]
+
+
+def test_store_imports_from_shards(tmp_path: Path):
+    save_knowledge_shards(tmp_path, _entities())
+    with open_knowledge_store(tmp_path) as store:
+        assert store.counts() == {"building": 1, "hero": 2}
@@ -0,0 +1,99 @@
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from wos_pack_value import logging_utils
+from wos_pack_value.cli import app
+from wos_pack_value.export.json_export import export_site_json
+from wos_pack_value.knowledge.loader import save_knowledge_entities
+from wos_pack_value.knowledge.schemas import KnowledgeEntity
+from wos_pack_value.knowledge.store import KnowledgeStore, open_knowledge_store
+from wos_pack_value.models.domain import Pack, PackItem, PackValuation, ValuedPack
+from wos_pack_value.utils import load_json, save_json
+
+
+def _entity(entity_id, entity_type, name, source="test", **attributes):
+    return KnowledgeEntity(
+        id=entity_id,
+        game="whiteout_survival",
+        entity_type=entity_type,
+        name=name,
+        source=source,
+        source_detail="file",
+        tags=["gen1"] if entity_type == "hero" else [],
+        attributes=attributes,
+        raw={"Name": name, **attributes},
+    )
+
+
+ENTITIES = [
+    _entity("hero-gina", "hero", "Gina", rarity="Epic", skill="Swift Assault"),
+    _entity("hero-sarge", "hero", "Sarge", rarity="Legendary"),
+    _entity("bld-furnace", "building", "Furnace", source="wiki", level=30),
+    _entity("tech-tools", "tech", "Tool Enhancement", source="wiki"),
+]
+
+
+def test_store_queries_select_only_requested_fields(tmp_path: Path):
+    with KnowledgeStore(tmp_path / "entities.sqlite") as store:
+        assert store.replace_all(ENTITIES) == 4
+        assert len(store) == 4
+        assert store.counts() == {"building": 1, "hero": 2, "tech": 1}
+
+        heroes = store.query(entity_type="hero")
+        assert heroes == [
+            {"id": "hero-gina", "entity_type": "hero", "name": "Gina"},
+            {"id": "hero-sarge", "entity_type": "hero", "name": "Sarge"},
+        ]
+        furnace = store.query(name="FURNACE", fields=("id", "attributes"))
+        assert furnace == [{"id": "bld-furnace", "attributes": {"level": 30}}]
+        assert [r["id"] for r in store.query(source="wiki", limit=1)] == ["bld-furnace"]
+
+        found = store.get_many(["tech-tools", "missing", "hero-sarge"], fields=("name",))
+        assert found == {"hero-sarge": {"name": "Sarge"}, "tech-tools": {"name": "Tool Enhancement"}}
+        assert store.get("hero-gina") == ENTITIES[0]
+
+        assert [r["id"] for r in store.search("swift")] == ["hero-gina"]
+        assert [r["id"] for r in store.search("sar")] == ["hero-sarge"]
+        assert [r["id"] for r in store.search("legendary gen1", entity_type="hero")] == ["hero-sarge"]
+        assert store.search("***") == []
+
+
+def test_store_reimports_when_entities_json_changes(tmp_path: Path):
+    knowledge_dir = tmp_path / "knowledge"
+    assert open_knowledge_store(knowledge_dir) is None
+    save_knowledge_entities(knowledge_dir / "all_entities.json", ENTITIES[:2])
+    with open_knowledge_store(knowledge_dir) as store:
+        assert len(store) == 2
+    save_knowledge_entities(knowledge_dir / "all_entities.json", ENTITIES)
+    with open_knowledge_store(knowledge_dir) as store:
+        assert len(store) == 4
+
+
+def test_export_and_cli_read_the_store(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(logging_utils, "LOG_DIR", tmp_path / "logs")
+    site_dir = tmp_path / "site"
+    knowledge_dir = site_dir / "knowledge"
+    save_knowledge_entities(knowledge_dir / "all_entities.json", ENTITIES)
+    save_json(knowledge_dir / "item_links.json", {"links": {"gina-shard": ["hero-gina", "missing"]}})
+    pack = Pack(
+        pack_id="p1",
+        name="Gina Pack",
+        price=4.99,
+        source_file="test.csv",
+        items=[PackItem(item_id="gina-shard", name="Gina Shard", quantity=10)],
+    )
+    valuation = PackValuation(pack_id="p1", total_value=10, price=4.99, ratio=2, score=1, label="ok", color="green")
+    export_site_json([ValuedPack(pack=pack, valuation=valuation)], site_dir=site_dir)
+
+    packs = load_json(site_dir / "packs.json")["packs"]
+    assert packs[0]["knowledge_summary"] == {"heros": [{"entity_id": "hero-gina", "name": "Gina"}]}
+    links = load_json(site_dir / "items.json")["items"][0]["knowledge_links"]
+    assert links[0] == {"entity_id": "hero-gina", "entity_type": "hero", "name": "Gina"}
+    assert links[1] == {"entity_id": "missing", "entity_type": None, "name": None}
+
+    result = CliRunner().invoke(app, ["knowledge-query", "--site-dir", str(site_dir), "--search", "furnace"])
+    assert result.exit_code == 0, result.output
+    assert "bld-furnace" in result.output
+    result = CliRunner().invoke(app, ["knowledge-query", "--site-dir", str(site_dir), "--fields", "nope"])
+    assert result.exit_code == 1
@@ -1,32 +1,125 @@
-from pathlib import Path
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 
+import pytest
 import requests
 
-from wos_pack_value.knowledge.web_scraping import scrape_wosnerds
+from wos_pack_value.knowledge import web_scraping
+from wos_pack_value.knowledge.fetcher import FetchConfig, PageFetcher
+from wos_pack_value.knowledge.web_scraping import scrape_wiki, scrape_wosnerds
 
+HTML = """
+<html><body>
+<table>
+  <tr><th>Name</th><th>Power</th></tr>
+  <tr><td>Hero C</td><td>9000</td></tr>
+</table>
+</body></html>
+"""
 
-class DummyResp:
-    def __init__(self, text: str):
-        self.text = text
 
-    def raise_for_status(self):
-        return None
+class _StandIn(BaseHTTPRequestHandler):
+    pages = {}
+    hits = []
 
+    def do_GET(self):
+        body = self.pages.get(self.path)
+        self.hits.append((self.path, self.headers.get("If-None-Match")))
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        etag = '"' + hashlib.sha1(body.encode("utf-8")).hexdigest() + '"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
 
-def test_scrape_wosnerds_uses_local_html(monkeypatch):
-    html = """
-    <html><body>
-    <table>
-      <tr><th>Name</th><th>Power</th></tr>
-      <tr><td>Hero C</td><td>9000</td></tr>
-    </table>
-    </body></html>
-    """
+    def log_message(self, *args):
+        pass
 
-    def fake_get(url, timeout=10):
-        return DummyResp(html)
 
-    monkeypatch.setattr(requests, "get", fake_get)
-    entities = scrape_wosnerds("whiteout_survival", "http://example.com", paths=["/heroes"])
+@pytest.fixture
+def server():
+    _StandIn.pages = {}
+    _StandIn.hits = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _StandIn)
+    thread = threading.Thread(target=httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", _StandIn
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_scrape_wosnerds_uses_local_html(server, tmp_path):
+    base_url, handler = server
+    handler.pages["/heroes"] = HTML
+    fetcher = PageFetcher(FetchConfig(cache_dir=tmp_path / "cache", per_host_rps=0))
+    entities = scrape_wosnerds("whiteout_survival", base_url, paths=["/heroes"], fetcher=fetcher)
     assert len(entities) == 1
     assert entities[0].name == "Hero C"
+
+
+def test_cache_ttl_and_conditional_requests_skip_parsing(server, tmp_path, monkeypatch):
+    base_url, handler = server
+    paths = [f"/page{i}" for i in range(6)]
+    for path in paths:
+        handler.pages[path] = HTML.replace("Hero C", f"Hero {path}")
+    cache_dir = tmp_path / "cache"
+    parsed = []
+    real_parse = web_scraping._parse_tables_from_html
+
+    def counting_parse(game, html, source, detail):
+        parsed.append(detail)
+        return real_parse(game, html, source, detail)
+
+    monkeypatch.setattr(web_scraping, "_parse_tables_from_html", counting_parse)
+
+    first = PageFetcher(FetchConfig(cache_dir=cache_dir, concurrency=3, per_host_rps=0))
+    entities = scrape_wiki("whiteout_survival", base_url, paths, fetcher=first)
+    assert [e.name for e in entities] == [f"Hero {p}" for p in paths]
+    assert first.metrics.fetched == 6 and len(parsed) == 6
+
+    # Within the TTL: no requests, no parsing.
+    handler.hits.clear()
+    fresh = PageFetcher(FetchConfig(cache_dir=cache_dir, per_host_rps=0))
+    cached = scrape_wiki("whiteout_survival", base_url, paths, fetcher=fresh)
+    assert [e.name for e in cached] == [e.name for e in entities]
+    assert handler.hits == [] and len(parsed) == 6
+    assert fresh.metrics.to_dict()["cache_hit_ratio"] == 1.0
+
+    # TTL expired: conditional requests; unchanged pages get 304 and are not parsed again.
+    handler.pages["/page2"] = HTML.replace("Hero C", "Hero Changed")
+    expired = PageFetcher(FetchConfig(cache_dir=cache_dir, ttl_seconds=0, per_host_rps=0))
+    again = scrape_wiki("whiteout_survival", base_url, paths, fetcher=expired)
+    assert all(etag for _, etag in handler.hits)
+    assert expired.metrics.revalidated == 5 and expired.metrics.fetched == 1
+    assert parsed[6:] == [f"{base_url}/page2"]
+    assert "Hero Changed" in [e.name for e in again]
+
+
+def test_per_host_rate_limit_spaces_requests(server, tmp_path):
+    base_url, handler = server
+    for i in range(4):
+        handler.pages[f"/p{i}"] = HTML
+    fetcher = PageFetcher(FetchConfig(cache_dir=None, concurrency=4, per_host_rps=20))
+    results = fetcher.fetch_all([f"{base_url}/p{i}" for i in range(4)])
+    assert [r.status for r in results] == ["fetched"] * 4
+    # Four requests at 20/s need at least three 50 ms gaps.
+    assert fetcher.metrics.seconds >= 0.14
+    assert fetcher.metrics.to_dict()["pages_per_second"] > 0
+
+
+def test_http_errors_propagate(server, tmp_path):
+    base_url, _ = server
+    fetcher = PageFetcher(FetchConfig(cache_dir=tmp_path / "cache", per_host_rps=0))
+    with pytest.raises(requests.HTTPError):
+        scrape_wosnerds("whiteout_survival", base_url, paths=["/missing"], fetcher=fetcher)
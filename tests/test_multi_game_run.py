@@ -0,0 +1,103 @@
+import shutil
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from wos_pack_value import pipeline
+from wos_pack_value.analysis.game_profiles import GameProfile
+from wos_pack_value.cli import app
+from wos_pack_value.ingestion import pipeline as ingestion_pipeline
+from wos_pack_value.ingestion.ocr import OcrBatchResult
+from wos_pack_value.models.domain import Pack
+from wos_pack_value.pipeline import run_all_games
+from wos_pack_value.utils import load_json, save_json
+
+SAMPLE = Path(__file__).parent / "data" / "sample_packs.csv"
+
+
+def _raw_root(tmp_path: Path, *games: str) -> Path:
+    raw_root = tmp_path / "raw"
+    for game in games:
+        (raw_root / game).mkdir(parents=True)
+        shutil.copy(SAMPLE, raw_root / game / "sample_packs.csv")
+    return raw_root
+
+
+def test_run_all_games_isolates_games_and_failures(tmp_path: Path):
+    raw_root = _raw_root(tmp_path, "whiteout_survival", "unknown_game")
+    site_root = tmp_path / "site"
+    report = run_all_games(
+        games=["whiteout_survival", "unknown_game"],
+        raw_dir=raw_root,
+        processed_dir=tmp_path / "processed",
+        images_dir=tmp_path / "images",
+        site_dir=site_root,
+        workers=2,
+        log_file=tmp_path / "run.log",
+    )
+    assert report["workers"] == 2
+    assert report["failed"] == ["unknown_game"]
+    ok = report["games"]["whiteout_survival"]
+    assert ok["ok"] and ok["summary"]["packs_valuated"] == 2
+    assert {s["name"] for s in ok["metrics"]["stages"]} >= {"ingest", "valuation", "export"}
+    assert "Unknown game" in report["games"]["unknown_game"]["error"]
+
+    assert len(load_json(site_root / "whiteout_survival" / "packs.json")["packs"]) == 2
+    assert (tmp_path / "processed" / "whiteout_survival").is_dir()
+    assert not (site_root / "packs.json").exists()
+    assert load_json(site_root / "run_metrics_all_games.json")["failed"] == ["unknown_game"]
+
+
+def test_run_all_games_keeps_ocr_review_files_per_game(tmp_path: Path, monkeypatch):
+    games = ["whiteout_survival", "kingshot"]
+    review_root = tmp_path / "review"
+    for game in games:
+        reviewed = {"id": f"{game}_reviewed", "price": 4.99, "source_image": f"{game}/a.png"}
+        save_json(review_root / game / "ocr_packs_reviewed.json", [reviewed])
+
+    def fake_ocr(screenshots_dir, **kwargs):
+        game = Path(screenshots_dir).name
+        pack = Pack(pack_id=f"{game}_raw", name=f"{game} raw", price=0.99, source_file=f"{game}/b.png")
+        return OcrBatchResult(packs=[pack])
+
+    monkeypatch.setattr(ingestion_pipeline, "ocr_screenshots", fake_ocr)
+    monkeypatch.setattr(pipeline, "get_game_profile", lambda game_key=None: GameProfile(game_key, game_key, "", None))
+    report = run_all_games(
+        games=games,
+        raw_dir=_raw_root(tmp_path, *games),
+        processed_dir=tmp_path / "processed",
+        images_dir=tmp_path / "images",
+        screenshots_dir=tmp_path / "shots",
+        site_dir=tmp_path / "site",
+        review_dir=review_root,
+        workers=1,
+        use_ocr=True,
+        use_ocr_cache=False,
+        enable_validation=False,
+        log_file=tmp_path / "run.log",
+    )
+    assert report["failed"] == []
+    for game, other in (games, games[::-1]):
+        ids = {p["id"] for p in load_json(tmp_path / "site" / game / "packs.json")["packs"]}
+        assert f"{game}_reviewed" in ids and f"{other}_reviewed" not in ids
+        assert [p["id"] for p in load_json(review_root / game / "ocr_packs_raw.json")["packs"]] == [f"{game}_raw"]
+
+
+def test_cli_run_all_games(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(pipeline, "DATA_PROCESSED_DIR", tmp_path / "processed")
+    monkeypatch.setattr(pipeline, "IMAGES_RAW_DIR", tmp_path / "images")
+    raw_root = _raw_root(tmp_path, "whiteout_survival")
+    log_file = str(tmp_path / "run.log")
+    result = CliRunner().invoke(
+        app,
+        ["run", "--all-games", "--raw-dir", str(raw_root), "--site-dir", str(tmp_path / "site"), "--summary-only"]
+        + ["--log-file", log_file],
+    )
+    assert result.exit_code == 0, result.output
+    assert "whiteout_survival: 2 packs valuated" in result.output
+    assert "All games:" in result.output
+
+    result = CliRunner().invoke(app, ["run", "--all-games", "--game", "whiteout_survival", "--log-file", log_file])
+    assert result.exit_code == 1
+    result = CliRunner().invoke(app, ["run", "--all-games", "--ocr-reviewed-path", "r.json", "--log-file", log_file])
+    assert result.exit_code == 1 and "data_review/<game>/" in result.output
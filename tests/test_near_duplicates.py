@@ -0,0 +1,95 @@
+import random
+
+import numpy as np
+
+from wos_pack_value.validation.near_duplicates import (
+    NearDuplicateConfig,
+    find_near_duplicates,
+    pack_shingles,
+    quantize,
+)
+from wos_pack_value.validation.validator import validate_packs_and_items
+
+
+def _pack(pack_id, price, items):
+    return {"id": pack_id, "price": {"amount": price}, "items": [{"id": i, "quantity": q} for i, q in items]}
+
+
+BASE = [("gems", 1000), ("speedup-1h", 20), ("shards", 50), ("stamina", 120), ("meat", 100000)]
+
+
+def test_quantize_absorbs_rounding_errors():
+    assert quantize(999) == quantize(1000) == "1000"
+    assert quantize(19.99) == quantize(20) == "20"
+    assert quantize(0) == "0"
+    assert pack_shingles(_pack("a", 4.99, [])) == set()
+
+
+def test_rounding_and_filler_item_are_near_duplicates():
+    packs = [
+        _pack("sheet-a", 4.99, BASE),
+        _pack("sheet-b", 4.99, [("gems", 999)] + BASE[1:] + [("filler", 1)]),
+        _pack("other", 4.99, [("gems", 300), ("hero-xp", 5000), ("meat", 2000)]),
+    ]
+    groups = find_near_duplicates(packs)
+    assert len(groups) == 1
+    assert groups[0]["pack_ids"] == ["sheet-a", "sheet-b"]
+    assert 0.8 <= groups[0]["similarity"] < 1.0
+    assert groups[0]["pairs"][0]["similarity"] == groups[0]["similarity"]
+
+    strict = find_near_duplicates(packs, NearDuplicateConfig(threshold=0.95))
+    assert strict == []
+
+
+def test_scales_without_pairwise_comparison():
+    rng = random.Random(3)
+    catalog = [f"item-{i}" for i in range(200)]
+    packs = [
+        _pack(f"p{n}", 9.99, [(i, rng.randint(1, 900)) for i in rng.sample(catalog, 8)]) for n in range(5000)
+    ]
+    packs.append(_pack("copy-of-p42", 9.99, [(it["id"], it["quantity"]) for it in packs[42]["items"]]))
+    groups = find_near_duplicates(packs)
+    assert ["copy-of-p42", "p42"] in [g["pack_ids"] for g in groups]
+
+
+def test_validation_report_includes_near_duplicates():
+    packs = [_pack("a", 4.99, BASE), _pack("b", 4.99, BASE[:-1] + [("meat", 100001)])]
+    report = validate_packs_and_items(packs, [], config={"validation": {}})
+    assert report.summary.num_near_duplicate_groups == 1
+    assert report.to_dict()["near_duplicate_packs"][0]["pack_ids"] == ["a", "b"]
+
+    off = validate_packs_and_items(packs, [], config={"validation": {"near_duplicates": {"enabled": False}}})
+    assert off.near_duplicate_packs == []
+
+
+def test_pipeline_records_report_pack_ids():
+    from wos_pack_value.models.domain import Pack, PackItem
+
+    def record(pack_id, items):
+        items = [PackItem(item_id=i, name=i, quantity=q) for i, q in items]
+        return Pack(pack_id=pack_id, name=pack_id, price=4.99, source_file="s.csv", items=items).dict()
+
+    packs = [
+        record("other", [("hero-xp", 5000)]),
+        record("sheet-a", BASE),
+        record("sheet-b", BASE[:-1] + [("meat", 99999)]),
+    ]
+    report = validate_packs_and_items(packs, [], config={"validation": {}})
+    group = report.near_duplicate_packs[0]
+    assert group["pack_ids"] == ["sheet-a", "sheet-b"]
+    assert (group["pairs"][0]["a"], group["pairs"][0]["b"]) == ("sheet-a", "sheet-b")
+
+
+def test_small_buckets_are_verified_pairwise(monkeypatch):
+    from wos_pack_value.validation import near_duplicates
+
+    packs = [
+        _pack("anchor", 4.99, [("hero-xp", 5000)]),
+        _pack("sheet-a", 4.99, BASE),
+        _pack("sheet-b", 4.99, [("gems", 999)] + BASE[1:]),
+    ]
+    # One bucket whose first member matches neither of the duplicates.
+    monkeypatch.setattr(near_duplicates, "lsh_candidate_groups", lambda *args: [np.array([0, 1, 2])])
+    assert [g["pack_ids"] for g in find_near_duplicates(packs)] == [["sheet-a", "sheet-b"]]
+    star = find_near_duplicates(packs, NearDuplicateConfig(max_pairwise_bucket=2))
+    assert star == []
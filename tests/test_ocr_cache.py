@@ -0,0 +1,85 @@
+from pathlib import Path
+
+from wos_pack_value.ingestion import ocr
+from wos_pack_value.ingestion.config import load_ingestion_config
+from wos_pack_value.ingestion.ocr_cache import OcrCache, image_digest, ocr_cache_key
+
+
+def _write_shots(root: Path, count: int = 3) -> Path:
+    shots = root / "shots"
+    shots.mkdir(exist_ok=True)
+    for idx in range(count):
+        (shots / f"shot_{idx}.png").write_text(f"Pack {idx}\n$4.99\nFire Crystal x{100 + idx}\n", encoding="utf-8")
+    return shots
+
+
+def _counting_extract(calls):
+    def fake(path: Path, lang: str = "eng", preprocess=None) -> str:
+        calls.append(path.name)
+        return path.read_text(encoding="utf-8")
+
+    return fake
+
+
+def test_cache_skips_unchanged_images_and_reparses_text(monkeypatch, tmp_path: Path):
+    calls = []
+    monkeypatch.setattr(ocr, "_extract_text", _counting_extract(calls))
+    shots = _write_shots(tmp_path)
+    cache_path = tmp_path / "ocr_cache.json"
+
+    first = ocr.ocr_screenshots(shots, cache=OcrCache(cache_path))
+    assert len(calls) == 3 and first.cache_hits == 0
+
+    (shots / "shot_1.png").write_text("Pack 1 v2\n$9.99\nFire Crystal x500\n", encoding="utf-8")
+    calls.clear()
+    second = ocr.ocr_screenshots(shots, cache=OcrCache(cache_path))
+    assert calls == ["shot_1.png"]
+    assert second.cache_hits == 2
+    assert [p.name for p in second.packs] == ["Pack 0", "Pack 1 v2", "Pack 2"]
+    assert second.packs[0].meta["ocr_cached"] is True
+    assert second.packs[1].meta["ocr_cached"] is False
+
+    # A different language is a different key.
+    calls.clear()
+    ocr.ocr_screenshots(shots, lang="deu", cache=OcrCache(cache_path))
+    assert len(calls) == 3
+
+
+def test_cache_key_includes_settings(tmp_path: Path):
+    img = tmp_path / "a.png"
+    img.write_bytes(b"abc")
+    digest = image_digest(img)
+    assert ocr_cache_key(digest, "eng") == ocr_cache_key(digest, "eng", {})
+    assert ocr_cache_key(digest, "eng", {"dpi": 150}) != ocr_cache_key(digest, "eng", {"dpi": 300})
+
+
+def test_cache_evicts_least_recently_used(tmp_path: Path):
+    cache = OcrCache(tmp_path / "c.json", max_entries=2)
+    cache.put("a", "text a")
+    cache.put("b", "text b")
+    cache.get("a")
+    cache.put("c", "text c")
+    cache.save()
+
+    reloaded = OcrCache(tmp_path / "c.json")
+    assert "a" in reloaded and "c" in reloaded and "b" not in reloaded
+
+    small = OcrCache(tmp_path / "s.json", max_bytes=10)
+    small.put("x", "12345678")
+    small.put("y", "12345678")
+    assert small.evict() == 1 and len(small) == 1
+
+
+def test_corrupt_cache_file_starts_empty(tmp_path: Path):
+    path = tmp_path / "c.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert len(OcrCache(path)) == 0
+
+
+def test_ingestion_config_merges_ocr_cache_section(tmp_path: Path):
+    cfg_path = tmp_path / "ingestion.yaml"
+    cfg_path.write_text("ocr:\n  cache:\n    max_entries: 10\n", encoding="utf-8")
+    cfg = load_ingestion_config(cfg_path)
+    assert cfg["ocr"]["cache"]["max_entries"] == 10
+    assert cfg["ocr"]["cache"]["enabled"] is True
+    assert load_ingestion_config(tmp_path / "missing.yaml")["ocr"]["cache"]["max_entries"] == 5000
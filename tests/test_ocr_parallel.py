@@ -0,0 +1,62 @@
+import random
+import time
+from pathlib import Path
+
+from wos_pack_value.ingestion import ocr
+from wos_pack_value.ingestion.ocr_review import dump_raw_ocr_packs
+from wos_pack_value.utils import load_json
+
+
+def _fake_extract(path: Path, lang: str = "eng", preprocess=None) -> str:
+    time.sleep(random.uniform(0, 0.01))  # scramble completion order
+    if path.stem == "broken":
+        raise RuntimeError("tesseract crashed")
+    return path.read_text(encoding="utf-8")
+
+
+def _write_shots(root: Path) -> Path:
+    shots = root / "shots"
+    shots.mkdir()
+    for idx in range(6):
+        (shots / f"shot_{idx}.png").write_text(f"Pack {idx}\n$4.99\nFire Crystal x{100 + idx}\n", encoding="utf-8")
+    (shots / "broken.png").write_text("", encoding="utf-8")
+    (shots / "notes.txt").write_text("ignored", encoding="utf-8")
+    return shots
+
+
+def test_ocr_screenshots_concurrent_keeps_order_and_collects_failures(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(ocr, "_extract_text", _fake_extract)
+    shots = _write_shots(tmp_path)
+
+    result = ocr.ocr_screenshots(shots, workers=3, max_in_flight=2, use_processes=False)
+    serial = ocr.ocr_screenshots(shots, workers=1)
+
+    assert [p.name for p in result.packs] == [f"Pack {idx}" for idx in range(6)]
+    assert [p.pack_id for p in result.packs] == [p.pack_id for p in serial.packs]
+    assert all("ocr_seconds" in p.meta for p in result.packs)
+    assert len(result.failures) == 1
+    assert result.failures[0].source_image.endswith("broken.png")
+    assert "tesseract crashed" in result.failures[0].error
+    assert result.stats()["images"] == 7
+
+
+def test_review_dump_includes_timings_and_failures(monkeypatch, tmp_path: Path):
+    monkeypatch.setattr(ocr, "_extract_text", _fake_extract)
+    result = ocr.ocr_screenshots(_write_shots(tmp_path), workers=2, use_processes=False)
+    out = dump_raw_ocr_packs(
+        result.packs,
+        path=tmp_path / "raw.json",
+        failures=[f.to_dict() for f in result.failures],
+        stats=result.stats(),
+    )
+    data = load_json(out)
+    assert len(data["packs"]) == 6
+    assert data["packs"][0]["metadata"]["ocr_seconds"] is not None
+    assert data["failures"][0]["source_image"].endswith("broken.png")
+    assert data["stats"]["workers"] == 2
+
+
+def test_resolve_ocr_workers_bounds():
+    assert ocr.resolve_ocr_workers(8, 3) == 3
+    assert ocr.resolve_ocr_workers(0, 100) >= 1
+    assert ocr.resolve_ocr_workers(4, 0) == 1
@@ -0,0 +1,86 @@
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+from wos_pack_value.ingestion import ocr
+from wos_pack_value.ingestion.ocr_cache import OcrCache
+from wos_pack_value.ingestion.ocr_preprocess import (
+    OcrPreprocessConfig,
+    OcrRegion,
+    load_ocr_config,
+    ocr_image,
+    preprocess_image,
+)
+
+
+def test_preprocess_downscales_grayscales_and_thresholds():
+    image = Image.new("RGB", (600, 400), (200, 40, 40))
+    out = preprocess_image(image, OcrPreprocessConfig(max_long_side=300, threshold=100))
+    assert out.size == (300, 200)
+    assert out.mode == "L"
+    hist = out.histogram()
+    assert sum(hist) == hist[0] + hist[255]
+
+    # The pixel size decides, not DPI metadata; never upscale.
+    image.info["dpi"] = (72, 72)
+    assert preprocess_image(image, OcrPreprocessConfig(max_long_side=300)).size == (300, 200)
+    portrait = Image.new("RGB", (1080, 2400))
+    assert preprocess_image(portrait, OcrPreprocessConfig()).size == (576, 1280)
+    assert preprocess_image(image, OcrPreprocessConfig(max_long_side=1280)).size == (600, 400)
+    assert preprocess_image(portrait, OcrPreprocessConfig(max_long_side=0)).size == (1080, 2400)
+
+
+def test_load_ocr_config_orders_and_validates_regions(tmp_path: Path):
+    cfg_path = tmp_path / "ocr.yaml"
+    cfg_path.write_text(
+        "preprocess:\n  threshold: null\nregions:\n"
+        "  items: {box: [0, 0.2, 1, 0.8], psm: 6}\n"
+        "  title: {box: [0, 0, 1, 0.1], psm: 7}\n",
+        encoding="utf-8",
+    )
+    cfg = load_ocr_config(cfg_path)
+    assert cfg.threshold is None
+    assert [r.name for r in cfg.regions] == ["title", "items"]
+    assert load_ocr_config(tmp_path / "missing.yaml") == OcrPreprocessConfig()
+
+    cfg_path.write_text("regions:\n  title: {box: [0.5, 0, 0.2, 1]}\n", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load_ocr_config(cfg_path)
+
+
+def test_ocr_image_runs_each_region_with_its_psm():
+    calls = []
+    texts = {"--psm 7": "Mega\nPack\n", "--psm 6": "Fire Crystal x300\n\n500 Wood\n"}
+
+    def fake_image_to_string(image, lang="eng", config=""):
+        calls.append((image.size, config))
+        return texts[config]
+
+    cfg = OcrPreprocessConfig(
+        max_long_side=0,
+        regions=(OcrRegion("title", (0.0, 0.0, 1.0, 0.1), psm=7), OcrRegion("items", (0.0, 0.2, 1.0, 0.8), psm=6)),
+    )
+    text = ocr_image(Image.new("RGB", (200, 100)), "eng", cfg, fake_image_to_string)
+    assert text == "Mega Pack\nFire Crystal x300\n500 Wood"
+    assert calls == [((200, 10), "--psm 7"), ((200, 60), "--psm 6")]
+
+
+def test_preprocess_settings_are_part_of_cache_key(monkeypatch, tmp_path: Path):
+    calls = []
+
+    def fake(path: Path, lang: str = "eng", preprocess=None) -> str:
+        calls.append(preprocess)
+        return "Pack\n$1.99\nWood x5\n"
+
+    monkeypatch.setattr(ocr, "_extract_text", fake)
+    shots = tmp_path / "shots"
+    shots.mkdir()
+    (shots / "a.png").write_bytes(b"img")
+    cache_path = tmp_path / "cache.json"
+
+    ocr.ocr_screenshots(shots, cache=OcrCache(cache_path), preprocess=OcrPreprocessConfig())
+    ocr.ocr_screenshots(shots, cache=OcrCache(cache_path), preprocess=OcrPreprocessConfig())
+    assert len(calls) == 1
+    ocr.ocr_screenshots(shots, cache=OcrCache(cache_path), preprocess=OcrPreprocessConfig(max_long_side=800))
+    assert len(calls) == 2 and calls[-1].max_long_side == 800
@@ -0,0 +1,47 @@
+import shutil
+from pathlib import Path
+
+from wos_pack_value.ingestion.pipeline import ingest_all
+from wos_pack_value.profiling import RunMetrics, export_run_metrics, stage
+from wos_pack_value.utils import load_json
+
+
+def test_run_metrics_nested_stages_and_throughput(tmp_path: Path):
+    metrics = RunMetrics()
+    with metrics.stage("outer") as outer:
+        with metrics.stage("inner", items=10):
+            sum(range(1000))
+        outer.items = 4
+    names = [s.name for s in metrics.stages]
+    assert names == ["outer", "inner"]
+    inner = metrics.stages[1]
+    assert inner.parent == "outer" and inner.depth == 1
+    assert inner.items_per_sec and inner.items_per_sec > 0
+    assert metrics.stages[0].wall_s >= inner.wall_s
+
+    out = export_run_metrics(metrics, tmp_path / "run_metrics.json")
+    data = load_json(out)
+    assert [s["name"] for s in data["stages"]] == ["outer", "inner"]
+    assert len(metrics.summary_lines()) == 1
+
+
+def test_stage_is_noop_without_metrics():
+    with stage(None, "anything") as timing:
+        timing.items = 3
+    assert timing.items == 3
+
+
+def test_ingest_all_records_per_file_stages(tmp_path: Path):
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    shutil.copy(Path(__file__).parent / "data" / "sample_packs.csv", raw_dir / "sample_packs.csv")
+    metrics = RunMetrics()
+    packs, _ = ingest_all(
+        raw_dir=raw_dir,
+        processed_dir=tmp_path / "processed",
+        images_dir=tmp_path / "images",
+        persist=False,
+        metrics=metrics,
+    )
+    parse_stage = next(s for s in metrics.stages if s.name == "parse:sample_packs.csv")
+    assert parse_stage.items == len(packs)
@@ -1,23 +1,90 @@
+from datetime import datetime, timedelta
 from pathlib import Path
 
-from wos_pack_value.history.snapshot import snapshot_site_data
+from wos_pack_value.history.snapshot import load_latest_snapshot, snapshot_site_data
 from wos_pack_value.history.diff import diff_packs
-from wos_pack_value.utils import ensure_dir, save_json
+from wos_pack_value.history.store import RetentionPolicy, SnapshotStore
+from wos_pack_value.utils import ensure_dir, load_json, save_json
 
 
-def test_snapshot_site_data(tmp_path: Path):
+def _site(tmp_path: Path) -> Path:
     site_dir = tmp_path / "site_data"
     ensure_dir(site_dir)
-    packs_path = site_dir / "packs.json"
-    items_path = site_dir / "items.json"
-    save_json(packs_path, {"packs": [{"id": "a"}]})
-    save_json(items_path, {"items": []})
+    save_json(site_dir / "packs.json", {"packs": [{"id": "a"}]})
+    save_json(site_dir / "items.json", {"items": []})
+    return site_dir
+
+
+def test_snapshot_site_data(tmp_path: Path):
+    site_dir = _site(tmp_path)
+    history_root = tmp_path / "exports"
+    manifest = snapshot_site_data(site_dir=site_dir, history_root=history_root)
+    assert manifest.path.exists()
+    assert set(manifest.files) == {"packs.json", "items.json"}
+    assert len(manifest.new_blobs) == 2
 
+    materialized = SnapshotStore(history_root).materialize(manifest.snapshot_id)
+    assert load_json(materialized / "packs.json") == {"packs": [{"id": "a"}]}
+    assert (materialized / "items.json").exists()
+
+
+def test_snapshots_share_unchanged_blobs(tmp_path: Path):
+    site_dir = _site(tmp_path)
     history_root = tmp_path / "exports"
-    snapshot_path = snapshot_site_data(site_dir=site_dir, history_root=history_root)
-    assert snapshot_path.exists()
-    assert (snapshot_path / "packs.json").exists()
-    assert (snapshot_path / "items.json").exists()
+    t0 = datetime(2024, 1, 1, 12, 0, 0)
+    snapshot_site_data(site_dir=site_dir, history_root=history_root, timestamp=t0)
+    save_json(site_dir / "packs.json", {"packs": [{"id": "a"}, {"id": "b"}]})
+    second = snapshot_site_data(site_dir=site_dir, history_root=history_root, timestamp=t0)
+
+    assert second.snapshot_id == "2024-01-01_120000-1"
+    assert [p.parent.parent.name for p in second.new_blobs] == ["objects"]  # only packs.json changed
+    assert len(list((history_root / "store" / "objects").glob("*/*.gz"))) == 3
+
+    label, latest = load_latest_snapshot(history_root)
+    assert label == "2024-01-01_120000-1/packs.json"
+    assert [p["id"] for p in latest["packs"]] == ["a", "b"]
+    assert sorted(p.name for p in history_root.iterdir()) == ["store"]  # nothing materialized
+
+
+def test_materialize_modes_and_legacy_import(tmp_path: Path):
+    history_root = tmp_path / "exports"
+    legacy = history_root / "2023-05-01_080000" / "site_data"
+    ensure_dir(legacy)
+    save_json(legacy / "packs.json", {"packs": [{"id": "old"}]})
+
+    store = SnapshotStore(history_root)
+    assert store.import_legacy(remove=True) == ["2023-05-01_080000"]
+    assert not legacy.exists()
+    out = store.materialize("2023-05-01_080000", dest=tmp_path / "copy", mode="copy")
+    assert load_json(out / "packs.json")["packs"][0]["id"] == "old"
+    linked = store.materialize("2023-05-01_080000")
+    assert linked == legacy and (legacy / "packs.json").exists()
+
+
+def test_retention_keeps_daily_then_weekly_and_gc_drops_orphans(tmp_path: Path):
+    site_dir = _site(tmp_path)
+    history_root = tmp_path / "exports"
+    now = datetime(2024, 6, 30, 12, 0, 0)
+    # Two snapshots per day for the last 60 days, each with distinct packs.json content.
+    for day in range(60):
+        for hour in (6, 18):
+            ts = now - timedelta(days=day, hours=12 - hour)
+            save_json(site_dir / "packs.json", {"packs": [{"id": f"{day}-{hour}"}]})
+            snapshot_site_data(site_dir=site_dir, history_root=history_root, timestamp=ts)
+
+    store = SnapshotStore(history_root)
+    expired = store.apply_retention(RetentionPolicy(daily_days=30), now=now)
+    kept = store.list_snapshots()
+    recent = [m for m in kept if m.created >= now - timedelta(days=30)]
+    older = [m for m in kept if m.created < now - timedelta(days=30)]
+    assert len({m.created.date() for m in recent}) == len(recent)
+    assert len({m.created.isocalendar()[:2] for m in older}) == len(older)
+    assert len(kept) + len(expired) == 120
+
+    removed = store.gc()
+    assert removed["blobs"] == len(expired)
+    live_blobs = {e["sha256"] for m in kept for e in m.files.values()}
+    assert {b.name[:-3] for b in (history_root / "store" / "objects").glob("*/*.gz")} == live_blobs
 
 
 def test_diff_packs_new_removed_changed(tmp_path: Path):
@@ -33,4 +100,3 @@ def test_diff_packs_new_removed_changed(tmp_path: Path):
     assert diff["new_packs"][0]["pack_id"] == "c"
     assert diff["removed_packs"][0]["pack_id"] == "b"
     assert diff["changed_packs"][0]["pack_id"] == "a"
-
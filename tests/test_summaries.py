@@ -53,3 +53,67 @@ def test_generate_pack_summary_handles_missing_data():
         context=ctx,
     )
     assert "hard to estimate" in summary
+
+
+def _old_percentile(values, pct):
+    ordered = sorted(values)
+    if len(ordered) == 1:
+        return ordered[0]
+    pos = (len(ordered) - 1) * pct
+    low = int(pos)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (pos - low)
+
+
+def test_batch_summaries_match_per_pack_summaries():
+    import random
+
+    rng = random.Random(7)
+    cats = ["shards", "vip", "speedups", "resources"]
+    packs = []
+    for idx in range(300):
+        price = rng.choice([0.0, 0.99, 4.99, 9.99, 19.99])
+        total = rng.choice([0.0, rng.uniform(1, 500)])
+        packs.append(
+            {
+                "id": f"p{idx}",
+                "price": price,
+                "total_value": total,
+                "value_per_dollar": total / price if price else 0.0,
+                "category_values": {c: rng.uniform(0, 100) for c in rng.sample(cats, rng.randint(0, 3))},
+            }
+        )
+    vpds = [p["value_per_dollar"] for p in packs]
+    cat_vpds = {}
+    for p in packs:
+        if p["price"] > 0:
+            for c, v in p["category_values"].items():
+                cat_vpds.setdefault(c, []).append(v / p["price"])
+    context = SummaryContext(
+        overall_percentiles={k: _old_percentile(vpds, q) for k, q in {"p90": 0.9, "p75": 0.75, "p50": 0.5}.items()},
+        category_percentiles={c: {"p80": _old_percentile(v, 0.8), "p60": _old_percentile(v, 0.6)} for c, v in cat_vpds.items()},
+        profile_name="whale",
+    )
+    batch = generate_all_pack_summaries(packs, profile_name="whale")
+    assert batch == {p["id"]: generate_pack_summary(p, context=context) for p in packs}
+
+
+def test_percentile_engine_exact_and_tdigest():
+    import numpy as np
+
+    from wos_pack_value.analysis.percentiles import TDigest, named_percentiles
+
+    values = [5.0, 1.0, 3.0, 2.0, 4.0]
+    assert named_percentiles(values, {"p50": 0.5, "p75": 0.75}) == {"p50": 3.0, "p75": 4.0}
+    assert named_percentiles([], {"p90": 0.9}) == {"p90": 0.0}
+    assert named_percentiles([2.5], {"p90": 0.9}, approximate=True) == {"p90": 2.5}
+
+    data = np.random.default_rng(0).lognormal(0, 1, 200_000)
+    digest = TDigest()
+    for chunk in np.array_split(data[:100_000], 50):
+        digest.update(chunk)
+    digest.merge(TDigest().update(data[100_000:]))
+    assert digest.count == len(data) and digest.centroids <= 100
+    qs = [0.01, 0.25, 0.5, 0.9, 0.99]
+    ranks = [(data <= estimate).mean() for estimate in digest.quantiles(qs)]
+    assert np.allclose(ranks, qs, atol=0.005)
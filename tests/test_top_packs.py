@@ -0,0 +1,90 @@
+import random
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from wos_pack_value import logging_utils
+from wos_pack_value.analysis.player_profiles import PlayerProfile
+from wos_pack_value.analysis.ranking import analyze_from_site_data, analyze_packs, compute_profile_score
+from wos_pack_value.analysis.top_packs import build_top_packs
+from wos_pack_value.analysis.topk import top_k, top_k_indices
+from wos_pack_value.cli import app
+from wos_pack_value.utils import load_json, save_json
+
+CONFIG = {"analysis": {"exclude_reference": True, "max_value_per_dollar": 50}}
+
+
+def _packs(n=60, seed=3):
+    rng = random.Random(seed)
+    packs = []
+    for i in range(n):
+        price = rng.choice([0.99, 4.99, 9.99, 19.99])
+        cats = {cat: float(rng.randint(0, 4) * 25) for cat in ("shard", "speedup", "vip")}
+        packs.append(
+            {
+                "id": f"p{i}",
+                "name": f"Pack {i}",
+                "price": {"amount": price, "currency": "USD"},
+                "value": sum(cats.values()),
+                "category_values": cats,
+                "is_reference": i % 17 == 0,
+            }
+        )
+    return packs
+
+
+def test_top_k_matches_stable_sort_prefix():
+    rng = random.Random(1)
+    scores = [float(rng.randint(0, 5)) for _ in range(200)] + [float("nan")]
+    for k in (0, 1, 7, 50, 500):
+        expected = sorted(range(len(scores) - 1), key=lambda i: scores[i], reverse=True)[:k]
+        assert top_k(range(len(scores) - 1), k, key=scores.__getitem__) == expected
+        assert top_k_indices(scores, k).tolist() == (expected + [len(scores) - 1])[:k]
+
+
+def test_build_top_packs_matches_full_rankings():
+    analyses, _, _ = analyze_packs(_packs(), CONFIG)
+    profiles = {
+        "default": PlayerProfile(name="default", description="", weights={}),
+        "shards": PlayerProfile(name="shards", description="", weights={"shard": 2.0, "vip": 0.5, "gems": 1.0}),
+    }
+    top = build_top_packs(analyses, profiles, ks=(10, 5, 0, 25))
+    assert top["ks"] == [5, 10, 25]
+
+    def ids(view, k):
+        return [e["id"] for e in view[str(k)]]
+
+    overall = [a["id"] for a in analyses if a["value_per_dollar"] > 0]
+    assert ids(top["overall"], 25) == overall[:25]
+    assert ids(top["overall"], 5) == overall[:5]
+    assert top["overall"]["5"][0]["rank_overall"] == 1
+    assert top["profiles"]["default"] == top["overall"]
+
+    by_profile = sorted(analyses, key=lambda a: compute_profile_score(a, profiles["shards"]), reverse=True)
+    assert ids(top["profiles"]["shards"], 10) == [a["id"] for a in by_profile[:10]]
+
+    by_speedup = [a for a in analyses if a["category_values"]["speedup"] > 0]
+    by_speedup.sort(key=lambda a: a["category_values"]["speedup"] / a["price"], reverse=True)
+    assert sorted(top["categories"]) == ["shard", "speedup", "vip"]
+    assert ids(top["categories"]["speedup"], 25) == [a["id"] for a in by_speedup[:25]]
+
+
+def test_analysis_and_cli_write_top_packs(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(logging_utils, "LOG_DIR", tmp_path / "logs")
+    site_dir = tmp_path / "site"
+    save_json(site_dir / "packs.json", {"packs": _packs(12)})
+    analyze_from_site_data(site_dir, output_dir=site_dir)
+    written = load_json(site_dir / "top_packs.json")
+    assert written["ks"] == [5, 10, 25]
+    assert len(written["overall"]["5"]) == 5
+    assert len(written["overall"]["25"]) <= 12
+    assert written["overall"]["25"][:10] == written["overall"]["10"]
+
+    out_dir = tmp_path / "out"
+    result = CliRunner().invoke(
+        app, ["top-packs", "--site-dir", str(site_dir), "--k", "3", "--output-dir", str(out_dir)]
+    )
+    assert result.exit_code == 0, result.output
+    assert list(load_json(out_dir / "top_packs.json")["overall"]) == ["3"]
+    result = CliRunner().invoke(app, ["top-packs", "--site-dir", str(site_dir), "--k", "x"])
+    assert result.exit_code == 1
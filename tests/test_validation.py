@@ -9,7 +9,11 @@ def test_validation_detects_missing_and_extreme():
         {"id": "p4", "name": "Extreme", "price": {"amount": 10}, "value_per_dollar": 1000},
     ]
     items = [{"item_id": "i1", "name": "Unknown", "base_value": None}]
-    report = validate_packs_and_items(packs, items, config={"validation": {"value_per_dollar_threshold_std": 0.01}})
+    report = validate_packs_and_items(
+        packs,
+        items,
+        config={"validation": {"value_per_dollar_threshold_std": 0.01, "outliers": {"method": "stdev"}}},
+    )
     assert report.summary.num_packs_missing_price == 1
     assert report.summary.num_packs_invalid_price == 1
     assert report.summary.num_unknown_items == 1
@@ -0,0 +1,132 @@
+import numpy as np
+
+from wos_pack_value.utils import load_json
+from wos_pack_value.validation.outliers import (
+    OutlierConfig,
+    group_median_mad,
+    pack_category,
+    price_tier,
+    record_keys,
+    score_packs,
+)
+from wos_pack_value.validation.validator import validate_packs_and_items
+
+
+def _pack(pack_id, price, vpd, category):
+    return {
+        "id": pack_id,
+        "name": pack_id,
+        "price": {"amount": price, "currency": "USD"},
+        "value_per_dollar": vpd,
+        "category_values": {category: vpd * price},
+        "items": [],
+    }
+
+
+def _catalog():
+    # Speedup packs are cheap (VPD ~10); gem packs are rich (VPD ~100).
+    packs = [_pack(f"speed-{i}", 4.99, 10 + i * 0.5, "speedups") for i in range(8)]
+    packs += [_pack(f"gems-{i}", 4.99, 100 + i * 2, "gems") for i in range(8)]
+    return packs
+
+
+def test_group_median_mad_matches_numpy():
+    values = np.array([1.0, 2.0, 3.0, 10.0, 5.0, 7.0, 9.0])
+    groups = np.array([0, 0, 0, 0, 1, 1, 1])
+    median, mad, counts = group_median_mad(values, groups, 2)
+    assert median.tolist() == [2.5, 7.0]
+    assert mad.tolist() == [1.0, 2.0]
+    assert counts.tolist() == [4, 3]
+
+
+def test_category_and_tier_helpers():
+    assert pack_category({"category_values": {"gems": 5, "speedups": 9}}) == "speedups"
+    assert pack_category({"items": [{"category": "gems", "value": 3}, {"category": "hero", "value": 1}]}) == "gems"
+    assert pack_category({"items": []}) == "unknown"
+    assert price_tier(4.89, "USD", {"USD": [0.99, 4.99, 9.99]}) == "USD 4.99"
+
+
+def test_robust_outlier_is_flagged_within_its_group_only():
+    packs = _catalog() + [_pack("speed-odd", 4.99, 40, "speedups")]
+    report = validate_packs_and_items(packs, [], config={"validation": {"outliers": {"method": "mad"}}})
+    flagged = [issue.pack_id for issue in report.packs_extreme_value_per_dollar]
+    # 40 is unremarkable next to gem packs, but far above other speedup packs.
+    assert flagged == ["speed-odd"]
+    assert "speedups|USD 4.99" in report.packs_extreme_value_per_dollar[0].detail
+
+    legacy = validate_packs_and_items(packs, [], config={"validation": {"outliers": {"method": "stdev"}}})
+    assert legacy.packs_extreme_value_per_dollar == []
+
+
+def test_small_groups_fall_back_to_category_then_global():
+    records = [(f"p{i}", 10.0 + i, ("gems", "USD 4.99")) for i in range(6)]
+    records.append(("lonely", 11.0, ("gems", "USD 99.99")))
+    records.append(("stranger", 12.0, ("hero", "USD 1")))
+    scores = score_packs(records, OutlierConfig(min_group_size=5))
+    assert scores["p0"]["group"] == "gems|USD 4.99"
+    assert scores["lonely"]["group"] == "gems|*"
+    assert scores["stranger"]["group"] == "*|*"
+
+
+def test_cached_distributions_rescore_only_changed_packs(tmp_path, caplog):
+    stats_path = tmp_path / "validation_stats.json"
+    records = [(f"p{i}", 10.0 + i % 5, ("gems", "USD 4.99")) for i in range(20)]
+    first = score_packs(records, OutlierConfig(), stats_path=stats_path)
+    cached = load_json(stats_path)
+    assert set(cached["packs"]) == {f"p{i}" for i in range(20)}
+    assert cached["groups"]["gems|USD 4.99"]["count"] == 20
+
+    caplog.set_level("INFO", logger="wos_pack_value.validation.outliers")
+    records[3] = ("p3", 60.0, ("gems", "USD 4.99"))
+    second = score_packs(records, OutlierConfig(), stats_path=stats_path)
+    assert "scored 1 of 20" in caplog.text
+    assert second["p0"]["z"] == first["p0"]["z"]
+    assert second["p3"]["z"] > 3.5
+    # The distributions were reused, not recomputed with the new value.
+    assert load_json(stats_path)["groups"] == cached["groups"]
+
+    caplog.clear()
+    shifted = [(pid, vpd * 2, key) for pid, vpd, key in records]
+    score_packs(shifted, OutlierConfig(), stats_path=stats_path)
+    assert "scored 20 of 20" in caplog.text
+    assert load_json(stats_path)["groups"]["gems|USD 4.99"]["median"] > cached["groups"]["gems|USD 4.99"]["median"]
+
+
+def test_small_changes_accumulate_into_a_refresh(tmp_path, caplog):
+    stats_path = tmp_path / "validation_stats.json"
+    records = [(f"p{i}", 10.0 + i % 5, ("gems", "USD 4.99")) for i in range(20)]
+    score_packs(records, OutlierConfig(refresh_ratio=0.25), stats_path=stats_path)
+    caplog.set_level("INFO", logger="wos_pack_value.validation.outliers")
+    # Four runs each change 2 packs (10%), but 8 of 20 differ from the base after four runs.
+    for run in range(4):
+        for i in (2 * run, 2 * run + 1):
+            records[i] = (f"p{i}", 40.0, ("gems", "USD 4.99"))
+        caplog.clear()
+        score_packs(records, OutlierConfig(refresh_ratio=0.25), stats_path=stats_path)
+        assert ("full recompute" in caplog.text) == (run == 2)
+    assert load_json(stats_path)["groups"]["gems|USD 4.99"]["median"] == 13.0
+
+
+def test_packs_without_id_are_keyed_by_position():
+    records = [(f"p{i}", 10.0 + i % 3, ("gems", "USD 4.99")) for i in range(8)]
+    records += [(None, 11.0, ("gems", "USD 4.99")), ("", 90.0, ("gems", "USD 4.99"))]
+    scores = score_packs(records, OutlierConfig())
+    assert len(scores) == 10
+    assert scores["#8"]["z"] == 0.0
+    assert scores["#9"]["z"] > 3.5
+
+
+def test_packs_sharing_an_id_are_all_scored():
+    records = [(f"p{i}", 10.0 + i % 3, ("gems", "USD 4.99")) for i in range(8)]
+    records += [("dup", 11.0, ("gems", "USD 4.99")), ("dup", 90.0, ("gems", "USD 4.99"))]
+    keys = record_keys([pid for pid, _, _ in records])
+    assert keys[:2] == ["p0", "p1"] and keys[8:] == ["dup#8", "dup#9"]
+    scores = score_packs(records, OutlierConfig())
+    assert len(scores) == 10
+    assert scores["dup#8"]["z"] == 0.0
+    assert scores["dup#9"]["z"] > 3.5
+
+    # The same pack id from two sheets: the copy with the inflated VPD is still flagged.
+    packs = _catalog() + [_pack("speed-3", 4.99, 40, "speedups")]
+    report = validate_packs_and_items(packs, [], config={"validation": {"outliers": {"method": "mad"}}})
+    assert [(i.pack_id, i.value_per_dollar) for i in report.packs_extreme_value_per_dollar] == [("speed-3", 40)]
@@ -0,0 +1,66 @@
+from wos_pack_value.validation.rules import RULES, register_rule, run_rules
+from wos_pack_value.validation.validator import validate_packs_and_items
+
+
+def _packs():
+    return [
+        {"id": "ok", "name": "OK", "price": {"amount": 4.99, "currency": "USD"}, "value_per_dollar": 5,
+         "items": [{"id": "gems", "quantity": 100}]},
+        {"id": "odd", "name": "Odd price", "price": {"amount": 7.49, "currency": "USD"}, "value_per_dollar": 5,
+         "items": [{"id": "gems", "quantity": -3}]},
+        {"id": "free", "name": "Free", "price": {"amount": 0}, "value_per_dollar": 0, "items": []},
+    ]
+
+
+def test_builtin_and_domain_rules_in_one_report():
+    items = [{"item_id": "gems", "name": "Gems", "base_value": 1, "category": ""}]
+    report = validate_packs_and_items(_packs(), items, config={"validation": {}})
+    data = report.to_dict()
+    assert report.summary.num_packs_invalid_price == 1
+    assert [i["pack_id"] for i in data["rule_issues"]["implausible_quantity"]] == ["odd"]
+    assert [i["pack_id"] for i in data["rule_issues"]["price_tier_mismatch"]] == ["odd"]
+    assert "nearest 4.99" in data["rule_issues"]["price_tier_mismatch"][0]["detail"]
+    assert data["rule_issues"]["item_missing_category"][0]["item_id"] == "gems"
+    stats = data["rule_stats"]
+    assert stats["invalid_price"]["hits"] == 1 and stats["invalid_price"]["scope"] == "pack"
+    assert stats["duplicate_packs"]["scope"] == "aggregate"
+    assert all(s["seconds"] >= 0 for s in stats.values())
+
+
+def test_rules_can_be_disabled_and_parameterized():
+    cfg = {
+        "validation": {
+            "rules": {
+                "price_tier_mismatch": {"prices": [7.49]},
+                "implausible_quantity": False,
+                "item_missing_category": {"enabled": False},
+            }
+        }
+    }
+    report = validate_packs_and_items(_packs(), [], config=cfg)
+    assert [i["pack_id"] for i in report.rule_issues["price_tier_mismatch"]] == ["ok"]
+    assert "implausible_quantity" not in report.rule_stats
+    assert "item_missing_category" not in report.rule_stats
+
+
+def test_record_rules_share_one_pass_and_custom_rules_register():
+    seen = []
+
+    @register_rule("test_counts_packs", "pack", fields=("id",))
+    def _count(rec, ctx):
+        seen.append(rec.pack_id)
+        return None
+
+    @register_rule("test_aggregate", "aggregate")
+    def _agg(ctx):
+        return [len(ctx.packs), len(ctx.priced_packs)]
+
+    try:
+        issues, stats = run_rules(_packs(), [], {}, workers=2)
+        assert seen == ["ok", "odd", "free"]
+        assert issues["test_aggregate"] == [3, 2]
+        assert stats["test_aggregate"].hits == 2
+        assert stats["test_counts_packs"].hits == 0
+    finally:
+        RULES.pop("test_counts_packs", None)
+        RULES.pop("test_aggregate", None)
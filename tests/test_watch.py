@@ -0,0 +1,98 @@
+import shutil
+import time
+from pathlib import Path
+
+from wos_pack_value.automation import watch
+from wos_pack_value.automation.watch import IncrementalPipeline, PollingWatcher, collect_changes, watch_and_rebuild
+from wos_pack_value.utils import load_json
+
+SAMPLE = Path(__file__).parent / "data" / "sample_packs.csv"
+EXTRA = "pack_name,price,currency,item_name,quantity,category\nExtra Pack,4.99,USD,Fire Crystal,100,premium_currency\n"
+
+
+def _pipeline(tmp_path: Path) -> IncrementalPipeline:
+    raw_dir = tmp_path / "raw"
+    raw_dir.mkdir()
+    shutil.copy(SAMPLE, raw_dir / "sample_packs.csv")
+    (raw_dir / "extra.csv").write_text(EXTRA, encoding="utf-8")
+    return IncrementalPipeline(
+        raw_dir=raw_dir,
+        site_dir=tmp_path / "site",
+        images_dir=tmp_path / "images",
+        processed_dir=tmp_path / "processed",
+        config_dir=tmp_path / "config",
+    )
+
+
+def _pack_names(site_dir: Path):
+    return sorted(p["name"] for p in load_json(site_dir / "packs.json")["packs"])
+
+
+def test_incremental_rebuild_reparses_only_changed_file(monkeypatch, tmp_path: Path):
+    pipeline = _pipeline(tmp_path)
+    first = pipeline.build()
+    assert len(first.reparsed) == 2 and first.ranked
+    assert "Extra Pack" in _pack_names(pipeline.site_dir)
+    assert (pipeline.site_dir / "pack_ranking_overall.json").exists()
+
+    parsed = []
+    real_parse = watch.parse_file
+    monkeypatch.setattr(watch, "parse_file", lambda path, **kw: parsed.append(path.name) or real_parse(path, **kw))
+
+    extra = pipeline.raw_dir / "extra.csv"
+    extra.write_text(EXTRA.replace("Extra Pack", "Renamed Pack"), encoding="utf-8")
+    cycle = pipeline.apply({extra, pipeline.raw_dir / "~$extra.xlsx"})
+    assert parsed == ["extra.csv"]
+    assert cycle.revalued == 1 and cycle.reused == 2
+    assert "Renamed Pack" in _pack_names(pipeline.site_dir)
+
+    extra.unlink()
+    cycle = pipeline.apply({extra})
+    assert cycle.removed == [str(extra)]
+    assert "Renamed Pack" not in _pack_names(pipeline.site_dir)
+
+    assert pipeline.apply({tmp_path / "elsewhere.txt"}) is None
+
+
+def test_config_changes_are_classified_by_effect(tmp_path: Path):
+    pipeline = _pipeline(tmp_path)
+    cfg = pipeline.config_dir
+    groups = pipeline.classify(
+        {cfg / "item_values.yaml", cfg / "analysis.yaml", cfg / "item_categories.yaml", pipeline.raw_dir / "a.csv"}
+    )
+    assert groups.keys() == {"config:revalue", "config:rank", "config:export", "raw"}
+
+
+def test_polling_watcher_debounces_bursts(tmp_path: Path):
+    target = tmp_path / "raw"
+    target.mkdir()
+    watcher = PollingWatcher([target], interval=0.01)
+    assert watcher.poll(0.0) == set()
+
+    (target / "a.csv").write_text("1", encoding="utf-8")
+    (target / "b.csv").write_text("2", encoding="utf-8")
+    (target / ".#lock").write_text("", encoding="utf-8")
+    changes = collect_changes(watcher, timeout=0.5, debounce=0.05)
+    assert changes == {target / "a.csv", target / "b.csv"}
+
+
+def test_watch_loop_applies_changes(tmp_path: Path):
+    pipeline = _pipeline(tmp_path)
+    pipeline.build()
+    watcher = PollingWatcher(pipeline.watch_paths(), interval=0.01)
+    time.sleep(0.01)
+    (pipeline.raw_dir / "extra.csv").write_text(EXTRA.replace("Extra Pack", "Watched Pack"), encoding="utf-8")
+
+    cycles = []
+    deadline = time.monotonic() + 5
+    ran = watch_and_rebuild(
+        pipeline,
+        watcher,
+        debounce=0.05,
+        idle_timeout=0.2,
+        on_cycle=cycles.append,
+        max_cycles=1,
+        should_stop=lambda: time.monotonic() > deadline,
+    )
+    assert ran == 1 and cycles[0].reparsed == [str(pipeline.raw_dir / "extra.csv")]
+    assert "Watched Pack" in _pack_names(pipeline.site_dir)
@@ -1,10 +1,18 @@
-"""Generate Markdown/Discord-friendly announcements from existing exports."""
+"""Generate Markdown/Discord-friendly announcements from existing exports.
+
+`load_and_generate_announcements` renders many (profile, top-N) variants in
+one run: `packs.json` and each profile ranking are read once, summaries for
+all profiles share one percentile context, and each profile's top packs are
+picked once with `top_k` (a k-sized heap) for its largest N.
+"""
 
 from __future__ import annotations
 
+from operator import itemgetter
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
+from .topk import top_k, top_k_prefixes
 from ..settings import (
     DEFAULT_SITE_PACKS,
     DEFAULT_SITE_ANALYSIS_PROFILE,
@@ -13,34 +21,44 @@ from ..settings import (
 from ..utils import load_json
 
 
-def _load_packs_with_profile(site_dir: Path, profile_name: Optional[str] = None) -> List[Dict[str, Any]]:
+def _load_packs(site_dir: Path) -> List[Dict[str, Any]]:
     packs_path = site_dir / DEFAULT_SITE_PACKS.name
     if not packs_path.exists():
         raise FileNotFoundError("packs.json not found; run `wos-pack-value run --with-analysis` first.")
-    packs = load_json(packs_path).get("packs", [])
+    return load_json(packs_path).get("packs", [])
+
+
+def _load_profile_ranking(site_dir: Path, profile_name: str) -> Dict[Any, Dict[str, Any]]:
+    """Pack id -> profile ranking entry, or {} when the profile has no ranking export."""
+    profile_path = site_dir / DEFAULT_SITE_ANALYSIS_PROFILE.format(profile=profile_name)
+    if not profile_path.exists():
+        return {}
+    return {p.get("id"): p for p in load_json(profile_path).get("packs", [])}
 
+
+def _with_profile(pack: Dict[str, Any], prof: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    if not prof:
+        return pack
+    return {
+        **pack,
+        "profile_score": prof.get("profile_score") or prof.get("value_per_dollar"),
+        "profile_rank": prof.get("profile_rank"),
+    }
+
+
+def _load_packs_with_profile(site_dir: Path, profile_name: Optional[str] = None) -> List[Dict[str, Any]]:
+    packs = _load_packs(site_dir)
     # Merge profile-specific ranking if available
     if profile_name:
-        profile_path = site_dir / DEFAULT_SITE_ANALYSIS_PROFILE.format(profile=profile_name)
-        if profile_path.exists():
-            profile_data = load_json(profile_path)
-            profile_map = {p.get("id"): p for p in profile_data.get("packs", [])}
-            for p in packs:
-                prof = profile_map.get(p.get("id"))
-                if prof:
-                    p["profile_score"] = prof.get("profile_score") or prof.get("value_per_dollar")
-                    p["profile_rank"] = prof.get("profile_rank")
+        profile_map = _load_profile_ranking(site_dir, profile_name)
+        packs = [_with_profile(p, profile_map.get(p.get("id"))) for p in packs]
     return packs
 
 
-def _filter_and_sort(
-    packs: List[Dict[str, Any]],
-    *,
-    profile_name: Optional[str],
-    top_n: int,
-    include_reference: bool = False,
-) -> List[Dict[str, Any]]:
-    eligible = []
+def _eligible(
+    packs: Iterable[Dict[str, Any]], *, profile_name: Optional[str], include_reference: bool = False
+) -> Iterable[Tuple[float, Dict[str, Any]]]:
+    """(ranking metric, pack) for every pack that may be announced."""
     for p in packs:
         if (p.get("is_reference") and not include_reference) or not p.get("price"):
             continue
@@ -55,9 +73,19 @@ def _filter_and_sort(
             metric = float(p.get("value_per_dollar") or 0.0)
         if metric <= 0:
             continue
-        eligible.append((metric, p))
-    eligible.sort(key=lambda x: x[0], reverse=True)
-    return [p for _, p in eligible[:top_n]]
+        yield metric, p
+
+
+def _filter_and_sort(
+    packs: List[Dict[str, Any]],
+    *,
+    profile_name: Optional[str],
+    top_n: int,
+    include_reference: bool = False,
+) -> List[Dict[str, Any]]:
+    eligible = _eligible(packs, profile_name=profile_name, include_reference=include_reference)
+    # top_k keeps input order among equal metrics, like a stable descending sort.
+    return [p for _, p in top_k(eligible, top_n, key=itemgetter(0))]
 
 
 def _format_pack_line(idx: int, pack: Dict[str, Any]) -> str:
@@ -83,6 +111,59 @@ def _format_pack_line(idx: int, pack: Dict[str, Any]) -> str:
     return "\n".join(lines)
 
 
+def _fmt_qty(qty: Any) -> str:
+    return f"{qty:g}" if isinstance(qty, (int, float)) else str(qty)
+
+
+def _format_item_changes(items: Dict[str, Any]) -> str:
+    parts = [f"+{a['item_id']} x{_fmt_qty(a['quantity'])}" for a in items.get("added", [])]
+    parts += [f"-{r['item_id']}" for r in items.get("removed", [])]
+    parts += [
+        f"{q['item_id']} {_fmt_qty(q['before'])}→{_fmt_qty(q['after'])}" for q in items.get("quantity_changes", [])
+    ]
+    return ", ".join(parts)
+
+
+def format_change_log(change_log: Dict[str, Any], *, top_n: int = 5) -> str:
+    """Markdown section for a `history-diff` change log (new/removed packs, value and item changes)."""
+    steps = change_log.get("steps", [])
+    if not steps:
+        return "**What changed**\n\nNo changes between snapshots."
+    new = [p for s in steps for p in s.get("new_packs", []) if not p.get("is_reference")]
+    removed = [p for s in steps for p in s.get("removed_packs", []) if not p.get("is_reference")]
+    changed = [c for s in steps for c in s.get("changed_packs", [])]
+    start = steps[0].get("from_created_at") or steps[0].get("from")
+    end = steps[-1].get("to_created_at") or steps[-1].get("to")
+    lines = [f"**What changed** ({start} → {end})", ""]
+    if new:
+        lines.append(f"New packs ({len(new)}):")
+        for p in new[:top_n]:
+            lines.append(f"• {p.get('pack_name')} – {p.get('price')} {p.get('currency') or ''}".rstrip())
+    if removed:
+        lines.append(f"Gone ({len(removed)}): " + ", ".join(str(p.get("pack_name")) for p in removed[:top_n]))
+
+    def vpd_delta(change: Dict[str, Any]) -> float:
+        before = change["before"].get("value_per_dollar") or 0.0
+        after = change["after"].get("value_per_dollar") or 0.0
+        return after - before
+
+    movers = top_k((c for c in changed if vpd_delta(c)), top_n, key=lambda c: abs(vpd_delta(c)))
+    if movers:
+        lines.append("Value per dollar moves:")
+        for c in movers:
+            before = c["before"].get("value_per_dollar") or 0.0
+            after = c["after"].get("value_per_dollar") or 0.0
+            lines.append(f"• {c.get('pack_name')}: {before:.2f} → {after:.2f}")
+    item_changes = [c for c in changed if any((c.get("items") or {}).values())]
+    if item_changes:
+        lines.append("Contents changed:")
+        for c in item_changes[:top_n]:
+            lines.append(f"• {c.get('pack_name')}: {_format_item_changes(c['items'])}")
+    if len(lines) == 2:
+        lines.append("No pack changes.")
+    return "\n".join(lines)
+
+
 def generate_announcement(
     packs: List[Dict[str, Any]],
     *,
@@ -90,18 +171,24 @@ def generate_announcement(
     top_n: int = 5,
     title: Optional[str] = None,
     include_reference: bool = False,
+    change_log: Optional[Dict[str, Any]] = None,
 ) -> str:
     selected = _filter_and_sort(packs, profile_name=profile_name, top_n=top_n, include_reference=include_reference)
+    changes_text = f"\n\n{format_change_log(change_log, top_n=top_n)}" if change_log else ""
+    return _render(selected, profile_name=profile_name, title=title, changes_text=changes_text)
+
+
+def _render(selected: List[Dict[str, Any]], *, profile_name: Optional[str], title: Optional[str], changes_text: str) -> str:
     heading = title or (
         f"Top {len(selected)} packs for profile: {profile_name}" if profile_name else f"Top {len(selected)} packs right now"
     )
     if not selected:
-        return f"**{heading}**\n\nNo eligible packs found."
+        return f"**{heading}**\n\nNo eligible packs found.{changes_text}"
     lines = [f"**{heading}**", ""]
     for idx, pack in enumerate(selected, start=1):
         lines.append(_format_pack_line(idx, pack))
         lines.append("")  # spacing
-    return "\n".join(lines).strip()
+    return "\n".join(lines).strip() + changes_text
 
 
 def load_and_generate_announcement(
@@ -111,15 +198,129 @@ def load_and_generate_announcement(
     top_n: int = 5,
     title: Optional[str] = None,
     include_reference: bool = False,
+    change_log_path: Optional[Path] = None,
 ) -> str:
     packs = _load_packs_with_profile(site_dir, profile_name=profile_name)
+    change_log = None
+    if change_log_path:
+        if not change_log_path.exists():
+            raise FileNotFoundError(f"Change log not found: {change_log_path}")
+        change_log = load_json(change_log_path)
     return generate_announcement(
         packs,
         profile_name=profile_name,
         top_n=top_n,
         title=title,
         include_reference=include_reference,
+        change_log=change_log,
+    )
+
+
+Variant = Tuple[Optional[str], int]
+
+
+def generate_announcements(
+    packs: List[Dict[str, Any]],
+    variants: Sequence[Variant],
+    *,
+    profile_rankings: Optional[Mapping[str, Mapping[Any, Mapping[str, Any]]]] = None,
+    profile_summaries: Optional[Mapping[Optional[str], Mapping[Any, str]]] = None,
+    title: Optional[str] = None,
+    include_reference: bool = False,
+    change_log: Optional[Dict[str, Any]] = None,
+) -> Dict[Variant, str]:
+    """Announcement text for every (profile or None, top_n) variant.
+
+    `profile_rankings` maps a profile to its pack id -> ranking entry, and
+    `profile_summaries` maps a profile to pack id -> summary (falling back to
+    the pack's own `summary`). Each profile's candidates are ranked once, for
+    its largest top_n; smaller variants take a prefix. Text matches
+    `generate_announcement` on packs merged with the same ranking.
+    """
+    sizes: Dict[Optional[str], List[int]] = {}
+    for profile_name, top_n in variants:
+        sizes.setdefault(profile_name, []).append(top_n)
+
+    ranked: Dict[Optional[str], Dict[int, List[Dict[str, Any]]]] = {}
+    for profile_name, top_ns in sizes.items():
+        ranking = (profile_rankings or {}).get(profile_name, {}) if profile_name else {}
+        merged = (_with_profile(p, ranking.get(p.get("id"))) for p in packs) if ranking else packs
+        eligible = _eligible(merged, profile_name=profile_name, include_reference=include_reference)
+        top = [p for _, p in top_k(eligible, max(top_ns), key=itemgetter(0))]
+        summaries = (profile_summaries or {}).get(profile_name)
+        if summaries:
+            top = [{**p, "summary": summaries.get(p.get("id"), p.get("summary"))} for p in top]
+        ranked[profile_name] = top_k_prefixes(top, top_ns)
+
+    change_texts: Dict[int, str] = {}
+    out: Dict[Variant, str] = {}
+    for profile_name, top_n in variants:
+        if change_log and top_n not in change_texts:
+            change_texts[top_n] = f"\n\n{format_change_log(change_log, top_n=top_n)}"
+        out[(profile_name, top_n)] = _render(
+            ranked[profile_name][top_n],
+            profile_name=profile_name,
+            title=title,
+            changes_text=change_texts.get(top_n, ""),
+        )
+    return out
+
+
+def _summary_metrics(pack: Dict[str, Any]) -> Dict[str, Any]:
+    """The fields `generate_pack_summary` reads, from a packs.json entry."""
+    price_val = pack.get("price", {})
+    price = price_val.get("amount") if isinstance(price_val, dict) else price_val
+    return {
+        "id": pack.get("id"),
+        "price": price,
+        "total_value": pack.get("value"),
+        "value_per_dollar": pack.get("value_per_dollar"),
+        "category_values": pack.get("category_values"),
+    }
+
+
+def load_and_generate_announcements(
+    site_dir: Path = SITE_DATA_DIR,
+    *,
+    profiles: Sequence[Optional[str]] = (None,),
+    top_ns: Sequence[int] = (5,),
+    title: Optional[str] = None,
+    include_reference: bool = False,
+    change_log_path: Optional[Path] = None,
+) -> Dict[Variant, str]:
+    """Every (profile, top_n) announcement from one read of `site_dir`.
+
+    Profile variants use summaries with that profile's hint, all computed
+    from a single percentile context; the overall (None) variant uses the
+    summaries stored in packs.json.
+    """
+    from .summaries import generate_summaries_for_profiles
+
+    packs = _load_packs(site_dir)
+    named = [p for p in dict.fromkeys(profiles) if p]
+    rankings = {name: _load_profile_ranking(site_dir, name) for name in named}
+    summaries = generate_summaries_for_profiles([_summary_metrics(p) for p in packs], named) if named else {}
+    change_log = None
+    if change_log_path:
+        if not change_log_path.exists():
+            raise FileNotFoundError(f"Change log not found: {change_log_path}")
+        change_log = load_json(change_log_path)
+    variants = [(profile, top_n) for profile in dict.fromkeys(profiles) for top_n in dict.fromkeys(top_ns)]
+    return generate_announcements(
+        packs,
+        variants,
+        profile_rankings=rankings,
+        profile_summaries=summaries,
+        title=title,
+        include_reference=include_reference,
+        change_log=change_log,
     )
 
 
-__all__ = ["generate_announcement", "load_and_generate_announcement"]
+__all__ = [
+    "format_change_log",
+    "generate_announcement",
+    "generate_announcements",
+    "load_and_generate_announcement",
+    "load_and_generate_announcements",
+]
@@ -4,10 +4,9 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, Optional
-
-import yaml
+from typing import Dict, Optional, Tuple
 
+from ..config_registry import load_config
 from ..settings import CONFIG_DIR
 
 
@@ -28,21 +27,31 @@ def _default_profile() -> GameProfile:
     )
 
 
-def load_game_profiles(config_root: Path = CONFIG_DIR) -> Dict[str, GameProfile]:
+def _build_game_profiles(config_root: Path):
+    def build(data) -> Tuple[Dict[str, GameProfile], Optional[str]]:
+        games = {}
+        for key, entry in (data.get("games") or {}).items():
+            games[key] = GameProfile(
+                key=key,
+                label=entry.get("label", key),
+                description=entry.get("description", ""),
+                config_dir=(config_root / entry.get("config_dir")) if entry.get("config_dir") else None,
+            )
+        return games, data.get("default_game")
+
+    return build
+
+
+def _game_profiles_file(config_root: Path) -> Tuple[Dict[str, GameProfile], Optional[str]]:
+    """(games, default_game) from `game_profiles.yaml`, parsed once per file version."""
     path = config_root / "game_profiles.yaml"
     if not path.exists():
-        default = _default_profile()
-        return {default.key: default}
-    with path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
-    games = {}
-    for key, entry in (data.get("games") or {}).items():
-        games[key] = GameProfile(
-            key=key,
-            label=entry.get("label", key),
-            description=entry.get("description", ""),
-            config_dir=(config_root / entry.get("config_dir")) if entry.get("config_dir") else None,
-        )
+        return {}, None
+    return load_config(path, _build_game_profiles(config_root), key=("game_profiles", config_root))
+
+
+def load_game_profiles(config_root: Path = CONFIG_DIR) -> Dict[str, GameProfile]:
+    games = dict(_game_profiles_file(config_root)[0])
     if not games:
         default = _default_profile()
         games[default.key] = default
@@ -51,13 +60,7 @@ def load_game_profiles(config_root: Path = CONFIG_DIR) -> Dict[str, GameProfile]
 
 def get_game_profile(config_root: Path = CONFIG_DIR, game_key: Optional[str] = None) -> GameProfile:
     games = load_game_profiles(config_root)
-    default_key = None
-    gp_path = config_root / "game_profiles.yaml"
-    if gp_path.exists():
-        with gp_path.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-            default_key = data.get("default_game")
-    default_key = default_key or "whiteout_survival"
+    default_key = _game_profiles_file(config_root)[1] or "whiteout_survival"
 
     if game_key is None:
         game_key = default_key
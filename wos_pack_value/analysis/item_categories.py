@@ -1,15 +1,23 @@
-"""Centralized item categorization based on config."""
+"""Centralized item categorization based on config.
+
+`classify_item` goes through a `CategoryClassifier` compiled once per config:
+every `name_contains` token sits in one Aho–Corasick automaton and every
+`name_exact` value in a hash map, so an item name is scanned once whatever
+the number of categories and tokens. Results are memoized per
+(name, item_id), so during an export each distinct item is classified once.
+"""
 
 from __future__ import annotations
 
 import re
 from dataclasses import dataclass, field
+from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-import yaml
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
 
 from ..analysis.game_profiles import GameProfile, resolve_config_path
+from ..config_registry import load_config
+from ..matching import AhoCorasick
 from ..settings import CONFIG_DIR, DEFAULT_ITEM_CATEGORIES_PATH
 
 
@@ -22,17 +30,53 @@ class CategoryRule:
 @dataclass
 class ItemCategoryConfig:
     categories: Dict[str, CategoryRule] = field(default_factory=dict)
-
-
-def load_item_category_config(path: Path | None = None, game: GameProfile | None = None) -> ItemCategoryConfig:
-    cfg_path = path or (resolve_config_path("item_categories.yaml", game, CONFIG_DIR) if game else DEFAULT_ITEM_CATEGORIES_PATH)
-    if not cfg_path.exists():
-        return ItemCategoryConfig()
-    with cfg_path.open("r", encoding="utf-8") as f:
-        data = yaml.safe_load(f) or {}
+    _classifier: Optional["CategoryClassifier"] = field(default=None, init=False, repr=False, compare=False)
+
+    def classifier(self) -> "CategoryClassifier":
+        """The compiled classifier, built on first use (rebuild by creating a new config, not by editing rules)."""
+        if self._classifier is None:
+            self._classifier = CategoryClassifier(self)
+        return self._classifier
+
+
+class CategoryClassifier:
+    """Compiled category rules; `classify(name, item_id)` returns matches in config order."""
+
+    def __init__(self, config: ItemCategoryConfig, cache_size: int = 65536) -> None:
+        self._names = list(config.categories)
+        self._contains = AhoCorasick()
+        self._always: Set[int] = set()  # an empty token is contained in every name
+        self._exact: Dict[str, Set[int]] = {}
+        for pos, rule in enumerate(config.categories.values()):
+            for token in rule.name_contains:
+                if token:
+                    self._contains.add(token, pos)
+                else:
+                    self._always.add(pos)
+            for exact in rule.name_exact:
+                self._exact.setdefault(exact, set()).add(pos)
+        self._contains.build()
+        self._classify = lru_cache(maxsize=cache_size)(self._match)
+
+    def _match(self, name: str, item_id: str) -> Tuple[str, ...]:
+        found = self._contains.search(name) | self._always
+        found |= self._exact.get(name, set()) | self._exact.get(item_id, set())
+        return tuple(self._names[pos] for pos in sorted(found))
+
+    def classify(self, name: str, item_id: str = "") -> Tuple[str, ...]:
+        """Category keys for lowercased `name`/`item_id`."""
+        if not self._names:
+            return ()
+        return self._classify(name, item_id)
+
+    def cache_info(self):
+        return self._classify.cache_info()
+
+
+def _build_item_category_config(data) -> ItemCategoryConfig:
     cats = {}
     for key, entry in (data.get("categories") or {}).items():
-        match = entry.get("match", {}) if isinstance(entry, dict) else {}
+        match = entry.get("match", {}) if isinstance(entry, Mapping) else {}
         cats[key] = CategoryRule(
             name_contains=[s.lower() for s in match.get("name_contains", [])],
             name_exact=[s.lower() for s in match.get("name_exact", [])],
@@ -40,20 +84,21 @@ def load_item_category_config(path: Path | None = None, game: GameProfile | None
     return ItemCategoryConfig(categories=cats)
 
 
+def load_item_category_config(path: Path | None = None, game: GameProfile | None = None) -> ItemCategoryConfig:
+    """Category rules with lowered patterns; the same object is returned until the file changes."""
+    cfg_path = path or (resolve_config_path("item_categories.yaml", game, CONFIG_DIR) if game else DEFAULT_ITEM_CATEGORIES_PATH)
+    if not cfg_path.exists():
+        return ItemCategoryConfig()
+    return load_config(cfg_path, _build_item_category_config)
+
+
 def classify_item(item: Dict[str, Any], config: ItemCategoryConfig) -> List[str]:
     """Return category keys for an item using name-based rules."""
     if not config.categories:
         return []
     name = str(item.get("name", "")).lower()
     item_id = str(item.get("item_id", "")).lower()
-    matched: List[str] = []
-    for cat, rule in config.categories.items():
-        if any(token in name for token in rule.name_contains):
-            matched.append(cat)
-            continue
-        if any(name == exact or item_id == exact for exact in rule.name_exact):
-            matched.append(cat)
-    return matched
+    return list(config.classifier().classify(name, item_id))
 
 
 def aggregate_category_values(
@@ -63,21 +108,25 @@ def aggregate_category_values(
 ) -> Dict[str, float]:
     """Sum item values into category buckets using classification."""
     totals: Dict[str, float] = {}
+    classifier = config.classifier()
     for it in items:
         key = getattr(it, "item_id", None) or it.get("item_id")
         value = breakdown.get(key, 0.0)
         base_category = getattr(it, "category", None) or it.get("category")
-        categories = classify_item(
-            {"name": getattr(it, "name", None) or it.get("name"), "item_id": key},
-            config,
-        )
+        name = getattr(it, "name", None) or it.get("name")
+        categories = classifier.classify(str(name).lower(), str(key).lower())
         if base_category and base_category not in categories:
-            categories.append(base_category)
-        if not categories:
-            categories = []
+            categories += (base_category,)
         for cat in categories:
             totals[cat] = totals.get(cat, 0.0) + value
     return totals
 
 
-__all__ = ["ItemCategoryConfig", "CategoryRule", "load_item_category_config", "classify_item", "aggregate_category_values"]
+__all__ = [
+    "ItemCategoryConfig",
+    "CategoryClassifier",
+    "CategoryRule",
+    "load_item_category_config",
+    "classify_item",
+    "aggregate_category_values",
+]
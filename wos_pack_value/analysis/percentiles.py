@@ -0,0 +1,139 @@
+"""Percentiles for value distributions: exact in one sort, or streamed with a t-digest.
+
+`named_percentiles(values, {"p90": 0.9, "p50": 0.5})` sorts the values once
+(`numpy.quantile`, linear interpolation between closest ranks) and returns
+every requested quantile. For catalogs too large to hold at once, feed values
+into a `TDigest` chunk by chunk and read approximate quantiles from it; its
+memory is bounded by the compression, not by the number of values.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def quantiles(values: Iterable[float], qs: Sequence[float]) -> np.ndarray:
+    """Exact quantiles `qs` (0..1) of `values` with one sort; zeros when there are no values."""
+    arr = np.asarray(list(values) if not isinstance(values, np.ndarray) else values, dtype=float)
+    if arr.size == 0:
+        return np.zeros(len(qs))
+    return np.quantile(arr, qs)
+
+
+class TDigest:
+    """Merging t-digest (Dunning) for approximate streaming quantiles.
+
+    Values are buffered and periodically merged into at most ~`compression`
+    centroids sized by the arcsine scale function, which keeps the tails
+    (p1/p99) precise and the middle coarser.
+    """
+
+    def __init__(self, compression: float = 100.0, buffer_size: Optional[int] = None) -> None:
+        self.compression = float(compression)
+        self.buffer_size = buffer_size or int(10 * compression)
+        self._means = np.empty(0)
+        self._weights = np.empty(0)
+        self._buffer: List[Tuple[np.ndarray, np.ndarray]] = []  # (means, weights) awaiting a merge
+        self._buffered = 0
+        self.count = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values: Iterable[float]) -> "TDigest":
+        arr = np.asarray(list(values) if not isinstance(values, np.ndarray) else values, dtype=float)
+        arr = arr[~np.isnan(arr)]
+        if arr.size:
+            self._buffer.append((arr, np.ones(arr.size)))
+            self._buffered += arr.size
+            self.count += arr.size
+            self.min = min(self.min, float(arr.min()))
+            self.max = max(self.max, float(arr.max()))
+            if self._buffered >= self.buffer_size:
+                self._compress()
+        return self
+
+    def add(self, value: float) -> "TDigest":
+        return self.update(np.array([value], dtype=float))
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold another digest's centroids into this one."""
+        other._compress()
+        if other._means.size:
+            self._buffer.append((other._means, other._weights))
+            self._buffered += other._means.size
+            self.count += other.count
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress()
+        return self
+
+    def _q_limit(self, q: float) -> float:
+        """Largest cumulative quantile a centroid starting at `q` may reach (k1 scale, k(q) + 1)."""
+        k = self.compression / (2 * math.pi) * math.asin(2 * q - 1) + 1
+        if k >= self.compression / 4:
+            return 1.0
+        return (math.sin(2 * math.pi * k / self.compression) + 1) / 2
+
+    def _compress(self) -> None:
+        if not self._buffer:
+            return
+        means = np.concatenate([self._means, *(m for m, _ in self._buffer)])
+        weights = np.concatenate([self._weights, *(w for _, w in self._buffer)])
+        self._buffer, self._buffered = [], 0
+        order = np.argsort(means, kind="mergesort")
+        means, weights = means[order], weights[order]
+        total = float(weights.sum())
+
+        out_means: List[float] = []
+        out_weights: List[float] = []
+        cur_m, cur_w = float(means[0]), float(weights[0])
+        q0 = 0.0
+        limit = self._q_limit(q0)
+        for m, w in zip(means[1:].tolist(), weights[1:].tolist()):
+            if q0 + (cur_w + w) / total <= limit:
+                cur_w += w
+                cur_m += (m - cur_m) * w / cur_w
+            else:
+                out_means.append(cur_m)
+                out_weights.append(cur_w)
+                q0 += cur_w / total
+                limit = self._q_limit(q0)
+                cur_m, cur_w = m, w
+        out_means.append(cur_m)
+        out_weights.append(cur_w)
+        self._means = np.array(out_means)
+        self._weights = np.array(out_weights)
+
+    @property
+    def centroids(self) -> int:
+        self._compress()
+        return int(self._means.size)
+
+    def quantiles(self, qs: Sequence[float]) -> np.ndarray:
+        """Approximate quantiles `qs` (0..1); zeros when nothing was added."""
+        self._compress()
+        if not self._means.size:
+            return np.zeros(len(qs))
+        if self._means.size == 1:
+            return np.full(len(qs), float(self._means[0]))
+        cumulative = np.cumsum(self._weights)
+        centers = cumulative - self._weights / 2
+        xs = np.concatenate([[0.0], centers, [cumulative[-1]]])
+        ys = np.concatenate([[self.min], self._means, [self.max]])
+        return np.interp(np.asarray(qs, dtype=float) * cumulative[-1], xs, ys)
+
+
+def named_percentiles(
+    values: Iterable[float], spec: Mapping[str, float], *, approximate: bool = False
+) -> Dict[str, float]:
+    """{name: quantile} for every entry of `spec` (e.g. {"p90": 0.9}), from one sort or one t-digest pass."""
+    names = list(spec)
+    qs = [spec[n] for n in names]
+    result = TDigest().update(values).quantiles(qs) if approximate else quantiles(values, qs)
+    return {name: float(v) for name, v in zip(names, result)}
+
+
+__all__ = ["TDigest", "named_percentiles", "quantiles"]
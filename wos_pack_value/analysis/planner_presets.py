@@ -6,9 +6,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Optional
 
-import yaml
-
 from .game_profiles import GameProfile
+from ..config_registry import load_config, thaw
 from ..settings import CONFIG_DIR
 
 
@@ -26,12 +25,7 @@ class PlannerPreset:
     target_amount: Optional[float] = None
 
 
-def load_planner_presets(config_root: Path = CONFIG_DIR, game: GameProfile | None = None) -> List[PlannerPreset]:
-    path = config_root / "planner_presets.yaml"
-    if not path.exists():
-        return []
-    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
-    game_key = game.key if game else None
+def _build_presets(data: Dict, game_key: Optional[str]) -> List[PlannerPreset]:
     game_section = data.get("games", {})
     entries = game_section.get(game_key, {}).get("presets", []) if game_key else []
     presets: List[PlannerPreset] = []
@@ -55,6 +49,18 @@ def load_planner_presets(config_root: Path = CONFIG_DIR, game: GameProfile | Non
     return presets
 
 
+def _presets_builder(game_key: Optional[str]):
+    return lambda data: _build_presets(thaw(data), game_key)
+
+
+def load_planner_presets(config_root: Path = CONFIG_DIR, game: GameProfile | None = None) -> List[PlannerPreset]:
+    path = config_root / "planner_presets.yaml"
+    if not path.exists():
+        return []
+    game_key = game.key if game else None
+    return list(load_config(path, _presets_builder(game_key), key=("planner_presets", game_key)))
+
+
 def find_preset(presets: List[PlannerPreset], key: str) -> Optional[PlannerPreset]:
     for preset in presets:
         if preset.key == key:
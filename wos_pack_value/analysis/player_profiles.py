@@ -6,9 +6,8 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict
 
-import yaml
-
 from ..analysis.game_profiles import GameProfile, resolve_config_path
+from ..config_registry import load_config, thaw
 from ..settings import DEFAULT_PLAYER_PROFILES_PATH
 
 
@@ -19,14 +18,8 @@ class PlayerProfile:
     weights: Dict[str, float]
 
 
-def load_profiles(path: Path | None = None, game: GameProfile | None = None) -> Dict[str, PlayerProfile]:
-    cfg_path = path or (resolve_config_path("player_profiles.yaml", game) if game else DEFAULT_PLAYER_PROFILES_PATH)
-    if not cfg_path.exists():
-        # Minimal default profile
-        return {
-            "default": PlayerProfile(name="default", description="Baseline profile", weights={}),
-        }
-    data = yaml.safe_load(cfg_path.read_text(encoding="utf-8")) or {}
+def _build_profiles(data) -> Dict[str, PlayerProfile]:
+    data = thaw(data)
     profiles_raw = data.get("profiles", {})
     profiles: Dict[str, PlayerProfile] = {}
     for name, cfg in profiles_raw.items():
@@ -40,6 +33,16 @@ def load_profiles(path: Path | None = None, game: GameProfile | None = None) ->
     return profiles
 
 
+def load_profiles(path: Path | None = None, game: GameProfile | None = None) -> Dict[str, PlayerProfile]:
+    cfg_path = path or (resolve_config_path("player_profiles.yaml", game) if game else DEFAULT_PLAYER_PROFILES_PATH)
+    if not cfg_path.exists():
+        # Minimal default profile
+        return {
+            "default": PlayerProfile(name="default", description="Baseline profile", weights={}),
+        }
+    return dict(load_config(cfg_path, _build_profiles))
+
+
 def get_profile(name: str | None, config_path: Path | None = None, game: GameProfile | None = None) -> PlayerProfile:
     profiles = load_profiles(config_path, game=game)
     if not name:
@@ -7,7 +7,7 @@ import logging
 from pathlib import Path
 from typing import Dict, List, Tuple
 
-from .player_profiles import PlayerProfile, get_profile
+from .player_profiles import PlayerProfile, get_profile, load_profiles
 from .game_profiles import GameProfile, resolve_config_path
 from ..settings import (
     DEFAULT_ANALYSIS_CONFIG_PATH,
@@ -19,7 +19,9 @@ from ..settings import (
     DEFAULT_SITE_PACKS,
     SITE_DATA_DIR,
 )
-from ..utils import ensure_dir, load_json, save_json
+from ..config_registry import load_config, thaw
+from ..export.changes import ChangeSet, write_export
+from ..utils import ensure_dir, load_json
 
 logger = logging.getLogger(__name__)
 
@@ -27,7 +29,7 @@ logger = logging.getLogger(__name__)
 def load_analysis_config(path: Path | None = None, game: GameProfile | None = None) -> Dict:
     cfg_path = path or (resolve_config_path("analysis.yaml", game) if game else DEFAULT_ANALYSIS_CONFIG_PATH)
     if cfg_path.exists():
-        return load_json(cfg_path) if cfg_path.suffix.lower() == ".json" else __load_yaml(cfg_path)
+        return thaw(load_config(cfg_path))
     return {
         "analysis": {
             "exclude_reference": True,
@@ -39,13 +41,6 @@ def load_analysis_config(path: Path | None = None, game: GameProfile | None = No
     }
 
 
-def __load_yaml(path: Path) -> Dict:
-    import yaml
-
-    with path.open("r", encoding="utf-8") as f:
-        return yaml.safe_load(f) or {}
-
-
 def compute_profile_score(pack_metrics: Dict, profile: PlayerProfile) -> float:
     """Compute a profile score for a pack based on category values and weights."""
     if not profile.weights:
@@ -184,6 +179,7 @@ def analyze_from_site_data(
     profile_name: str | None = None,
     profiles_path: Path | None = None,
     game: GameProfile | None = None,
+    changes: ChangeSet | None = None,
 ) -> Tuple[Path, Path]:
     config = load_analysis_config(config_path, game=game)
     profile = None
@@ -198,11 +194,14 @@ def analyze_from_site_data(
     ensure_dir(out_dir)
     overall_path = out_dir / DEFAULT_SITE_ANALYSIS_OVERALL.name
     cat_path = out_dir / DEFAULT_SITE_ANALYSIS_BY_CATEGORY.name
-    save_json(overall_path, {"packs": analyses})
-    save_json(cat_path, {"by_category": by_category})
+    write_export(overall_path, {"packs": analyses}, changes)
+    write_export(cat_path, {"by_category": by_category}, changes)
     logger.info("Analysis exported to %s and %s", overall_path, cat_path)
+    from .top_packs import write_top_packs
+
+    write_top_packs(out_dir, analyses, load_profiles(profile_path, game=game), changes=changes)
     if profile and profile_sorted:
         profile_path_out = out_dir / DEFAULT_SITE_ANALYSIS_PROFILE.format(profile=profile.name)
-        save_json(profile_path_out, {"profile": profile.name, "packs": profile_sorted})
+        write_export(profile_path_out, {"profile": profile.name, "packs": profile_sorted}, changes)
         logger.info("Profile analysis (%s) exported to %s", profile.name, profile_path_out)
     return overall_path, cat_path
@@ -1,9 +1,18 @@
-"""Rule-based summaries for packs based on existing metrics."""
+"""Rule-based summaries for packs based on existing metrics.
+
+Percentile thresholds come from `analysis.percentiles` (one sort per
+distribution), and `generate_all_pack_summaries` classifies every pack
+against them with array comparisons rather than pack by pack.
+"""
 
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Mapping, Optional
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from .percentiles import named_percentiles
 
 
 @dataclass
@@ -13,29 +22,16 @@ class SummaryContext:
     profile_name: str | None = None
 
 
-def _percentile(values: List[float], pct: float) -> float:
-    if not values:
-        return 0.0
-    ordered = sorted(values)
-    if len(ordered) == 1:
-        return ordered[0]
-    pos = (len(ordered) - 1) * pct
-    low = int(pos)
-    high = min(low + 1, len(ordered) - 1)
-    fraction = pos - low
-    return ordered[low] + (ordered[high] - ordered[low]) * fraction
+OVERALL_PERCENTILES = {"p90": 0.9, "p75": 0.75, "p50": 0.5, "p25": 0.25}
+CATEGORY_PERCENTILES = {"p80": 0.8, "p60": 0.6}
+OVERALL_DESCRIPTIONS = ("exceptional overall value", "very strong overall value", "solid overall value")
+AVERAGE_DESCRIPTION = "average or situational value"
+UNKNOWN_SUMMARY = "This pack's value is hard to estimate with current data."
 
 
-def _compute_percentiles(values: Iterable[float]) -> Dict[str, float]:
+def _compute_percentiles(values: Iterable[float], approximate: bool = False) -> Dict[str, float]:
     vals = [float(v) for v in values if v is not None]
-    if not vals:
-        return {"p90": 0.0, "p75": 0.0, "p50": 0.0, "p25": 0.0}
-    return {
-        "p90": _percentile(vals, 0.9),
-        "p75": _percentile(vals, 0.75),
-        "p50": _percentile(vals, 0.5),
-        "p25": _percentile(vals, 0.25),
-    }
+    return named_percentiles(vals, OVERALL_PERCENTILES, approximate=approximate)
 
 
 def _describe_overall(value_per_dollar: float, percentiles: Mapping[str, float]) -> str | None:
@@ -44,13 +40,10 @@ def _describe_overall(value_per_dollar: float, percentiles: Mapping[str, float])
     p90 = percentiles.get("p90", 0.0)
     p75 = percentiles.get("p75", 0.0)
     p50 = percentiles.get("p50", 0.0)
-    if value_per_dollar >= p90 and p90 > 0:
-        return "exceptional overall value"
-    if value_per_dollar >= p75 and p75 > 0:
-        return "very strong overall value"
-    if value_per_dollar >= p50 and p50 > 0:
-        return "solid overall value"
-    return "average or situational value"
+    for threshold, description in zip((p90, p75, p50), OVERALL_DESCRIPTIONS):
+        if value_per_dollar >= threshold and threshold > 0:
+            return description
+    return AVERAGE_DESCRIPTION
 
 
 def _human_label(category: str) -> str:
@@ -76,10 +69,14 @@ def _describe_category(
     thresholds = category_percentiles.get(best_cat, {})
     p80 = thresholds.get("p80", 0.0)
     p60 = thresholds.get("p60", 0.0)
-    label = _human_label(best_cat)
-    if p80 and best_vpd >= p80:
+    return _category_phrase(best_cat, best_vpd >= p80 if p80 else False, best_vpd >= p60 if p60 else False)
+
+
+def _category_phrase(category: str, above_p80: bool, above_p60: bool) -> str:
+    label = _human_label(category)
+    if above_p80:
         return f"especially strong for {label}"
-    if p60 and best_vpd >= p60:
+    if above_p60:
         return f"notably good for {label}"
     return f"leans toward {label.lower()}"
 
@@ -102,7 +99,7 @@ def generate_pack_summary(
     value_per_dollar = float(pack_metrics.get("value_per_dollar", 0) or 0.0)
 
     if price <= 0 or total_value <= 0 or value_per_dollar <= 0:
-        return "This pack's value is hard to estimate with current data."
+        return UNKNOWN_SUMMARY
 
     sentences: List[str] = []
 
@@ -123,7 +120,7 @@ def generate_pack_summary(
         sentences.append(PROFILE_HINTS[profile])
 
     if not sentences:
-        return "This pack's value is hard to estimate with current data."
+        return UNKNOWN_SUMMARY
     return " ".join(sentences)
 
 
@@ -131,31 +128,86 @@ def generate_all_pack_summaries(
     packs: List[Dict[str, Any]],
     *,
     profile_name: str | None = None,
+    approximate: bool = False,
 ) -> Dict[str, str]:
-    overall_percentiles = _compute_percentiles(p.get("value_per_dollar") for p in packs)
-    category_percentiles: Dict[str, Dict[str, float]] = {}
-    for pack in packs:
-        price = float(pack.get("price", 0) or 0.0)
-        if price <= 0:
+    """Summaries for every pack; same text as `generate_pack_summary` with percentiles over `packs`."""
+    return generate_summaries_for_profiles(packs, [profile_name], approximate=approximate)[profile_name]
+
+
+def generate_summaries_for_profiles(
+    packs: List[Dict[str, Any]],
+    profile_names: Iterable[Optional[str]],
+    *,
+    approximate: bool = False,
+) -> Dict[Optional[str], Dict[str, str]]:
+    """{profile: {pack id: summary}} for several profiles from one shared percentile context.
+
+    Only the closing profile hint depends on the profile, so percentiles and
+    per-pack sentences are computed once. Each distribution is sorted once (or
+    streamed through a t-digest when `approximate`), and packs are compared
+    against the thresholds as arrays.
+    """
+    n = len(packs)
+    prices = [float(p.get("price", 0) or 0.0) for p in packs]
+    overall = _compute_percentiles((p.get("value_per_dollar") for p in packs), approximate=approximate)
+
+    # One pass over category values: per-category distributions plus each pack's strongest category.
+    category_values: Dict[str, List[float]] = {}
+    best_cat: List[Optional[str]] = [None] * n
+    best_vpds = [0.0] * n
+    for idx, pack in enumerate(packs):
+        pack_price = prices[idx]
+        if pack_price <= 0:
             continue
         for cat, val in (pack.get("category_values") or {}).items():
-            vpd = float(val or 0) / price if price else 0.0
-            category_percentiles.setdefault(cat, []).append(vpd)
-    for cat, values in list(category_percentiles.items()):
-        category_percentiles[cat] = {
-            "p80": _percentile(values, 0.8),
-            "p60": _percentile(values, 0.6),
-        }
+            cat_vpd = float(val or 0) / pack_price
+            category_values.setdefault(cat, []).append(cat_vpd)
+            if cat_vpd > best_vpds[idx]:
+                best_cat[idx], best_vpds[idx] = cat, cat_vpd
+    category_percentiles = {
+        cat: named_percentiles(values, CATEGORY_PERCENTILES, approximate=approximate)
+        for cat, values in category_values.items()
+    }
 
-    context = SummaryContext(
-        overall_percentiles=overall_percentiles,
-        category_percentiles=category_percentiles,
-        profile_name=profile_name,
+    price = np.array(prices)
+    total_value = np.array([float(p.get("total_value", 0) or 0.0) for p in packs], dtype=float)
+    vpd = np.array([float(p.get("value_per_dollar", 0) or 0.0) for p in packs], dtype=float)
+    best_vpd = np.array(best_vpds)
+    valid = ((price > 0) & (total_value > 0) & (vpd > 0)).tolist()
+    thresholds = [overall["p90"], overall["p75"], overall["p50"]]
+    overall_level = np.select(
+        [(vpd >= t) & (t > 0) for t in thresholds], range(len(thresholds)), default=len(thresholds)
     )
-    return {
-        pack.get("id", f"pack-{idx}"): generate_pack_summary(pack, context=context)
-        for idx, pack in enumerate(packs)
-    }
+    p80 = np.array([category_percentiles[c]["p80"] if c else 0.0 for c in best_cat])
+    p60 = np.array([category_percentiles[c]["p60"] if c else 0.0 for c in best_cat])
+    above_p80 = ((p80 != 0) & (best_vpd >= p80)).tolist()
+    above_p60 = ((p60 != 0) & (best_vpd >= p60)).tolist()
+
+    # Only a handful of distinct sentences exist; build each once.
+    overall_sentences = [f"This pack offers {d}." for d in OVERALL_DESCRIPTIONS + (AVERAGE_DESCRIPTION,)]
+    category_sentences: Dict[tuple, str] = {}
+    bodies: List[Tuple[str, Optional[str]]] = []  # (pack id, profile-independent text or None when not estimable)
+    for idx, (pack, level) in enumerate(zip(packs, overall_level.tolist())):
+        key = pack.get("id", f"pack-{idx}")
+        if not valid[idx]:
+            bodies.append((key, None))
+            continue
+        body = overall_sentences[level]
+        if best_cat[idx]:
+            phrase_key = (best_cat[idx], above_p80[idx], above_p60[idx])
+            if phrase_key not in category_sentences:
+                category_sentences[phrase_key] = f"It is {_category_phrase(*phrase_key)}."
+            body = f"{body} {category_sentences[phrase_key]}"
+        bodies.append((key, body))
+
+    result: Dict[Optional[str], Dict[str, str]] = {}
+    for profile_name in dict.fromkeys(profile_names):
+        hint = PROFILE_HINTS.get((profile_name or "default").lower())
+        suffix = f" {hint}" if hint else ""
+        result[profile_name] = {
+            key: f"{body}{suffix}" if body is not None else UNKNOWN_SUMMARY for key, body in bodies
+        }
+    return result
 
 
-__all__ = ["generate_pack_summary", "generate_all_pack_summaries", "SummaryContext"]
+__all__ = ["generate_pack_summary", "generate_all_pack_summaries", "generate_summaries_for_profiles", "SummaryContext"]
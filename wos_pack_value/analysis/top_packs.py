@@ -0,0 +1,132 @@
+"""Precomputed top-k pack lists (`top_packs.json`).
+
+For the overall value per dollar, every player profile and every item
+category, the best packs are selected once with `top_k_indices` for the
+largest k and stored for each requested k (5/10/25 by default). Readers such
+as announcements, the explorer or a bot look up `views[k]` instead of
+sorting the full ranking export.
+
+Scores match the ranking exports: `value_per_dollar` overall,
+`compute_profile_score` per profile, and category value / price per
+category. Packs with no positive score are left out of a view.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Mapping, Optional, Sequence
+
+from .game_profiles import GameProfile
+from .player_profiles import PlayerProfile, load_profiles
+from .topk import top_k_indices, top_k_prefixes
+from ..export.changes import ChangeSet, write_export
+from ..settings import DEFAULT_SITE_PACKS, DEFAULT_SITE_TOP_PACKS, SITE_DATA_DIR
+from ..utils import ensure_dir, load_json
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOP_KS = (5, 10, 25)
+
+
+def _entry(rec: Dict[str, Any], score: float) -> Dict[str, Any]:
+    return {
+        "id": rec.get("id"),
+        "name": rec.get("name"),
+        "price": rec.get("price"),
+        "currency": rec.get("currency"),
+        "value_per_dollar": rec.get("value_per_dollar"),
+        "score": round(float(score), 4),
+        "rank_overall": rec.get("rank_overall"),
+    }
+
+
+def _view(analyses: Sequence[Dict[str, Any]], scores: np.ndarray, ks: Sequence[int]) -> Dict[str, List[Dict]]:
+    positive = int((scores > 0).sum())
+    best = [_entry(analyses[i], scores[i]) for i in top_k_indices(scores, min(max(ks), positive)).tolist()]
+    return {str(k): view for k, view in top_k_prefixes(best, ks).items()}
+
+
+def build_top_packs(
+    analyses: Sequence[Dict[str, Any]],
+    profiles: Optional[Mapping[str, PlayerProfile]] = None,
+    ks: Sequence[int] = DEFAULT_TOP_KS,
+) -> Dict[str, Any]:
+    """Top-k views over `analyze_packs` records: {"ks", "overall", "profiles", "categories"}."""
+    import numpy as np
+
+    ks = sorted({int(k) for k in ks if int(k) > 0})
+    if not ks:
+        raise ValueError("At least one positive k is required")
+    categories = sorted({cat for rec in analyses for cat in (rec.get("category_values") or {})})
+    column = {cat: j for j, cat in enumerate(categories)}
+    values = np.zeros((len(analyses), len(categories)))
+    for i, rec in enumerate(analyses):
+        for cat, val in (rec.get("category_values") or {}).items():
+            values[i, column[cat]] = float(val or 0)
+    price = np.array([float(rec.get("price") or 0) for rec in analyses])
+    vpd = np.array([float(rec.get("value_per_dollar") or 0) for rec in analyses])
+    safe_price = np.where(price > 0, price, 1.0)
+
+    def per_dollar(totals: np.ndarray) -> np.ndarray:
+        return np.where(price > 0, totals / safe_price, 0.0)
+
+    profile_views: Dict[str, Dict[str, List[Dict]]] = {}
+    for name, profile in (profiles or {}).items():
+        if not profile.weights:
+            scores = vpd
+        else:
+            weights = np.zeros(len(categories))
+            for cat, weight in profile.weights.items():
+                if cat in column:
+                    weights[column[cat]] = float(weight)
+            scores = per_dollar(values @ weights)
+        profile_views[name] = _view(analyses, scores, ks)
+
+    return {
+        "ks": ks,
+        "overall": _view(analyses, vpd, ks),
+        "profiles": profile_views,
+        "categories": {cat: _view(analyses, per_dollar(values[:, column[cat]]), ks) for cat in categories},
+    }
+
+
+def write_top_packs(
+    out_dir: Path,
+    analyses: Sequence[Dict[str, Any]],
+    profiles: Optional[Mapping[str, PlayerProfile]] = None,
+    ks: Sequence[int] = DEFAULT_TOP_KS,
+    changes: ChangeSet | None = None,
+) -> Path:
+    ensure_dir(out_dir)
+    path = out_dir / DEFAULT_SITE_TOP_PACKS.name
+    write_export(path, build_top_packs(analyses, profiles, ks), changes)
+    logger.info("Top packs exported to %s", path)
+    return path
+
+
+def export_top_packs(
+    site_dir: Path = SITE_DATA_DIR,
+    output_dir: Path | None = None,
+    ks: Sequence[int] = DEFAULT_TOP_KS,
+    config_path: Path | None = None,
+    profiles_path: Path | None = None,
+    game: GameProfile | None = None,
+    changes: ChangeSet | None = None,
+) -> Path:
+    """Build `top_packs.json` from `packs.json` in `site_dir`."""
+    from .ranking import analyze_packs, load_analysis_config
+
+    packs_path = site_dir / DEFAULT_SITE_PACKS.name
+    if not packs_path.exists():
+        raise FileNotFoundError(f"{packs_path} not found; run `wos-pack-value run` first.")
+    config = load_analysis_config(config_path, game=game)
+    analyses, _, _ = analyze_packs(load_json(packs_path).get("packs", []), config)
+    profiles = load_profiles(profiles_path, game=game)
+    return write_top_packs(output_dir or site_dir, analyses, profiles, ks, changes)
+
+
+__all__ = ["DEFAULT_TOP_KS", "build_top_packs", "export_top_packs", "write_top_packs"]
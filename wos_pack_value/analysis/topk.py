@@ -0,0 +1,52 @@
+"""Top-k selection without sorting everything.
+
+`top_k(items, k, key)` keeps a k-sized heap (`heapq.nlargest`, O(n log k))
+over any iterable; `top_k_indices(scores, k)` does the same for a numpy score
+array with `argpartition` (O(n) plus sorting the k winners). Both order the
+winners by descending score and break ties by input position, so the result
+is exactly the first k entries of a stable descending sort.
+"""
+
+from __future__ import annotations
+
+import heapq
+from typing import TYPE_CHECKING, Callable, Dict, Iterable, List, Sequence, TypeVar
+
+if TYPE_CHECKING:
+    import numpy as np
+
+T = TypeVar("T")
+
+
+def top_k(items: Iterable[T], k: int, key: Callable[[T], float]) -> List[T]:
+    """The k items with the largest `key`, best first (ties keep input order)."""
+    if k <= 0:
+        return []
+    return heapq.nlargest(k, items, key=key)
+
+
+def top_k_indices(scores: Sequence[float], k: int) -> np.ndarray:
+    """Indices of the k largest scores, best first (ties keep index order; NaN ranks last)."""
+    import numpy as np
+
+    arr = np.asarray(scores, dtype=float)
+    arr = np.where(np.isnan(arr), -np.inf, arr)
+    k = min(max(int(k), 0), arr.size)
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    if k < arr.size:
+        kth = arr[np.argpartition(-arr, k - 1)[k - 1]]
+        # Keep every score tied with the k-th so the lowest indices win the tie, not argpartition's pick.
+        candidates = np.flatnonzero(arr >= kth)
+    else:
+        candidates = np.arange(arr.size)
+    order = np.lexsort((candidates, -arr[candidates]))
+    return candidates[order][:k]
+
+
+def top_k_prefixes(ranked: Sequence[T], ks: Iterable[int]) -> Dict[int, List[T]]:
+    """{k: first k of `ranked`} for every k; `ranked` only needs to hold max(ks) entries."""
+    return {k: list(ranked[: max(k, 0)]) for k in ks}
+
+
+__all__ = ["top_k", "top_k_indices", "top_k_prefixes"]
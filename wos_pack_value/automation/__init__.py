@@ -1,5 +1,6 @@
-"""Automation helpers (auto-run + auto-commit)."""
+"""Automation helpers (auto-run + auto-commit, watch mode)."""
 
 from .auto_update import auto_update_and_commit
+from .watch import IncrementalPipeline, WatchCycle, make_watcher, watch_and_rebuild
 
-__all__ = ["auto_update_and_commit"]
+__all__ = ["auto_update_and_commit", "IncrementalPipeline", "WatchCycle", "make_watcher", "watch_and_rebuild"]
@@ -1,13 +1,46 @@
-"""Auto-run the pipeline and create a git commit if exports changed."""
+"""Auto-run the pipeline and create a git commit if exports changed.
+
+The pipeline and analysis run in-process and report a `ChangeSet` from the
+export layer (which files changed and why). When this run changed nothing,
+`git status` is still checked for the watched paths so exports left behind by
+a dry run or a failed `git add`/`git commit` are committed on the next run.
+"""
 
 from __future__ import annotations
 
+import logging
 import subprocess
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, Optional, Sequence
-
-from ..settings import SITE_DATA_DIR
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+from ..analysis.game_profiles import get_game_profile
+from ..analysis.ranking import analyze_from_site_data
+from ..export.changes import ChangeSet
+from ..history.snapshot import snapshot_site_data
+from ..pipeline import run_pipeline
+from ..settings import DEFAULT_SITE_ALL_GAMES_METRICS, DEFAULT_SITE_RUN_METRICS, SITE_DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+# `run` CLI parameter -> run_pipeline keyword (forwarded via --extra-run-args).
+_RUN_PARAM_TO_KWARG = {
+    "config": "config_path",
+    "use_ocr_screenshots": "use_ocr",
+    "screenshots_dir": "screenshots_dir",
+    "ocr_lang": "ocr_lang",
+    "ocr_workers": "ocr_workers",
+    "ocr_review_dump": "ocr_review_dump_path",
+    "ocr_reviewed_path": "ocr_reviewed_path",
+    "ingestion_config": "ingestion_config_path",
+    "reference_mode": "reference_mode_override",
+    "log_file": "log_file",
+}
+_RUN_PARAM_NEGATED = {"no_validation": "enable_validation", "no_ocr_cache": "use_ocr_cache"}
+# Accepted but redundant: auto-update always runs the analysis.
+_RUN_PARAM_IMPLIED = {"with_analysis"}
+# Rewritten on every run (timings) and never part of the change set, so never worth a commit.
+_PER_RUN_FILES = {DEFAULT_SITE_RUN_METRICS.name, DEFAULT_SITE_ALL_GAMES_METRICS.name}
 
 
 def _run_cmd(args: Sequence[str]) -> int:
@@ -15,38 +48,77 @@ def _run_cmd(args: Sequence[str]) -> int:
     return result.returncode
 
 
-def _run_pipeline_cmd(
+def _run_kwargs_from_args(extra_run_args: Sequence[str] | None) -> Dict[str, Any]:
+    """Parse `run` CLI flags into run_pipeline kwargs (plus `analysis_config`).
+
+    Raises ValueError for flags auto-update cannot honour (e.g. --summary-only, --raw-dir).
+    """
+    if not extra_run_args:
+        return {}
+    import typer
+
+    from ..cli import app
+
+    command = typer.main.get_command(app).commands["run"]
+    params = command.make_context("run", list(extra_run_args)).params
+    handled = {*_RUN_PARAM_TO_KWARG, *_RUN_PARAM_NEGATED, *_RUN_PARAM_IMPLIED, "analysis_config"}
+    unsupported = [p.opts[0] for p in command.params if p.name not in handled and params.get(p.name) != p.default]
+    if unsupported:
+        raise ValueError(
+            f"Cannot forward {', '.join(unsupported)} via --extra-run-args; "
+            "use auto-update's own --raw-dir/--site-dir/--history-root/--game options instead"
+        )
+    kwargs: Dict[str, Any] = {}
+    for param, kwarg in _RUN_PARAM_TO_KWARG.items():
+        if params.get(param) is not None:
+            kwargs[kwarg] = params[param]
+    for param, kwarg in _RUN_PARAM_NEGATED.items():
+        kwargs[kwarg] = not params.get(param, False)
+    if params.get("analysis_config"):
+        kwargs["analysis_config"] = params["analysis_config"]
+    return kwargs
+
+
+def _run_pipeline_in_process(
     raw_dir: Path,
     site_dir: Path,
-    history_root: Optional[Path],
+    changes: ChangeSet,
     extra_run_args: Sequence[str] | None = None,
     game_key: str | None = None,
-) -> int:
-    cmd = [
-        "python",
-        "-m",
-        "wos_pack_value.cli",
-        "run",
-        "--raw-dir",
-        str(raw_dir),
-        "--site-dir",
-        str(site_dir),
-        "--with-analysis",
-    ]
-    if history_root:
-        cmd += ["--history-root", str(history_root)]
-    if game_key:
-        cmd += ["--game", game_key]
-    if extra_run_args:
-        cmd += list(extra_run_args)
-    return _run_cmd(cmd)
+) -> None:
+    kwargs = _run_kwargs_from_args(extra_run_args)
+    analysis_config = kwargs.pop("analysis_config", None)
+    run_pipeline(raw_dir=raw_dir, site_dir=site_dir, game_key=game_key, changes=changes, **kwargs)
+    analyze_from_site_data(
+        site_dir,
+        config_path=analysis_config,
+        output_dir=site_dir,
+        game=get_game_profile(game_key=game_key),
+        changes=changes,
+    )
 
 
-def _git_status() -> list[str]:
-    proc = subprocess.run(["git", "status", "--porcelain"], capture_output=True, text=True)
+def _git_pending(paths: Sequence[Path]) -> list[Path]:
+    """Uncommitted (modified, staged or untracked) exports under `paths`, per `git status --porcelain`."""
+    top = subprocess.run(["git", "rev-parse", "--show-toplevel"], capture_output=True, text=True)
+    if top.returncode != 0:
+        raise RuntimeError(top.stderr.strip() or "git rev-parse failed")
+    cmd = ["git", "status", "--porcelain", "-z", "--untracked-files=all", "--"] + [str(p) for p in paths]
+    proc = subprocess.run(cmd, capture_output=True, text=True)
     if proc.returncode != 0:
         raise RuntimeError(proc.stderr.strip() or "git status failed")
-    return proc.stdout.splitlines()
+    root = Path(top.stdout.strip())
+    pending: list[Path] = []
+    entries = iter(proc.stdout.split("\0"))
+    for entry in entries:
+        if len(entry) < 4:
+            continue
+        path = root / entry[3:]
+        if entry[0] in "RC":
+            next(entries, None)  # rename/copy source path
+        if path.name not in _PER_RUN_FILES:
+            pending.append(path)
+    return pending
 
 
 def _git_add(paths: Iterable[Path]) -> int:
@@ -59,18 +131,6 @@ def _git_commit(message: str) -> int:
     return _run_cmd(cmd)
 
 
-def _filter_changed(status_lines: list[str], watch_paths: Sequence[Path]) -> list[str]:
-    watch = [p.as_posix().rstrip("/") for p in watch_paths]
-    changed: list[str] = []
-    for line in status_lines:
-        if len(line) < 4:
-            continue
-        path = line[3:].strip()
-        if any(path == w or path.startswith(f"{w}/") for w in watch):
-            changed.append(path)
-    return changed
-
-
 def auto_update_and_commit(
     raw_dir: Path,
     site_dir: Path = SITE_DATA_DIR,
@@ -81,44 +141,60 @@ def auto_update_and_commit(
     commit_message: Optional[str] = None,
     paths_to_watch: Optional[Sequence[Path]] = None,
     game_key: str | None = None,
+    changes: ChangeSet | None = None,
 ) -> int:
-    """Run pipeline, detect export changes, and create a git commit if needed."""
-    run_code = _run_pipeline_cmd(
-        raw_dir=raw_dir, site_dir=site_dir, history_root=history_root, extra_run_args=extra_run_args, game_key=game_key
-    )
-    if run_code != 0:
-        print("Pipeline run failed; aborting auto-update.")
-        return run_code
-
-    watch_paths = list(paths_to_watch) if paths_to_watch else [site_dir]
-    if history_root:
-        watch_paths.append(history_root)
+    """Run pipeline + analysis, and create a git commit if exports changed.
 
+    Pass `changes` to receive the change set (files changed and why). Raises ValueError
+    when `extra_run_args` contains `run` flags that cannot be forwarded.
+    """
+    changes = changes if changes is not None else ChangeSet()
+    _run_kwargs_from_args(extra_run_args)  # reject unsupported flags before doing any work
     try:
-        status_lines = _git_status()
-    except Exception as exc:  # pragma: no cover - git environment issue
-        print(f"Git status failed: {exc}")
+        _run_pipeline_in_process(
+            raw_dir=raw_dir, site_dir=site_dir, changes=changes, extra_run_args=extra_run_args, game_key=game_key
+        )
+    except Exception as exc:
+        logger.exception("Pipeline run failed")
+        print(f"Pipeline run failed ({exc}); aborting auto-update.")
         return 1
 
-    changed = _filter_changed(status_lines, watch_paths)
-    if not changed:
-        print("No changes detected in watched paths; nothing to commit.")
-        return 0
+    watch_paths = list(paths_to_watch) if paths_to_watch else [site_dir]
+    relevant = changes.filter(watch_paths)
+    if not relevant:
+        # Nothing rewritten this run; exports from a dry run or failed commit may still be pending.
+        try:
+            pending = _git_pending(watch_paths + ([history_root] if history_root else []))
+        except Exception as exc:
+            logger.warning("git status failed: %s", exc)
+            print(f"Git status failed: {exc}")
+            return 1
+        for path in pending:
+            relevant.record(path, "uncommitted from an earlier run")
+        if not relevant:
+            print("No changes detected in watched paths; nothing to commit.")
+            return 0
+    elif history_root:
+        manifest = snapshot_site_data(site_dir=site_dir, history_root=history_root)
+        for path in [manifest.path] + manifest.new_blobs:
+            relevant.record(path, f"history snapshot {manifest.snapshot_id}")
+            changes.record(path, f"history snapshot {manifest.snapshot_id}")
 
     if dry_run:
         print("Dry run: detected changes in:")
-        for p in changed:
-            print(f"  {p}")
-        print("Would stage watched paths and create a commit.")
+        for line in relevant.summary_lines():
+            print(f"  {line}")
+        print("Would stage changed paths and create a commit.")
         return 0
 
-    add_code = _git_add(watch_paths)
+    add_code = _git_add(relevant.paths())
     if add_code != 0:
         print("git add failed.")
         return add_code
 
     msg = commit_message or f"Update pack data {datetime.now().date().isoformat()}"
-    commit_code = _git_commit(msg)
+    body = "\n".join(f"- {line}" for line in relevant.summary_lines())
+    commit_code = _git_commit(f"{msg}\n\n{body}")
     if commit_code != 0:
         print("git commit failed.")
         return commit_code
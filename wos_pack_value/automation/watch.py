@@ -0,0 +1,468 @@
+"""Watch inputs and incrementally rebuild exports when they change.
+
+`IncrementalPipeline` keeps parsed packs per source file and valuations per
+pack fingerprint between cycles, so a change re-parses only the files that
+changed, revalues only packs whose content changed, then re-exports and
+re-ranks. Config edits widen the rebuild to whatever that config affects.
+File events come from inotify when `inotify_simple` is installed (Linux) and
+from mtime polling otherwise; bursts are debounced into one cycle.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from ..analysis.game_profiles import GameProfile
+from ..analysis.ranking import analyze_from_site_data
+from ..export.json_export import export_site_json
+from ..ingestion.config import load_ingestion_config
+from ..ingestion.ocr import ocr_screenshots
+from ..ingestion.ocr_cache import open_ocr_cache
+from ..ingestion.ocr_preprocess import load_ocr_config
+from ..ingestion.ocr_review import load_reviewed_ocr_packs
+from ..ingestion.pipeline import build_item_definitions
+from ..ingestion.tabular import parse_file
+from ..models.domain import Pack, ValuedPack
+from ..settings import (
+    CONFIG_DIR,
+    DATA_PROCESSED_DIR,
+    DEFAULT_OCR_CACHE,
+    DEFAULT_OCR_REVIEWED,
+    IMAGES_RAW_DIR,
+    SCREENSHOTS_DIR,
+)
+from ..valuation.config import load_valuation_config
+from ..valuation.engine import value_packs
+
+logger = logging.getLogger(__name__)
+
+# Editor/Excel lock and swap files; saving a workbook touches these first.
+IGNORED_PREFIXES = ("~$", ".~lock", ".#")
+IGNORED_SUFFIXES = ("~", ".swp", ".tmp", ".part")
+
+# Which stages a config file invalidates, by basename. Unlisted configs re-export + re-rank.
+CONFIG_EFFECTS: Dict[str, str] = {
+    "ingestion.yaml": "reparse",
+    "item_values.yaml": "revalue",
+    "ocr.yaml": "ocr",
+    "analysis.yaml": "rank",
+    "player_profiles.yaml": "rank",
+}
+
+
+def _is_ignored(path: Path) -> bool:
+    name = path.name
+    return name.startswith(IGNORED_PREFIXES) or name.endswith(IGNORED_SUFFIXES)
+
+
+def _is_under(path: Path, root: Path) -> bool:
+    try:
+        path.relative_to(root)
+        return True
+    except ValueError:
+        return False
+
+
+def pack_fingerprint(pack: Pack) -> str:
+    """Content hash of a freshly parsed pack (taken before valuation annotates it)."""
+    return hashlib.sha1(pack.json(sort_keys=True).encode("utf-8")).hexdigest()
+
+
+# --- change detection -------------------------------------------------------
+
+
+class PollingWatcher:
+    """Detect changes by diffing (mtime, size) snapshots of the watched paths."""
+
+    backend = "polling"
+
+    def __init__(self, paths: Iterable[Path], interval: float = 1.0) -> None:
+        self.paths = [Path(p) for p in paths]
+        self.interval = interval
+        self._snapshot = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        snap: Dict[Path, Tuple[int, int]] = {}
+        for root in self.paths:
+            if root.is_file():
+                st = root.stat()
+                snap[root] = (st.st_mtime_ns, st.st_size)
+                continue
+            if not root.is_dir():
+                continue
+            for dirpath, _, filenames in os.walk(root):
+                for name in filenames:
+                    path = Path(dirpath) / name
+                    try:
+                        st = path.stat()
+                    except OSError:
+                        continue
+                    snap[path] = (st.st_mtime_ns, st.st_size)
+        return snap
+
+    def poll(self, timeout: float) -> Set[Path]:
+        """Return changed paths, waiting up to `timeout` seconds for the first change."""
+        deadline = time.monotonic() + timeout
+        while True:
+            current = self._scan()
+            changed = {p for p in current.keys() | self._snapshot.keys() if current.get(p) != self._snapshot.get(p)}
+            self._snapshot = current
+            changed = {p for p in changed if not _is_ignored(p)}
+            remaining = deadline - time.monotonic()
+            if changed or remaining <= 0:
+                return changed
+            time.sleep(min(self.interval, remaining))
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """inotify-backed watcher (Linux, requires `inotify_simple`)."""
+
+    backend = "inotify"
+
+    def __init__(self, paths: Iterable[Path]) -> None:
+        from inotify_simple import INotify, flags  # type: ignore
+
+        paths = [Path(p) for p in paths]
+        self._inotify = INotify()
+        mask = flags.CLOSE_WRITE | flags.MOVED_TO | flags.MOVED_FROM | flags.DELETE | flags.CREATE
+        self._dirs: Dict[int, Path] = {}
+        self._files: Dict[Path, Set[str]] = {}  # dir -> basenames watched individually
+        for path in paths:
+            if path.is_dir():
+                for dirpath, _, _ in os.walk(path):
+                    self._dirs[self._inotify.add_watch(dirpath, mask)] = Path(dirpath)
+            elif path.parent.is_dir():
+                self._dirs[self._inotify.add_watch(str(path.parent), mask)] = path.parent
+                self._files.setdefault(path.parent, set()).add(path.name)
+        self._whole_dirs = {p for p in paths if p.is_dir()}
+
+    def _wanted(self, path: Path) -> bool:
+        if _is_ignored(path):
+            return False
+        if any(_is_under(path, root) for root in self._whole_dirs):
+            return True
+        return path.name in self._files.get(path.parent, set())
+
+    def poll(self, timeout: float) -> Set[Path]:
+        events = self._inotify.read(timeout=int(timeout * 1000))
+        changed = set()
+        for event in events:
+            base = self._dirs.get(event.wd)
+            if base is None or not event.name:
+                continue
+            path = base / event.name
+            if self._wanted(path):
+                changed.add(path)
+        return changed
+
+    def close(self) -> None:
+        self._inotify.close()
+
+
+def make_watcher(paths: Iterable[Path], poll_interval: float = 1.0, force_polling: bool = False):
+    """Return an inotify watcher when available, else a polling watcher."""
+    paths = list(paths)
+    if not force_polling:
+        try:
+            return InotifyWatcher(paths)
+        except (ImportError, OSError) as exc:
+            logger.info("inotify unavailable (%s); falling back to polling every %.1fs", exc, poll_interval)
+    return PollingWatcher(paths, interval=poll_interval)
+
+
+def collect_changes(watcher, timeout: float, debounce: float = 0.5, max_wait: float = 5.0) -> Set[Path]:
+    """Wait up to `timeout` for a change, then keep collecting until `debounce` seconds pass quietly."""
+    changes = watcher.poll(timeout)
+    if not changes:
+        return changes
+    deadline = time.monotonic() + max_wait
+    while time.monotonic() < deadline:
+        more = watcher.poll(debounce)
+        if not more:
+            break
+        changes |= more
+    return changes
+
+
+# --- incremental rebuild ----------------------------------------------------
+
+
+@dataclass
+class WatchCycle:
+    """What one rebuild cycle did."""
+
+    triggers: Dict[str, List[str]] = field(default_factory=dict)
+    reparsed: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    ocr: bool = False
+    revalued: int = 0
+    reused: int = 0
+    exported: bool = False
+    ranked: bool = False
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        parts = [f"{len(self.reparsed)} file(s) re-parsed"]
+        if self.removed:
+            parts.append(f"{len(self.removed)} removed")
+        if self.ocr:
+            parts.append("OCR refreshed")
+        parts.append(f"{self.revalued} pack(s) revalued, {self.reused} reused")
+        if self.ranked:
+            parts.append("re-ranked")
+        return f"{', '.join(parts)} in {self.seconds:.2f}s"
+
+
+FingerprintedPacks = List[Tuple[str, Pack]]
+
+
+class IncrementalPipeline:
+    """Pipeline state kept across watch cycles (parsed packs, valuations, configs)."""
+
+    def __init__(
+        self,
+        raw_dir: Path,
+        site_dir: Path,
+        *,
+        images_dir: Path = IMAGES_RAW_DIR,
+        processed_dir: Path = DATA_PROCESSED_DIR,
+        config_dir: Path = CONFIG_DIR,
+        game: GameProfile | None = None,
+        use_ocr: bool = False,
+        screenshots_dir: Path | None = None,
+        ocr_reviewed_path: Path | None = None,
+        ocr_lang: str = "eng",
+        with_analysis: bool = True,
+        default_currency: str = "USD",
+    ) -> None:
+        self.raw_dir = raw_dir
+        self.site_dir = site_dir
+        self.images_dir = images_dir
+        self.processed_dir = processed_dir
+        self.config_dir = config_dir
+        self.game = game
+        self.use_ocr = use_ocr
+        self.screenshots_dir = screenshots_dir or SCREENSHOTS_DIR
+        self.ocr_reviewed_path = ocr_reviewed_path or DEFAULT_OCR_REVIEWED
+        self.ocr_lang = ocr_lang
+        self.with_analysis = with_analysis
+        self.default_currency = default_currency
+
+        self._file_packs: Dict[Path, FingerprintedPacks] = {}
+        self._reviewed: FingerprintedPacks = []
+        self._ocr: FingerprintedPacks = []
+        self._valued: Dict[str, ValuedPack] = {}
+        self._load_configs()
+
+    def _load_configs(self) -> None:
+        self.ingestion_config = load_ingestion_config()
+        self.valuation_config = load_valuation_config(game=self.game)
+        self.ocr_config = load_ocr_config(game=self.game)
+
+    @property
+    def reference_mode(self) -> str:
+        return self.ingestion_config.get("reference_handling", {}).get("mode", "tag")
+
+    def watch_paths(self) -> List[Path]:
+        paths = [self.raw_dir, self.config_dir]
+        if self.use_ocr:
+            paths += [self.screenshots_dir, self.ocr_reviewed_path]
+        return paths
+
+    # -- stages --
+
+    def _parse(self, path: Path) -> FingerprintedPacks:
+        packs = parse_file(
+            path,
+            images_dir=self.images_dir,
+            default_currency=self.default_currency,
+            reference_config=self.ingestion_config.get("reference_handling", {}),
+        )
+        return [(pack_fingerprint(p), p) for p in packs]
+
+    def _raw_files(self) -> List[Path]:
+        if not self.raw_dir.exists():
+            return []
+        return [p for p in sorted(self.raw_dir.iterdir()) if p.is_file() and not _is_ignored(p)]
+
+    def _refresh_ocr(self, reviewed: bool = True, screenshots: bool = True) -> None:
+        if reviewed:
+            self._reviewed = [(pack_fingerprint(p), p) for p in load_reviewed_ocr_packs(self.ocr_reviewed_path)]
+        if screenshots:
+            cache = open_ocr_cache(
+                self.ingestion_config.get("ocr", {}).get("cache"), self.processed_dir / DEFAULT_OCR_CACHE.name
+            )
+            result = ocr_screenshots(
+                self.screenshots_dir,
+                default_currency=self.default_currency,
+                lang=self.ocr_lang,
+                cache=cache,
+                preprocess=self.ocr_config,
+            )
+            self._ocr = [(pack_fingerprint(p), p) for p in result.packs]
+
+    def _all_packs(self) -> FingerprintedPacks:
+        packs: FingerprintedPacks = []
+        for path in sorted(self._file_packs):
+            packs.extend(self._file_packs[path])
+        packs.extend(self._reviewed)
+        reviewed_sources = {p.source_file for _, p in self._reviewed if p.source_file}
+        packs.extend((fp, p) for fp, p in self._ocr if not (p.source_file and p.source_file in reviewed_sources))
+        return packs
+
+    def _value_and_export(self, cycle: WatchCycle) -> None:
+        packs = self._all_packs()
+        reference = [p for _, p in packs if p.is_reference]
+        to_value = [(fp, p) for fp, p in packs if not (p.is_reference and self.reference_mode in {"exclude", "separate"})]
+
+        misses = [(fp, p) for fp, p in to_value if fp not in self._valued]
+        fresh = value_packs([p for _, p in misses], config=self.valuation_config) if misses else []
+        valued_by_fp = {fp: self._valued[fp] for fp, _ in to_value if fp in self._valued}
+        valued_by_fp.update({fp: vp for (fp, _), vp in zip(misses, fresh)})
+        self._valued = valued_by_fp
+        cycle.revalued = len(misses)
+        cycle.reused = len(to_value) - len(misses)
+
+        export_site_json(
+            valued_packs=[valued_by_fp[fp] for fp, _ in to_value],
+            items=build_item_definitions([p for _, p in packs]),
+            site_dir=self.site_dir,
+            reference_mode=self.reference_mode,
+            reference_packs=reference,
+            game=self.game,
+        )
+        cycle.exported = True
+        if self.with_analysis:
+            analyze_from_site_data(self.site_dir, output_dir=self.site_dir, game=self.game)
+            cycle.ranked = True
+
+    # -- entry points --
+
+    def build(self) -> WatchCycle:
+        """Full rebuild; run once before watching."""
+        start = time.perf_counter()
+        cycle = WatchCycle(triggers={"initial": [str(self.raw_dir)]})
+        self._load_configs()
+        self._valued.clear()
+        self._file_packs = {path: self._parse(path) for path in self._raw_files()}
+        cycle.reparsed = [str(p) for p in self._file_packs]
+        if self.use_ocr:
+            self._refresh_ocr()
+            cycle.ocr = True
+        self._value_and_export(cycle)
+        cycle.seconds = time.perf_counter() - start
+        return cycle
+
+    def classify(self, changed: Iterable[Path]) -> Dict[str, Set[Path]]:
+        """Group changed paths into raw / screenshots / reviewed / config:<effect> buckets."""
+        groups: Dict[str, Set[Path]] = {}
+        for path in changed:
+            path = Path(path)
+            if _is_ignored(path):
+                continue
+            if self.use_ocr and path == self.ocr_reviewed_path:
+                key = "reviewed"
+            elif self.use_ocr and _is_under(path, self.screenshots_dir):
+                key = "screenshots"
+            elif path.parent == self.raw_dir:
+                key = "raw"
+            elif _is_under(path, self.config_dir) and path.suffix.lower() in {".yaml", ".yml", ".json"}:
+                key = f"config:{CONFIG_EFFECTS.get(path.name, 'export')}"
+            else:
+                continue
+            groups.setdefault(key, set()).add(path)
+        return groups
+
+    def apply(self, changed: Iterable[Path]) -> Optional[WatchCycle]:
+        """Rebuild only what `changed` affects; returns None when nothing relevant changed."""
+        groups = self.classify(changed)
+        if not groups:
+            return None
+        start = time.perf_counter()
+        cycle = WatchCycle(triggers={k: sorted(str(p) for p in v) for k, v in groups.items()})
+
+        if any(k.startswith("config:") for k in groups):
+            self._load_configs()
+        if "config:revalue" in groups:
+            self._valued.clear()
+
+        if "config:reparse" in groups:
+            to_parse = set(self._raw_files()) | set(self._file_packs)
+        else:
+            to_parse = groups.get("raw", set())
+        for path in sorted(to_parse):
+            if path.exists() and path.is_file():
+                self._file_packs[path] = self._parse(path)
+                cycle.reparsed.append(str(path))
+            elif self._file_packs.pop(path, None) is not None:
+                cycle.removed.append(str(path))
+
+        if self.use_ocr and ({"reviewed", "screenshots", "config:ocr", "config:reparse"} & groups.keys()):
+            self._refresh_ocr(
+                reviewed="reviewed" in groups,
+                screenshots=bool({"screenshots", "config:ocr", "config:reparse"} & groups.keys()),
+            )
+            cycle.ocr = True
+
+        if groups.keys() == {"config:rank"}:
+            if self.with_analysis:
+                analyze_from_site_data(self.site_dir, output_dir=self.site_dir, game=self.game)
+                cycle.ranked = True
+        else:
+            self._value_and_export(cycle)
+        cycle.seconds = time.perf_counter() - start
+        return cycle
+
+
+def watch_and_rebuild(
+    pipeline: IncrementalPipeline,
+    watcher,
+    *,
+    debounce: float = 0.5,
+    max_wait: float = 5.0,
+    idle_timeout: float = 1.0,
+    on_cycle: Callable[[WatchCycle], None] | None = None,
+    max_cycles: int | None = None,
+    should_stop: Callable[[], bool] | None = None,
+) -> int:
+    """Run rebuild cycles until stopped; returns the number of cycles executed."""
+    cycles = 0
+    while not (should_stop and should_stop()):
+        changes = collect_changes(watcher, idle_timeout, debounce=debounce, max_wait=max_wait)
+        if not changes:
+            continue
+        try:
+            cycle = pipeline.apply(changes)
+        except Exception:
+            logger.exception("Watch rebuild failed for %s change(s); waiting for the next change", len(changes))
+            continue
+        if cycle is None:
+            continue
+        cycles += 1
+        logger.info("Watch cycle: %s", cycle.summary())
+        if on_cycle:
+            on_cycle(cycle)
+        if max_cycles is not None and cycles >= max_cycles:
+            break
+    return cycles
+
+
+__all__ = [
+    "IncrementalPipeline",
+    "WatchCycle",
+    "PollingWatcher",
+    "InotifyWatcher",
+    "make_watcher",
+    "collect_changes",
+    "watch_and_rebuild",
+    "pack_fingerprint",
+]
@@ -8,12 +8,13 @@ from typing import Optional
 
 import typer
 
-from .export.json_export import export_site_json
 from .analysis.game_profiles import get_game_profile
-from .ingestion.pipeline import ingest_all
 from .logging_utils import configure_logging
-from .pipeline import run_pipeline
-from .valuation.pipeline import valuate
+from .settings import DEFAULT_SITE_ITEMS, DEFAULT_SITE_PACKS, SITE_DATA_DIR
+
+# Heavy dependencies (pandas/openpyxl via ingestion, pydantic via models) are
+# imported inside the commands that need them so JSON-only commands such as
+# `plan`, `goal`, `announce` and `history-diff` start quickly.
 
 app = typer.Typer(add_completion=False, help="Whiteout Survival pack value toolkit")
 
@@ -34,6 +35,8 @@ def run(
     use_ocr_screenshots: bool = typer.Option(False, help="Enable OCR ingestion from screenshots directory"),
     screenshots_dir: Optional[Path] = typer.Option(None, help="Path to screenshots for OCR"),
     ocr_lang: str = typer.Option("eng", help="Language code for OCR (pytesseract)"),
+    ocr_workers: int = typer.Option(0, help="Concurrent OCR worker processes (0 = one per CPU)"),
+    no_ocr_cache: bool = typer.Option(False, help="Re-OCR every screenshot instead of reusing cached OCR text"),
     ocr_review_dump: Optional[Path] = typer.Option(None, help="Path to write raw OCR review dump JSON"),
     ocr_reviewed_path: Optional[Path] = typer.Option(None, help="Path to reviewed OCR packs JSON"),
     ingestion_config: Optional[Path] = typer.Option(None, help="Path to ingestion config (reference handling)"),
@@ -43,38 +46,125 @@ def run(
     with_analysis: bool = typer.Option(False, help="Run analysis ranking after pipeline"),
     analysis_config: Optional[Path] = typer.Option(None, help="Path to analysis config YAML/JSON"),
     no_validation: bool = typer.Option(False, help="Skip validation checks/report"),
-    history_root: Optional[Path] = typer.Option(None, help="Write a timestamped snapshot of site_data into this directory"),
+    history_root: Optional[Path] = typer.Option(None, help="Record a snapshot of site_data in this history store"),
     game: Optional[str] = typer.Option(None, help="Game key to use (default from config/game_profiles.yaml)"),
+    all_games: bool = typer.Option(
+        False, help="Run every game in config/game_profiles.yaml in parallel (per-game <raw-dir>/<game>, <site-dir>/<game>)"
+    ),
+    game_workers: int = typer.Option(0, help="Processes for --all-games (0 = one per game, capped at CPU count)"),
+    timings: bool = typer.Option(False, help="Print per-stage timings (also written to site_data/run_metrics.json)"),
+    profile: Optional[str] = typer.Option(None, help="Profile the run: cprofile or tracemalloc (output in logs/)"),
 ):
     """Run ingestion + valuation + export."""
+    from .pipeline import run_pipeline
+    from .profiling import PROFILE_MODES, RunMetrics, profile_run
+    from .settings import LOG_DIR
+
     configure_logging(log_file=log_file)
+    if all_games:
+        if game or profile or history_root or ocr_review_dump or ocr_reviewed_path:
+            typer.echo(
+                "--all-games cannot be combined with --game, --profile, --history-root, --ocr-review-dump or "
+                "--ocr-reviewed-path (OCR review files are per game under data_review/<game>/)."
+            )
+            raise typer.Exit(code=1)
+        _run_all_games(
+            workers=game_workers,
+            timings=timings,
+            with_analysis=with_analysis,
+            analysis_config=analysis_config,
+            raw_dir=raw_dir,
+            site_dir=site_dir,
+            screenshots_dir=screenshots_dir,
+            ingestion_config_path=ingestion_config,
+            config_path=config,
+            use_ocr=use_ocr_screenshots,
+            ocr_lang=ocr_lang,
+            ocr_workers=ocr_workers,
+            use_ocr_cache=not no_ocr_cache,
+            reference_mode_override=reference_mode,
+            summary_only=summary_only,
+            log_file=log_file,
+            enable_validation=not no_validation,
+        )
+        return
     game_profile = _resolve_game_or_exit(game)
-    valued, _ = run_pipeline(
-        config_path=config,
-        raw_dir=raw_dir,
-        site_dir=site_dir,
-        use_ocr=use_ocr_screenshots,
-        screenshots_dir=screenshots_dir,
-        ocr_lang=ocr_lang,
-        ingestion_config_path=ingestion_config,
-        reference_mode_override=reference_mode,
-        summary_only=summary_only,
-        log_file=log_file,
-        enable_validation=not no_validation,
-        ocr_review_dump_path=ocr_review_dump,
-        ocr_reviewed_path=ocr_reviewed_path,
-        history_root=history_root,
-        game_key=game_profile.key,
+    if profile and profile not in PROFILE_MODES:
+        typer.echo(f"Unknown profile mode '{profile}'. Known: {', '.join(PROFILE_MODES)}")
+        raise typer.Exit(code=1)
+    metrics = RunMetrics()
+    with profile_run(profile, LOG_DIR) as profile_path:
+        valued, _ = run_pipeline(
+            config_path=config,
+            raw_dir=raw_dir,
+            site_dir=site_dir,
+            use_ocr=use_ocr_screenshots,
+            screenshots_dir=screenshots_dir,
+            ocr_lang=ocr_lang,
+            ocr_workers=ocr_workers,
+            use_ocr_cache=not no_ocr_cache,
+            ingestion_config_path=ingestion_config,
+            reference_mode_override=reference_mode,
+            summary_only=summary_only,
+            log_file=log_file,
+            enable_validation=not no_validation,
+            ocr_review_dump_path=ocr_review_dump,
+            ocr_reviewed_path=ocr_reviewed_path,
+            history_root=history_root,
+            game_key=game_profile.key,
+            metrics=metrics,
+        )
+        if with_analysis and not summary_only:
+            from .analysis.ranking import analyze_from_site_data
+            from .profiling import export_run_metrics
+            from .settings import DEFAULT_SITE_RUN_METRICS
+
+            with metrics.stage("analysis"):
+                analyze_from_site_data(
+                    site_dir or SITE_DATA_DIR, config_path=analysis_config, output_dir=site_dir or None, game=game_profile
+                )
+            export_run_metrics(metrics, (site_dir or SITE_DATA_DIR) / DEFAULT_SITE_RUN_METRICS.name)
+    if timings:
+        typer.echo("Stage timings:")
+        for line in metrics.summary_lines(max_depth=2):
+            typer.echo(f"  {line}")
+    if profile_path:
+        typer.echo(f"Profile written to {profile_path}")
+
+
+def _run_all_games(workers: int, timings: bool, with_analysis: bool, analysis_config: Optional[Path], **kwargs):
+    from .pipeline import run_all_games
+
+    report = run_all_games(workers=workers, **kwargs)
+    site_root = kwargs.get("site_dir") or SITE_DATA_DIR
+    for key, result in report["games"].items():
+        status = f"{result['summary']['packs_valuated']} packs valuated" if result["ok"] else f"FAILED: {result['error']}"
+        typer.echo(f"{key}: {status} in {result['wall_s']:.2f}s")
+        if timings and result["ok"]:
+            for stage in result["metrics"]["stages"]:
+                if stage["depth"] <= 1:
+                    typer.echo(f"  {'  ' * stage['depth']}{stage['name']}: {stage['wall_s']:.3f}s wall")
+    typer.echo(
+        f"All games: {report['total_wall_s']:.2f}s wall with {report['workers']} worker(s) "
+        f"(slowest game {report['slowest_game_wall_s']:.2f}s, sum {report['sum_game_wall_s']:.2f}s)"
     )
-    if with_analysis and not summary_only:
+    if with_analysis and not kwargs.get("summary_only"):
         from .analysis.ranking import analyze_from_site_data
 
-        analyze_from_site_data(site_dir or None, config_path=analysis_config, output_dir=site_dir or None, game=game_profile)
+        for key, result in report["games"].items():
+            if result["ok"]:
+                analyze_from_site_data(
+                    site_root / key, config_path=analysis_config, output_dir=site_root / key, game=get_game_profile(game_key=key)
+                )
+    if report["failed"]:
+        raise typer.Exit(code=1)
 
 
 @app.command()
 def ingest(raw_dir: Path = typer.Option(None, help="Override raw data directory")):
     """Run only ingestion."""
+    from .ingestion.pipeline import ingest_all
+
     configure_logging()
     kwargs = {}
     if raw_dir:
@@ -89,6 +179,8 @@ def value(
     processed: Optional[Path] = typer.Option(None, help="Path to processed packs JSON"),
 ):
     """Run valuation from processed packs."""
+    from .valuation.pipeline import valuate
+
     configure_logging()
     kwargs = {}
     if processed:
@@ -104,6 +196,9 @@ def export(
     site_dir: Optional[Path] = typer.Option(None, help="Override site_data output directory"),
 ):
     """Value and export packs to site_data JSON."""
+    from .export.json_export import export_site_json
+    from .valuation.pipeline import valuate
+
     configure_logging()
     kwargs = {}
     if processed:
@@ -138,6 +233,43 @@ def analyze(
     typer.echo("Analysis completed")
 
 
+@app.command()
+def top_packs(
+    site_dir: Optional[Path] = typer.Option(None, help="Directory containing site_data packs.json"),
+    k: str = typer.Option("5,10,25", help="Comma-separated list sizes to precompute"),
+    analysis_config: Optional[Path] = typer.Option(None, help="Path to analysis config YAML/JSON"),
+    profiles_path: Optional[Path] = typer.Option(None, help="Path to player profiles config"),
+    output_dir: Optional[Path] = typer.Option(None, help="Where to write top_packs.json (default: site dir)"),
+    game: Optional[str] = typer.Option(None, help="Game key to use (default from config/game_profiles.yaml)"),
+):
+    """Precompute top-k pack lists per profile and category (top_packs.json)."""
+    from .analysis.top_packs import export_top_packs
+
+    configure_logging()
+    game_profile = _resolve_game_or_exit(game)
+    try:
+        ks = [int(n) for n in k.split(",") if n.strip()]
+    except ValueError:
+        typer.echo(f"Invalid --k '{k}'; expected comma-separated integers.")
+        raise typer.Exit(code=1)
+    if not any(n > 0 for n in ks):
+        typer.echo("--k needs at least one positive size.")
+        raise typer.Exit(code=1)
+    try:
+        path = export_top_packs(
+            site_dir=site_dir or SITE_DATA_DIR,
+            output_dir=output_dir,
+            ks=ks,
+            config_path=analysis_config,
+            profiles_path=profiles_path,
+            game=game_profile,
+        )
+    except FileNotFoundError as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=1)
+    typer.echo(f"Top packs written to {path}")
+
+
 @app.command()
 def plan(
     site_dir: Optional[Path] = typer.Option(None, help="Directory containing site_data exports"),
@@ -322,14 +454,32 @@ def announce(
     include_reference: bool = typer.Option(False, help="Include reference/library packs"),
     output_file: Optional[Path] = typer.Option(None, help="Optional output Markdown file"),
     title: Optional[str] = typer.Option(None, help="Optional heading override"),
+    change_log: Optional[Path] = typer.Option(None, help="Append a 'What changed' section from a history-diff change log"),
     game: Optional[str] = typer.Option(None, help="Game key to use (default from config/game_profiles.yaml)"),
+    profiles: Optional[str] = typer.Option(
+        None, help="Batch mode: comma-separated profiles ('overall' = no profile, 'all' = overall + every configured profile)"
+    ),
+    top_ns: Optional[str] = typer.Option(None, help="Batch mode: comma-separated top-N sizes (default: --top-n)"),
+    output_dir: Optional[Path] = typer.Option(None, help="Batch mode: write announcement_<profile>_top<N>.md files here"),
 ):
     """Generate a Discord/Markdown-friendly announcement of top packs."""
     from .analysis.announcements import load_and_generate_announcement
 
     configure_logging()
-    _ = _resolve_game_or_exit(game)  # resolved for validation/future use
+    game_profile = _resolve_game_or_exit(game)
     site_dir_path = site_dir or Path("site_data")
+    if profiles or top_ns or output_dir:
+        _announce_batch(
+            site_dir_path,
+            game_profile,
+            profiles=profiles or (profile or "overall"),
+            top_ns=top_ns or str(top_n),
+            output_dir=output_dir,
+            title=title,
+            include_reference=include_reference,
+            change_log=change_log,
+        )
+        return
     try:
         text = load_and_generate_announcement(
             site_dir=site_dir_path,
@@ -337,6 +487,7 @@ def announce(
             top_n=top_n,
             title=title,
             include_reference=include_reference,
+            change_log_path=change_log,
         )
     except FileNotFoundError as exc:
         typer.echo(str(exc))
@@ -353,6 +504,52 @@ def announce(
         typer.echo(text)
 
 
+def _announce_batch(
+    site_dir: Path,
+    game_profile,
+    *,
+    profiles: str,
+    top_ns: str,
+    output_dir: Optional[Path],
+    title: Optional[str],
+    include_reference: bool,
+    change_log: Optional[Path],
+):
+    from .analysis.announcements import load_and_generate_announcements
+    from .analysis.player_profiles import load_profiles
+
+    names = [n.strip() for n in profiles.split(",") if n.strip()]
+    if "all" in names:
+        names = ["overall", *load_profiles(game=game_profile)]
+    profile_list = [None if n == "overall" else n for n in names]
+    try:
+        sizes = [int(n) for n in top_ns.split(",") if n.strip()]
+    except ValueError:
+        typer.echo(f"Invalid --top-ns '{top_ns}'; expected comma-separated integers.")
+        raise typer.Exit(code=1)
+    try:
+        variants = load_and_generate_announcements(
+            site_dir=site_dir,
+            profiles=profile_list,
+            top_ns=sizes,
+            title=title,
+            include_reference=include_reference,
+            change_log_path=change_log,
+        )
+    except FileNotFoundError as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=1)
+    for (profile_name, size), text in variants.items():
+        if output_dir:
+            path = output_dir / f"announcement_{profile_name or 'overall'}_top{size}.md"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(text, encoding="utf-8")
+        else:
+            typer.echo(f"<!-- {profile_name or 'overall'} top {size} -->\n{text}\n")
+    if output_dir:
+        typer.echo(f"{len(variants)} announcement(s) written to {output_dir}")
+
+
 @app.command()
 def history_diff(
     previous: Optional[Path] = typer.Option(None, help="Path to previous packs.json snapshot"),
@@ -360,31 +557,43 @@ def history_diff(
     output_file: Optional[Path] = typer.Option(None, help="Where to write diff JSON (default: site_data/changes_since_last_run.json)"),
     history_root: Optional[Path] = typer.Option(None, help="If previous not given, pick latest snapshot under this root"),
     summary_only: bool = typer.Option(False, help="Print only summary to stdout"),
+    mode: Optional[str] = typer.Option(
+        None, help="Diff stored snapshots instead: 'consecutive' (each pair) or 'endpoints' (first vs last)"
+    ),
+    since: Optional[str] = typer.Option(None, help="With --mode: first snapshot date/datetime (ISO)"),
+    until: Optional[str] = typer.Option(None, help="With --mode: last snapshot date/datetime (ISO, inclusive)"),
+    snapshot: Optional[list[str]] = typer.Option(None, help="With --mode: explicit snapshot ids, oldest first (repeatable)"),
 ):
-    """Compute differences between two pack snapshots."""
-    from .history.diff import diff_packs
-    from .settings import SITE_DATA_DIR, DEFAULT_SITE_PACKS
+    """Compute differences between two pack snapshots, or a change log across a snapshot range."""
+    from .history.diff import diff_pack_states, diff_packs, load_pack_states, parse_snapshot
 
     configure_logging()
+    if mode:
+        _history_range_diff(history_root, mode, since, until, snapshot, output_file, summary_only)
+        return
     current_path = current or (SITE_DATA_DIR / DEFAULT_SITE_PACKS.name)
 
-    prev_path = previous
-    if not prev_path and history_root and history_root.exists():
-        # pick latest snapshot
-        snapshots = sorted(history_root.glob("*/site_data/packs.json"))
-        if snapshots:
-            prev_path = snapshots[-1]
-    if not prev_path:
+    latest = None
+    if not previous and history_root and history_root.exists():
+        from .history.snapshot import load_latest_snapshot
+
+        latest = load_latest_snapshot(history_root)
+    if not previous and not latest:
         typer.echo("Previous snapshot path is required (or provide --history-root with existing snapshots).")
         raise typer.Exit(code=1)
-    if not prev_path.exists():
-        typer.echo(f"Previous snapshot not found: {prev_path}")
+    if previous and not previous.exists():
+        typer.echo(f"Previous snapshot not found: {previous}")
         raise typer.Exit(code=1)
     if not current_path.exists():
         typer.echo(f"Current packs.json not found: {current_path}")
         raise typer.Exit(code=1)
 
-    diff = diff_packs(prev_path, current_path)
+    if latest:
+        label, data = latest
+        states = diff_pack_states(parse_snapshot(data), load_pack_states(current_path))
+        diff = {"previous_snapshot": label, "current_snapshot": str(current_path), **states}
+    else:
+        diff = diff_packs(previous, current_path)
     summary = diff["summary"]
     typer.echo("Pack changes:")
     typer.echo(f"  Previous packs: {summary['num_packs_previous']}")
@@ -392,6 +601,10 @@ def history_diff(
     typer.echo(f"  New packs: {summary['num_new_packs']}")
     typer.echo(f"  Removed packs: {summary['num_removed_packs']}")
     typer.echo(f"  Changed packs: {summary['num_changed_packs']}")
+    typer.echo(
+        f"  Item changes: {summary['num_items_added']} added, {summary['num_items_removed']} removed, "
+        f"{summary['num_quantity_changes']} quantity change(s)"
+    )
 
     if not summary_only:
         out_path = output_file or (SITE_DATA_DIR / "changes_since_last_run.json")
@@ -401,6 +614,181 @@ def history_diff(
         typer.echo(f"Detailed diff written to {out_path}")
 
 
+def _history_range_diff(
+    history_root: Optional[Path],
+    mode: str,
+    since: Optional[str],
+    until: Optional[str],
+    snapshot_ids: Optional[list[str]],
+    output_file: Optional[Path],
+    summary_only: bool,
+) -> None:
+    from .history.diff import diff_snapshot_range
+    from .history.store import SnapshotStore
+    from .utils import save_json
+
+    if not history_root or not history_root.exists():
+        typer.echo("--mode needs --history-root with existing snapshots.")
+        raise typer.Exit(code=1)
+    try:
+        change_log = diff_snapshot_range(
+            SnapshotStore(history_root), snapshot_ids or None, since=since, until=until, mode=mode
+        )
+    except (FileNotFoundError, ValueError) as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=1)
+    typer.echo(f"Change log over {len(change_log['snapshots'])} snapshot(s), {len(change_log['steps'])} step(s):")
+    for key, count in change_log["summary"].items():
+        typer.echo(f"  {key.replace('num_', '').replace('_', ' ')}: {count}")
+    if not summary_only:
+        out_path = output_file or (SITE_DATA_DIR / "history_changelog.json")
+        save_json(out_path, change_log)
+        typer.echo(f"Change log written to {out_path}")
+
+
+@app.command()
+def history_gc(
+    history_root: Path = typer.Option(..., help="History root containing the snapshot store"),
+    daily_days: int = typer.Option(30, help="Keep the newest snapshot per day for this many days"),
+    weekly_weeks: int = typer.Option(0, help="After that, keep the newest per week for this many weeks (0 = forever)"),
+    keep_last: int = typer.Option(1, help="Always keep this many most recent snapshots"),
+    import_legacy: bool = typer.Option(False, help="First move old <timestamp>/site_data copies into the store"),
+    dry_run: bool = typer.Option(False, help="Report what would be removed without deleting"),
+):
+    """Apply snapshot retention and delete blobs no snapshot references."""
+    from .history.store import RetentionPolicy, SnapshotStore
+
+    configure_logging()
+    store = SnapshotStore(history_root)
+    if import_legacy:
+        imported = [] if dry_run else store.import_legacy(remove=True)
+        typer.echo(f"Imported {len(imported)} legacy snapshot(s) into the store.")
+    policy = RetentionPolicy(daily_days=daily_days, weekly_weeks=weekly_weeks or None, keep_last=keep_last)
+    expired = store.apply_retention(policy, dry_run=dry_run)
+    removed = store.gc(dry_run=dry_run)
+    verb = "Would remove" if dry_run else "Removed"
+    typer.echo(f"{verb} {len(expired)} snapshot(s): {', '.join(expired) if expired else '-'}")
+    typer.echo(f"{verb} {removed['blobs']} blob(s) ({removed['bytes'] / 1024:.1f} KiB) and {removed['cached']} cached file(s).")
+
+
+@app.command()
+def history_materialize(
+    history_root: Path = typer.Option(..., help="History root containing the snapshot store"),
+    snapshot: str = typer.Option("latest", help="Snapshot id to materialize (or 'latest')"),
+    dest: Optional[Path] = typer.Option(None, help="Target directory (default: <history_root>/<snapshot>/site_data)"),
+    mode: str = typer.Option("hardlink", help="hardlink, reflink or copy"),
+):
+    """Recreate a stored snapshot's site_data files on disk."""
+    from .history.store import SnapshotStore
+
+    configure_logging()
+    store = SnapshotStore(history_root)
+    snapshots = store.list_snapshots()
+    if not snapshots:
+        typer.echo(f"No snapshots under {history_root}")
+        raise typer.Exit(code=1)
+    snapshot_id = snapshots[-1].snapshot_id if snapshot == "latest" else snapshot
+    try:
+        out = store.materialize(snapshot_id, dest=dest, mode=mode)
+    except (FileNotFoundError, ValueError) as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=1)
+    typer.echo(f"Snapshot {snapshot_id} materialized at {out}")
+
+
+@app.command()
+def history_query(
+    history_root: Path = typer.Option(..., help="History root containing the snapshot store"),
+    pack: Optional[str] = typer.Option(None, help="Pack id or name fragment: print its time series"),
+    start: Optional[str] = typer.Option(None, help="Range start (ISO date or datetime)"),
+    end: Optional[str] = typer.Option(None, help="Range end (ISO date or datetime, inclusive)"),
+    metric: str = typer.Option("value_per_dollar", help="price, value, value_per_dollar or rank"),
+    top_movers: int = typer.Option(0, help="List the N packs whose metric moved most in the range"),
+    direction: str = typer.Option("abs", help="Top movers direction: up, down or abs"),
+    seen: bool = typer.Option(False, help="List first-seen/last-seen dates per pack"),
+    no_sync: bool = typer.Option(False, help="Query the index as-is without ingesting new snapshots"),
+    output_file: Optional[Path] = typer.Option(None, help="Also write the result as JSON"),
+):
+    """Query per-pack price/value/rank history across snapshots."""
+    from .history.index import METRICS, open_history_index
+
+    configure_logging()
+    if metric not in METRICS:
+        typer.echo(f"Unknown metric '{metric}'. Known: {', '.join(METRICS)}")
+        raise typer.Exit(code=1)
+    result: dict = {}
+    with open_history_index(history_root, sync=not no_sync) as index:
+        keys = index.resolve_pack(pack) if pack else []
+        if pack and not keys:
+            typer.echo(f"No pack matching '{pack}' in the history index.")
+            raise typer.Exit(code=1)
+        for key in keys:
+            points = index.series(key, start=start, end=end)
+            result.setdefault("series", {})[key] = points
+            typer.echo(f"{key} ({len(points)} point(s)):")
+            for pt in points:
+                typer.echo(f"  {pt['created_at']}  {metric}={pt[metric]}")
+        if top_movers:
+            try:
+                movers = index.top_movers(metric, start=start, end=end, limit=top_movers, direction=direction)
+            except ValueError as exc:
+                typer.echo(str(exc))
+                raise typer.Exit(code=1)
+            result["top_movers"] = movers
+            typer.echo(f"Top movers by {metric}:")
+            for m in movers:
+                typer.echo(f"  {m['name']}: {m['before']} -> {m['after']} ({m['delta']:+.4g})")
+        if seen or not (pack or top_movers):
+            rows = index.seen(keys[0] if len(keys) == 1 else None)
+            result["seen"] = rows
+            for row in rows:
+                typer.echo(f"  {row['name']}: first {row['first_seen']}, last {row['last_seen']} ({row['num_snapshots']} snapshot(s))")
+    if output_file:
+        from .utils import save_json
+
+        save_json(output_file, result)
+        typer.echo(f"Result written to {output_file}")
+
+
+@app.command()
+def knowledge_query(
+    site_dir: Path = typer.Option(SITE_DATA_DIR, help="site_data directory containing knowledge/"),
+    search: Optional[str] = typer.Option(None, help="Full-text search over names, tags and attribute values"),
+    entity_type: Optional[str] = typer.Option(None, "--type", help="Filter by entity type (hero, building, ...)"),
+    name: Optional[str] = typer.Option(None, help="Exact name (case-insensitive)"),
+    source: Optional[str] = typer.Option(None, help="Filter by source (e.g. wosnerdwarriors_github)"),
+    fields: str = typer.Option("id,entity_type,name", help="Comma-separated fields to return"),
+    limit: int = typer.Option(20, help="Maximum number of entities"),
+    output_file: Optional[Path] = typer.Option(None, help="Also write the result as JSON"),
+):
+    """Query knowledge entities from the SQLite store built by build-knowledge."""
+    from .knowledge.store import open_knowledge_store
+
+    configure_logging()
+    store = open_knowledge_store(site_dir / "knowledge")
+    if store is None:
+        typer.echo(f"No knowledge store under {site_dir / 'knowledge'}; run build-knowledge first.")
+        raise typer.Exit(code=1)
+    wanted = tuple(f.strip() for f in fields.split(",") if f.strip())
+    with store:
+        try:
+            if search:
+                rows = store.search(search, entity_type=entity_type, fields=wanted, limit=limit)
+            else:
+                rows = store.query(entity_type=entity_type, name=name, source=source, fields=wanted, limit=limit)
+        except ValueError as exc:
+            typer.echo(str(exc))
+            raise typer.Exit(code=1)
+        typer.echo(f"{len(rows)} of {len(store)} entities:")
+    for row in rows:
+        typer.echo("  " + "  ".join(f"{k}={v}" for k, v in row.items()))
+    if output_file:
+        from .utils import save_json
+
+        save_json(output_file, {"entities": rows})
+        typer.echo(f"Result written to {output_file}")
+
+
 @app.command()
 def auto_update(
     raw_dir: Path = typer.Option(..., help="Raw data directory"),
@@ -416,16 +804,68 @@ def auto_update(
 
     configure_logging()
     game_profile = _resolve_game_or_exit(game)
-    code = auto_update_and_commit(
-        raw_dir=raw_dir,
+    try:
+        code = auto_update_and_commit(
+            raw_dir=raw_dir,
+            site_dir=site_dir,
+            history_root=history_root,
+            dry_run=dry_run,
+            commit_message=commit_message,
+            extra_run_args=extra_run_args or [],
+            game_key=game_profile.key,
+        )
+    except ValueError as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=1)
+    raise typer.Exit(code)
+
+
+@app.command()
+def watch(
+    raw_dir: Optional[Path] = typer.Option(None, help="Override raw data directory"),
+    site_dir: Path = typer.Option(SITE_DATA_DIR, help="site_data output directory"),
+    use_ocr_screenshots: bool = typer.Option(False, help="Also watch screenshots and the reviewed OCR file"),
+    screenshots_dir: Optional[Path] = typer.Option(None, help="Path to screenshots for OCR"),
+    ocr_lang: str = typer.Option("eng", help="Language code for OCR (pytesseract)"),
+    ocr_reviewed_path: Optional[Path] = typer.Option(None, help="Path to reviewed OCR packs JSON"),
+    no_analysis: bool = typer.Option(False, help="Skip re-ranking after each rebuild"),
+    debounce: float = typer.Option(0.5, help="Seconds of quiet before a burst of changes is processed"),
+    poll_interval: float = typer.Option(1.0, help="Polling interval when inotify is unavailable"),
+    polling: bool = typer.Option(False, help="Force mtime polling even when inotify is available"),
+    game: Optional[str] = typer.Option(None, help="Game key to use (default from config/game_profiles.yaml)"),
+    log_file: Optional[Path] = typer.Option(None, help="Optional log file path"),
+):
+    """Watch inputs and configs; re-parse, revalue, re-export and re-rank only what changed."""
+    from .automation.watch import IncrementalPipeline, make_watcher, watch_and_rebuild
+    from .settings import DATA_RAW_DIR
+
+    configure_logging(log_file=log_file)
+    game_profile = _resolve_game_or_exit(game)
+    pipeline = IncrementalPipeline(
+        raw_dir=raw_dir or DATA_RAW_DIR,
         site_dir=site_dir,
-        history_root=history_root,
-        dry_run=dry_run,
-        commit_message=commit_message,
-        extra_run_args=extra_run_args or [],
-        game_key=game_profile.key,
+        game=game_profile,
+        use_ocr=use_ocr_screenshots,
+        screenshots_dir=screenshots_dir,
+        ocr_reviewed_path=ocr_reviewed_path,
+        ocr_lang=ocr_lang,
+        with_analysis=not no_analysis,
     )
-    raise typer.Exit(code)
+    initial = pipeline.build()
+    typer.echo(f"Initial build: {initial.summary()}")
+    watcher = make_watcher(pipeline.watch_paths(), poll_interval=poll_interval, force_polling=polling)
+    typer.echo(f"Watching {', '.join(str(p) for p in pipeline.watch_paths())} ({watcher.backend}); Ctrl+C to stop.")
+    try:
+        watch_and_rebuild(
+            pipeline,
+            watcher,
+            debounce=debounce,
+            on_cycle=lambda cycle: typer.echo(f"Rebuilt: {cycle.summary()}"),
+        )
+    except KeyboardInterrupt:
+        typer.echo("Stopped watching.")
+    finally:
+        watcher.close()
 
 
 @app.command()
@@ -437,14 +877,22 @@ def build_knowledge(
     no_web: bool = typer.Option(False, help="Skip web scraping ingestion"),
     wosnerds_paths: Optional[str] = typer.Option(None, help="Comma-separated paths to scrape on wosnerds.com"),
     wiki_paths: Optional[str] = typer.Option(None, help="Comma-separated paths to scrape on wiki"),
+    no_http_cache: bool = typer.Option(False, help="Re-download every page instead of using the HTTP cache"),
+    github_workers: int = typer.Option(0, help="Processes reading GitHub table files (0 = one per CPU)"),
+    no_github_cache: bool = typer.Option(False, help="Re-read every GitHub table file, even unchanged ones"),
+    include_raw: bool = typer.Option(False, help="Keep each entity's raw source row in the knowledge shards"),
+    all_entities_json: bool = typer.Option(False, help="Also write the monolithic knowledge/all_entities.json"),
 ):
     """Build knowledge base (heroes/buildings/etc.) from external sources and export JSON."""
     from .knowledge.config import load_external_sources_config
+    from .knowledge.fetcher import FetchConfig, PageFetcher
     from .knowledge.github_ingestion import extract_knowledge_from_github_root
     from .knowledge.web_scraping import scrape_wosnerds, scrape_wiki
-    from .knowledge.loader import save_knowledge_entities
+    from .knowledge.loader import save_knowledge_entities, save_knowledge_shards
     from .knowledge.linking import build_item_to_knowledge_links
     from .knowledge.schemas import KnowledgeEntity
+    from .knowledge.store import write_knowledge_store
+    from .settings import DEFAULT_GITHUB_KNOWLEDGE_CACHE
     from .utils import load_json, ensure_dir
 
     configure_logging()
@@ -456,29 +904,51 @@ def build_knowledge(
     gh_root = github_root or (Path(gh_cfg.get("local_root")) if gh_cfg.get("local_root") else None)
     if not no_github and gh_root:
         patterns = gh_cfg.get("table_patterns", ["**/*.xlsx", "**/*.csv"])
-        entities.extend(extract_knowledge_from_github_root(game_profile.key, gh_root, patterns))
+        entities.extend(
+            extract_knowledge_from_github_root(
+                game_profile.key,
+                gh_root,
+                patterns,
+                workers=github_workers,
+                cache_path=None if no_github_cache else DEFAULT_GITHUB_KNOWLEDGE_CACHE,
+            )
+        )
 
     web_cfg = cfg.get("websites", {}) or {}
+    http_cfg = dict(cfg.get("http") or {})
+    if no_http_cache:
+        http_cfg["cache_dir"] = None
+    fetcher = PageFetcher(FetchConfig.from_dict(http_cfg))
     if not no_web:
         wos_cfg = web_cfg.get("wosnerds", {}) or {}
         if wos_cfg.get("enabled") and wos_cfg.get("base_url"):
             paths = wosnerds_paths.split(",") if wosnerds_paths else wos_cfg.get("paths", [])
             try:
-                entities.extend(scrape_wosnerds(game_profile.key, wos_cfg["base_url"], paths or []))
+                entities.extend(scrape_wosnerds(game_profile.key, wos_cfg["base_url"], paths or [], fetcher=fetcher))
             except Exception as exc:  # pragma: no cover - network-dependent
                 typer.echo(f"wosnerds scraping failed: {exc}")
         wiki_cfg = web_cfg.get("wiki", {}) or {}
         if wiki_cfg.get("enabled") and wiki_cfg.get("base_url"):
             paths = wiki_paths.split(",") if wiki_paths else wiki_cfg.get("paths", [])
             try:
-                entities.extend(scrape_wiki(game_profile.key, wiki_cfg["base_url"], paths or []))
+                entities.extend(scrape_wiki(game_profile.key, wiki_cfg["base_url"], paths or [], fetcher=fetcher))
             except Exception as exc:  # pragma: no cover - network-dependent
                 typer.echo(f"wiki scraping failed: {exc}")
 
+    if fetcher.metrics.pages:
+        typer.echo(f"Web pages: {fetcher.metrics.summary()}")
+
     # Export knowledge
     knowledge_dir = site_dir / "knowledge"
     ensure_dir(knowledge_dir)
-    save_knowledge_entities(knowledge_dir / "all_entities.json", entities)
+    index = save_knowledge_shards(knowledge_dir, entities, include_raw=include_raw)
+    if all_entities_json:
+        save_knowledge_entities(knowledge_dir / "all_entities.json", entities)
+    else:
+        (knowledge_dir / "all_entities.json").unlink(missing_ok=True)  # would be stale next to the shards
+    write_knowledge_store(knowledge_dir, entities)
+    shard_counts = ", ".join(f"{t} ({shard['count']})" for t, shard in index["shards"].items())
+    typer.echo(f"Knowledge shards: {shard_counts or 'none'}")
 
     # Optional linking to items
     links = {}
@@ -500,9 +970,12 @@ def build_knowledge(
 @app.command()
 def sanity():
     """Quick sanity run with console logging."""
+    from .analysis.topk import top_k
+    from .pipeline import run_pipeline
+
     configure_logging(level=logging.INFO)
     valued, _ = run_pipeline()
-    top = sorted(valued, key=lambda p: p.valuation.score, reverse=True)[:3]
+    top = top_k(valued, 3, key=lambda p: p.valuation.score)
     typer.echo("Top packs:")
     for vp in top:
         typer.echo(f"- {vp.pack.name}: score={vp.valuation.score}, ratio={vp.valuation.ratio}")
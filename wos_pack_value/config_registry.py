@@ -0,0 +1,141 @@
+"""Parse-once cache for config files.
+
+Every config loader goes through `registry.load(path, build)`. The file is
+parsed once per (path, mtime, size), and `build` turns the parsed data into
+whatever the loader returns (merged defaults, dataclasses, lowered patterns).
+The result is memoized under the same key, so a long-running `serve`/`watch`
+process re-reads a file only after it changes on disk.
+
+Parsed data is handed to builders as a read-only view (`freeze`): mappings
+become `MappingProxyType`, lists become tuples. Loaders that return plain
+dicts return `thaw(...)` copies so callers may still mutate their config
+without touching the cache.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import yaml
+
+logger = logging.getLogger(__name__)
+
+_Stamp = Tuple[int, int]
+
+
+def freeze(obj: Any) -> Any:
+    """Read-only deep view: dicts -> MappingProxyType, lists/tuples -> tuples."""
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    return obj
+
+
+def thaw(obj: Any) -> Any:
+    """Mutable deep copy of a frozen (or plain) structure: mappings -> dicts, sequences -> lists."""
+    if isinstance(obj, (dict, MappingProxyType)):
+        return {k: thaw(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [thaw(v) for v in obj]
+    return obj
+
+
+def _parse(path: Path) -> Any:
+    text = path.read_text(encoding="utf-8")
+    if path.suffix.lower() == ".json":
+        return json.loads(text)
+    return yaml.safe_load(text) or {}
+
+
+@dataclass
+class RegistryStats:
+    parses: int = 0
+    builds: int = 0
+    hits: int = 0
+    invalidations: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return dict(vars(self))
+
+
+class ConfigRegistry:
+    """Config files parsed once and memoized by path + mtime + size."""
+
+    def __init__(self) -> None:
+        self._parsed: Dict[Path, Tuple[_Stamp, Any]] = {}
+        self._built: Dict[Tuple[Path, Any], Tuple[_Stamp, Any]] = {}
+        self._lock = threading.RLock()
+        self.stats = RegistryStats()
+
+    @staticmethod
+    def _stamp(path: Path) -> Optional[_Stamp]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def parsed(self, path: Path) -> Any:
+        """Frozen parsed contents of `path` (YAML, or JSON by suffix). Raises FileNotFoundError if missing."""
+        path = Path(path).resolve()
+        stamp = self._stamp(path)
+        if stamp is None:
+            raise FileNotFoundError(path)
+        with self._lock:
+            cached = self._parsed.get(path)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            if cached is not None:
+                self.stats.invalidations += 1
+                logger.debug("Config %s changed on disk; re-parsing", path)
+            data = freeze(_parse(path))
+            self.stats.parses += 1
+            self._parsed[path] = (stamp, data)
+            return data
+
+    def load(self, path: Path, build: Optional[Callable[[Any], Any]] = None, key: Any = None) -> Any:
+        """`build(frozen parsed data)` for `path`, memoized until the file changes.
+
+        `key` distinguishes several builds of the same file (e.g. one per game);
+        it defaults to the builder itself, so pass module-level functions rather
+        than fresh lambdas.
+        """
+        if build is None:
+            return self.parsed(path)
+        path = Path(path).resolve()
+        cache_key = (path, key if key is not None else build)
+        with self._lock:
+            data = self.parsed(path)
+            stamp = self._parsed[path][0]
+            cached = self._built.get(cache_key)
+            if cached is not None and cached[0] == stamp:
+                self.stats.hits += 1
+                return cached[1]
+            value = build(data)
+            self.stats.builds += 1
+            self._built[cache_key] = (stamp, value)
+            return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._parsed.clear()
+            self._built.clear()
+            self.stats = RegistryStats()
+
+
+registry = ConfigRegistry()
+
+
+def load_config(path: Path, build: Optional[Callable[[Any], Any]] = None, key: Any = None) -> Any:
+    """`registry.load` on the process-wide registry."""
+    return registry.load(path, build, key=key)
+
+
+__all__ = ["ConfigRegistry", "RegistryStats", "freeze", "load_config", "registry", "thaw"]
@@ -0,0 +1,121 @@
+"""Track which export files a run actually changed, and why.
+
+Exports are passed through `write_export`. With a `ChangeSet`, a file is only
+rewritten when its content differs from what is on disk (ignoring volatile
+keys such as `generated_at`), and each rewrite is recorded with a short
+reason. Automation uses the change set instead of asking git what changed.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..utils import load_json, save_json
+
+VOLATILE_KEYS = ("generated_at", "rule_stats")  # rule_stats holds per-run timings
+_ID_KEYS = ("id", "pack_id", "item_id")
+
+
+@dataclass
+class FileChange:
+    path: Path
+    reason: str
+
+    def to_dict(self) -> Dict[str, str]:
+        return {"path": str(self.path), "reason": self.reason}
+
+
+def _stable(data: Any) -> Any:
+    if isinstance(data, dict):
+        return {k: v for k, v in data.items() if k not in VOLATILE_KEYS}
+    return data
+
+
+def _record_id(record: Any) -> Optional[str]:
+    if not isinstance(record, dict):
+        return None
+    for key in _ID_KEYS:
+        if record.get(key) is not None:
+            return str(record[key])
+    return None
+
+
+def describe_change(old: Any, new: Any) -> str:
+    """Summarise how an export payload changed, by record id where possible."""
+    if isinstance(old, dict) and isinstance(new, dict):
+        for key, new_list in new.items():
+            old_list = old.get(key)
+            if not isinstance(new_list, list) or not isinstance(old_list, list):
+                continue
+            new_map = {_record_id(r): r for r in new_list}
+            old_map = {_record_id(r): r for r in old_list}
+            if None in new_map or None in old_map:
+                continue
+            added = len(new_map.keys() - old_map.keys())
+            removed = len(old_map.keys() - new_map.keys())
+            changed = sum(1 for k in new_map.keys() & old_map.keys() if new_map[k] != old_map[k])
+            if added or removed or changed:
+                return f"{key}: {added} added, {removed} removed, {changed} changed"
+    return "content changed"
+
+
+@dataclass
+class ChangeSet:
+    """Files written by a run whose content changed."""
+
+    changes: List[FileChange] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.changes)
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def record(self, path: Path, reason: str) -> None:
+        self.changes.append(FileChange(path=path, reason=reason))
+
+    def write_json(self, path: Path, data: Any) -> bool:
+        """Write `data` to `path` unless only volatile keys differ; return True when written."""
+        old = None
+        if path.exists():
+            try:
+                old = load_json(path)
+            except (OSError, ValueError):
+                old = None
+            if old is not None and _stable(old) == _stable(data):
+                return False
+        save_json(path, data)
+        self.record(path, "created" if old is None else describe_change(old, data))
+        return True
+
+    def paths(self) -> List[Path]:
+        return [c.path for c in self.changes]
+
+    def filter(self, roots: Iterable[Path]) -> "ChangeSet":
+        """Keep only changes at or below one of `roots`."""
+        resolved = [Path(r).resolve() for r in roots]
+        kept = [
+            c
+            for c in self.changes
+            if any(c.path.resolve() == r or r in c.path.resolve().parents for r in resolved)
+        ]
+        return ChangeSet(changes=kept)
+
+    def summary_lines(self) -> List[str]:
+        return [f"{c.path}: {c.reason}" for c in self.changes]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"changes": [c.to_dict() for c in self.changes]}
+
+
+def write_export(path: Path, data: Any, changes: ChangeSet | None = None) -> bool:
+    """Write an export file, recording it in `changes` when change tracking is on."""
+    if changes is None:
+        save_json(path, data)
+        return True
+    return changes.write_json(path, data)
+
+
+__all__ = ["ChangeSet", "FileChange", "describe_change", "write_export"]
@@ -10,11 +10,12 @@ from ..analysis.summaries import generate_all_pack_summaries
 from ..analysis.item_categories import load_item_category_config, aggregate_category_values
 from ..analysis.game_profiles import GameProfile
 from ..analysis.planner_presets import load_planner_presets
-from ..knowledge.loader import load_knowledge_entities
+from ..knowledge.store import open_knowledge_store
 from ..utils import load_json
 from ..models.domain import ItemDefinition, Pack, ValuedPack
 from ..settings import DEFAULT_SITE_ITEMS, DEFAULT_SITE_PACKS, DEFAULT_SITE_REFERENCES, SITE_DATA_DIR
-from ..utils import ensure_dir, save_json, timestamp
+from ..utils import ensure_dir, timestamp
+from .changes import ChangeSet, write_export
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +42,7 @@ def export_site_json(
     reference_mode: str = "tag",
     reference_packs: Optional[List[Pack]] = None,
     game: GameProfile | None = None,
+    changes: ChangeSet | None = None,
 ) -> tuple[Path, Path]:
     ensure_dir(site_dir)
     reference_packs = reference_packs or []
@@ -55,10 +57,12 @@ def export_site_json(
     if knowledge_links_path.exists():
         try:
             item_links = load_json(knowledge_links_path).get("links", {})
-            entities_path = knowledge_dir / "all_entities.json"
-            if entities_path.exists():
-                for ent in load_knowledge_entities(entities_path):
-                    entity_lookup[ent.id] = ent
+            # Only the linked entities' type and name are needed; query them instead of loading every entity.
+            store = open_knowledge_store(knowledge_dir)
+            if store is not None:
+                with store:
+                    linked_ids = {ent_id for ids in item_links.values() for ent_id in ids}
+                    entity_lookup = store.get_many(linked_ids, fields=("entity_type", "name"))
         except Exception:  # pragma: no cover - optional
             item_links = {}
     packs_payload = []
@@ -77,10 +81,10 @@ def export_site_json(
                 ent = entity_lookup.get(ent_id)
                 if not ent:
                     continue
-                bucket = ent.entity_type + "s" if ent.entity_type else "entities"
+                bucket = ent["entity_type"] + "s" if ent["entity_type"] else "entities"
                 pack_knowledge.setdefault(bucket, [])
                 if not any(e.get("entity_id") == ent_id for e in pack_knowledge[bucket]):
-                    pack_knowledge[bucket].append({"entity_id": ent_id, "name": ent.name})
+                    pack_knowledge[bucket].append({"entity_id": ent_id, "name": ent["name"]})
         metrics.append(
             {
                 "id": pack.pack_id,
@@ -133,8 +137,8 @@ def export_site_json(
 
     packs_path = site_dir / DEFAULT_SITE_PACKS.name
     items_path = site_dir / DEFAULT_SITE_ITEMS.name
-    save_json(packs_path, {"generated_at": timestamp(), "packs": packs_payload})
-    save_json(
+    write_export(packs_path, {"generated_at": timestamp(), "packs": packs_payload}, changes)
+    write_export(
         items_path,
         {
             "generated_at": timestamp(),
@@ -146,8 +150,8 @@ def export_site_json(
                     "knowledge_links": [
                         {
                             "entity_id": ent_id,
-                            "entity_type": entity_lookup.get(ent_id).entity_type if entity_lookup.get(ent_id) else None,
-                            "name": entity_lookup.get(ent_id).name if entity_lookup.get(ent_id) else None,
+                            "entity_type": entity_lookup.get(ent_id, {}).get("entity_type"),
+                            "name": entity_lookup.get(ent_id, {}).get("name"),
                         }
                         for ent_id in item_links.get(item.item_id, [])
                     ],
@@ -155,17 +159,19 @@ def export_site_json(
                 for item in items_payload
             ],
         },
+        changes,
     )
     # planner presets export
     presets = load_planner_presets(game=game)
     if presets:
-        save_json(
+        write_export(
             site_dir / "planner_presets.json",
             {
                 "game": game_key,
                 "game_label": game_label,
                 "presets": [preset.__dict__ for preset in presets],
             },
+            changes,
         )
     reference_path = None
     if reference_mode == "separate" and reference_packs:
@@ -181,6 +187,6 @@ def export_site_json(
             for p in reference_packs
         ]
         reference_path = site_dir / DEFAULT_SITE_REFERENCES.name
-        save_json(reference_path, {"generated_at": timestamp(), "reference_packs": ref_payload})
+        write_export(reference_path, {"generated_at": timestamp(), "reference_packs": ref_payload}, changes)
     logger.info("Exported site data to %s and %s", packs_path, items_path)
     return packs_path, items_path
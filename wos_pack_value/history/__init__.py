@@ -1,6 +1,18 @@
 """History helpers: snapshotting exports and computing diffs."""
 
-from .snapshot import snapshot_site_data
-from .diff import diff_packs
+from .snapshot import load_latest_snapshot, snapshot_site_data
+from .store import RetentionPolicy, SnapshotStore
+from .diff import SnapshotCache, diff_packs, diff_snapshot_range
+from .index import HistoryIndex, open_history_index
 
-__all__ = ["snapshot_site_data", "diff_packs"]
+__all__ = [
+    "snapshot_site_data",
+    "load_latest_snapshot",
+    "SnapshotStore",
+    "RetentionPolicy",
+    "diff_packs",
+    "diff_snapshot_range",
+    "SnapshotCache",
+    "HistoryIndex",
+    "open_history_index",
+]
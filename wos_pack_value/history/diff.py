@@ -1,14 +1,28 @@
-"""Compute diffs between pack snapshots."""
+"""Compute diffs between pack snapshots.
+
+Snapshots are reduced to compact `PackState` tuples sorted by pack key, and
+two snapshots are compared with a merge-join over those sorted sequences, so
+a diff is one linear pass and reports item-level changes (items added or
+removed, quantity deltas) next to price/value changes. Parsed snapshots are
+kept in a small LRU `SnapshotCache`, so diffing a range of snapshots parses
+each one once even when it takes part in two consecutive pairs.
+"""
 
 from __future__ import annotations
 
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from ..utils import load_json, timestamp
 
-from ..utils import load_json
+DIFF_MODES = ("consecutive", "endpoints")
 
 
-def _pack_key(pack: Dict[str, Any]) -> str:
+def pack_key_of(pack: Dict[str, Any]) -> str:
+    """Identity of a pack across snapshots: its id, else "<lowercased name>|<price>"."""
     if "id" in pack and pack.get("id"):
         return str(pack.get("id"))
     name = str(pack.get("name", "")).lower()
@@ -32,65 +46,277 @@ def _pack_summary_fields(pack: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
-def diff_packs(
-    previous_packs_path: Path,
-    current_packs_path: Path,
+@dataclass(frozen=True)
+class PackState:
+    """The parts of an exported pack a diff looks at; items are (item_id, quantity) sorted by id."""
+
+    key: str
+    summary: Tuple[Tuple[str, Any], ...]
+    items: Tuple[Tuple[str, float], ...]
+
+    @property
+    def fields(self) -> Dict[str, Any]:
+        return dict(self.summary)
+
+
+def pack_state(pack: Dict[str, Any]) -> PackState:
+    quantities: Dict[str, float] = {}
+    for item in pack.get("items") or []:
+        item_id = item.get("id") or item.get("item_id")
+        if not item_id:
+            continue
+        try:
+            qty = float(item.get("quantity") or 0.0)
+        except (TypeError, ValueError):
+            qty = 0.0
+        quantities[str(item_id)] = quantities.get(str(item_id), 0.0) + qty
+    return PackState(
+        key=pack_key_of(pack),
+        summary=tuple(_pack_summary_fields(pack).items()),
+        items=tuple(sorted(quantities.items())),
+    )
+
+
+def parse_snapshot(data: Any) -> List[PackState]:
+    """packs.json payload -> PackStates sorted by key (the last duplicate key wins)."""
+    packs = data.get("packs", []) if isinstance(data, dict) else (data or [])
+    states = {}
+    for pack in packs:
+        state = pack_state(pack)
+        states[state.key] = state
+    return [states[k] for k in sorted(states)]
+
+
+class SnapshotCache:
+    """LRU of parsed snapshots keyed by content (blob digest, or path + mtime + size)."""
+
+    def __init__(self, maxsize: int = 8) -> None:
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, List[PackState]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str, loader: Callable[[], Any]) -> List[PackState]:
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        states = parse_snapshot(loader())
+        self._entries[key] = states
+        while len(self._entries) > max(self.maxsize, 1):
+            self._entries.popitem(last=False)
+        return states
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def load_pack_states(path: Path, cache: SnapshotCache | None = None) -> List[PackState]:
+    if cache is None:
+        return parse_snapshot(load_json(path))
+    st = path.stat()
+    return cache.get(f"{path.resolve()}:{st.st_mtime_ns}:{st.st_size}", lambda: load_json(path))
+
+
+def _differs(a: Any, b: Any, tol: float) -> bool:
+    return a is not None and b is not None and abs(a - b) > tol
+
+
+def diff_items(
+    previous: Sequence[Tuple[str, float]],
+    current: Sequence[Tuple[str, float]],
+    tol: float = 1e-6,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """Merge-join two sorted (item_id, quantity) sequences."""
+    added: List[Dict[str, Any]] = []
+    removed: List[Dict[str, Any]] = []
+    quantity_changes: List[Dict[str, Any]] = []
+    i = j = 0
+    while i < len(previous) or j < len(current):
+        prev = previous[i] if i < len(previous) else None
+        curr = current[j] if j < len(current) else None
+        if curr is None or (prev is not None and prev[0] < curr[0]):
+            removed.append({"item_id": prev[0], "quantity": prev[1]})
+            i += 1
+        elif prev is None or curr[0] < prev[0]:
+            added.append({"item_id": curr[0], "quantity": curr[1]})
+            j += 1
+        else:
+            if abs(curr[1] - prev[1]) > tol:
+                quantity_changes.append(
+                    {"item_id": curr[0], "before": prev[1], "after": curr[1], "delta": curr[1] - prev[1]}
+                )
+            i += 1
+            j += 1
+    return {"added": added, "removed": removed, "quantity_changes": quantity_changes}
+
+
+def iter_pack_changes(
+    previous: Sequence[PackState],
+    current: Sequence[PackState],
     *,
     value_tol: float = 1e-6,
-) -> Dict[str, Any]:
-    prev_data = load_json(previous_packs_path)
-    curr_data = load_json(current_packs_path)
-    prev_packs = prev_data.get("packs", prev_data if isinstance(prev_data, list) else [])
-    curr_packs = curr_data.get("packs", curr_data if isinstance(curr_data, list) else [])
-
-    prev_map = {_pack_key(p): p for p in prev_packs}
-    curr_map = {_pack_key(p): p for p in curr_packs}
-
-    new_keys = set(curr_map) - set(prev_map)
-    removed_keys = set(prev_map) - set(curr_map)
-    common_keys = set(curr_map) & set(prev_map)
-
-    new_packs = [_pack_summary_fields(curr_map[k]) for k in sorted(new_keys)]
-    removed_packs = [_pack_summary_fields(prev_map[k]) for k in sorted(removed_keys)]
-
-    changed_packs = []
-    for k in sorted(common_keys):
-        prev = prev_map[k]
-        curr = curr_map[k]
-        price_prev = prev.get("price", {}).get("amount") if isinstance(prev.get("price"), dict) else prev.get("price")
-        price_curr = curr.get("price", {}).get("amount") if isinstance(curr.get("price"), dict) else curr.get("price")
-        vpd_prev = prev.get("value_per_dollar")
-        vpd_curr = curr.get("value_per_dollar")
-        value_prev = prev.get("value")
-        value_curr = curr.get("value")
+) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """Yield ("new" | "removed" | "changed", record) from two key-sorted snapshots."""
+    i = j = 0
+    while i < len(previous) or j < len(current):
+        prev = previous[i] if i < len(previous) else None
+        curr = current[j] if j < len(current) else None
+        if curr is None or (prev is not None and prev.key < curr.key):
+            yield "removed", prev.fields
+            i += 1
+            continue
+        if prev is None or curr.key < prev.key:
+            yield "new", curr.fields
+            j += 1
+            continue
+        i += 1
+        j += 1
+        if prev == curr:
+            continue
+        before, after = prev.fields, curr.fields
+        items = diff_items(prev.items, curr.items, tol=value_tol)
         if (
-            price_prev != price_curr
-            or (vpd_prev is not None and vpd_curr is not None and abs(vpd_prev - vpd_curr) > value_tol)
-            or (value_prev is not None and value_curr is not None and abs(value_prev - value_curr) > value_tol)
+            before["price"] != after["price"]
+            or _differs(before["value_per_dollar"], after["value_per_dollar"], value_tol)
+            or _differs(before["value"], after["value"], value_tol)
+            or any(items.values())
         ):
-            changed_packs.append(
-                {
-                    "pack_id": curr.get("id"),
-                    "pack_name": curr.get("name"),
-                    "before": {"price": price_prev, "value_per_dollar": vpd_prev, "value": value_prev},
-                    "after": {"price": price_curr, "value_per_dollar": vpd_curr, "value": value_curr},
-                }
-            )
+            yield "changed", {
+                "pack_id": after["pack_id"],
+                "pack_name": after["pack_name"],
+                "before": {k: before[k] for k in ("price", "value_per_dollar", "value")},
+                "after": {k: after[k] for k in ("price", "value_per_dollar", "value")},
+                "items": items,
+            }
 
+
+def diff_pack_states(
+    previous: Sequence[PackState],
+    current: Sequence[PackState],
+    *,
+    value_tol: float = 1e-6,
+) -> Dict[str, Any]:
+    buckets: Dict[str, List[Dict[str, Any]]] = {"new": [], "removed": [], "changed": []}
+    for kind, record in iter_pack_changes(previous, current, value_tol=value_tol):
+        buckets[kind].append(record)
+    changed = buckets["changed"]
     summary = {
-        "num_packs_previous": len(prev_packs),
-        "num_packs_current": len(curr_packs),
-        "num_new_packs": len(new_packs),
-        "num_removed_packs": len(removed_packs),
-        "num_changed_packs": len(changed_packs),
+        "num_packs_previous": len(previous),
+        "num_packs_current": len(current),
+        "num_new_packs": len(buckets["new"]),
+        "num_removed_packs": len(buckets["removed"]),
+        "num_changed_packs": len(changed),
+        "num_items_added": sum(len(c["items"]["added"]) for c in changed),
+        "num_items_removed": sum(len(c["items"]["removed"]) for c in changed),
+        "num_quantity_changes": sum(len(c["items"]["quantity_changes"]) for c in changed),
     }
-
     return {
-        "previous_snapshot": str(previous_packs_path),
-        "current_snapshot": str(current_packs_path),
         "summary": summary,
-        "new_packs": new_packs,
-        "removed_packs": removed_packs,
-        "changed_packs": changed_packs,
+        "new_packs": buckets["new"],
+        "removed_packs": buckets["removed"],
+        "changed_packs": changed,
     }
 
+
+def diff_packs(
+    previous_packs_path: Path,
+    current_packs_path: Path,
+    *,
+    value_tol: float = 1e-6,
+    cache: SnapshotCache | None = None,
+) -> Dict[str, Any]:
+    diff = diff_pack_states(
+        load_pack_states(previous_packs_path, cache),
+        load_pack_states(current_packs_path, cache),
+        value_tol=value_tol,
+    )
+    return {"previous_snapshot": str(previous_packs_path), "current_snapshot": str(current_packs_path), **diff}
+
+
+def diff_snapshot_range(
+    store,
+    snapshot_ids: Optional[Sequence[str]] = None,
+    *,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    mode: str = "consecutive",
+    name: str = "packs.json",
+    value_tol: float = 1e-6,
+    cache: SnapshotCache | None = None,
+) -> Dict[str, Any]:
+    """Diff a range of stored snapshots into a change log.
+
+    `snapshot_ids` (oldest first) or a `since`/`until` ISO range select the
+    snapshots; mode "consecutive" diffs each adjacent pair, "endpoints" diffs
+    first against last. The change log is what `announce --change-log` reads.
+    """
+    if mode not in DIFF_MODES:
+        raise ValueError(f"Unknown diff mode '{mode}'. Known: {', '.join(DIFF_MODES)}")
+    manifests = [m for m in store.list_snapshots() if name in m.files]
+    if snapshot_ids is not None:
+        by_id = {m.snapshot_id: m for m in manifests}
+        missing = [sid for sid in snapshot_ids if sid not in by_id]
+        if missing:
+            raise FileNotFoundError(f"Snapshot(s) without {name}: {', '.join(missing)}")
+        manifests = [by_id[sid] for sid in snapshot_ids]
+    else:
+        hi = f"{until}T23:59:59" if until and len(until) == 10 else until
+        manifests = [
+            m
+            for m in manifests
+            if (not since or m.created.isoformat() >= since) and (not hi or m.created.isoformat() <= hi)
+        ]
+    cache = cache if cache is not None else SnapshotCache()
+
+    def states(manifest) -> List[PackState]:
+        digest = manifest.files[name]["sha256"]
+        return cache.get(digest, lambda: json.loads(store.read_blob(digest)))
+
+    if len(manifests) < 2:
+        pairs = []
+    elif mode == "endpoints":
+        pairs = [(manifests[0], manifests[-1])]
+    else:
+        pairs = list(zip(manifests, manifests[1:]))
+
+    steps = []
+    for prev, curr in pairs:
+        diff = diff_pack_states(states(prev), states(curr), value_tol=value_tol)
+        steps.append(
+            {
+                "from": prev.snapshot_id,
+                "to": curr.snapshot_id,
+                "from_created_at": prev.created_at,
+                "to_created_at": curr.created_at,
+                **diff,
+            }
+        )
+    totals: Dict[str, int] = {}
+    for step in steps:
+        for key, count in step["summary"].items():
+            if not key.startswith("num_packs_"):
+                totals[key] = totals.get(key, 0) + count
+    return {
+        "generated_at": timestamp(),
+        "mode": mode,
+        "snapshots": [m.snapshot_id for m in manifests],
+        "summary": totals,
+        "steps": steps,
+    }
+
+
+__all__ = [
+    "DIFF_MODES",
+    "PackState",
+    "SnapshotCache",
+    "diff_items",
+    "diff_pack_states",
+    "diff_packs",
+    "diff_snapshot_range",
+    "pack_key_of",
+    "iter_pack_changes",
+    "load_pack_states",
+    "parse_snapshot",
+]
@@ -0,0 +1,383 @@
+"""SQLite time-series index over history snapshots.
+
+Each snapshot's packs.json is parsed once and flattened into one row per pack
+(price, value, value per dollar, rank). Queries such as "value per dollar of
+this pack over the last 6 months" or "top movers between two dates" are then
+indexed SQL lookups instead of loading and diffing every snapshot.
+
+The index lives next to the snapshot store (`<history_root>/store/index.sqlite`)
+and is derived data: `sync` adds snapshots it has not seen, drops snapshots
+the store no longer has, and can always be rebuilt from scratch.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..settings import DEFAULT_SITE_ANALYSIS_OVERALL, DEFAULT_SITE_PACKS
+from .diff import pack_key_of
+from .store import SnapshotStore
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+METRICS = ("price", "value", "value_per_dollar", "rank")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_id TEXT PRIMARY KEY,
+    created_at TEXT NOT NULL,
+    content_key TEXT,
+    num_packs INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS points (
+    pack_key TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    snapshot_id TEXT NOT NULL,
+    pack_id TEXT,
+    name TEXT,
+    price REAL,
+    currency TEXT,
+    value REAL,
+    value_per_dollar REAL,
+    rank INTEGER,
+    is_reference INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (pack_key, created_at, snapshot_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS packs (
+    pack_key TEXT PRIMARY KEY,
+    pack_id TEXT,
+    name TEXT,
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL,
+    num_snapshots INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS points_by_time ON points (created_at);
+CREATE INDEX IF NOT EXISTS points_by_snapshot ON points (snapshot_id);
+CREATE INDEX IF NOT EXISTS points_by_pack_id ON points (pack_id);
+"""
+
+_POINT_COLUMNS = (
+    "pack_key",
+    "created_at",
+    "snapshot_id",
+    "pack_id",
+    "name",
+    "price",
+    "currency",
+    "value",
+    "value_per_dollar",
+    "rank",
+    "is_reference",
+)
+
+
+def _float(value: Any) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _range_bounds(start: Optional[str], end: Optional[str]) -> Tuple[str, str]:
+    """ISO bounds for created_at; a bare end date includes that whole day."""
+    lo = start or ""
+    hi = end or "9999"
+    if end and len(end) == 10:
+        hi = f"{end}T23:59:59"
+    return lo, hi
+
+
+def snapshot_points(
+    snapshot_id: str,
+    created_at: str,
+    packs_data: Any,
+    ranking_data: Any = None,
+) -> List[Tuple[Any, ...]]:
+    """Flatten one snapshot's packs.json (and optional overall ranking) into index rows.
+
+    Rank comes from the snapshot's `pack_ranking_overall.json` when present;
+    otherwise packs are ranked by value per dollar, as `analyze_packs` does.
+    """
+    packs = packs_data.get("packs", []) if isinstance(packs_data, dict) else (packs_data or [])
+    ranks: Dict[str, int] = {}
+    if isinstance(ranking_data, dict):
+        for rec in ranking_data.get("packs", []):
+            if rec.get("id") is not None and rec.get("rank_overall") is not None:
+                ranks[str(rec["id"])] = int(rec["rank_overall"])
+    if not ranks:
+        ordered = sorted(packs, key=lambda p: _float(p.get("value_per_dollar")) or 0.0, reverse=True)
+        ranks = {str(p.get("id")): idx for idx, p in enumerate(ordered, start=1) if p.get("id") is not None}
+
+    rows: Dict[str, Tuple[Any, ...]] = {}
+    for pack in packs:
+        price_field = pack.get("price", {})
+        price = price_field.get("amount") if isinstance(price_field, dict) else price_field
+        currency = price_field.get("currency") if isinstance(price_field, dict) else None
+        pack_id = pack.get("id")
+        key = pack_key_of(pack)
+        rows[key] = (
+            key,
+            created_at,
+            snapshot_id,
+            str(pack_id) if pack_id is not None else None,
+            pack.get("name"),
+            _float(price),
+            currency,
+            _float(pack.get("value")),
+            _float(pack.get("value_per_dollar")),
+            ranks.get(str(pack_id)) if pack_id is not None else None,
+            1 if pack.get("is_reference") else 0,
+        )
+    return list(rows.values())
+
+
+class HistoryIndex:
+    """Per-pack time series of price/value/value-per-dollar/rank across snapshots."""
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    @classmethod
+    def for_history_root(cls, history_root: Path) -> "HistoryIndex":
+        return cls(SnapshotStore(history_root).root / "index.sqlite")
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "HistoryIndex":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _init_schema(self) -> None:
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            # Derived data: rebuild rather than migrate.
+            self.conn.executescript("DROP TABLE IF EXISTS points; DROP TABLE IF EXISTS snapshots; DROP TABLE IF EXISTS packs;")
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.commit()
+
+    # -- ingestion --
+
+    def indexed_snapshots(self) -> Dict[str, Optional[str]]:
+        """snapshot_id -> content key (packs.json + ranking digests) for everything indexed."""
+        return {row[0]: row[1] for row in self.conn.execute("SELECT snapshot_id, content_key FROM snapshots")}
+
+    def add_snapshot(
+        self,
+        snapshot_id: str,
+        created_at: str,
+        rows: Iterable[Tuple[Any, ...]],
+        content_key: Optional[str] = None,
+    ) -> int:
+        rows = list(rows)
+        with self.conn:
+            self._delete(snapshot_id)
+            self.conn.executemany(
+                f"INSERT INTO points ({', '.join(_POINT_COLUMNS)}) VALUES ({', '.join('?' * len(_POINT_COLUMNS))})",
+                rows,
+            )
+            self.conn.execute(
+                "INSERT INTO snapshots (snapshot_id, created_at, content_key, num_packs) VALUES (?, ?, ?, ?)",
+                (snapshot_id, created_at, content_key, len(rows)),
+            )
+            self._merge_pack_summaries(snapshot_id)
+        return len(rows)
+
+    def _copy_snapshot(self, source_id: str, snapshot_id: str, created_at: str, content_key: str) -> int:
+        """Index a snapshot whose inputs are byte-identical to an indexed one without re-parsing."""
+        cols = ", ".join(_POINT_COLUMNS)
+        select_cols = ", ".join("?" if c in ("created_at", "snapshot_id") else c for c in _POINT_COLUMNS)
+        with self.conn:
+            self._delete(snapshot_id)
+            cur = self.conn.execute(
+                f"INSERT INTO points ({cols}) SELECT {select_cols} FROM points WHERE snapshot_id = ?",
+                (created_at, snapshot_id, source_id),
+            )
+            self.conn.execute(
+                "INSERT INTO snapshots (snapshot_id, created_at, content_key, num_packs) VALUES (?, ?, ?, ?)",
+                (snapshot_id, created_at, content_key, cur.rowcount),
+            )
+            self._merge_pack_summaries(snapshot_id)
+        return cur.rowcount
+
+    def _merge_pack_summaries(self, snapshot_id: str) -> None:
+        """Fold one snapshot's rows into the per-pack first/last-seen summary."""
+        self.conn.execute(
+            """
+            INSERT INTO packs (pack_key, pack_id, name, first_seen, last_seen, num_snapshots)
+            SELECT pack_key, pack_id, name, created_at, created_at, 1 FROM points WHERE snapshot_id = ?
+            ON CONFLICT (pack_key) DO UPDATE SET
+                pack_id = CASE WHEN excluded.last_seen >= last_seen THEN excluded.pack_id ELSE pack_id END,
+                name = CASE WHEN excluded.last_seen >= last_seen THEN excluded.name ELSE name END,
+                first_seen = MIN(first_seen, excluded.first_seen),
+                last_seen = MAX(last_seen, excluded.last_seen),
+                num_snapshots = num_snapshots + 1
+            """,
+            (snapshot_id,),
+        )
+
+    def _delete(self, snapshot_id: str) -> None:
+        keys = [r[0] for r in self.conn.execute("SELECT pack_key FROM points WHERE snapshot_id = ?", (snapshot_id,))]
+        self.conn.execute("DELETE FROM points WHERE snapshot_id = ?", (snapshot_id,))
+        self.conn.execute("DELETE FROM snapshots WHERE snapshot_id = ?", (snapshot_id,))
+        # Rebuild summaries of the affected packs from their remaining points.
+        self.conn.executemany("DELETE FROM packs WHERE pack_key = ?", [(k,) for k in keys])
+        self.conn.executemany(
+            """
+            INSERT INTO packs (pack_key, pack_id, name, first_seen, last_seen, num_snapshots)
+            SELECT pack_key, pack_id, name, MIN(created_at), MAX(created_at), COUNT(*)
+            FROM points WHERE pack_key = ? GROUP BY pack_key
+            """,
+            [(k,) for k in keys],
+        )
+
+    def remove_snapshot(self, snapshot_id: str) -> None:
+        with self.conn:
+            self._delete(snapshot_id)
+
+    def sync(self, store: SnapshotStore) -> Dict[str, int]:
+        """Index new snapshots from `store` and forget ones it no longer has."""
+        indexed = self.indexed_snapshots()
+        by_content = {key: sid for sid, key in indexed.items() if key}
+        manifests = [m for m in store.list_snapshots() if DEFAULT_SITE_PACKS.name in m.files]
+        live = {m.snapshot_id for m in manifests}
+        stats = {"added": 0, "reused": 0, "removed": 0}
+        for snapshot_id in set(indexed) - live:
+            self.remove_snapshot(snapshot_id)
+            stats["removed"] += 1
+        for manifest in manifests:
+            if manifest.snapshot_id in indexed:
+                continue
+            created_at = manifest.created.isoformat(timespec="seconds")
+            digest = manifest.files[DEFAULT_SITE_PACKS.name]["sha256"]
+            ranking_entry = manifest.files.get(DEFAULT_SITE_ANALYSIS_OVERALL.name)
+            content_key = digest + (f"+{ranking_entry['sha256']}" if ranking_entry else "")
+            source = by_content.get(content_key)
+            if source and source in live:
+                self._copy_snapshot(source, manifest.snapshot_id, created_at, content_key)
+                stats["reused"] += 1
+            else:
+                packs_data = json.loads(store.read_blob(digest))
+                ranking = json.loads(store.read_blob(ranking_entry["sha256"])) if ranking_entry else None
+                rows = snapshot_points(manifest.snapshot_id, created_at, packs_data, ranking)
+                self.add_snapshot(manifest.snapshot_id, created_at, rows, content_key=content_key)
+                stats["added"] += 1
+            by_content.setdefault(content_key, manifest.snapshot_id)
+        if any(stats.values()):
+            logger.info(
+                "History index %s: %s added, %s reused, %s removed",
+                self.db_path,
+                stats["added"],
+                stats["reused"],
+                stats["removed"],
+            )
+        return stats
+
+    # -- queries --
+
+    def snapshots(self) -> List[Dict[str, Any]]:
+        rows = self.conn.execute("SELECT * FROM snapshots ORDER BY created_at, snapshot_id")
+        return [dict(r) for r in rows]
+
+    def resolve_pack(self, query: str) -> List[str]:
+        """Pack keys matching an exact id/key, else a case-insensitive name substring."""
+        rows = self.conn.execute(
+            "SELECT pack_key FROM packs WHERE pack_id = ? OR pack_key = ? ORDER BY pack_key", (query, query)
+        ).fetchall()
+        if not rows:
+            pattern = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            rows = self.conn.execute(
+                "SELECT pack_key FROM packs WHERE name LIKE ? ESCAPE '\\' ORDER BY pack_key",
+                (f"%{pattern}%",),
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def series(self, pack_key: str, start: Optional[str] = None, end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Time series for one pack within [start, end] (ISO dates or datetimes)."""
+        lo, hi = _range_bounds(start, end)
+        rows = self.conn.execute(
+            "SELECT * FROM points WHERE pack_key = ? AND created_at BETWEEN ? AND ? ORDER BY created_at, snapshot_id",
+            (pack_key, lo, hi),
+        )
+        return [dict(r) for r in rows]
+
+    def top_movers(
+        self,
+        metric: str = "value_per_dollar",
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        limit: int = 10,
+        direction: str = "abs",
+        include_reference: bool = False,
+    ) -> List[Dict[str, Any]]:
+        """Packs whose `metric` changed most between their first and last point in the range.
+
+        direction: "up" (largest increase), "down" (largest decrease) or "abs".
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'. Known: {', '.join(METRICS)}")
+        orders = {
+            "up": ("delta > 0", "delta DESC"),
+            "down": ("delta < 0", "delta ASC"),
+            "abs": ("delta != 0", "ABS(delta) DESC"),
+        }
+        if direction not in orders:
+            raise ValueError("direction must be 'up', 'down' or 'abs'")
+        keep, order = orders[direction]
+        lo, hi = _range_bounds(start, end)
+        ref_filter = "" if include_reference else "AND p.is_reference = 0"
+        # Per pack, the first/last point in range are two seeks on the (pack_key, created_at) key.
+        # Snapshots taken in the same second share created_at, so points are joined back by snapshot id.
+        point_in_range = f"""
+            FROM points p WHERE p.pack_key = k.pack_key AND p.created_at BETWEEN :lo AND :hi
+            AND p.{metric} IS NOT NULL {ref_filter}
+        """
+        sql = f"""
+            WITH bounds AS (
+                SELECT k.pack_key,
+                       (SELECT p.snapshot_id {point_in_range} ORDER BY p.created_at, p.snapshot_id LIMIT 1) AS first_id,
+                       (SELECT p.snapshot_id {point_in_range}
+                        ORDER BY p.created_at DESC, p.snapshot_id DESC LIMIT 1) AS last_id
+                FROM packs k
+                WHERE k.last_seen >= :lo AND k.first_seen <= :hi
+            )
+            SELECT b.pack_key, l.pack_id, l.name, f.created_at AS first_at, l.created_at AS last_at,
+                   f.{metric} AS before, l.{metric} AS after, l.{metric} - f.{metric} AS delta
+            FROM bounds b
+            JOIN points f ON f.pack_key = b.pack_key AND f.snapshot_id = b.first_id
+            JOIN points l ON l.pack_key = b.pack_key AND l.snapshot_id = b.last_id
+            WHERE b.first_id != b.last_id AND {keep}
+            ORDER BY {order}, b.pack_key
+            LIMIT :limit
+        """
+        rows = self.conn.execute(sql, {"lo": lo, "hi": hi, "limit": int(limit)})
+        return [dict(r, metric=metric) for r in rows]
+
+    def seen(self, pack_key: Optional[str] = None) -> List[Dict[str, Any]]:
+        """First-seen/last-seen dates and snapshot counts, per pack."""
+        where, params = ("WHERE pack_key = ?", (pack_key,)) if pack_key else ("", ())
+        rows = self.conn.execute(f"SELECT * FROM packs {where} ORDER BY first_seen, pack_key", params)
+        return [dict(r) for r in rows]
+
+
+def open_history_index(history_root: Path, sync: bool = True) -> HistoryIndex:
+    """Open (and by default bring up to date) the index for a history root."""
+    index = HistoryIndex.for_history_root(history_root)
+    if sync:
+        index.sync(SnapshotStore(history_root))
+    return index
+
+
+__all__ = ["HistoryIndex", "METRICS", "open_history_index", "snapshot_points"]
@@ -1,11 +1,11 @@
-"""Snapshot site_data exports into a timestamped history directory."""
+"""Snapshot site_data exports into the content-addressed history store."""
 
 from __future__ import annotations
 
-import shutil
+import json
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Any, Iterable, Optional, Tuple
 
 from ..settings import (
     DEFAULT_SITE_ANALYSIS_BY_CATEGORY,
@@ -15,7 +15,8 @@ from ..settings import (
     DEFAULT_SITE_VALIDATION_REPORT,
     SITE_DATA_DIR,
 )
-from ..utils import ensure_dir
+from ..utils import load_json
+from .store import SnapshotManifest, SnapshotStore
 
 
 DEFAULT_SNAPSHOT_FILES: tuple[Path, ...] = (
@@ -27,30 +28,34 @@ DEFAULT_SNAPSHOT_FILES: tuple[Path, ...] = (
 )
 
 
-def _timestamp_str(ts: Optional[datetime] = None) -> str:
-    ts = ts or datetime.now()
-    return ts.strftime("%Y-%m-%d_%H%M%S")
-
-
 def snapshot_site_data(
     site_dir: Path = SITE_DATA_DIR,
     history_root: Path = Path("exports"),
     *,
     timestamp: Optional[datetime] = None,
     extra_files: Optional[Iterable[Path]] = None,
-) -> Path:
+) -> SnapshotManifest:
     """
-    Copies JSON exports under site_dir into a new timestamped subdirectory
-    under history_root and returns the snapshot path.
+    Store the JSON exports under site_dir in the history store under
+    history_root and return the snapshot manifest. Only contents not already
+    stored are written; use `SnapshotStore.materialize` to get files back.
     Missing optional files are ignored.
     """
-    ensure_dir(history_root)
-    snap_dir = history_root / _timestamp_str(timestamp) / "site_data"
-    ensure_dir(snap_dir)
-
-    candidates = list(DEFAULT_SNAPSHOT_FILES) + list(extra_files or [])
-    for src in candidates:
-        src_path = site_dir / src.name if not src.is_absolute() else src
-        if src_path.exists():
-            shutil.copy2(src_path, snap_dir / src_path.name)
-    return snap_dir
+    # Default export files are resolved against site_dir; extra absolute paths are used as-is.
+    candidates = [site_dir / f.name for f in DEFAULT_SNAPSHOT_FILES]
+    candidates += [src if src.is_absolute() else site_dir / src.name for src in (extra_files or [])]
+    return SnapshotStore(history_root).snapshot(candidates, timestamp=timestamp)
+
+
+def load_latest_snapshot(history_root: Path, name: str = DEFAULT_SITE_PACKS.name) -> Optional[Tuple[str, Any]]:
+    """Return (source label, parsed JSON) of `name` from the newest snapshot (store or legacy layout).
+
+    Store snapshots are read straight from their blob, so nothing is
+    materialized under history_root.
+    """
+    store = SnapshotStore(history_root)
+    for manifest in reversed(store.list_snapshots()):
+        if name in manifest.files:
+            return f"{manifest.snapshot_id}/{name}", json.loads(store.read_file(manifest.snapshot_id, name))
+    legacy = sorted(history_root.glob(f"*/site_data/{name}"))
+    return (str(legacy[-1]), load_json(legacy[-1])) if legacy else None
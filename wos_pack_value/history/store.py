@@ -0,0 +1,286 @@
+"""Content-addressed snapshot store for site_data history.
+
+Layout under a history root::
+
+    store/objects/ab/<sha256>.gz     gzip-compressed file contents, written once
+    store/manifests/<snapshot>.json  {snapshot_id, created_at, files: {name: {sha256, size}}}
+    store/cache/<sha256>.json        decompressed blobs backing materialized files
+    <snapshot>/site_data/<name>      materialized on demand (hardlink/reflink/copy)
+
+A snapshot only writes blobs that are not already stored, so its cost is
+proportional to what changed. `apply_retention` prunes manifests (e.g. daily
+for 30 days, weekly after) and `gc` drops blobs no manifest references.
+"""
+
+from __future__ import annotations
+
+import gzip
+import hashlib
+import logging
+import os
+import shutil
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from ..utils import ensure_dir, load_json, save_json
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_ID_FORMAT = "%Y-%m-%d_%H%M%S"
+MATERIALIZE_MODES = ("hardlink", "reflink", "copy")
+_FICLONE = 0x40049409  # linux/fs.h
+
+
+def _sha256_file(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _atomic_write_bytes(path: Path, data: bytes) -> None:
+    ensure_dir(path.parent)
+    tmp = path.with_name(f".{path.name}.tmp{os.getpid()}")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _reflink(src: Path, dst: Path) -> bool:
+    try:
+        import fcntl
+    except ImportError:  # pragma: no cover - Windows
+        return False
+    with src.open("rb") as s, dst.open("wb") as d:
+        try:
+            fcntl.ioctl(d.fileno(), _FICLONE, s.fileno())
+            return True
+        except OSError:
+            pass
+    dst.unlink()
+    return False
+
+
+@dataclass
+class SnapshotManifest:
+    snapshot_id: str
+    created_at: str
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    path: Optional[Path] = None
+    new_blobs: List[Path] = field(default_factory=list)
+
+    @property
+    def created(self) -> datetime:
+        try:
+            return datetime.fromisoformat(self.created_at)
+        except ValueError:
+            return datetime.strptime(self.snapshot_id[:17], SNAPSHOT_ID_FORMAT)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"snapshot_id": self.snapshot_id, "created_at": self.created_at, "files": self.files}
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Keep everything from the last `keep_last` snapshots, the newest snapshot per
+    day for `daily_days` days, then the newest per ISO week for `weekly_weeks`
+    weeks (None = forever)."""
+
+    daily_days: int = 30
+    weekly_weeks: Optional[int] = None
+    keep_last: int = 1
+
+
+class SnapshotStore:
+    def __init__(self, history_root: Path) -> None:
+        self.history_root = history_root
+        self.root = history_root / "store"
+        self.objects_dir = self.root / "objects"
+        self.manifests_dir = self.root / "manifests"
+        self.cache_dir = self.root / "cache"
+
+    def exists(self) -> bool:
+        return self.manifests_dir.exists()
+
+    # -- blobs --
+
+    def blob_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / f"{digest}.gz"
+
+    def put_file(self, path: Path) -> tuple[str, Optional[Path]]:
+        """Store a file's contents; return (digest, blob path if newly written)."""
+        digest = _sha256_file(path)
+        blob = self.blob_path(digest)
+        if blob.exists():
+            return digest, None
+        _atomic_write_bytes(blob, gzip.compress(path.read_bytes(), compresslevel=6, mtime=0))
+        return digest, blob
+
+    def read_blob(self, digest: str) -> bytes:
+        return gzip.decompress(self.blob_path(digest).read_bytes())
+
+    def _cached_blob(self, digest: str) -> Path:
+        cached = self.cache_dir / f"{digest}.json"
+        if not cached.exists():
+            _atomic_write_bytes(cached, self.read_blob(digest))
+            # Materialized files may be hardlinks to this copy; keep it from being edited in place.
+            cached.chmod(0o444)
+        return cached
+
+    # -- manifests --
+
+    def _new_snapshot_id(self, ts: datetime) -> str:
+        base = ts.strftime(SNAPSHOT_ID_FORMAT)
+        snapshot_id, n = base, 1
+        while (self.manifests_dir / f"{snapshot_id}.json").exists():
+            snapshot_id = f"{base}-{n}"
+            n += 1
+        return snapshot_id
+
+    def snapshot(
+        self, files: Iterable[Path], *, timestamp: Optional[datetime] = None, snapshot_id: Optional[str] = None
+    ) -> SnapshotManifest:
+        """Store `files` (missing ones skipped) and write a manifest referencing them."""
+        ts = timestamp or datetime.now()
+        manifest = SnapshotManifest(
+            snapshot_id=snapshot_id or self._new_snapshot_id(ts),
+            created_at=ts.isoformat(timespec="seconds"),
+        )
+        for path in files:
+            if not path.exists():
+                continue
+            digest, new_blob = self.put_file(path)
+            manifest.files[path.name] = {"sha256": digest, "size": path.stat().st_size}
+            if new_blob:
+                manifest.new_blobs.append(new_blob)
+        manifest.path = self.manifests_dir / f"{manifest.snapshot_id}.json"
+        save_json(manifest.path, manifest.to_dict())
+        logger.info(
+            "Snapshot %s: %s file(s), %s new blob(s)", manifest.snapshot_id, len(manifest.files), len(manifest.new_blobs)
+        )
+        return manifest
+
+    def load_manifest(self, snapshot_id: str) -> SnapshotManifest:
+        path = self.manifests_dir / f"{snapshot_id}.json"
+        if not path.exists():
+            raise FileNotFoundError(f"Unknown snapshot '{snapshot_id}' in {self.history_root}")
+        data = load_json(path)
+        return SnapshotManifest(
+            snapshot_id=data["snapshot_id"], created_at=data.get("created_at", ""), files=data.get("files", {}), path=path
+        )
+
+    def list_snapshots(self) -> List[SnapshotManifest]:
+        """All snapshots, oldest first."""
+        if not self.manifests_dir.exists():
+            return []
+        manifests = [self.load_manifest(p.stem) for p in self.manifests_dir.glob("*.json")]
+        return sorted(manifests, key=lambda m: (m.created, m.snapshot_id))
+
+    def read_file(self, snapshot_id: str, name: str) -> bytes:
+        entry = self.load_manifest(snapshot_id).files.get(name)
+        if entry is None:
+            raise FileNotFoundError(f"{name} is not part of snapshot {snapshot_id}")
+        return self.read_blob(entry["sha256"])
+
+    def materialize(self, snapshot_id: str, dest: Optional[Path] = None, mode: str = "hardlink") -> Path:
+        """Recreate a snapshot's files under `dest` (default `<root>/<id>/site_data`)."""
+        if mode not in MATERIALIZE_MODES:
+            raise ValueError(f"Unknown materialize mode '{mode}'. Known: {', '.join(MATERIALIZE_MODES)}")
+        manifest = self.load_manifest(snapshot_id)
+        dest = dest or (self.history_root / snapshot_id / "site_data")
+        ensure_dir(dest)
+        for name, entry in manifest.files.items():
+            target = dest / name
+            if target.exists():
+                target.unlink()
+            cached = self._cached_blob(entry["sha256"])
+            if mode == "hardlink":
+                try:
+                    os.link(cached, target)
+                    continue
+                except OSError:
+                    pass
+            elif mode == "reflink" and _reflink(cached, target):
+                continue
+            shutil.copyfile(cached, target)
+        return dest
+
+    # -- retention / gc --
+
+    def select_expired(self, policy: RetentionPolicy, now: Optional[datetime] = None) -> List[SnapshotManifest]:
+        now = now or datetime.now()
+        snapshots = sorted(self.list_snapshots(), key=lambda m: m.created, reverse=True)
+        keep: set[str] = {m.snapshot_id for m in snapshots[: max(policy.keep_last, 0)]}
+        seen_buckets: set[tuple] = set()
+        daily_cutoff = now - timedelta(days=policy.daily_days)
+        weekly_cutoff = (
+            daily_cutoff - timedelta(weeks=policy.weekly_weeks) if policy.weekly_weeks is not None else None
+        )
+        for m in snapshots:  # newest first, so the first hit per bucket is the one kept
+            created = m.created
+            if created >= daily_cutoff:
+                bucket: tuple = ("day", created.date())
+            elif weekly_cutoff is None or created >= weekly_cutoff:
+                bucket = ("week",) + tuple(created.isocalendar()[:2])
+            else:
+                continue
+            if bucket not in seen_buckets:
+                seen_buckets.add(bucket)
+                keep.add(m.snapshot_id)
+        return [m for m in snapshots if m.snapshot_id not in keep]
+
+    def delete_snapshot(self, snapshot_id: str) -> None:
+        (self.manifests_dir / f"{snapshot_id}.json").unlink(missing_ok=True)
+        materialized = self.history_root / snapshot_id
+        if materialized.is_dir():
+            shutil.rmtree(materialized)
+
+    def apply_retention(
+        self, policy: RetentionPolicy, now: Optional[datetime] = None, dry_run: bool = False
+    ) -> List[str]:
+        expired = [m.snapshot_id for m in self.select_expired(policy, now=now)]
+        if not dry_run:
+            for snapshot_id in expired:
+                self.delete_snapshot(snapshot_id)
+        return expired
+
+    def gc(self, dry_run: bool = False) -> Dict[str, int]:
+        """Delete blobs (and cached copies) no manifest references."""
+        live = {entry["sha256"] for m in self.list_snapshots() for entry in m.files.values()}
+        removed = {"blobs": 0, "cached": 0, "bytes": 0}
+        for blob in self.objects_dir.glob("*/*.gz") if self.objects_dir.exists() else []:
+            if blob.name[: -len(".gz")] not in live:
+                removed["blobs"] += 1
+                removed["bytes"] += blob.stat().st_size
+                if not dry_run:
+                    blob.unlink()
+        for cached in self.cache_dir.glob("*.json") if self.cache_dir.exists() else []:
+            if cached.stem not in live:
+                removed["cached"] += 1
+                if not dry_run:
+                    cached.unlink()
+        return removed
+
+    # -- legacy --
+
+    def import_legacy(self, remove: bool = False) -> List[str]:
+        """Ingest old `<root>/<timestamp>/site_data/` copies into the store."""
+        imported = []
+        for site_dir in sorted(self.history_root.glob("*/site_data")):
+            snapshot_id = site_dir.parent.name
+            if (self.manifests_dir / f"{snapshot_id}.json").exists():
+                continue
+            try:
+                ts = datetime.strptime(snapshot_id[:17], SNAPSHOT_ID_FORMAT)
+            except ValueError:
+                ts = datetime.fromtimestamp(site_dir.stat().st_mtime)
+            self.snapshot(sorted(p for p in site_dir.iterdir() if p.is_file()), timestamp=ts, snapshot_id=snapshot_id)
+            imported.append(snapshot_id)
+            if remove:
+                shutil.rmtree(site_dir.parent)
+        return imported
+
+
+__all__ = ["SnapshotStore", "SnapshotManifest", "RetentionPolicy", "MATERIALIZE_MODES"]
@@ -2,29 +2,45 @@
 
 from __future__ import annotations
 
+import copy
 from pathlib import Path
 from typing import Any, Dict
 
-import yaml
-
+from ..config_registry import freeze, load_config, thaw
 from ..settings import DEFAULT_INGESTION_CONFIG_PATH
 
 DEFAULT_CONFIG: Dict[str, Any] = {
     "reference_handling": {
         "mode": "tag",  # options: tag, exclude, separate
         "sheet_name_patterns": ["library", "ref", "lookup", "rate"],
-    }
+    },
+    "ocr": {
+        "cache": {
+            "enabled": True,
+            "path": None,  # default: data_processed/ocr_cache.json
+            "max_entries": 5000,
+            "max_mb": 32,
+        },
+    },
 }
 
 
+def _merge_with_defaults(data) -> Any:
+    data = thaw(data)
+    merged = copy.deepcopy(DEFAULT_CONFIG)
+    # merge nested
+    if "reference_handling" in data:
+        merged["reference_handling"].update(data.pop("reference_handling") or {})
+    if "ocr" in data:
+        ocr_data = data.pop("ocr") or {}
+        merged["ocr"]["cache"].update(ocr_data.pop("cache", None) or {})
+        merged["ocr"].update(ocr_data)
+    merged.update(data)
+    return freeze(merged)
+
+
 def load_ingestion_config(path: Path | None = None) -> Dict[str, Any]:
     cfg_path = path or DEFAULT_INGESTION_CONFIG_PATH
     if cfg_path.exists():
-        data = yaml.safe_load(cfg_path.read_text(encoding="utf-8")) or {}
-        merged = DEFAULT_CONFIG.copy()
-        merged.update(data)
-        # merge nested
-        if "reference_handling" in data:
-            merged["reference_handling"].update(data["reference_handling"] or {})
-        return merged
-    return DEFAULT_CONFIG.copy()
+        return thaw(load_config(cfg_path, _merge_with_defaults))
+    return copy.deepcopy(DEFAULT_CONFIG)
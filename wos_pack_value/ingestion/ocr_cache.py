@@ -0,0 +1,152 @@
+"""Persistent cache of raw OCR text keyed by screenshot content.
+
+Entries are keyed by the SHA-256 of the image bytes plus the OCR language and
+preprocessing settings, and store the raw tesseract text rather than parsed
+packs. Unchanged screenshots skip OCR entirely, while parser changes still
+apply because cached text is re-parsed on every run. The cache is one JSON
+file; least-recently-used entries are evicted past `max_entries`/`max_bytes`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from ..utils import load_json, save_json, timestamp
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+DEFAULT_MAX_ENTRIES = 5000
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+def image_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """Return the SHA-256 hex digest of an image file's bytes."""
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def ocr_cache_key(digest: str, lang: str, settings: Optional[Dict[str, Any]] = None) -> str:
+    """Combine image digest, language and preprocessing settings into one cache key."""
+    settings_json = json.dumps(settings or {}, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(f"{digest}|{lang}|{settings_json}".encode("utf-8")).hexdigest()
+
+
+class OcrCache:
+    """LRU-evicting OCR text cache persisted to a JSON file."""
+
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._dirty = False
+        self._entries: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if not self.path.exists():
+            return {}
+        try:
+            data = load_json(self.path)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable OCR cache %s: %s", self.path, exc)
+            return {}
+        if not isinstance(data, dict) or data.get("version") != CACHE_VERSION:
+            logger.info("OCR cache %s has an unknown format; starting empty", self.path)
+            return {}
+        entries = data.get("entries") or {}
+        return entries if isinstance(entries, dict) else {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(int(e.get("bytes", 0)) for e in self._entries.values())
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        entry["last_used"] = time.time()
+        self._dirty = True
+        return entry.get("text", "")
+
+    def put(self, key: str, text: str, source_image: str | None = None) -> None:
+        now = time.time()
+        self._entries[key] = {
+            "text": text,
+            "bytes": len(text.encode("utf-8")),
+            "source_image": source_image,
+            "created": now,
+            "last_used": now,
+        }
+        self._dirty = True
+
+    def evict(self) -> int:
+        """Drop least-recently-used entries until both limits hold; return how many were dropped."""
+        total = self.total_bytes
+        if len(self._entries) <= self.max_entries and total <= self.max_bytes:
+            return 0
+        dropped = 0
+        for key, entry in sorted(self._entries.items(), key=lambda kv: kv[1].get("last_used", 0.0)):
+            if len(self._entries) <= self.max_entries and total <= self.max_bytes:
+                break
+            total -= int(entry.get("bytes", 0))
+            del self._entries[key]
+            dropped += 1
+        self.evicted += dropped
+        self._dirty = True
+        return dropped
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        self.evict()
+        save_json(self.path, {"version": CACHE_VERSION, "updated_at": timestamp(), "entries": self._entries})
+        self._dirty = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evicted": self.evicted,
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+        }
+
+
+def open_ocr_cache(cache_config: Dict[str, Any] | None, default_path: Path) -> Optional[OcrCache]:
+    """Build a cache from the `ocr.cache` ingestion config section, or None when disabled."""
+    cfg = cache_config or {}
+    if not cfg.get("enabled", True):
+        return None
+    path = Path(cfg["path"]) if cfg.get("path") else default_path
+    return OcrCache(
+        path,
+        max_entries=int(cfg.get("max_entries", DEFAULT_MAX_ENTRIES)),
+        max_bytes=int(float(cfg.get("max_mb", DEFAULT_MAX_BYTES / (1024 * 1024))) * 1024 * 1024),
+    )
+
+
+__all__ = ["OcrCache", "image_digest", "ocr_cache_key", "open_ocr_cache"]
@@ -0,0 +1,144 @@
+"""Screenshot preprocessing and region layout for OCR.
+
+Tesseract time grows with pixel count and its accuracy drops on colourful,
+textured store art. Screenshots are downscaled so their longer side fits
+`max_long_side` pixels, converted to grayscale and thresholded before OCR.
+DPI metadata is ignored: screenshots are tagged 72/144 dpi or not at all,
+whatever their real resolution. When a game defines regions in
+`ocr.yaml` (fractional boxes for title, price and item grid), each region is
+OCR'd on its own with a page-segmentation mode suited to its layout and the
+texts are stitched back in the order `parse_ocr_text_to_pack` expects.
+"""
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..analysis.game_profiles import GameProfile, resolve_config_path
+from ..config_registry import load_config, thaw
+from ..settings import DEFAULT_OCR_CONFIG_PATH
+
+# Tesseract page-segmentation modes: 3 = automatic, 6 = uniform block, 7 = single line.
+DEFAULT_PSM = 3
+REGION_ORDER = ("title", "price", "items")
+
+
+@dataclass(frozen=True)
+class OcrRegion:
+    name: str
+    box: Tuple[float, float, float, float]  # left, top, right, bottom as fractions of width/height
+    psm: int = 6
+
+
+@dataclass(frozen=True)
+class OcrPreprocessConfig:
+    enabled: bool = True
+    max_long_side: int = 1280  # pixels; larger screenshots are downscaled to fit, 0 disables
+    grayscale: bool = True
+    threshold: Optional[int] = 160  # None disables binarization
+    psm: int = DEFAULT_PSM
+    regions: Tuple[OcrRegion, ...] = field(default_factory=tuple)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Settings fingerprint; part of the OCR cache key."""
+        return asdict(self)
+
+
+def _parse_region(name: str, entry: Dict[str, Any]) -> OcrRegion:
+    box = entry.get("box") or []
+    if len(box) != 4 or not all(0.0 <= float(v) <= 1.0 for v in box):
+        raise ValueError(f"OCR region '{name}' needs a box of four fractions [left, top, right, bottom]")
+    left, top, right, bottom = (float(v) for v in box)
+    if left >= right or top >= bottom:
+        raise ValueError(f"OCR region '{name}' has an empty box {box}")
+    return OcrRegion(name=name, box=(left, top, right, bottom), psm=int(entry.get("psm", 6)))
+
+
+def _build_ocr_config(data) -> OcrPreprocessConfig:
+    data = thaw(data)
+    pre = data.get("preprocess") or {}
+    regions = [_parse_region(name, entry or {}) for name, entry in (data.get("regions") or {}).items()]
+    # The parser reads the first line as the pack name, so the title region always goes first.
+    regions.sort(key=lambda r: REGION_ORDER.index(r.name) if r.name in REGION_ORDER else len(REGION_ORDER))
+    defaults = OcrPreprocessConfig()
+    threshold = pre.get("threshold", defaults.threshold)
+    return OcrPreprocessConfig(
+        enabled=bool(pre.get("enabled", defaults.enabled)),
+        max_long_side=int(pre.get("max_long_side", defaults.max_long_side)),
+        grayscale=bool(pre.get("grayscale", defaults.grayscale)),
+        threshold=int(threshold) if threshold is not None else None,
+        psm=int(data.get("psm", defaults.psm)),
+        regions=tuple(regions),
+    )
+
+
+def load_ocr_config(path: Path | None = None, game: GameProfile | None = None) -> OcrPreprocessConfig:
+    cfg_path = path or (resolve_config_path("ocr.yaml", game) if game else DEFAULT_OCR_CONFIG_PATH)
+    if not cfg_path.exists():
+        return OcrPreprocessConfig()
+    return load_config(cfg_path, _build_ocr_config)
+
+
+def preprocess_image(image, config: OcrPreprocessConfig):
+    """Return a downscaled, grayscale, thresholded copy of a PIL image."""
+    from PIL import Image
+
+    long_side = max(image.width, image.height)
+    scale = config.max_long_side / long_side if config.max_long_side and long_side else 1.0
+    out = image
+    if config.grayscale or config.threshold is not None:
+        out = out.convert("L")
+    if scale < 1.0:
+        size = (max(1, round(out.width * scale)), max(1, round(out.height * scale)))
+        out = out.resize(size, Image.LANCZOS)
+    if config.threshold is not None:
+        cutoff = config.threshold
+        out = out.point(lambda p: 255 if p >= cutoff else 0)
+    return out
+
+
+def crop_region(image, region: OcrRegion):
+    left, top, right, bottom = region.box
+    w, h = image.size
+    return image.crop((round(left * w), round(top * h), round(right * w), round(bottom * h)))
+
+
+def join_region_texts(texts: List[Tuple[str, str]]) -> str:
+    """Stitch per-region OCR output into one text block; the title collapses to one line."""
+    lines: List[str] = []
+    for name, text in texts:
+        region_lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+        if not region_lines:
+            continue
+        if name == "title":
+            lines.append(" ".join(region_lines))
+        else:
+            lines.extend(region_lines)
+    return "\n".join(lines)
+
+
+def ocr_image(image, lang: str, config: OcrPreprocessConfig, image_to_string) -> str:
+    """OCR a PIL image per config using `image_to_string(image, lang=..., config=...)`."""
+    if not config.enabled:
+        return image_to_string(image, lang=lang)
+    prepared = preprocess_image(image, config)
+    if not config.regions:
+        return image_to_string(prepared, lang=lang, config=f"--psm {config.psm}")
+    texts = [
+        (region.name, image_to_string(crop_region(prepared, region), lang=lang, config=f"--psm {region.psm}"))
+        for region in config.regions
+    ]
+    return join_region_texts(texts)
+
+
+__all__ = [
+    "OcrPreprocessConfig",
+    "OcrRegion",
+    "load_ocr_config",
+    "preprocess_image",
+    "crop_region",
+    "join_region_texts",
+    "ocr_image",
+]
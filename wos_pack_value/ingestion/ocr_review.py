@@ -4,7 +4,7 @@ from __future__ import annotations
 
 import logging
 from pathlib import Path
-from typing import Dict, Iterable, List
+from typing import Any, Dict, Iterable, List, Optional
 
 from ..models.domain import Pack, PackItem
 from ..settings import DEFAULT_OCR_REVIEWED, DEFAULT_OCR_REVIEW_RAW, DATA_REVIEW_DIR
@@ -13,8 +13,14 @@ from ..utils import ensure_dir, load_json, save_json, slugify, timestamp
 logger = logging.getLogger(__name__)
 
 
-def dump_raw_ocr_packs(packs: Iterable[Pack], lang: str = "eng", path: Path | None = None) -> Path:
-    """Write raw OCR-detected packs to a review JSON file."""
+def dump_raw_ocr_packs(
+    packs: Iterable[Pack],
+    lang: str = "eng",
+    path: Path | None = None,
+    failures: Optional[Iterable[Dict[str, Any]]] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> Path:
+    """Write raw OCR-detected packs (plus failed images and batch stats) to a review JSON file."""
     ensure_dir(DATA_REVIEW_DIR)
     out_path = path or DEFAULT_OCR_REVIEW_RAW
     payload = []
@@ -27,11 +33,25 @@ def dump_raw_ocr_packs(packs: Iterable[Pack], lang: str = "eng", path: Path | No
                 "price_ocr": pack.price,
                 "currency_ocr": pack.currency,
                 "items_ocr": [{"name": it.name, "quantity": it.quantity} for it in pack.items],
-                "metadata": {"ocr_language": lang, "timestamp": timestamp()},
+                "metadata": {
+                    "ocr_language": lang,
+                    "timestamp": timestamp(),
+                    "ocr_seconds": pack.meta.get("ocr_seconds"),
+                },
             }
         )
-    save_json(out_path, payload)
-    logger.info("Wrote raw OCR review dump to %s (%s packs)", out_path, len(payload))
+    failure_list = list(failures or [])
+    save_json(
+        out_path,
+        {
+            "generated_at": timestamp(),
+            "ocr_language": lang,
+            "stats": stats or {},
+            "packs": payload,
+            "failures": failure_list,
+        },
+    )
+    logger.info("Wrote raw OCR review dump to %s (%s packs, %s failures)", out_path, len(payload), len(failure_list))
     return out_path
 
 
@@ -7,11 +7,13 @@ from pathlib import Path
 from typing import List, Tuple
 
 from ..models.domain import ItemDefinition, Pack
+from ..profiling import RunMetrics, stage
 from ..settings import (
     DATA_PROCESSED_DIR,
     DATA_RAW_DIR,
     DEFAULT_PROCESSED_ITEMS,
     DEFAULT_PROCESSED_PACKS,
+    DEFAULT_OCR_CACHE,
     DEFAULT_OCR_REVIEW_RAW,
     DEFAULT_OCR_REVIEWED,
     IMAGES_RAW_DIR,
@@ -20,7 +22,9 @@ from ..settings import (
 from ..utils import ensure_dir, save_json, timestamp
 from .config import load_ingestion_config
 from .ocr_review import dump_raw_ocr_packs, load_reviewed_ocr_packs
-from .ocr import ingest_screenshots
+from .ocr import ocr_screenshots
+from .ocr_cache import open_ocr_cache
+from .ocr_preprocess import OcrPreprocessConfig, load_ocr_config
 from .tabular import parse_file
 
 logger = logging.getLogger(__name__)
@@ -54,6 +58,10 @@ def ingest_all(
     ingestion_config_data: dict | None = None,
     ocr_review_dump_path: Path | None = None,
     ocr_reviewed_path: Path | None = None,
+    metrics: RunMetrics | None = None,
+    ocr_workers: int | None = None,
+    use_ocr_cache: bool = True,
+    ocr_config: OcrPreprocessConfig | None = None,
 ) -> Tuple[List[Pack], List[ItemDefinition]]:
     ensure_dir(raw_dir)
     ensure_dir(processed_dir)
@@ -65,39 +73,64 @@ def ingest_all(
     for path in sorted(raw_dir.iterdir()):
         if not path.is_file():
             continue
-        packs.extend(
-            parse_file(
+        with stage(metrics, f"parse:{path.name}") as timing:
+            file_packs = parse_file(
                 path,
                 images_dir=images_dir,
                 default_currency=default_currency,
                 reference_config=ref_config,
+                metrics=metrics,
             )
-        )
+            timing.items = len(file_packs)
+        packs.extend(file_packs)
 
     if use_ocr:
         reviewed_packs = load_reviewed_ocr_packs(ocr_reviewed_path or DEFAULT_OCR_REVIEWED)
         reviewed_sources = {p.source_file for p in reviewed_packs if p.source_file}
         packs.extend(reviewed_packs)
 
-        raw_ocr_packs = ingest_screenshots(
-            screenshots_dir=screenshots_dir or SCREENSHOTS_DIR,
-            default_currency=default_currency,
-            lang=ocr_lang,
-        )
+        ocr_cache = None
+        if use_ocr_cache:
+            ocr_cache = open_ocr_cache(
+                ingestion_config.get("ocr", {}).get("cache"), processed_dir / DEFAULT_OCR_CACHE.name
+            )
+        with stage(metrics, "ocr") as timing:
+            ocr_result = ocr_screenshots(
+                screenshots_dir=screenshots_dir or SCREENSHOTS_DIR,
+                default_currency=default_currency,
+                lang=ocr_lang,
+                workers=ocr_workers,
+                cache=ocr_cache,
+                preprocess=ocr_config or load_ocr_config(),
+            )
+            raw_ocr_packs = ocr_result.packs
+            timing.items = len(raw_ocr_packs) + len(ocr_result.failures)
         # Prefer reviewed packs; only keep raw OCR packs without a reviewed counterpart
         for rp in raw_ocr_packs:
             if rp.source_file and rp.source_file in reviewed_sources:
                 continue
             packs.append(rp)
-        if raw_ocr_packs:
-            dump_raw_ocr_packs(raw_ocr_packs, lang=ocr_lang, path=ocr_review_dump_path or DEFAULT_OCR_REVIEW_RAW)
+        if raw_ocr_packs or ocr_result.failures:
+            dump_raw_ocr_packs(
+                raw_ocr_packs,
+                lang=ocr_lang,
+                path=ocr_review_dump_path or DEFAULT_OCR_REVIEW_RAW,
+                failures=[f.to_dict() for f in ocr_result.failures],
+                stats=ocr_result.stats(),
+            )
 
     item_defs = build_item_definitions(packs)
     logger.info("Ingested %s packs (%s items)", len(packs), sum(len(p.items) for p in packs))
 
     if persist:
         ensure_dir(processed_dir)
-        save_json(DEFAULT_PROCESSED_PACKS, {"generated_at": timestamp(), "packs": [p.dict() for p in packs]})
-        save_json(DEFAULT_PROCESSED_ITEMS, {"generated_at": timestamp(), "items": [i.dict() for i in item_defs]})
+        save_json(
+            processed_dir / DEFAULT_PROCESSED_PACKS.name,
+            {"generated_at": timestamp(), "packs": [p.dict() for p in packs]},
+        )
+        save_json(
+            processed_dir / DEFAULT_PROCESSED_ITEMS.name,
+            {"generated_at": timestamp(), "items": [i.dict() for i in item_defs]},
+        )
 
     return packs, item_defs
@@ -10,6 +10,7 @@ import pandas as pd
 from openpyxl import load_workbook
 
 from ..models.domain import Pack, PackItem
+from ..profiling import RunMetrics, stage
 from ..utils import ensure_dir, slugify
 
 logger = logging.getLogger(__name__)
@@ -343,6 +344,7 @@ def parse_excel(
     images_dir: Path,
     default_currency: str = "USD",
     reference_config: Dict | None = None,
+    metrics: RunMetrics | None = None,
 ) -> List[Pack]:
     logger.info("Ingesting Excel %s", path.name)
     workbook = load_workbook(path, data_only=True)
@@ -353,7 +355,8 @@ def parse_excel(
         ws = workbook[sheet_name]
         image_pairs = _extract_images(ws, images_dir, f"{path.stem}_{slugify(sheet_name)}")
         image_map = {row: file for row, file in image_pairs if row is not None}
-        tables = _sheet_tables(ws, sheet_name, reference_config)
+        with stage(metrics, f"tables:{sheet_name}", items=ws.max_row):
+            tables = _sheet_tables(ws, sheet_name, reference_config)
         for idx, (df, row_numbers, pack_hint, is_ref) in enumerate(tables, start=1):
             if df.empty:
                 continue
@@ -371,11 +374,18 @@ def parse_file(
     images_dir: Path,
     default_currency: str = "USD",
     reference_config: Dict | None = None,
+    metrics: RunMetrics | None = None,
 ) -> List[Pack]:
     suffix = path.suffix.lower()
     if suffix in {".csv", ".tsv"}:
         return parse_csv(path, default_currency=default_currency)
     if suffix in {".xlsx", ".xlsm"}:
-        return parse_excel(path, images_dir=images_dir, default_currency=default_currency, reference_config=reference_config)
+        return parse_excel(
+            path,
+            images_dir=images_dir,
+            default_currency=default_currency,
+            reference_config=reference_config,
+            metrics=metrics,
+        )
     logger.warning("Skipping unsupported file: %s", path.name)
     return []
@@ -1,17 +1,23 @@
 """Knowledge base utilities (schemas, ingestion, linking)."""
 
 from .schemas import KnowledgeEntity
-from .loader import save_knowledge_entities, load_knowledge_entities
+from .loader import save_knowledge_entities, load_knowledge_entities, save_knowledge_shards, load_knowledge_shards
 from .github_ingestion import extract_knowledge_from_github_root
 from .web_scraping import scrape_wosnerds, scrape_wiki
-from .linking import build_item_to_knowledge_links
+from .store import KnowledgeStore, open_knowledge_store
+from .linking import KnowledgeLinkIndex, build_item_to_knowledge_links
 
 __all__ = [
     "KnowledgeEntity",
     "save_knowledge_entities",
     "load_knowledge_entities",
+    "save_knowledge_shards",
+    "load_knowledge_shards",
     "extract_knowledge_from_github_root",
     "scrape_wosnerds",
     "scrape_wiki",
+    "KnowledgeStore",
+    "open_knowledge_store",
+    "KnowledgeLinkIndex",
     "build_item_to_knowledge_links",
 ]
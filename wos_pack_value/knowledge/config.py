@@ -2,10 +2,10 @@
 
 from __future__ import annotations
 
-import yaml
 from pathlib import Path
 from typing import Any, Dict
 
+from ..config_registry import load_config, thaw
 from ..settings import CONFIG_DIR
 from ..analysis.game_profiles import GameProfile
 
@@ -14,9 +14,9 @@ def load_external_sources_config(config_root: Path = CONFIG_DIR, game: GameProfi
     path = config_root / "external_sources.yaml"
     if not path.exists():
         return {}
-    data = yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+    data = load_config(path)
     game_key = game.key if game else None
-    return (data.get("games", {}) or {}).get(game_key, {})
+    return thaw((data.get("games", {}) or {}).get(game_key, {}))
 
 
 __all__ = ["load_external_sources_config"]
@@ -0,0 +1,223 @@
+"""Concurrent page fetcher with an on-disk HTTP cache for knowledge scraping.
+
+Pages are fetched from an asyncio event loop: a semaphore bounds the number
+of requests in flight, and a per-host limiter spaces requests to the same
+host by `1 / per_host_rps` seconds. Each response is cached on disk (one JSON
+file per URL) with its ETag/Last-Modified validators:
+
+- within `ttl_seconds` of the last fetch, the cached body is used without
+  any request ("fresh");
+- after that, a conditional request is sent, and a 304 refreshes the entry
+  ("revalidated") without downloading the body again.
+
+A result is `changed` only when the body differs from the cached one, so
+callers can keep derived data (parsed entities) next to the entry and skip
+re-parsing unchanged pages. `requests` is blocking, so each request runs in
+the default thread pool; the event loop only schedules and rate-limits.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+import requests
+
+from ..settings import DEFAULT_HTTP_CACHE_DIR
+from ..utils import load_json, save_json
+
+logger = logging.getLogger(__name__)
+
+CACHE_VERSION = 1
+
+
+@dataclass(frozen=True)
+class FetchConfig:
+    concurrency: int = 8
+    per_host_rps: float = 2.0  # 0 disables rate limiting
+    timeout: float = 10.0
+    ttl_seconds: float = 24 * 3600
+    cache_dir: Optional[Path] = DEFAULT_HTTP_CACHE_DIR  # None disables the cache
+    user_agent: str = "wos-pack-value knowledge scraper"
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "FetchConfig":
+        data = data or {}
+        defaults = cls()
+        cache_dir = data.get("cache_dir", defaults.cache_dir)
+        return cls(
+            concurrency=max(1, int(data.get("concurrency", defaults.concurrency))),
+            per_host_rps=float(data.get("per_host_rps", defaults.per_host_rps)),
+            timeout=float(data.get("timeout", defaults.timeout)),
+            ttl_seconds=float(data.get("ttl_hours", defaults.ttl_seconds / 3600)) * 3600,
+            cache_dir=Path(cache_dir) if cache_dir else None,
+            user_agent=str(data.get("user_agent", defaults.user_agent)),
+        )
+
+
+class HttpCache:
+    """One JSON file per URL under `root`: body, validators, fetch time and caller extras."""
+
+    def __init__(self, root: Path) -> None:
+        self.root = root
+
+    def _path(self, url: str) -> Path:
+        return self.root / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        path = self._path(url)
+        if not path.exists():
+            return None
+        try:
+            entry = load_json(path)
+        except (OSError, ValueError) as exc:
+            logger.warning("Ignoring unreadable HTTP cache entry %s: %s", path, exc)
+            return None
+        if entry.get("version") != CACHE_VERSION or entry.get("url") != url:
+            return None
+        return entry
+
+    def put(self, url: str, entry: Dict[str, Any]) -> None:
+        save_json(self._path(url), {**entry, "version": CACHE_VERSION, "url": url})
+
+
+@dataclass
+class FetchResult:
+    url: str
+    status: str  # "fresh" (TTL hit), "revalidated" (304), "fetched" (200)
+    body: str
+    changed: bool  # body differs from the cached copy (always True without one)
+    entry: Dict[str, Any] = field(default_factory=dict)  # cache entry; callers may add extras before `store`
+
+
+@dataclass
+class FetchMetrics:
+    pages: int = 0
+    requests: int = 0
+    fresh: int = 0
+    revalidated: int = 0
+    fetched: int = 0
+    bytes_downloaded: int = 0
+    seconds: float = 0.0
+
+    @property
+    def cache_hits(self) -> int:
+        return self.fresh + self.revalidated
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "pages": self.pages,
+            "requests": self.requests,
+            "fresh": self.fresh,
+            "revalidated": self.revalidated,
+            "fetched": self.fetched,
+            "bytes_downloaded": self.bytes_downloaded,
+            "seconds": round(self.seconds, 4),
+            "pages_per_second": round(self.pages / self.seconds, 2) if self.seconds else None,
+            "cache_hit_ratio": round(self.cache_hits / self.pages, 4) if self.pages else None,
+        }
+
+    def summary(self) -> str:
+        d = self.to_dict()
+        return (
+            f"{d['pages']} page(s) in {d['seconds']:.2f}s ({d['pages_per_second'] or 0} pages/s); "
+            f"{d['fresh']} fresh, {d['revalidated']} revalidated, {d['fetched']} downloaded"
+        )
+
+
+class _HostLimiter:
+    """Hands out request slots spaced `interval` seconds apart per host."""
+
+    def __init__(self, per_host_rps: float) -> None:
+        self.interval = 1.0 / per_host_rps if per_host_rps > 0 else 0.0
+        self._next: Dict[str, float] = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, host: str) -> None:
+        if not self.interval:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._lock:
+            now = loop.time()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class PageFetcher:
+    """Fetch many URLs concurrently through the HTTP cache."""
+
+    def __init__(self, config: FetchConfig | None = None, session: requests.Session | None = None) -> None:
+        self.config = config or FetchConfig()
+        self.cache = HttpCache(self.config.cache_dir) if self.config.cache_dir else None
+        self.session = session or requests.Session()
+        self.session.headers.setdefault("User-Agent", self.config.user_agent)
+        self.metrics = FetchMetrics()
+
+    def store(self, result: FetchResult) -> None:
+        """Persist `result.entry` (including any extras the caller attached)."""
+        if self.cache is not None:
+            self.cache.put(result.url, result.entry)
+
+    def _request(self, url: str, headers: Dict[str, str]) -> requests.Response:
+        return self.session.get(url, headers=headers, timeout=self.config.timeout)
+
+    async def _fetch(self, url: str, semaphore: asyncio.Semaphore, limiter: _HostLimiter) -> FetchResult:
+        cached = self.cache.get(url) if self.cache is not None else None
+        now = time.time()
+        if cached and now - float(cached.get("fetched_at", 0)) < self.config.ttl_seconds:
+            self.metrics.fresh += 1
+            return FetchResult(url, "fresh", cached["body"], changed=False, entry=cached)
+
+        headers: Dict[str, str] = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        async with semaphore:
+            await limiter.wait(urlsplit(url).netloc)
+            resp = await asyncio.get_running_loop().run_in_executor(None, self._request, url, headers)
+        self.metrics.requests += 1
+
+        if resp.status_code == 304 and cached:
+            self.metrics.revalidated += 1
+            entry = {**cached, "fetched_at": now}
+            return FetchResult(url, "revalidated", cached["body"], changed=False, entry=entry)
+        resp.raise_for_status()
+        self.metrics.fetched += 1
+        self.metrics.bytes_downloaded += len(resp.content)
+        body = resp.text
+        entry = {
+            "body": body,
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "fetched_at": now,
+        }
+        changed = not cached or cached.get("body") != body
+        if not changed:
+            entry = {**cached, **entry}  # same body: keep the caller's extras
+        return FetchResult(url, "fetched", body, changed=changed, entry=entry)
+
+    async def fetch_all_async(self, urls: Sequence[str]) -> List[FetchResult]:
+        semaphore = asyncio.Semaphore(self.config.concurrency)
+        limiter = _HostLimiter(self.config.per_host_rps)
+        return list(await asyncio.gather(*(self._fetch(url, semaphore, limiter) for url in urls)))
+
+    def fetch_all(self, urls: Sequence[str]) -> List[FetchResult]:
+        """Fetch `urls` (results in input order) and update `self.metrics`."""
+        start = time.perf_counter()
+        results = asyncio.run(self.fetch_all_async(urls))
+        self.metrics.pages += len(results)
+        self.metrics.seconds += time.perf_counter() - start
+        logger.info("Fetched %s", self.metrics.summary())
+        return results
+
+
+__all__ = ["FetchConfig", "FetchMetrics", "FetchResult", "HttpCache", "PageFetcher"]
@@ -1,32 +1,63 @@
-"""Lightweight linking between items and knowledge entities."""
+"""Lightweight linking between items and knowledge entities.
+
+Rules: a hero links to every item whose (lowercased) name contains the hero
+name; any other entity links to items with exactly its name. Instead of
+checking every entity against every item, `KnowledgeLinkIndex` keeps a hash
+map of exact names and an Aho–Corasick automaton over hero names, so each
+item name is looked up once and scanned once, whatever the number of
+entities.
+"""
 
 from __future__ import annotations
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Sequence
 
+from ..matching import AhoCorasick
 from .schemas import KnowledgeEntity
 
 
+class KnowledgeLinkIndex:
+    """Entities indexed for linking; matches come back in the original entity order."""
+
+    def __init__(self, entities: Sequence[KnowledgeEntity]) -> None:
+        self._ids = [ent.id for ent in entities]
+        self._exact: Dict[str, List[int]] = {}
+        self._any_name: List[int] = []  # heroes with an empty name match every named item
+        self._heroes = AhoCorasick()
+        for pos, ent in enumerate(entities):
+            name = ent.name.lower()
+            if ent.entity_type != "hero":
+                self._exact.setdefault(name, []).append(pos)
+            elif name:
+                self._heroes.add(name, pos)
+            else:
+                self._any_name.append(pos)
+        self._heroes.build()
+
+    def match(self, name: str) -> List[str]:
+        """Entity ids linked to an item name (already lowercased)."""
+        positions: Iterable[int] = self._exact.get(name, [])
+        if name:
+            hits = self._heroes.search(name)
+            if hits or self._any_name:
+                positions = sorted(hits.union(positions, self._any_name))
+        return [self._ids[pos] for pos in positions]
+
+
 def build_item_to_knowledge_links(
     items: List[Dict[str, Any]], knowledge_entities: List[KnowledgeEntity]
 ) -> Dict[str, List[str]]:
     links: Dict[str, List[str]] = {}
     if not items or not knowledge_entities:
         return links
+    index = KnowledgeLinkIndex(knowledge_entities)
     for item in items:
         name = str(item.get("name", "")).lower()
         item_id = item.get("id") or item.get("item_id") or item.get("name")
-        matched = []
-        for ent in knowledge_entities:
-            if ent.entity_type == "hero":
-                if name and ent.name.lower() in name:
-                    matched.append(ent.id)
-            else:
-                if name == ent.name.lower():
-                    matched.append(ent.id)
+        matched = index.match(name)
         if matched and item_id:
             links[item_id] = matched
     return links
 
 
-__all__ = ["build_item_to_knowledge_links"]
+__all__ = ["AhoCorasick", "KnowledgeLinkIndex", "build_item_to_knowledge_links"]
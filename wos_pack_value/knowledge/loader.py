@@ -1,14 +1,26 @@
-"""Serialize/deserialize knowledge entities."""
+"""Serialize/deserialize knowledge entities.
+
+Besides the monolithic `all_entities.json`, entities can be exported as
+per-type shards: `index.json` lists every entity's id, type and name and
+points to one `shards/<type>.<hash>.json` file per entity type. Shard names
+carry a hash of their content, so they can be cached forever and only change
+when their entities do. `raw` (usually a copy of `attributes`) is left out of
+shards unless `include_raw` is set.
+"""
 
 from __future__ import annotations
 
+import hashlib
 import json
 from pathlib import Path
-from typing import Iterable, List
+from typing import Any, Dict, Iterable, List, Optional, Sequence
 
 from .schemas import KnowledgeEntity
 from ..utils import ensure_dir
 
+INDEX_NAME = "index.json"
+SHARDS_DIR = "shards"
+
 
 def save_knowledge_entities(path: Path, entities: Iterable[KnowledgeEntity]) -> None:
     ensure_dir(path.parent)
@@ -24,4 +36,72 @@ def load_knowledge_entities(path: Path) -> List[KnowledgeEntity]:
     return entities
 
 
-__all__ = ["save_knowledge_entities", "load_knowledge_entities"]
+def _shard_slug(entity_type: str) -> str:
+    slug = "".join(ch if ch.isalnum() or ch in "-_" else "-" for ch in (entity_type or "unknown").lower())
+    return slug or "unknown"
+
+
+def save_knowledge_shards(
+    knowledge_dir: Path, entities: Sequence[KnowledgeEntity], include_raw: bool = False
+) -> Dict[str, Any]:
+    """Write `index.json` plus one content-hashed shard per entity type; return the index.
+
+    Shard files from earlier exports that the new index no longer references are removed.
+    """
+    shards_dir = knowledge_dir / SHARDS_DIR
+    ensure_dir(shards_dir)
+    by_type: Dict[str, List[Dict[str, Any]]] = {}
+    for ent in entities:
+        record = ent.dict()
+        if not include_raw:
+            record.pop("raw", None)
+        by_type.setdefault(ent.entity_type or "unknown", []).append(record)
+
+    shards: Dict[str, Dict[str, Any]] = {}
+    for entity_type in sorted(by_type):
+        body = json.dumps(
+            {"entity_type": entity_type, "entities": by_type[entity_type]}, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        digest = hashlib.sha256(body).hexdigest()
+        name = f"{_shard_slug(entity_type)}.{digest[:12]}.json"
+        if not (shards_dir / name).exists():
+            (shards_dir / name).write_bytes(body)
+        shards[entity_type] = {"file": f"{SHARDS_DIR}/{name}", "count": len(by_type[entity_type]), "sha256": digest}
+
+    index = {
+        "include_raw": include_raw,
+        "shards": shards,
+        "entities": [{"id": e.id, "type": e.entity_type, "name": e.name} for e in entities],
+    }
+    (knowledge_dir / INDEX_NAME).write_text(json.dumps(index, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+    referenced = {Path(s["file"]).name for s in shards.values()}
+    for stale in shards_dir.glob("*.json"):
+        if stale.name not in referenced:
+            stale.unlink()
+    return index
+
+
+def load_knowledge_index(knowledge_dir: Path) -> Dict[str, Any]:
+    return json.loads((knowledge_dir / INDEX_NAME).read_text(encoding="utf-8"))
+
+
+def load_knowledge_shards(knowledge_dir: Path, entity_types: Optional[Iterable[str]] = None) -> List[KnowledgeEntity]:
+    """Entities from the shards of `entity_types` (all types when None); `raw` is {} if it was not exported."""
+    index = load_knowledge_index(knowledge_dir)
+    wanted = set(entity_types) if entity_types is not None else None
+    entities: List[KnowledgeEntity] = []
+    for entity_type, shard in index.get("shards", {}).items():
+        if wanted is not None and entity_type not in wanted:
+            continue
+        data = json.loads((knowledge_dir / shard["file"]).read_text(encoding="utf-8"))
+        entities.extend(KnowledgeEntity(**entry) for entry in data.get("entities", []))
+    return entities
+
+
+__all__ = [
+    "load_knowledge_entities",
+    "load_knowledge_index",
+    "load_knowledge_shards",
+    "save_knowledge_entities",
+    "save_knowledge_shards",
+]
@@ -2,6 +2,8 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
 from dataclasses import dataclass, field, asdict
 from typing import Any, Dict, List
 
@@ -20,3 +22,9 @@ class KnowledgeEntity:
 
     def dict(self) -> Dict[str, Any]:
         return asdict(self)
+
+
+def stable_entity_id(prefix: str, *parts: Any) -> str:
+    """`<prefix>-<12 hex chars>` from a SHA-1 of the parts; identical across runs (unlike `hash()`)."""
+    payload = json.dumps(parts, sort_keys=True, default=str, ensure_ascii=False)
+    return f"{prefix}-{hashlib.sha1(payload.encode('utf-8')).hexdigest()[:12]}"
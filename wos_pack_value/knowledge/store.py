@@ -0,0 +1,287 @@
+"""SQLite store for knowledge entities, with an FTS5 name/attribute index.
+
+`all_entities.json` stays the portable export, but consumers that only need a
+few entities or a few fields query `entities.sqlite` next to it instead of
+parsing the whole file:
+
+- `get_many(ids, fields=...)` / `query(entity_type=..., name=..., source=...)`
+  select only the requested columns; `tags`, `attributes` and `raw` are JSON
+  and decoded only when asked for.
+- `search(text)` runs a full-text query over names, tags and attribute values.
+
+The store is derived data. `build-knowledge` writes it along with the JSON
+export, and `open_knowledge_store` (re)imports the newest export
+(`all_entities.json` or the sharded `index.json`) when the store is missing
+or was built from something else.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import re
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from .loader import INDEX_NAME, load_knowledge_entities, load_knowledge_shards
+from .schemas import KnowledgeEntity
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+STORE_NAME = "entities.sqlite"
+ENTITIES_JSON_NAME = "all_entities.json"
+FIELDS = ("id", "game", "entity_type", "name", "source", "source_detail", "tags", "attributes", "raw")
+JSON_FIELDS = ("tags", "attributes", "raw")
+DEFAULT_FIELDS = ("id", "entity_type", "name")
+_MAX_VARIABLES = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entities (
+    rowid INTEGER PRIMARY KEY,
+    id TEXT NOT NULL,
+    game TEXT,
+    entity_type TEXT,
+    name TEXT,
+    name_lower TEXT,
+    source TEXT,
+    source_detail TEXT,
+    tags TEXT,
+    attributes TEXT,
+    raw TEXT
+);
+CREATE INDEX IF NOT EXISTS entities_by_id ON entities (id);
+CREATE INDEX IF NOT EXISTS entities_by_type ON entities (entity_type, name_lower);
+CREATE INDEX IF NOT EXISTS entities_by_name ON entities (name_lower);
+CREATE INDEX IF NOT EXISTS entities_by_source ON entities (source);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+_FTS_SCHEMA = "CREATE VIRTUAL TABLE IF NOT EXISTS entities_fts USING fts5(name, tags, attributes, content='')"
+
+
+def _fts_query(text: str) -> str:
+    """Prefix match on every word, e.g. 'gina sk' -> '"gina"* "sk"*' (no FTS syntax leaks through)."""
+    return " ".join(f'"{token}"*' for token in re.findall(r"\w+", text.lower()))
+
+
+class KnowledgeStore:
+    """Knowledge entities indexed by id, type, name and source, plus full-text search."""
+
+    def __init__(self, db_path: Path) -> None:
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(db_path))
+        self.conn.row_factory = sqlite3.Row
+        self._init_schema()
+
+    @classmethod
+    def for_knowledge_dir(cls, knowledge_dir: Path) -> "KnowledgeStore":
+        return cls(knowledge_dir / STORE_NAME)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "KnowledgeStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _init_schema(self) -> None:
+        version = self.conn.execute("PRAGMA user_version").fetchone()[0]
+        if version not in (0, SCHEMA_VERSION):
+            # Derived data: rebuild rather than migrate.
+            self.conn.executescript(
+                "DROP TABLE IF EXISTS entities; DROP TABLE IF EXISTS entities_fts; DROP TABLE IF EXISTS meta;"
+            )
+        self.conn.executescript(_SCHEMA)
+        self.conn.execute(_FTS_SCHEMA)
+        self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        self.conn.commit()
+
+    # -- writing --
+
+    def replace_all(self, entities: Iterable[KnowledgeEntity], source_key: Optional[str] = None) -> int:
+        """Replace the store's contents; `source_key` records what it was built from."""
+        rows = []
+        fts_rows = []
+        for rowid, ent in enumerate(entities, start=1):
+            attributes = json.dumps(ent.attributes, ensure_ascii=False, default=str)
+            tags = json.dumps(ent.tags, ensure_ascii=False)
+            rows.append(
+                (
+                    rowid,
+                    ent.id,
+                    ent.game,
+                    ent.entity_type,
+                    ent.name,
+                    (ent.name or "").lower(),
+                    ent.source,
+                    ent.source_detail,
+                    tags,
+                    attributes,
+                    json.dumps(ent.raw, ensure_ascii=False, default=str),
+                )
+            )
+            fts_rows.append(
+                (rowid, ent.name or "", " ".join(map(str, ent.tags)), " ".join(map(str, ent.attributes.values())))
+            )
+        with self.conn:
+            self.conn.execute("DELETE FROM entities")
+            # A contentless FTS table cannot DELETE; recreate it instead.
+            self.conn.execute("DROP TABLE IF EXISTS entities_fts")
+            self.conn.execute(_FTS_SCHEMA)
+            self.conn.executemany(f"INSERT INTO entities VALUES ({', '.join('?' * 11)})", rows)
+            self.conn.executemany(
+                "INSERT INTO entities_fts (rowid, name, tags, attributes) VALUES (?, ?, ?, ?)", fts_rows
+            )
+            self.conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('source_key', ?)", (source_key,))
+        return len(rows)
+
+    def source_key(self) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'source_key'").fetchone()
+        return row[0] if row else None
+
+    # -- reading --
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM entities").fetchone()[0]
+
+    @staticmethod
+    def _columns(fields: Sequence[str]) -> str:
+        unknown = [f for f in fields if f not in FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown entity field(s): {', '.join(unknown)}. Known: {', '.join(FIELDS)}")
+        return ", ".join(f"e.{f}" for f in fields)
+
+    @staticmethod
+    def _decode(row: sqlite3.Row, fields: Sequence[str]) -> Dict[str, Any]:
+        out = {}
+        for f in fields:
+            value = row[f]
+            out[f] = json.loads(value) if f in JSON_FIELDS and value is not None else value
+        return out
+
+    def get_many(self, ids: Iterable[str], fields: Sequence[str] = DEFAULT_FIELDS) -> Dict[str, Dict[str, Any]]:
+        """id -> {field: value} for the ids present (the last entity wins when ids repeat, as in the JSON)."""
+        wanted = list(dict.fromkeys(ids))
+        cols = self._columns(tuple(dict.fromkeys(("id", *fields))))
+        out: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(wanted), _MAX_VARIABLES):
+            chunk = wanted[start : start + _MAX_VARIABLES]
+            rows = self.conn.execute(
+                f"SELECT {cols} FROM entities e WHERE e.id IN ({', '.join('?' * len(chunk))}) ORDER BY e.rowid",
+                chunk,
+            )
+            for row in rows:
+                out[row["id"]] = self._decode(row, fields)
+        return out
+
+    def get(self, entity_id: str) -> Optional[KnowledgeEntity]:
+        found = self.get_many([entity_id], fields=FIELDS)
+        return KnowledgeEntity(**found[entity_id]) if entity_id in found else None
+
+    def query(
+        self,
+        *,
+        entity_type: Optional[str] = None,
+        name: Optional[str] = None,
+        source: Optional[str] = None,
+        game: Optional[str] = None,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Entities matching every given filter; `name` is matched case-insensitively."""
+        clauses, params = [], []
+        for column, value in (("entity_type", entity_type), ("name_lower", name), ("source", source), ("game", game)):
+            if value is not None:
+                clauses.append(f"e.{column} = ?")
+                params.append(value.lower() if column == "name_lower" else value)
+        sql = f"SELECT {self._columns(fields)} FROM entities e"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY e.rowid"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        return [self._decode(row, fields) for row in self.conn.execute(sql, params)]
+
+    def search(
+        self,
+        text: str,
+        *,
+        entity_type: Optional[str] = None,
+        fields: Sequence[str] = DEFAULT_FIELDS,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """Full-text search over names, tags and attribute values, best matches first."""
+        match = _fts_query(text)
+        if not match:
+            return []
+        sql = (
+            f"SELECT {self._columns(fields)} FROM entities_fts f JOIN entities e ON e.rowid = f.rowid "
+            "WHERE entities_fts MATCH ?"
+        )
+        params: List[Any] = [match]
+        if entity_type is not None:
+            sql += " AND e.entity_type = ?"
+            params.append(entity_type)
+        sql += " ORDER BY bm25(entities_fts, 10.0, 2.0, 1.0) LIMIT ?"
+        params.append(int(limit))
+        return [self._decode(row, fields) for row in self.conn.execute(sql, params)]
+
+    def counts(self) -> Dict[str, int]:
+        """Entity count per type."""
+        rows = self.conn.execute("SELECT entity_type, COUNT(*) FROM entities GROUP BY entity_type ORDER BY entity_type")
+        return {row[0]: row[1] for row in rows}
+
+
+def _export_source(knowledge_dir: Path) -> Optional[Path]:
+    """The newest knowledge export: `all_entities.json` or the sharded `index.json`."""
+    candidates = [p for p in (knowledge_dir / ENTITIES_JSON_NAME, knowledge_dir / INDEX_NAME) if p.exists()]
+    return max(candidates, key=lambda p: p.stat().st_mtime_ns) if candidates else None
+
+
+def _source_key(path: Path) -> str:
+    st = path.stat()
+    return f"{path.name}:{st.st_mtime_ns}:{st.st_size}"
+
+
+def open_knowledge_store(knowledge_dir: Path) -> Optional[KnowledgeStore]:
+    """Open `<knowledge_dir>/entities.sqlite`, importing the JSON export if the store is missing or stale.
+
+    Returns None when there is neither a store nor a JSON export.
+    """
+    source = _export_source(knowledge_dir)
+    db_path = knowledge_dir / STORE_NAME
+    if not db_path.exists() and source is None:
+        return None
+    store = KnowledgeStore(db_path)
+    if source is not None:
+        key = _source_key(source)
+        if store.source_key() != key:
+            if source.name == INDEX_NAME:
+                entities = load_knowledge_shards(knowledge_dir)
+            else:
+                entities = load_knowledge_entities(source)
+            count = store.replace_all(entities, source_key=key)
+            logger.info("Imported %s knowledge entities from %s into %s", count, source, db_path)
+    return store
+
+
+def write_knowledge_store(knowledge_dir: Path, entities: Sequence[KnowledgeEntity]) -> Path:
+    """Rebuild the store for entities just exported to `knowledge_dir`."""
+    source = _export_source(knowledge_dir)
+    with KnowledgeStore.for_knowledge_dir(knowledge_dir) as store:
+        store.replace_all(entities, source_key=_source_key(source) if source is not None else None)
+        return store.db_path
+
+
+__all__ = [
+    "DEFAULT_FIELDS",
+    "FIELDS",
+    "KnowledgeStore",
+    "open_knowledge_store",
+    "write_knowledge_store",
+]
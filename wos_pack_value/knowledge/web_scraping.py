@@ -1,7 +1,9 @@
 """Web scraping helpers for wosnerds.com and whiteoutsurvival.wiki.
 
-These functions are intentionally simple and should be mocked in tests; they
-are not called automatically in CI.
+Pages go through `fetcher.PageFetcher` (concurrent, rate-limited, cached on
+disk). Parsed entities are stored next to each cached page, so pages whose
+body did not change are not parsed again. Tests run them against a local
+HTTP server; they are not called automatically in CI.
 """
 
 from __future__ import annotations
@@ -9,10 +11,10 @@ from __future__ import annotations
 import logging
 from typing import List, Optional
 
-import requests
 from bs4 import BeautifulSoup  # type: ignore
 
-from .schemas import KnowledgeEntity
+from .fetcher import PageFetcher
+from .schemas import KnowledgeEntity, stable_entity_id
 
 logger = logging.getLogger(__name__)
 
@@ -30,7 +32,7 @@ def _parse_tables_from_html(game: str, html: str, source: str, detail: str) -> L
             name = row_dict.get("Name") or row_dict.get("Hero") or row_dict.get("Building") or row_dict.get("Title") or f"row_{t_idx}_{r_idx}"
             entities.append(
                 KnowledgeEntity(
-                    id=f"{source}-{t_idx}-{r_idx}-{hash(name)}",
+                    id=stable_entity_id(f"{source}-{t_idx}-{r_idx}", name),
                     game=game,
                     entity_type="table",
                     name=name,
@@ -43,24 +45,38 @@ def _parse_tables_from_html(game: str, html: str, source: str, detail: str) -> L
     return entities
 
 
-def scrape_wosnerds(game: str, base_url: str, paths: Optional[List[str]] = None) -> List[KnowledgeEntity]:
+def _scrape(
+    game: str, base_url: str, paths: Optional[List[str]], source: str, fetcher: PageFetcher | None
+) -> List[KnowledgeEntity]:
+    fetcher = fetcher or PageFetcher()
+    urls = [base_url.rstrip("/") + "/" + path.lstrip("/") for path in paths or []]
+    parse_key = f"{source}|{game}"
     entities: List[KnowledgeEntity] = []
-    for path in paths or []:
-        url = base_url.rstrip("/") + "/" + path.lstrip("/")
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        entities.extend(_parse_tables_from_html(game, resp.text, "wosnerds_site", url))
+    for result in fetcher.fetch_all(urls):
+        parsed = (result.entry.get("entities") or {}).get(parse_key)
+        if result.changed or parsed is None:
+            page_entities = _parse_tables_from_html(game, result.body, source, result.url)
+            result.entry["entities"] = {parse_key: [e.dict() for e in page_entities]}
+        else:
+            page_entities = [KnowledgeEntity(**e) for e in parsed]
+        if result.status != "fresh":
+            fetcher.store(result)
+        entities.extend(page_entities)
+    return entities
+
+
+def scrape_wosnerds(
+    game: str, base_url: str, paths: Optional[List[str]] = None, fetcher: PageFetcher | None = None
+) -> List[KnowledgeEntity]:
+    entities = _scrape(game, base_url, paths, "wosnerds_site", fetcher)
     logger.info("Scraped %s knowledge entities from wosnerds", len(entities))
     return entities
 
 
-def scrape_wiki(game: str, base_url: str, paths: Optional[List[str]] = None) -> List[KnowledgeEntity]:
-    entities: List[KnowledgeEntity] = []
-    for path in paths or []:
-        url = base_url.rstrip("/") + "/" + path.lstrip("/")
-        resp = requests.get(url, timeout=10)
-        resp.raise_for_status()
-        entities.extend(_parse_tables_from_html(game, resp.text, "wiki", url))
+def scrape_wiki(
+    game: str, base_url: str, paths: Optional[List[str]] = None, fetcher: PageFetcher | None = None
+) -> List[KnowledgeEntity]:
+    entities = _scrape(game, base_url, paths, "wiki", fetcher)
     logger.info("Scraped %s knowledge entities from wiki", len(entities))
     return entities
 
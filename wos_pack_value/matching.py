@@ -0,0 +1,65 @@
+"""Multi-pattern string matching shared by item categorization and knowledge linking."""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, List, Set
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher; `search(text)` returns the payloads of all patterns found."""
+
+    def __init__(self) -> None:
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[int]] = [[]]
+        self._built = False
+
+    def add(self, pattern: str, payload: int) -> None:
+        node = 0
+        for ch in pattern:
+            nxt = self._goto[node].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[node][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            node = nxt
+        self._out[node].append(payload)
+        self._built = False
+
+    def build(self) -> "AhoCorasick":
+        """Compute failure links breadth-first and fold each node's suffix outputs into it."""
+        queue = deque(self._goto[0].values())
+        for child in queue:
+            self._fail[child] = 0
+        while queue:
+            node = queue.popleft()
+            for ch, child in self._goto[node].items():
+                fail = self._fail[node]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[child] = target if target != child else 0
+                self._out[child] = self._out[child] + self._out[self._fail[child]]
+                queue.append(child)
+        self._built = True
+        return self
+
+    def search(self, text: str) -> Set[int]:
+        if not self._built:
+            self.build()
+        goto, fail, out = self._goto, self._fail, self._out
+        found: Set[int] = set()
+        node = 0
+        for ch in text:
+            while node and ch not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(ch, 0)
+            if out[node]:
+                found.update(out[node])
+        return found
+
+
+__all__ = ["AhoCorasick"]
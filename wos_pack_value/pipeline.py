@@ -1,36 +1,66 @@
-"""High-level pipeline orchestrating ingestion, valuation, and export."""
+"""High-level pipeline orchestrating ingestion, valuation, and export.
+
+`run_all_games` runs the pipeline for every game in `game_profiles.yaml` in a
+process pool. Each game reads `<raw_dir>/<game>` (and `<images_dir>/<game>`,
+`<screenshots_dir>/<game>`) and writes `<processed_dir>/<game>` and
+`<site_dir>/<game>`. The ingestion and validation
+configs are loaded once in the parent and handed to every worker.
+"""
 
 from __future__ import annotations
 
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 
+from .export.changes import ChangeSet
 from .export.json_export import export_site_json
-from .analysis.game_profiles import get_game_profile, GameProfile
+from .analysis.game_profiles import get_game_profile, load_game_profiles, GameProfile
 from .ingestion.config import load_ingestion_config
+from .ingestion.ocr_preprocess import load_ocr_config
 from .ingestion.pipeline import ingest_all
 from .logging_utils import configure_logging
 from .models.domain import ValuedPack
+from .profiling import RunMetrics, export_run_metrics
 from .validation.validator import validate_packs_and_items, export_validation_report, load_validation_config
 from .settings import (
     DATA_PROCESSED_DIR,
     DATA_RAW_DIR,
+    DATA_REVIEW_DIR,
     DEFAULT_CONFIG_PATH,
+    DEFAULT_OCR_REVIEW_RAW,
+    DEFAULT_OCR_REVIEWED,
     DEFAULT_PROCESSED_ITEMS,
     DEFAULT_PROCESSED_PACKS,
     DEFAULT_PROCESSED_VALUATIONS,
+    DEFAULT_SITE_ALL_GAMES_METRICS,
     DEFAULT_SITE_ITEMS,
     DEFAULT_SITE_PACKS,
+    DEFAULT_SITE_RUN_METRICS,
+    DEFAULT_VALIDATION_STATS,
     IMAGES_RAW_DIR,
     SCREENSHOTS_DIR,
     SITE_DATA_DIR,
 )
+from .utils import save_json, timestamp
 from .valuation.pipeline import valuate
 
 logger = logging.getLogger(__name__)
 
 
+def _validation_record(vp: ValuedPack) -> Dict:
+    record = vp.pack.dict()
+    price = float(vp.pack.price or 0.0)
+    record["value_per_dollar"] = float(vp.valuation.total_value or 0.0) / price if price else 0.0
+    for item in record["items"]:
+        item["value"] = vp.valuation.breakdown.get(item["item_id"], 0.0)
+    return record
+
+
 def run_pipeline(
     config_path: Path | None = None,
     log_file: Path | None = None,
@@ -49,59 +79,79 @@ def run_pipeline(
     ocr_reviewed_path: Path | None = None,
     history_root: Path | None = None,
     game_key: str | None = None,
+    metrics: RunMetrics | None = None,
+    ocr_workers: int | None = None,
+    use_ocr_cache: bool = True,
+    changes: ChangeSet | None = None,
+    ingestion_config: Dict | None = None,
+    validation_config: Dict | None = None,
 ) -> Tuple[List[ValuedPack], Dict]:
     configure_logging(log_file=log_file)
     logger.info("Starting pipeline")
-    ingestion_config = load_ingestion_config(ingestion_config_path)
+    metrics = metrics if metrics is not None else RunMetrics()
+    if ingestion_config is None:
+        ingestion_config = load_ingestion_config(ingestion_config_path)
     ref_handling = ingestion_config.get("reference_handling", {})
     ref_mode = reference_mode_override or ref_handling.get("mode", "tag")
     game_profile: GameProfile = get_game_profile(game_key=game_key)
-    packs, item_defs = ingest_all(
-        raw_dir=raw_dir or DATA_RAW_DIR,
-        processed_dir=processed_dir or DATA_PROCESSED_DIR,
-        images_dir=images_dir or IMAGES_RAW_DIR,
-        use_ocr=use_ocr,
-        screenshots_dir=screenshots_dir or SCREENSHOTS_DIR,
-        ocr_lang=ocr_lang,
-        ingestion_config_path=ingestion_config_path,
-        ingestion_config_data=ingestion_config,
-        persist=not summary_only,
-        ocr_review_dump_path=ocr_review_dump_path,
-        ocr_reviewed_path=ocr_reviewed_path,
-    )
+    with metrics.stage("ingest") as timing:
+        packs, item_defs = ingest_all(
+            raw_dir=raw_dir or DATA_RAW_DIR,
+            processed_dir=processed_dir or DATA_PROCESSED_DIR,
+            images_dir=images_dir or IMAGES_RAW_DIR,
+            use_ocr=use_ocr,
+            screenshots_dir=screenshots_dir or SCREENSHOTS_DIR,
+            ocr_lang=ocr_lang,
+            ingestion_config_path=ingestion_config_path,
+            ingestion_config_data=ingestion_config,
+            persist=not summary_only,
+            ocr_review_dump_path=ocr_review_dump_path,
+            ocr_reviewed_path=ocr_reviewed_path,
+            metrics=metrics,
+            ocr_workers=ocr_workers,
+            use_ocr_cache=use_ocr_cache,
+            ocr_config=load_ocr_config(game=game_profile) if use_ocr else None,
+        )
+        timing.items = len(packs)
     reference_packs = [p for p in packs if p.is_reference]
     normal_packs = [p for p in packs if not p.is_reference]
     valuation_input = normal_packs if ref_mode in {"exclude", "separate"} else packs
     valuations_path = (processed_dir or DATA_PROCESSED_DIR) / DEFAULT_PROCESSED_VALUATIONS.name
-    valued, config = valuate(
-        packs=valuation_input,
-        config_path=config_path,
-        game=game_profile,
-        valuations_path=valuations_path,
-        processed_path=(processed_dir or DATA_PROCESSED_DIR) / DEFAULT_PROCESSED_PACKS.name,
-    )
-    if not summary_only:
-        export_site_json(
-            valued_packs=valued,
-            items=item_defs,
-            site_dir=site_dir or SITE_DATA_DIR,
-            reference_mode=ref_mode,
-            reference_packs=reference_packs,
+    with metrics.stage("valuation", items=len(valuation_input)):
+        valued, config = valuate(
+            packs=valuation_input,
+            config_path=config_path,
             game=game_profile,
+            valuations_path=valuations_path,
+            processed_path=(processed_dir or DATA_PROCESSED_DIR) / DEFAULT_PROCESSED_PACKS.name,
         )
+    if not summary_only:
+        with metrics.stage("export", items=len(valued)):
+            export_site_json(
+                valued_packs=valued,
+                items=item_defs,
+                site_dir=site_dir or SITE_DATA_DIR,
+                reference_mode=ref_mode,
+                reference_packs=reference_packs,
+                game=game_profile,
+                changes=changes,
+            )
         if enable_validation:
-            validation_cfg = load_validation_config()
+            validation_cfg = validation_config if validation_config is not None else load_validation_config()
             if validation_cfg.get("validation", {}).get("enabled", True):
-                report = validate_packs_and_items(
-                    packs=[vp.pack.dict() for vp in valued],
-                    items=[i.dict() for i in item_defs],
-                    config=validation_cfg,
-                )
-                report_path = export_validation_report(
-                    report,
-                    site_dir=site_dir or SITE_DATA_DIR,
-                    filename=validation_cfg.get("validation", {}).get("report_filename"),
-                )
+                with metrics.stage("validation", items=len(valued)):
+                    report = validate_packs_and_items(
+                        packs=[_validation_record(vp) for vp in valued],
+                        items=[i.dict() for i in item_defs],
+                        config=validation_cfg,
+                        stats_path=(processed_dir or DATA_PROCESSED_DIR) / DEFAULT_VALIDATION_STATS.name,
+                    )
+                    report_path = export_validation_report(
+                        report,
+                        site_dir=site_dir or SITE_DATA_DIR,
+                        filename=validation_cfg.get("validation", {}).get("report_filename"),
+                        changes=changes,
+                    )
                 logger.info(
                     "Validation summary: packs=%s missing_price=%s invalid_price=%s extreme_vpd=%s unknown_items=%s duplicates=%s. Report: %s",
                     report.summary.total_packs,
@@ -116,8 +166,10 @@ def run_pipeline(
         if history_root:
             from .history.snapshot import snapshot_site_data
 
-            snapshot_path = snapshot_site_data(site_dir=site_dir or SITE_DATA_DIR, history_root=history_root)
-            logger.info("Snapshot of site_data written to %s", snapshot_path)
+            with metrics.stage("snapshot"):
+                manifest = snapshot_site_data(site_dir=site_dir or SITE_DATA_DIR, history_root=history_root)
+            logger.info("Snapshot of site_data written to %s", manifest.path)
+        export_run_metrics(metrics, (site_dir or SITE_DATA_DIR) / DEFAULT_SITE_RUN_METRICS.name)
 
     summary = {
         "packs_total": len(packs),
@@ -136,11 +188,132 @@ def run_pipeline(
         ref_mode,
         use_ocr,
     )
+    metrics.log_summary()
     logger.info("Pipeline finished")
     return valued, config
 
 
+@dataclass
+class GameRunResult:
+    game: str
+    ok: bool
+    wall_s: float
+    summary: Dict[str, Any]
+    metrics: Dict[str, Any]
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "game": self.game,
+            "ok": self.ok,
+            "wall_s": round(self.wall_s, 6),
+            "summary": self.summary,
+            "metrics": self.metrics,
+            "error": self.error,
+        }
+
+
+def _run_game(game: str, options: Dict[str, Any]) -> GameRunResult:
+    """Pipeline for one game; runs in worker processes, so errors are returned rather than raised."""
+    metrics = RunMetrics()
+    start = time.perf_counter()
+    try:
+        valued, _ = run_pipeline(game_key=game, metrics=metrics, **options)
+    except Exception as exc:
+        logger.exception("Pipeline failed for game %s", game)
+        error = f"{type(exc).__name__}: {exc}"
+        return GameRunResult(game, False, time.perf_counter() - start, {}, metrics.to_dict(), error)
+    summary = {"packs_valuated": len(valued)}
+    return GameRunResult(game, True, time.perf_counter() - start, summary, metrics.to_dict())
+
+
+def run_all_games(
+    games: Optional[List[str]] = None,
+    raw_dir: Path | None = None,
+    processed_dir: Path | None = None,
+    images_dir: Path | None = None,
+    screenshots_dir: Path | None = None,
+    site_dir: Path | None = None,
+    review_dir: Path | None = None,
+    workers: int | None = None,
+    ingestion_config_path: Path | None = None,
+    metrics_path: Path | None = None,
+    **pipeline_kwargs: Any,
+) -> Dict[str, Any]:
+    """Run the pipeline for `games` (default: every profile) concurrently; return the combined report.
+
+    Every directory is per game (`<dir>/<game>`), including the OCR review
+    dump and reviewed packs under `review_dir` (default `data_review/`).
+    `workers` <= 0/None means one process per game, capped at the CPU count.
+    The report is also written to `<site_dir>/run_metrics_all_games.json`
+    (or `metrics_path`) unless `summary_only` is passed.
+    """
+    games = list(games) if games is not None else sorted(load_game_profiles())
+    raw_root = raw_dir or DATA_RAW_DIR
+    processed_root = processed_dir or DATA_PROCESSED_DIR
+    images_root = images_dir or IMAGES_RAW_DIR
+    screenshots_root = screenshots_dir or SCREENSHOTS_DIR
+    site_root = site_dir or SITE_DATA_DIR
+    review_root = review_dir or DATA_REVIEW_DIR
+    shared = {
+        "ingestion_config": load_ingestion_config(ingestion_config_path),
+        "validation_config": load_validation_config(),
+        "ingestion_config_path": ingestion_config_path,
+        **pipeline_kwargs,
+    }
+    jobs = {
+        game: {
+            **shared,
+            "raw_dir": raw_root / game,
+            "processed_dir": processed_root / game,
+            "images_dir": images_root / game,
+            "screenshots_dir": screenshots_root / game,
+            "site_dir": site_root / game,
+            "ocr_review_dump_path": review_root / game / DEFAULT_OCR_REVIEW_RAW.name,
+            "ocr_reviewed_path": review_root / game / DEFAULT_OCR_REVIEWED.name,
+        }
+        for game in games
+    }
+    if not workers or workers <= 0:
+        workers = min(len(games), os.cpu_count() or 1)
+    workers = max(1, min(workers, len(games) or 1))
+
+    start = time.perf_counter()
+    if workers == 1:
+        results = [_run_game(game, jobs[game]) for game in games]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_run_game, games, [jobs[g] for g in games]))
+    wall_s = time.perf_counter() - start
+
+    slowest = max((r.wall_s for r in results), default=0.0)
+    report = {
+        "generated_at": timestamp(),
+        "workers": workers,
+        "total_wall_s": round(wall_s, 6),
+        "sum_game_wall_s": round(sum(r.wall_s for r in results), 6),
+        "slowest_game_wall_s": round(slowest, 6),
+        "failed": [r.game for r in results if not r.ok],
+        "games": {r.game: r.to_dict() for r in results},
+    }
+    if not pipeline_kwargs.get("summary_only"):
+        out_path = metrics_path or site_root / DEFAULT_SITE_ALL_GAMES_METRICS.name
+        save_json(out_path, report)
+        logger.info("Combined run metrics for %s game(s) written to %s", len(results), out_path)
+    logger.info(
+        "Ran %s game(s) with %s worker(s) in %.2fs (slowest game %.2fs, failed: %s)",
+        len(results),
+        workers,
+        wall_s,
+        slowest,
+        ", ".join(report["failed"]) or "none",
+    )
+    return report
+
+
 __all__ = [
+    "GameRunResult",
+    "run_all_games",
     "run_pipeline",
     "export_site_json",
     "ingest_all",
@@ -0,0 +1,205 @@
+"""Stage timing and optional profiling for pipeline runs.
+
+`RunMetrics` records wall/CPU time, peak memory growth, and throughput for
+named (optionally nested) stages. Functions accept an optional metrics object
+and use `stage(metrics, name)` so instrumentation is a no-op when disabled.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import logging
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from .utils import ensure_dir, save_json, timestamp
+
+try:  # pragma: no cover - platform dependent
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+
+def _max_rss_kb() -> Optional[float]:
+    if resource is None:
+        return None
+    rss = float(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    # ru_maxrss is kilobytes on Linux and bytes on macOS.
+    return rss / 1024.0 if sys.platform == "darwin" else rss
+
+
+@dataclass
+class StageTiming:
+    name: str
+    parent: Optional[str]
+    depth: int
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    peak_mem_delta_kb: Optional[float] = None
+    items: Optional[int] = None
+    items_per_sec: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "parent": self.parent,
+            "depth": self.depth,
+            "wall_s": round(self.wall_s, 6),
+            "cpu_s": round(self.cpu_s, 6),
+            "peak_mem_delta_kb": round(self.peak_mem_delta_kb, 1) if self.peak_mem_delta_kb is not None else None,
+            "items": self.items,
+            "items_per_sec": round(self.items_per_sec, 2) if self.items_per_sec is not None else None,
+        }
+
+
+@dataclass
+class _Frame:
+    timing: StageTiming
+    wall_start: float
+    cpu_start: float
+    mem_start: Optional[float]
+    child_peak: float = 0.0
+
+
+@dataclass
+class RunMetrics:
+    """Collects stage timings for one pipeline run."""
+
+    stages: List[StageTiming] = field(default_factory=list)
+    _stack: List[_Frame] = field(default_factory=list, repr=False)
+
+    @property
+    def memory_source(self) -> Optional[str]:
+        if tracemalloc.is_tracing():
+            return "tracemalloc"
+        return "rusage" if resource is not None else None
+
+    def _mem_now(self) -> Optional[float]:
+        if tracemalloc.is_tracing():
+            current, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            return current / 1024.0
+        return _max_rss_kb()
+
+    def _mem_peak(self, frame: _Frame) -> Optional[float]:
+        if frame.mem_start is None:
+            return None
+        if tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            return max(peak / 1024.0, frame.child_peak)
+        return _max_rss_kb()
+
+    @contextmanager
+    def stage(self, name: str, items: Optional[int] = None) -> Iterator[StageTiming]:
+        """Time a stage; set `.items` on the yielded timing to report throughput."""
+        parent = self._stack[-1].timing.name if self._stack else None
+        timing = StageTiming(name=name, parent=parent, depth=len(self._stack), items=items)
+        self.stages.append(timing)
+        frame = _Frame(timing, time.perf_counter(), time.process_time(), self._mem_now())
+        self._stack.append(frame)
+        try:
+            yield timing
+        finally:
+            self._stack.pop()
+            timing.wall_s = time.perf_counter() - frame.wall_start
+            timing.cpu_s = time.process_time() - frame.cpu_start
+            peak = self._mem_peak(frame)
+            if peak is not None and frame.mem_start is not None:
+                timing.peak_mem_delta_kb = max(0.0, peak - frame.mem_start)
+                if self._stack:
+                    self._stack[-1].child_peak = max(self._stack[-1].child_peak, peak)
+            if timing.items is not None and timing.wall_s > 0:
+                timing.items_per_sec = timing.items / timing.wall_s
+
+    def top_level(self) -> List[StageTiming]:
+        return [s for s in self.stages if s.depth == 0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "generated_at": timestamp(),
+            "memory_source": self.memory_source,
+            "total_wall_s": round(sum(s.wall_s for s in self.top_level()), 6),
+            "stages": [s.to_dict() for s in self.stages],
+        }
+
+    def summary_lines(self, max_depth: int = 0) -> List[str]:
+        lines = []
+        for s in self.stages:
+            if s.depth > max_depth:
+                continue
+            rate = f", {s.items_per_sec:.1f} items/s" if s.items_per_sec is not None else ""
+            mem = f", +{s.peak_mem_delta_kb / 1024.0:.1f} MiB peak" if s.peak_mem_delta_kb is not None else ""
+            lines.append(f"{'  ' * s.depth}{s.name}: {s.wall_s:.3f}s wall, {s.cpu_s:.3f}s cpu{mem}{rate}")
+        return lines
+
+    def log_summary(self) -> None:
+        for line in self.summary_lines():
+            logger.info("Stage timing: %s", line.strip())
+
+
+def stage(metrics: Optional[RunMetrics], name: str, items: Optional[int] = None):
+    """Return a timing context for `name`, or a no-op context when metrics are disabled."""
+    if metrics is None:
+        return nullcontext(StageTiming(name=name, parent=None, depth=0, items=items))
+    return metrics.stage(name, items=items)
+
+
+def export_run_metrics(metrics: RunMetrics, path: Path) -> Path:
+    save_json(path, metrics.to_dict())
+    logger.info("Run metrics written to %s", path)
+    return path
+
+
+@contextmanager
+def profile_run(mode: Optional[str], output_dir: Path, top: int = 40) -> Iterator[Optional[Path]]:
+    """Profile the enclosed block with cProfile or tracemalloc and dump results to output_dir."""
+    if not mode:
+        yield None
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}'. Known: {', '.join(PROFILE_MODES)}")
+    ensure_dir(output_dir)
+    if mode == "cprofile":
+        out_path = output_dir / "run_profile.prof"
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield out_path
+        finally:
+            profiler.disable()
+            profiler.dump_stats(str(out_path))
+            buf = io.StringIO()
+            pstats.Stats(profiler, stream=buf).sort_stats("cumulative").print_stats(top)
+            (output_dir / "run_profile.txt").write_text(buf.getvalue(), encoding="utf-8")
+            logger.info("cProfile stats written to %s", out_path)
+        return
+
+    out_path = output_dir / "run_tracemalloc.txt"
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start(25)
+    try:
+        yield out_path
+    finally:
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if not already_tracing:
+            tracemalloc.stop()
+        lines = [f"current={current / 1024:.1f} KiB peak={peak / 1024:.1f} KiB", ""]
+        lines.extend(str(stat) for stat in snapshot.statistics("lineno")[:top])
+        out_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        logger.info("tracemalloc top allocations written to %s", out_path)
+
+
+__all__ = ["RunMetrics", "StageTiming", "stage", "export_run_metrics", "profile_run", "PROFILE_MODES"]
@@ -28,7 +28,15 @@ DEFAULT_ITEM_CATEGORIES_PATH = CONFIG_DIR / "item_categories.yaml"
 DEFAULT_SITE_ANALYSIS_OVERALL = SITE_DATA_DIR / "pack_ranking_overall.json"
 DEFAULT_SITE_ANALYSIS_BY_CATEGORY = SITE_DATA_DIR / "pack_ranking_by_category.json"
 DEFAULT_SITE_ANALYSIS_PROFILE = "pack_ranking_profile_{profile}.json"
+DEFAULT_SITE_TOP_PACKS = SITE_DATA_DIR / "top_packs.json"
 DEFAULT_SITE_VALIDATION_REPORT = SITE_DATA_DIR / "validation_report.json"
+DEFAULT_SITE_RUN_METRICS = SITE_DATA_DIR / "run_metrics.json"
+DEFAULT_SITE_ALL_GAMES_METRICS = SITE_DATA_DIR / "run_metrics_all_games.json"
 DEFAULT_VALIDATION_CONFIG_PATH = CONFIG_DIR / "validation.yaml"
+DEFAULT_OCR_CONFIG_PATH = CONFIG_DIR / "ocr.yaml"
 DEFAULT_OCR_REVIEW_RAW = DATA_REVIEW_DIR / "ocr_packs_raw.json"
 DEFAULT_OCR_REVIEWED = DATA_REVIEW_DIR / "ocr_packs_reviewed.json"
+DEFAULT_OCR_CACHE = DATA_PROCESSED_DIR / "ocr_cache.json"
+DEFAULT_VALIDATION_STATS = DATA_PROCESSED_DIR / "validation_stats.json"
+DEFAULT_HTTP_CACHE_DIR = DATA_PROCESSED_DIR / "http_cache"
+DEFAULT_GITHUB_KNOWLEDGE_CACHE = DATA_PROCESSED_DIR / "github_knowledge_cache.json"
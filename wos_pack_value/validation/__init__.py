@@ -7,6 +7,9 @@ from .validator import (
     export_validation_report,
     load_validation_config,
 )
+from .near_duplicates import NearDuplicateConfig, find_near_duplicates
+from .outliers import OutlierConfig, score_packs
+from .rules import RULES, ValidationRule, register_rule, run_rules
 
 __all__ = [
     "ValidationReport",
@@ -14,4 +17,12 @@ __all__ = [
     "validate_packs_and_items",
     "export_validation_report",
     "load_validation_config",
+    "NearDuplicateConfig",
+    "find_near_duplicates",
+    "OutlierConfig",
+    "score_packs",
+    "RULES",
+    "ValidationRule",
+    "register_rule",
+    "run_rules",
 ]
@@ -0,0 +1,238 @@
+"""Near-duplicate pack detection with MinHash signatures and LSH banding.
+
+Each pack becomes a set of shingles: every item id, every `(item_id,
+quantized quantity)` pair and the quantized price. Quantities and prices are
+rounded to a few significant digits, so a rounding error in one sheet still
+produces the same shingle, and one extra filler item only costs a couple of
+shingles. MinHash signatures make Jaccard similarity cheap to estimate; LSH
+banding buckets signatures so only packs that share a band are compared, which
+keeps detection near-linear instead of pairwise over all packs. Candidates are
+confirmed with the exact Jaccard similarity of their shingle sets and clustered
+with union-find.
+
+Buckets of up to `max_pairwise_bucket` packs are verified pair by pair. Larger
+buckets (usually many near-identical filler packs) are verified as a star
+around their first member to stay linear; a similar pair that is only ever
+bucketed together with a dissimilar first member can then be missed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import combinations
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+_PRIME = (1 << 31) - 1  # hashes, a and b stay below 2**31 so a*h+b fits in int64
+_SEED = 1
+
+
+@dataclass(frozen=True)
+class NearDuplicateConfig:
+    enabled: bool = True
+    threshold: float = 0.8  # minimum Jaccard similarity of shingle sets
+    num_perm: int = 64
+    bands: int = 16
+    significant_digits: int = 2
+    chunk_size: int = 5000  # packs per signature batch (bounds the num_perm x shingles matrix)
+    max_pairwise_bucket: int = 50  # larger LSH buckets are verified against their first member only
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "NearDuplicateConfig":
+        data = data or {}
+        defaults = cls()
+        cfg = cls(
+            enabled=bool(data.get("enabled", defaults.enabled)),
+            threshold=float(data.get("threshold", defaults.threshold)),
+            num_perm=int(data.get("num_perm", defaults.num_perm)),
+            bands=int(data.get("bands", defaults.bands)),
+            significant_digits=int(data.get("significant_digits", defaults.significant_digits)),
+            chunk_size=int(data.get("chunk_size", defaults.chunk_size)),
+            max_pairwise_bucket=int(data.get("max_pairwise_bucket", defaults.max_pairwise_bucket)),
+        )
+        if cfg.bands < 1 or cfg.num_perm % cfg.bands:
+            raise ValueError(f"near_duplicates.num_perm ({cfg.num_perm}) must be a multiple of bands ({cfg.bands})")
+        return cfg
+
+
+@lru_cache(maxsize=1 << 16)
+def _quantize_number(number: float, significant_digits: int) -> str:
+    if not math.isfinite(number):
+        return str(number)
+    return f"{float(format(number, f'.{significant_digits}g')):g}"
+
+
+def quantize(value: Any, significant_digits: int = 2) -> str:
+    """Round to `significant_digits` significant figures, e.g. 999 and 1000 -> '1000'."""
+    try:
+        number = float(value or 0.0)
+    except (TypeError, ValueError):
+        return str(value)
+    return _quantize_number(number, significant_digits)
+
+
+def pack_shingles(pack: Dict[str, Any], significant_digits: int = 2) -> Set[str]:
+    price_field = pack.get("price", 0)
+    price = price_field.get("amount", 0) if isinstance(price_field, dict) else price_field
+    shingles: Set[str] = set()
+    quantities: Dict[str, float] = {}
+    for item in pack.get("items") or []:
+        item_id = item.get("id") or item.get("item_id")
+        if not item_id:
+            continue
+        try:
+            quantities[str(item_id)] = quantities.get(str(item_id), 0.0) + float(item.get("quantity") or 0.0)
+        except (TypeError, ValueError):
+            quantities.setdefault(str(item_id), 0.0)
+    if not quantities:
+        return shingles
+    for item_id, qty in quantities.items():
+        shingles.add(f"i:{item_id}")
+        shingles.add(f"q:{item_id}:{quantize(qty, significant_digits)}")
+    shingles.add(f"p:{quantize(price, significant_digits)}")
+    return shingles
+
+
+def _hash_shingle(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "little") % _PRIME
+
+
+def _permutations(num_perm: int) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(_SEED)
+    a = rng.integers(1, _PRIME, size=num_perm, dtype=np.int64)
+    b = rng.integers(0, _PRIME, size=num_perm, dtype=np.int64)
+    return a, b
+
+
+def minhash_signatures(shingle_sets: Sequence[Set[str]], num_perm: int = 64, chunk_size: int = 5000) -> np.ndarray:
+    """(len(shingle_sets), num_perm) MinHash matrix; rows of empty sets are all _PRIME."""
+    a, b = _permutations(num_perm)
+    signatures = np.full((len(shingle_sets), num_perm), _PRIME, dtype=np.int64)
+    hash_cache: Dict[str, int] = {}
+    for start in range(0, len(shingle_sets), max(chunk_size, 1)):
+        chunk = shingle_sets[start : start + chunk_size]
+        rows = [i for i, s in enumerate(chunk) if s]
+        if not rows:
+            continue
+        hashes: List[int] = []
+        offsets: List[int] = []
+        for i in rows:
+            offsets.append(len(hashes))
+            for shingle in chunk[i]:
+                if shingle not in hash_cache:
+                    hash_cache[shingle] = _hash_shingle(shingle)
+            hashes.extend([hash_cache[shingle] for shingle in chunk[i]])
+        values = np.asarray(hashes, dtype=np.int64)
+        permuted = (a[:, None] * values[None, :] + b[:, None]) % _PRIME  # (num_perm, n_hashes)
+        mins = np.minimum.reduceat(permuted, np.asarray(offsets, dtype=np.int64), axis=1)
+        signatures[start + np.asarray(rows)] = mins.T
+    return signatures
+
+
+def lsh_candidate_groups(signatures: np.ndarray, bands: int, valid: Optional[np.ndarray] = None) -> List[np.ndarray]:
+    """Row indices that share at least one band, one array per (band, bucket) with 2+ members."""
+    n, num_perm = signatures.shape
+    rows_per_band = num_perm // bands
+    index = np.arange(n) if valid is None else np.flatnonzero(valid)
+    groups: List[np.ndarray] = []
+    if len(index) < 2:
+        return groups
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[index, band * rows_per_band : (band + 1) * rows_per_band])
+        keys = block.view(np.dtype((np.void, block.dtype.itemsize * rows_per_band))).ravel()
+        _, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        shared = np.flatnonzero(counts > 1)
+        if not len(shared):
+            continue
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.concatenate(([0], np.cumsum(counts)))
+        for bucket in shared:
+            groups.append(index[order[bounds[bucket] : bounds[bucket + 1]]])
+    return groups
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def find_near_duplicates(
+    packs: Sequence[Dict[str, Any]],
+    config: NearDuplicateConfig | None = None,
+) -> List[Dict[str, Any]]:
+    """Cluster packs whose shingle sets have Jaccard similarity >= config.threshold.
+
+    Returns groups sorted by size then lowest similarity:
+    `{"pack_ids", "similarity" (weakest confirmed link), "pairs": [{"a", "b", "similarity"}]}`.
+    """
+    cfg = config or NearDuplicateConfig()
+    shingle_sets = [pack_shingles(p, cfg.significant_digits) for p in packs]
+    valid = np.fromiter((bool(s) for s in shingle_sets), dtype=bool, count=len(shingle_sets))
+    signatures = minhash_signatures(shingle_sets, cfg.num_perm, cfg.chunk_size)
+
+    parent = list(range(len(packs)))
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    checked: Set[Tuple[int, int]] = set()
+    edges: List[Tuple[int, int, float]] = []
+    for members in lsh_candidate_groups(signatures, cfg.bands, valid):
+        members = [int(m) for m in members]
+        if len(members) <= cfg.max_pairwise_bucket:
+            candidates = combinations(members, 2)
+        else:
+            # Star verification keeps huge buckets linear: each member is compared to the bucket's anchor.
+            candidates = ((members[0], other) for other in members[1:])
+        for a, b in candidates:
+            pair = (min(a, b), max(a, b))
+            if pair in checked:
+                continue
+            checked.add(pair)
+            score = jaccard(shingle_sets[a], shingle_sets[b])
+            if score >= cfg.threshold:
+                edges.append((pair[0], pair[1], score))
+                parent[find(pair[0])] = find(pair[1])
+
+    clusters: Dict[int, Dict[str, Any]] = {}
+    for a, b, score in edges:
+        cluster = clusters.setdefault(find(a), {"members": set(), "pairs": []})
+        cluster["members"].update((a, b))
+        cluster["pairs"].append((a, b, score))
+
+    def pack_id(idx: int) -> str:
+        # Site exports carry `id`; pipeline validation records (Pack.dict()) carry `pack_id`.
+        pack = packs[idx]
+        return str(pack.get("id") or pack.get("pack_id") or idx)
+
+    groups = []
+    for cluster in clusters.values():
+        pairs = sorted(cluster["pairs"], key=lambda e: (e[2], e[0], e[1]))
+        groups.append(
+            {
+                "pack_ids": sorted(pack_id(i) for i in cluster["members"]),
+                "similarity": round(pairs[0][2], 4),
+                "pairs": [{"a": pack_id(a), "b": pack_id(b), "similarity": round(s, 4)} for a, b, s in pairs],
+            }
+        )
+    groups.sort(key=lambda g: (-len(g["pack_ids"]), g["similarity"], g["pack_ids"]))
+    return groups
+
+
+__all__ = [
+    "NearDuplicateConfig",
+    "find_near_duplicates",
+    "jaccard",
+    "lsh_candidate_groups",
+    "minhash_signatures",
+    "pack_shingles",
+    "quantize",
+]
@@ -0,0 +1,235 @@
+"""Robust value-per-dollar outliers per category and price tier.
+
+A pack is compared with packs like it: same dominant item category and same
+store price tier. Each group's median and MAD (median absolute deviation) are
+computed in one vectorized pass, and a pack is flagged when its modified
+z-score `0.6745 * (vpd - median) / MAD` exceeds the threshold (3.5 by
+default). Median and MAD are not dragged up by the outliers themselves the
+way mean and stdev are. Groups that are too small or have no spread fall back
+to the category across all tiers, then to all packs.
+
+With a stats path, the distributions and per-pack scores are saved as a JSON
+artifact. The next run scores only packs whose inputs (vpd, category, tier)
+changed against the cached distributions. Everything is recomputed once more
+than `refresh_ratio` of the packs differ from the inputs the distributions
+were computed from, so small changes cannot accumulate into stale medians.
+Packs without an id are keyed by position (`#<index>`), and packs sharing an
+id (the same pack from several sheets) by `<id>#<index>`, so each is scored.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..utils import load_json, save_json
+
+logger = logging.getLogger(__name__)
+
+STATS_VERSION = 2
+ANY = "*"
+_MAD_SCALE = 0.6745  # makes MAD comparable to a standard deviation for normal data
+
+
+@dataclass(frozen=True)
+class OutlierConfig:
+    method: str = "mad"  # "mad" (robust, per group) or "stdev" (global mean + k*stdev)
+    threshold: float = 3.5
+    min_group_size: int = 5
+    refresh_ratio: float = 0.25
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "OutlierConfig":
+        data = data or {}
+        defaults = cls()
+        method = str(data.get("method", defaults.method)).lower()
+        if method not in ("mad", "stdev"):
+            raise ValueError(f"validation.outliers.method must be 'mad' or 'stdev', got '{method}'")
+        return cls(
+            method=method,
+            threshold=float(data.get("threshold", defaults.threshold)),
+            min_group_size=int(data.get("min_group_size", defaults.min_group_size)),
+            refresh_ratio=float(data.get("refresh_ratio", defaults.refresh_ratio)),
+        )
+
+    def fingerprint(self) -> Dict[str, Any]:
+        return {"threshold": self.threshold, "min_group_size": self.min_group_size}
+
+
+def pack_category(pack: Dict[str, Any]) -> str:
+    """Dominant category by value (export `category_values`, else item values/quantities)."""
+    cat_values = pack.get("category_values")
+    if isinstance(cat_values, dict) and cat_values:
+        best = max(cat_values.items(), key=lambda kv: (kv[1] or 0, kv[0]))
+        if best[1]:
+            return str(best[0])
+    weights: Dict[str, float] = {}
+    for item in pack.get("items") or []:
+        category = str(item.get("category") or "unknown")
+        weight = item.get("value")
+        if weight is None and item.get("base_value") is not None:
+            weight = float(item.get("quantity") or 0) * float(item["base_value"])
+        weights[category] = weights.get(category, 0.0) + (float(weight) if weight is not None else 1.0)
+    if not weights:
+        return "unknown"
+    return max(weights.items(), key=lambda kv: (kv[1], kv[0]))[0]
+
+
+def price_tier(price: float, currency: str, tiers: Dict[str, List[float]]) -> str:
+    """Label of the nearest configured price point, e.g. 'USD 4.99'."""
+    points = tiers.get(currency or "USD")
+    if not points:
+        return f"{currency or 'USD'} {price:.0f}"
+    nearest = min(points, key=lambda p: abs(price - p))
+    return f"{currency or 'USD'} {nearest:g}"
+
+
+def group_median_mad(values: np.ndarray, groups: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-group (median, MAD, count) for integer group ids, without a Python loop over groups."""
+    counts = np.bincount(groups, minlength=n_groups)
+
+    def medians(x: np.ndarray) -> np.ndarray:
+        order = np.lexsort((x, groups))
+        sorted_x = x[order]
+        starts = np.cumsum(counts) - counts
+        lower = starts + np.maximum(counts - 1, 0) // 2
+        upper = starts + counts // 2
+        out = np.full(n_groups, np.nan)
+        has = counts > 0
+        out[has] = (sorted_x[lower[has]] + sorted_x[upper[has]]) / 2.0
+        return out
+
+    median = medians(values)
+    mad = medians(np.abs(values - median[groups]))
+    return median, mad, counts
+
+
+def compute_distributions(keys: Sequence[Tuple[str, str]], values: np.ndarray) -> Dict[str, Dict[str, float]]:
+    """Median/MAD/count per `category|tier`, `category|*` and `*|*`."""
+    out: Dict[str, Dict[str, float]] = {}
+    levels = [
+        [f"{c}|{t}" for c, t in keys],
+        [f"{c}|{ANY}" for c, _ in keys],
+        [f"{ANY}|{ANY}"] * len(keys),
+    ]
+    for labels in levels:
+        if not labels:
+            continue
+        names, inverse = np.unique(np.asarray(labels), return_inverse=True)
+        median, mad, counts = group_median_mad(values, inverse.ravel(), len(names))
+        for i, name in enumerate(names):
+            out[str(name)] = {"median": float(median[i]), "mad": float(mad[i]), "count": int(counts[i])}
+    return out
+
+
+def robust_score(
+    vpd: float, key: Tuple[str, str], groups: Dict[str, Dict[str, float]], min_group_size: int
+) -> Tuple[Optional[float], Optional[str]]:
+    """(modified z-score, group used) against the most specific usable group."""
+    category, tier = key
+    for name in (f"{category}|{tier}", f"{category}|{ANY}", f"{ANY}|{ANY}"):
+        stats = groups.get(name)
+        if stats and stats["count"] >= min_group_size and stats["mad"] > 0:
+            return _MAD_SCALE * (vpd - stats["median"]) / stats["mad"], name
+    return None, None
+
+
+def _fingerprint(vpd: float, key: Tuple[str, str]) -> str:
+    return f"{vpd:.9g}|{key[0]}|{key[1]}"
+
+
+def record_keys(pack_ids: Sequence[Optional[str]]) -> List[str]:
+    """Keys of records in `score_packs` results: the pack id when it is unique, else position based.
+
+    Records without an id get `#<position>`; records whose id repeats get `<id>#<position>`.
+    """
+    counts: Dict[str, int] = {}
+    for pid in pack_ids:
+        if pid:
+            counts[str(pid)] = counts.get(str(pid), 0) + 1
+    keys = []
+    for i, pid in enumerate(pack_ids):
+        if not pid:
+            keys.append(f"#{i}")
+        elif counts[str(pid)] > 1:
+            keys.append(f"{pid}#{i}")
+        else:
+            keys.append(str(pid))
+    return keys
+
+
+def score_packs(
+    records: Sequence[Tuple[str, float, Tuple[str, str]]],
+    config: OutlierConfig,
+    stats_path: Optional[Path] = None,
+) -> Dict[str, Dict[str, Any]]:
+    """Score (pack_id, vpd, (category, tier)) records; return {key: {z, group, median}} keyed by `record_keys`.
+
+    With `stats_path`, reuse cached distributions/scores and only score packs whose inputs changed.
+    """
+    cached = load_json(stats_path) if stats_path and stats_path.exists() else None
+    if cached and (cached.get("version") != STATS_VERSION or cached.get("config") != config.fingerprint()):
+        cached = None
+
+    keys = record_keys([pid for pid, _, _ in records])
+    current = {rk: (vpd, key, _fingerprint(vpd, key)) for rk, (_, vpd, key) in zip(keys, records)}
+    old_packs: Dict[str, Dict[str, Any]] = (cached or {}).get("packs", {})
+    # Fingerprints the cached distributions were computed from; drift is measured against these.
+    base: Dict[str, str] = (cached or {}).get("base", {})
+    changed = {pid for pid, (_, _, fp) in current.items() if old_packs.get(pid, {}).get("fp") != fp}
+    drift = sum(1 for pid, (_, _, fp) in current.items() if base.get(pid) != fp) + len(base.keys() - current.keys())
+    incremental = bool(cached) and drift <= config.refresh_ratio * max(len(current), 1)
+
+    if incremental:
+        groups = cached["groups"]
+        to_score = list(changed)
+    else:
+        values = np.fromiter((vpd for vpd, _, _ in current.values()), dtype=float, count=len(current))
+        groups = compute_distributions([key for _, key, _ in current.values()], values)
+        base = {pid: fp for pid, (_, _, fp) in current.items()}
+        to_score = list(current)
+
+    packs_out: Dict[str, Dict[str, Any]] = {}
+    for pid, (vpd, key, fp) in current.items():
+        if incremental and pid not in changed:
+            packs_out[pid] = old_packs[pid]
+            continue
+        z, group = robust_score(vpd, key, groups, config.min_group_size)
+        packs_out[pid] = {"fp": fp, "z": z, "group": group}
+    logger.info(
+        "VPD outliers: scored %s of %s pack(s) (%s)",
+        len(to_score),
+        len(current),
+        "incremental" if incremental else "full recompute",
+    )
+    if stats_path:
+        save_json(
+            stats_path,
+            {
+                "version": STATS_VERSION,
+                "config": config.fingerprint(),
+                "groups": groups,
+                "base": base,
+                "packs": packs_out,
+            },
+        )
+    for entry in packs_out.values():
+        group = groups.get(entry.get("group") or "")
+        entry["median"] = group["median"] if group else None
+    return packs_out
+
+
+__all__ = [
+    "OutlierConfig",
+    "compute_distributions",
+    "group_median_mad",
+    "pack_category",
+    "price_tier",
+    "record_keys",
+    "robust_score",
+    "score_packs",
+]
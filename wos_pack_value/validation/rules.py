@@ -0,0 +1,225 @@
+"""Validation rule registry and engine.
+
+A rule declares its scope:
+
+- "pack" / "item": called once per record; all enabled record rules of a scope
+  are fused into a single pass over the records.
+- "aggregate": called once with the whole context after the record passes
+  (outliers, duplicate clustering); independent aggregates run concurrently.
+
+Rules are registered with `@register_rule(...)` and toggled or parameterized
+under `validation.rules.<name>` in `config/validation.yaml`. The engine records
+per-rule wall time and hit counts, which end up in the validation report.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field, is_dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+RULE_SCOPES = ("pack", "item", "aggregate")
+
+
+@dataclass(frozen=True)
+class ValidationRule:
+    name: str
+    scope: str
+    check: Callable[..., Any]
+    fields: Tuple[str, ...] = ()
+    description: str = ""
+    enabled: bool = True  # default when the config does not mention the rule
+    prepare: Optional[Callable[[Dict[str, Any], "RuleContext"], Any]] = None
+
+
+RULES: Dict[str, ValidationRule] = {}
+
+
+def register_rule(
+    name: str,
+    scope: str,
+    *,
+    fields: Iterable[str] = (),
+    description: str = "",
+    enabled: bool = True,
+    prepare: Optional[Callable[[Dict[str, Any], "RuleContext"], Any]] = None,
+) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Register a rule.
+
+    Record rules are `check(record, ctx) -> issue | None`; aggregate rules are
+    `check(ctx) -> list of issues`. `prepare(params, ctx)` runs once before the
+    pass and its result is available as `ctx.state[name]`.
+    """
+    if scope not in RULE_SCOPES:
+        raise ValueError(f"Unknown rule scope '{scope}'. Known: {', '.join(RULE_SCOPES)}")
+
+    def decorator(func: Callable[..., Any]) -> Callable[..., Any]:
+        RULES[name] = ValidationRule(
+            name=name,
+            scope=scope,
+            check=func,
+            fields=tuple(fields),
+            description=description or ((func.__doc__ or "").strip().splitlines() or [""])[0],
+            enabled=enabled,
+            prepare=prepare,
+        )
+        return func
+
+    return decorator
+
+
+@dataclass
+class PackRecord:
+    """A pack plus the fields most rules need, parsed once per pass."""
+
+    pack: Dict[str, Any]
+    pack_id: str
+    name: str
+    price: Any  # raw amount; None/"" when missing
+    currency: str
+    value_per_dollar: float
+
+
+def pack_record(pack: Dict[str, Any]) -> PackRecord:
+    price_field = pack.get("price", 0)
+    if isinstance(price_field, dict):
+        price, currency = price_field.get("amount", 0), price_field.get("currency") or pack.get("currency") or ""
+    else:
+        price, currency = price_field, pack.get("currency") or ""
+    return PackRecord(
+        pack=pack,
+        pack_id=str(pack.get("id") or pack.get("pack_id") or ""),
+        name=pack.get("name", ""),
+        price=price,
+        currency=str(currency).upper(),
+        value_per_dollar=float(pack.get("value_per_dollar", 0) or 0),
+    )
+
+
+@dataclass
+class RuleContext:
+    config: Dict[str, Any]  # the `validation` section
+    packs: List[PackRecord] = field(default_factory=list)
+    items: List[Dict[str, Any]] = field(default_factory=list)
+    priced_packs: List[PackRecord] = field(default_factory=list)  # packs with a positive numeric price
+    state: Dict[str, Any] = field(default_factory=dict)
+    artifacts: Dict[str, Any] = field(default_factory=dict)  # caller-provided inputs such as cache paths
+
+    def params(self, rule_name: str) -> Dict[str, Any]:
+        entry = (self.config.get("rules") or {}).get(rule_name)
+        return entry if isinstance(entry, dict) else {}
+
+
+@dataclass
+class RuleStats:
+    scope: str
+    seconds: float = 0.0
+    hits: int = 0
+    fields: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"scope": self.scope, "seconds": round(self.seconds, 6), "hits": self.hits, "fields": list(self.fields)}
+
+
+def rule_enabled(rule: ValidationRule, config: Dict[str, Any]) -> bool:
+    entry = (config.get("rules") or {}).get(rule.name)
+    if isinstance(entry, bool):
+        return entry
+    if isinstance(entry, dict) and "enabled" in entry:
+        return bool(entry["enabled"])
+    return rule.enabled
+
+
+def active_rules(config: Dict[str, Any], rules: Optional[Dict[str, ValidationRule]] = None) -> List[ValidationRule]:
+    return [r for r in (rules or RULES).values() if rule_enabled(r, config)]
+
+
+def issue_to_dict(issue: Any) -> Any:
+    return asdict(issue) if is_dataclass(issue) else issue
+
+
+def _record_pass(
+    records: List[Any],
+    rules: List[ValidationRule],
+    ctx: RuleContext,
+    issues: Dict[str, List[Any]],
+    stats: Dict[str, RuleStats],
+) -> None:
+    if not rules:
+        return
+    checks = [(r.name, r.check, issues[r.name], stats[r.name]) for r in rules]
+    clock = time.perf_counter
+    for record in records:
+        for _, check, found, stat in checks:
+            t0 = clock()
+            issue = check(record, ctx)
+            stat.seconds += clock() - t0
+            if issue is not None:
+                found.append(issue)
+
+
+def _run_aggregate(rule: ValidationRule, ctx: RuleContext) -> Tuple[List[Any], float]:
+    t0 = time.perf_counter()
+    found = list(rule.check(ctx) or [])
+    return found, time.perf_counter() - t0
+
+
+def run_rules(
+    packs: Iterable[Dict[str, Any]],
+    items: Iterable[Dict[str, Any]],
+    config: Dict[str, Any],
+    *,
+    rules: Optional[Dict[str, ValidationRule]] = None,
+    workers: Optional[int] = None,
+    artifacts: Optional[Dict[str, Any]] = None,
+) -> Tuple[Dict[str, List[Any]], Dict[str, RuleStats]]:
+    """Run enabled rules over packs/items; return (issues by rule, stats by rule)."""
+    ctx = RuleContext(config=config, items=list(items), artifacts=dict(artifacts or {}))
+    for pack in packs:
+        rec = pack_record(pack)
+        ctx.packs.append(rec)
+        if isinstance(rec.price, (int, float)) and rec.price > 0:
+            ctx.priced_packs.append(rec)
+    selected = active_rules(config, rules)
+    issues: Dict[str, List[Any]] = {r.name: [] for r in selected}
+    stats: Dict[str, RuleStats] = {r.name: RuleStats(scope=r.scope, fields=r.fields) for r in selected}
+    for rule in selected:
+        if rule.prepare is not None:
+            t0 = time.perf_counter()
+            ctx.state[rule.name] = rule.prepare(ctx.params(rule.name), ctx)
+            stats[rule.name].seconds += time.perf_counter() - t0
+
+    _record_pass(ctx.packs, [r for r in selected if r.scope == "pack"], ctx, issues, stats)
+    _record_pass(ctx.items, [r for r in selected if r.scope == "item"], ctx, issues, stats)
+
+    aggregates = [r for r in selected if r.scope == "aggregate"]
+    n_workers = int(workers if workers is not None else config.get("workers", 4) or 1)
+    if n_workers > 1 and len(aggregates) > 1:
+        with ThreadPoolExecutor(max_workers=min(n_workers, len(aggregates))) as pool:
+            results = list(pool.map(lambda r: _run_aggregate(r, ctx), aggregates))
+    else:
+        results = [_run_aggregate(r, ctx) for r in aggregates]
+    for rule, (found, seconds) in zip(aggregates, results):
+        issues[rule.name] = found
+        stats[rule.name].seconds += seconds
+
+    for name, found in issues.items():
+        stats[name].hits = len(found)
+    return issues, stats
+
+
+__all__ = [
+    "RULES",
+    "RULE_SCOPES",
+    "PackRecord",
+    "RuleContext",
+    "RuleStats",
+    "ValidationRule",
+    "active_rules",
+    "issue_to_dict",
+    "pack_record",
+    "register_rule",
+    "rule_enabled",
+    "run_rules",
+]
@@ -5,13 +5,16 @@ from __future__ import annotations
 import math
 from dataclasses import dataclass, field
 from pathlib import Path
-from statistics import mean, stdev
+from statistics import fmean
 from typing import Any, Dict, Iterable, List, Optional
 
-import yaml
-
+from ..config_registry import load_config, thaw
 from ..settings import DEFAULT_VALIDATION_CONFIG_PATH, DEFAULT_SITE_VALIDATION_REPORT, SITE_DATA_DIR
-from ..utils import ensure_dir, save_json
+from ..export.changes import ChangeSet, write_export
+from ..utils import ensure_dir
+from .near_duplicates import NearDuplicateConfig, find_near_duplicates
+from .outliers import OutlierConfig, pack_category, price_tier, record_keys, score_packs
+from .rules import PackRecord, RuleContext, issue_to_dict, register_rule, run_rules
 
 
 @dataclass
@@ -40,6 +43,7 @@ class ValidationSummary:
     num_packs_extreme_value_per_dollar: int = 0
     num_unknown_items: int = 0
     num_duplicate_packs: int = 0
+    num_near_duplicate_groups: int = 0
 
     def to_dict(self) -> Dict[str, Any]:
         return self.__dict__
@@ -53,6 +57,9 @@ class ValidationReport:
     packs_extreme_value_per_dollar: List[PackIssue] = field(default_factory=list)
     unknown_items: List[ItemIssue] = field(default_factory=list)
     duplicate_packs: List[List[str]] = field(default_factory=list)
+    near_duplicate_packs: List[Dict[str, Any]] = field(default_factory=list)
+    rule_issues: Dict[str, List[Any]] = field(default_factory=dict)  # findings of rules without a field above
+    rule_stats: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # per-rule scope, seconds and hits
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -62,41 +69,221 @@ class ValidationReport:
             "packs_extreme_value_per_dollar": [issue.__dict__ for issue in self.packs_extreme_value_per_dollar],
             "unknown_items": [issue.__dict__ for issue in self.unknown_items],
             "duplicate_packs": self.duplicate_packs,
+            "near_duplicate_packs": self.near_duplicate_packs,
+            "rule_issues": self.rule_issues,
+            "rule_stats": self.rule_stats,
         }
 
 
 def load_validation_config(path: Path | None = None) -> Dict[str, Any]:
     cfg_path = path or DEFAULT_VALIDATION_CONFIG_PATH
     if cfg_path.exists():
-        with cfg_path.open("r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
+        return thaw(load_config(cfg_path))
     return {"validation": {"enabled": True, "value_per_dollar_threshold_std": 3.0, "report_filename": "validation_report.json"}}
 
 
 def _std_threshold(values: List[float], multiplier: float) -> float:
     if len(values) < 2:
         return math.inf
-    return mean(values) + multiplier * stdev(values)
+    avg = fmean(values)
+    std = math.sqrt(sum((v - avg) ** 2 for v in values) / (len(values) - 1))
+    return avg + multiplier * std
 
 
 def _detect_duplicates(packs: List[Dict[str, Any]]) -> List[List[str]]:
-    seen: Dict[str, List[str]] = {}
+    seen: Dict[Any, List[str]] = {}
     for p in packs:
         price = p.get("price", {}).get("amount", 0) if isinstance(p.get("price"), dict) else p.get("price", 0)
-        items = tuple(sorted([(it.get("id"), it.get("quantity")) for it in p.get("items", [])]))
-        key = (price, items)
-        seen.setdefault(str(key), []).append(p.get("id"))
+        items = tuple(sorted((str(it.get("id") or it.get("item_id")), it.get("quantity")) for it in p.get("items", [])))
+        seen.setdefault((price, items), []).append(p.get("id") or p.get("pack_id"))
     return [ids for ids in seen.values() if len(ids) > 1]
 
 
+# -- built-in rules --
+
+
+@register_rule("missing_price", "pack", fields=("price",))
+def _rule_missing_price(rec: PackRecord, ctx: RuleContext) -> Optional[PackIssue]:
+    """Pack has no price."""
+    if rec.price in (None, ""):
+        return PackIssue(rec.pack_id, rec.name, price=0, value_per_dollar=rec.value_per_dollar, detail="Missing price")
+    return None
+
+
+@register_rule("invalid_price", "pack", fields=("price",))
+def _rule_invalid_price(rec: PackRecord, ctx: RuleContext) -> Optional[PackIssue]:
+    """Pack price is zero or negative."""
+    if rec.price not in (None, "") and rec.price <= 0:
+        return PackIssue(
+            rec.pack_id, rec.name, price=rec.price, value_per_dollar=rec.value_per_dollar, detail="Non-positive price"
+        )
+    return None
+
+
+def _max_quantity(params: Dict[str, Any], ctx: RuleContext) -> float:
+    return float(params.get("max_quantity", 1e9))
+
+
+@register_rule("implausible_quantity", "pack", fields=("items.quantity",), prepare=_max_quantity)
+def _rule_implausible_quantity(rec: PackRecord, ctx: RuleContext) -> Optional[PackIssue]:
+    """An item quantity is negative or above `max_quantity`."""
+    limit = ctx.state["implausible_quantity"]
+    bad = []
+    for item in rec.pack.get("items") or []:
+        qty = item.get("quantity")
+        if isinstance(qty, (int, float)) and (qty < 0 or qty > limit):
+            bad.append(f"{item.get('id') or item.get('item_id')}={qty:g}")
+    if not bad:
+        return None
+    return PackIssue(
+        rec.pack_id,
+        rec.name,
+        price=rec.price or 0,
+        value_per_dollar=rec.value_per_dollar,
+        detail=f"Implausible quantities: {', '.join(bad)}",
+    )
+
+
+def _price_tiers(params: Dict[str, Any], ctx: RuleContext) -> Dict[str, List[float]]:
+    if params.get("prices"):
+        return {str(params.get("currency", "USD")).upper(): [float(p) for p in params["prices"]]}
+    from ..valuation.config import load_valuation_config
+
+    tiers: Dict[str, List[float]] = {}
+    for tier in load_valuation_config().get("price_inference", {}).get("tiers") or []:
+        prices = tier.get("prices") or tier.get("amounts") or []
+        tiers.setdefault(str(tier.get("currency", "USD")).upper(), []).extend(float(p) for p in prices)
+    return tiers
+
+
+@register_rule("price_tier_mismatch", "pack", fields=("price",), prepare=_price_tiers)
+def _rule_price_tier_mismatch(rec: PackRecord, ctx: RuleContext) -> Optional[PackIssue]:
+    """Price is not one of the store's price points for its currency."""
+    tiers = ctx.state["price_tier_mismatch"].get(rec.currency or "USD")
+    if not tiers or not isinstance(rec.price, (int, float)) or rec.price <= 0:
+        return None
+    tolerance = float(ctx.params("price_tier_mismatch").get("tolerance", 0.01))
+    if any(abs(rec.price - tier) <= tolerance for tier in tiers):
+        return None
+    nearest = min(tiers, key=lambda tier: abs(rec.price - tier))
+    return PackIssue(
+        rec.pack_id,
+        rec.name,
+        price=rec.price,
+        value_per_dollar=rec.value_per_dollar,
+        detail=f"Price {rec.price:g} {rec.currency} is not a store price point (nearest {nearest:g})",
+    )
+
+
+@register_rule("unknown_items", "item", fields=("base_value",))
+def _rule_unknown_item(item: Dict[str, Any], ctx: RuleContext) -> Optional[ItemIssue]:
+    """Item has a missing or zero base value."""
+    if item.get("base_value") in (None, 0, 0.0, ""):
+        return ItemIssue(
+            item_id=item.get("item_id", ""), item_name=item.get("name", ""), detail="Missing or zero base value", packs=[]
+        )
+    return None
+
+
+@register_rule("item_missing_category", "item", fields=("category",))
+def _rule_item_missing_category(item: Dict[str, Any], ctx: RuleContext) -> Optional[ItemIssue]:
+    """Item has no category, so category rankings and filters skip it."""
+    if str(item.get("category") or "").strip().lower() in ("", "unknown", "none"):
+        return ItemIssue(item_id=item.get("item_id", ""), item_name=item.get("name", ""), detail="Missing category")
+    return None
+
+
+def _prepare_outliers(params: Dict[str, Any], ctx: RuleContext) -> Dict[str, Any]:
+    cfg = OutlierConfig.from_dict(ctx.config.get("outliers"))
+    return {"config": cfg, "tiers": _price_tiers({}, ctx) if cfg.method == "mad" else {}}
+
+
+@register_rule(
+    "extreme_value_per_dollar",
+    "aggregate",
+    fields=("price", "value_per_dollar", "items.category"),
+    prepare=_prepare_outliers,
+)
+def _rule_extreme_vpd(ctx: RuleContext) -> List[PackIssue]:
+    """Value per dollar far above comparable packs (robust per category/price tier, or global stdev)."""
+    priced = ctx.priced_packs
+    state = ctx.state["extreme_value_per_dollar"]
+    cfg: OutlierConfig = state["config"]
+    if cfg.method == "stdev":
+        multiplier = float(ctx.config.get("value_per_dollar_threshold_std", 3.0) or 3.0)
+        threshold = _std_threshold([rec.value_per_dollar for rec in priced], multiplier=multiplier)
+        return [
+            PackIssue(
+                rec.pack_id,
+                rec.name,
+                price=rec.price,
+                value_per_dollar=rec.value_per_dollar,
+                detail=f"VPD above threshold ({rec.value_per_dollar:.2f} > {threshold:.2f})",
+            )
+            for rec in priced
+            if rec.value_per_dollar > threshold
+        ]
+
+    records = [
+        (rec.pack_id, rec.value_per_dollar, (pack_category(rec.pack), price_tier(rec.price, rec.currency, state["tiers"])))
+        for rec in priced
+    ]
+    scores = score_packs(records, cfg, stats_path=ctx.artifacts.get("outlier_stats_path"))
+    issues = []
+    for rec, key in zip(priced, record_keys([pid for pid, _, _ in records])):
+        score = scores.get(key) or {}
+        z = score.get("z")
+        if z is not None and z > cfg.threshold:
+            issues.append(
+                PackIssue(
+                    rec.pack_id,
+                    rec.name,
+                    price=rec.price,
+                    value_per_dollar=rec.value_per_dollar,
+                    detail=(
+                        f"VPD {rec.value_per_dollar:.2f} is {z:.1f} robust SDs above the "
+                        f"{score['group']} median ({score['median']:.2f})"
+                    ),
+                )
+            )
+    return issues
+
+
+@register_rule("duplicate_packs", "aggregate", fields=("price", "items"))
+def _rule_duplicates(ctx: RuleContext) -> List[List[str]]:
+    """Packs with identical price and item list."""
+    return _detect_duplicates([rec.pack for rec in ctx.packs])
+
+
+@register_rule("near_duplicate_packs", "aggregate", fields=("price", "items"))
+def _rule_near_duplicates(ctx: RuleContext) -> List[Dict[str, Any]]:
+    """Near-identical packs (MinHash/LSH over item shingles)."""
+    near_cfg = NearDuplicateConfig.from_dict(ctx.config.get("near_duplicates"))
+    if not near_cfg.enabled:
+        return []
+    return find_near_duplicates([rec.pack for rec in ctx.packs], near_cfg)
+
+
+# Rules whose findings have a dedicated field (and summary counter) in the report.
+_REPORT_FIELDS = {
+    "missing_price": ("packs_missing_price", "num_packs_missing_price"),
+    "invalid_price": ("packs_invalid_price", "num_packs_invalid_price"),
+    "extreme_value_per_dollar": ("packs_extreme_value_per_dollar", "num_packs_extreme_value_per_dollar"),
+    "unknown_items": ("unknown_items", "num_unknown_items"),
+    "duplicate_packs": ("duplicate_packs", "num_duplicate_packs"),
+    "near_duplicate_packs": ("near_duplicate_packs", "num_near_duplicate_groups"),
+}
+
+
 def validate_packs_and_items(
     packs: Iterable[Dict[str, Any]],
     items: Iterable[Dict[str, Any]],
     config: Optional[Dict[str, Any]] = None,
+    stats_path: Optional[Path] = None,
 ) -> ValidationReport:
+    """Run all enabled rules. `stats_path` caches outlier distributions between runs."""
     cfg = config or load_validation_config()
     val_cfg = cfg.get("validation", {})
-    threshold_std = float(val_cfg.get("value_per_dollar_threshold_std", 3.0) or 3.0)
     report = ValidationReport()
 
     pack_list = list(packs)
@@ -104,66 +291,25 @@ def validate_packs_and_items(
     report.summary.total_packs = len(pack_list)
     report.summary.total_items = len(item_list)
 
-    vpd_values = []
-    for p in pack_list:
-        price_field = p.get("price", 0)
-        price = price_field.get("amount", 0) if isinstance(price_field, dict) else price_field
-        vpd = float(p.get("value_per_dollar", 0) or 0)
-        if price in (None, ""):
-            report.packs_missing_price.append(
-                PackIssue(p.get("id", ""), p.get("name", ""), price=0, value_per_dollar=vpd, detail="Missing price")
-            )
-        elif price <= 0:
-            report.packs_invalid_price.append(
-                PackIssue(p.get("id", ""), p.get("name", ""), price=price, value_per_dollar=vpd, detail="Non-positive price")
-            )
-        else:
-            vpd_values.append(vpd)
-
-    if vpd_values:
-        threshold = _std_threshold(vpd_values, multiplier=threshold_std)
-        for p in pack_list:
-            price_field = p.get("price", 0)
-            price = price_field.get("amount", 0) if isinstance(price_field, dict) else price_field or 0
-            vpd = float(p.get("value_per_dollar", 0) or 0)
-            if price and vpd > threshold:
-                report.packs_extreme_value_per_dollar.append(
-                    PackIssue(
-                        p.get("id", ""),
-                        p.get("name", ""),
-                        price=price,
-                        value_per_dollar=vpd,
-                        detail=f"VPD above threshold ({vpd:.2f} > {threshold:.2f})",
-                    )
-                )
-
-    # Unknown items: items with missing or zero base value
-    for it in item_list:
-        val = it.get("base_value")
-        if val in (None, 0, 0.0, ""):
-            report.unknown_items.append(
-                ItemIssue(
-                    item_id=it.get("item_id", ""),
-                    item_name=it.get("name", ""),
-                    detail="Missing or zero base value",
-                    packs=[],
-                )
-            )
-
-    report.summary.num_packs_missing_price = len(report.packs_missing_price)
-    report.summary.num_packs_invalid_price = len(report.packs_invalid_price)
-    report.summary.num_packs_extreme_value_per_dollar = len(report.packs_extreme_value_per_dollar)
-    report.summary.num_unknown_items = len(report.unknown_items)
-
-    # Duplicates heuristic
-    report.duplicate_packs = _detect_duplicates(pack_list)
-    report.summary.num_duplicate_packs = len(report.duplicate_packs)
-
+    issues, stats = run_rules(pack_list, item_list, val_cfg, artifacts={"outlier_stats_path": stats_path})
+    for name, found in issues.items():
+        if name in _REPORT_FIELDS:
+            report_field, counter = _REPORT_FIELDS[name]
+            setattr(report, report_field, found)
+            setattr(report.summary, counter, len(found))
+        elif found:
+            report.rule_issues[name] = [issue_to_dict(issue) for issue in found]
+    report.rule_stats = {name: stat.to_dict() for name, stat in stats.items()}
     return report
 
 
-def export_validation_report(report: ValidationReport, site_dir: Path = SITE_DATA_DIR, filename: Optional[str] = None) -> Path:
+def export_validation_report(
+    report: ValidationReport,
+    site_dir: Path = SITE_DATA_DIR,
+    filename: Optional[str] = None,
+    changes: ChangeSet | None = None,
+) -> Path:
     ensure_dir(site_dir)
     out_path = site_dir / (filename or DEFAULT_SITE_VALIDATION_REPORT.name)
-    save_json(out_path, report.to_dict())
+    write_export(out_path, report.to_dict(), changes)
     return out_path
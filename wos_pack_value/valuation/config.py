@@ -2,13 +2,13 @@
 
 from __future__ import annotations
 
+import copy
 import logging
 from pathlib import Path
 from typing import Any, Dict
 
-import yaml
-
 from ..analysis.game_profiles import GameProfile, resolve_config_path
+from ..config_registry import freeze, load_config, thaw
 from ..settings import DEFAULT_CONFIG_PATH
 
 logger = logging.getLogger(__name__)
@@ -53,12 +53,13 @@ def _deep_update(base: Dict[str, Any], updates: Dict[str, Any]) -> Dict[str, Any
     return base
 
 
+def _merge_with_defaults(data) -> Any:
+    return freeze(_deep_update(copy.deepcopy(DEFAULT_CONFIG), {k: thaw(v) for k, v in data.items() if v is not None}))
+
+
 def load_valuation_config(path: Path | None = None, game: GameProfile | None = None) -> Dict[str, Any]:
     cfg_path = path or (resolve_config_path("item_values.yaml", game) if game else DEFAULT_CONFIG_PATH)
     if cfg_path.exists():
-        with cfg_path.open("r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
-        config = _deep_update(DEFAULT_CONFIG.copy(), {k: v for k, v in data.items() if v is not None})
-        return config
+        return thaw(load_config(cfg_path, _merge_with_defaults))
     logger.warning("Config file %s missing; using defaults", cfg_path)
-    return DEFAULT_CONFIG
+    return copy.deepcopy(DEFAULT_CONFIG)